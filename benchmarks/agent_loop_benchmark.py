@@ -0,0 +1,306 @@
+"""Measure the agent loop's own overhead by replaying a session offline.
+
+Drives `FunctionCallAgent` with a `ScriptedLLMClient` and `ReplayTool`s, so
+no model or tool does any work and no network is used. The script is either
+synthetic (a tool call per turn, with tool outputs of a given size), a saved
+``agent_state.json`` history or a session read from the events database.
+
+Reported per turn: the loop overhead between two model calls, building the
+provider request from the history (an OpenRouter request, with its payload
+cache) and token counting; over the run: memory growth and the throughput
+of events persisted to a scratch SQLite database and sent to a websocket.
+
+With ``--max-turn-overhead-ms`` the script exits with status 1 when the
+median overhead per turn (loop plus request building) is above the limit,
+to catch regressions in CI.
+
+Usage:
+    python benchmarks/agent_loop_benchmark.py --turns 200
+    python benchmarks/agent_loop_benchmark.py --agent-state path/to/agent_state.json
+    python benchmarks/agent_loop_benchmark.py --session-id <uuid>
+    python benchmarks/agent_loop_benchmark.py --turns 100 --max-turn-overhead-ms 20
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+
+SRC_PATH = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_PATH))
+
+SYSTEM_PROMPT = "You are a helpful agent."
+
+
+class FakeWebSocket:
+    """Counts the events the agent sends, serializing them like Starlette."""
+
+    def __init__(self):
+        self.messages = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    async def send_json(self, data) -> None:
+        start = time.perf_counter()
+        self.bytes += len(json.dumps(data, separators=(",", ":")))
+        self.messages += 1
+        self.seconds += time.perf_counter() - start
+
+
+class Stopwatch:
+    """Wraps a function to add up the time spent in it."""
+
+    def __init__(self, func):
+        self.func = func
+        self.calls = 0
+        self.seconds = 0.0
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.func(*args, **kwargs)
+        finally:
+            self.calls += 1
+            self.seconds += time.perf_counter() - start
+
+
+def make_script(turns: int, output_size: int):
+    from ii_agent.llm.base import TextResult, ToolCall
+    from ii_agent.llm.replay import ReplayScript
+
+    output = ("x" * 79 + "\n") * max(1, output_size // 80)
+    return ReplayScript(
+        prompts=["Summarize the repository"],
+        responses=[
+            [
+                TextResult(text=f"Reading file {i}"),
+                ToolCall(
+                    tool_call_id=f"call-{i}",
+                    tool_name="bash",
+                    tool_input={"command": f"cat file_{i}.txt"},
+                ),
+            ]
+            for i in range(turns)
+        ]
+        + [[TextResult(text="Done")]],
+        tool_outputs={"bash": [output] * turns},
+    )
+
+
+def load_script(args):
+    from ii_agent.llm.replay import ReplayScript
+
+    if args.agent_state:
+        return ReplayScript.from_agent_state(args.agent_state)
+    if args.session_id:
+        return ReplayScript.from_session_events(args.session_id)
+    return make_script(args.turns, args.output_size)
+
+
+async def run(script, latency: float, workspace_root: Path) -> dict:
+    from ii_agent.agents.function_call import FunctionCallAgent
+    from ii_agent.db.manager import Events, Sessions
+    from ii_agent.llm.base import TextResult
+    from ii_agent.llm.context_manager.llm_summarizing import (
+        LLMSummarizingContextManager,
+    )
+    from ii_agent.llm.message_history import MessageHistory
+    from ii_agent.llm.openrouter import OpenRouterClient
+    from ii_agent.llm.replay import ScriptedLLMClient
+    from ii_agent.llm.token_counter import TokenCounter
+    from ii_agent.tools.replay_tool import ReplayTool
+    from ii_agent.utils.workspace_manager import WorkspaceManager
+
+    logger = logging.getLogger("agent_loop_benchmark")
+    # Every tool call is echoed to stdout, which would swamp the measurement
+    logging.getLogger("tool_calls").setLevel(logging.WARNING)
+    payload_client = OpenRouterClient(model_name="benchmark")
+
+    def build_request(messages, max_tokens, system_prompt, tools):
+        return payload_client._build_request_kwargs(
+            messages, max_tokens, system_prompt, 0.0, tools, None
+        )
+
+    client = ScriptedLLMClient(
+        script.responses, latency=latency, build_request=build_request
+    )
+    summary_client = ScriptedLLMClient(
+        [[TextResult(text="Summary of the earlier turns.")]] * len(script.responses)
+    )
+    context_manager = LLMSummarizingContextManager(
+        client=summary_client, token_counter=TokenCounter(), logger=logger
+    )
+    token_counting = Stopwatch(context_manager.count_turn_tokens)
+    context_manager.count_turn_tokens = token_counting
+    db_writes = Stopwatch(Events.save_events)
+    Events.save_events = db_writes
+
+    session_id = uuid.uuid4()
+    workspace = workspace_root / str(session_id)
+    workspace.mkdir()
+    Sessions.create_session(session_uuid=session_id, workspace_path=workspace)
+    websocket = FakeWebSocket()
+    agent = FunctionCallAgent(
+        system_prompt=SYSTEM_PROMPT,
+        client=client,
+        tools=[
+            ReplayTool(name, outputs) for name, outputs in script.tool_outputs.items()
+        ],
+        init_history=MessageHistory(context_manager=context_manager),
+        workspace_manager=WorkspaceManager(workspace),
+        message_queue=asyncio.Queue(),
+        logger_for_agent_logs=logger,
+        max_turns=len(script.responses) + 1,
+        websocket=websocket,
+        session_id=session_id,
+    )
+    processor = agent.start_message_processing()
+
+    start = time.perf_counter()
+    for i, prompt in enumerate(script.prompts or ["Replay the session"]):
+        await agent.run_agent_async(prompt, resume=i > 0)
+    run_seconds = time.perf_counter() - start
+    await agent.message_queue.join()
+    processor.cancel()
+    await processor
+    total_seconds = time.perf_counter() - start
+    Events.save_events = db_writes.func
+
+    calls = client.calls
+    loop_ms = [
+        (calls[i].started - calls[i - 1].finished) * 1000 for i in range(1, len(calls))
+    ]
+    request_ms = [call.request_seconds * 1000 for call in calls]
+    events = len(Events.get_session_events(session_id))
+    return {
+        "turns": len(calls),
+        "run_seconds": run_seconds,
+        "loop_ms": loop_ms,
+        "request_ms": request_ms,
+        "overhead_ms": [loop + request for loop, request in zip(loop_ms, request_ms[1:])],
+        "token_counting_ms": token_counting.seconds * 1000,
+        "token_counting_calls": token_counting.calls,
+        "events_persisted": events,
+        "db_write_seconds": db_writes.seconds,
+        "db_events_per_second": events / total_seconds if total_seconds else 0.0,
+        "websocket_messages": websocket.messages,
+        "websocket_bytes": websocket.bytes,
+        "websocket_messages_per_second": (
+            websocket.messages / run_seconds if run_seconds else 0.0
+        ),
+    }
+
+
+async def measure_memory(script, workspace_root: Path) -> dict:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = await run(script, 0.0, workspace_root)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "memory_growth_bytes": current - before,
+        "memory_growth_per_turn_bytes": (current - before) / max(1, result["turns"]),
+        "memory_peak_bytes": peak - before,
+    }
+
+
+def summarize(samples: list[float]) -> dict:
+    if not samples:
+        return {"median": 0.0, "p95": 0.0, "total": 0.0}
+    ordered = sorted(samples)
+    return {
+        "median": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "total": sum(ordered),
+    }
+
+
+def report(result: dict) -> None:
+    turns = max(1, result["turns"])
+    print(f"{result['turns']} model calls in {result['run_seconds']:.3f} s")
+    print(f"{'per turn (ms)':<28}{'median':>10}{'p95':>10}{'total':>12}")
+    for name in ("loop_ms", "request_ms", "overhead_ms"):
+        stats = result[name]
+        print(
+            f"{name[:-3]:<28}{stats['median']:>10.3f}{stats['p95']:>10.3f}"
+            f"{stats['total']:>12.1f}"
+        )
+    print(
+        f"token counting: {result['token_counting_ms'] / turns:.3f} ms per turn "
+        f"({result['token_counting_calls']} turns counted)"
+    )
+    print(
+        f"memory growth: {result['memory_growth_per_turn_bytes'] / 1024:.1f} KiB per turn, "
+        f"peak {result['memory_peak_bytes'] / 2**20:.1f} MiB"
+    )
+    print(
+        f"events db: {result['events_persisted']} events, "
+        f"{result['db_write_seconds'] * 1000:.1f} ms writing, "
+        f"{result['db_events_per_second']:.0f} events/s end to end"
+    )
+    print(
+        f"websocket: {result['websocket_messages']} messages, "
+        f"{result['websocket_bytes'] / 1024:.0f} KiB, "
+        f"{result['websocket_messages_per_second']:.0f} messages/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--output-size", type=int, default=2000)
+    parser.add_argument("--agent-state", type=str, default=None)
+    parser.add_argument("--session-id", type=str, default=None)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Simulated model latency (s)"
+    )
+    parser.add_argument("--json", type=str, default=None, help="Write results here")
+    parser.add_argument("--max-turn-overhead-ms", type=float, default=None)
+    args = parser.parse_args()
+    if args.json:
+        args.json = os.path.abspath(args.json)
+
+    # Recorded sessions are read from ./db/events.db before moving away
+    script = load_script(args)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        from ii_agent.db.manager import engine
+        from ii_agent.db.models import Base
+
+        # The engine URL is relative to the working directory
+        engine.dispose()
+        os.chdir(tmp_dir)
+        os.makedirs("db")
+        Base.metadata.create_all(engine)
+        workspace = Path(tmp_dir) / "workspace"
+        workspace.mkdir()
+
+        result = asyncio.run(run(script, args.latency, workspace))
+        result.update(asyncio.run(measure_memory(script, workspace)))
+        engine.dispose()
+
+    for name in ("loop_ms", "request_ms", "overhead_ms"):
+        result[name] = summarize(result[name])
+    report(result)
+    if args.json:
+        Path(args.json).write_text(json.dumps(result, indent=2))
+
+    limit = args.max_turn_overhead_ms
+    if limit is not None and result["overhead_ms"]["median"] > limit:
+        print(
+            f"FAIL: median overhead per turn {result['overhead_ms']['median']:.3f} ms "
+            f"is above {limit} ms"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Time filter_overlapping_elements on synthetic pages of interactive elements.
+
+Builds spreadsheet-like layouts: a grid of cells, each found again by a
+second detector with a slightly different box, a few elements nested in
+cells, and some page-wide containers. Prints the median time of the grid
+based filter and, up to --pairwise-max elements, of the pairwise comparison
+it replaced, and checks that both keep the same elements.
+
+Usage:
+    python benchmarks/element_filter_benchmark.py --sizes 1000 5000 20000
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+SRC_PATH = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_PATH))
+
+
+def make_element(index: int, left: int, top: int, width: int, height: int, weight: float):
+    from ii_agent.browser.models import Coordinates, InteractiveElement, Rect
+
+    position = Coordinates(x=left, y=top, width=width, height=height)
+    return InteractiveElement.model_construct(
+        index=index,
+        tag_name="td",
+        text="",
+        attributes={},
+        viewport=position,
+        page=position,
+        center=position,
+        weight=weight,
+        browser_agent_id=str(index),
+        input_type=None,
+        rect=Rect.model_construct(
+            left=left,
+            top=top,
+            right=left + width,
+            bottom=top + height,
+            width=width,
+            height=height,
+        ),
+        z_index=0,
+    )
+
+
+def make_layout(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    elements = []
+    columns = 26
+    cell_width, cell_height = 100, 21
+    for index in range(count):
+        kind = rng.random()
+        weight = rng.choice([1.0, 2.0])
+        if kind < 0.001:
+            # Page, sheet and toolbar containers, ranked below their content
+            box = (0, 0, columns * cell_width, (count // columns) * cell_height)
+            weight = 0.5
+        else:
+            cell = index // 2
+            left = (cell % columns) * cell_width
+            top = (cell // columns) * cell_height
+            box = (left, top, cell_width, cell_height)
+            if index % 2:
+                # The same cell found by the computer vision detector
+                box = (
+                    left + rng.randint(-3, 3),
+                    top + rng.randint(-2, 2),
+                    cell_width + rng.randint(-6, 6),
+                    cell_height + rng.randint(-4, 4),
+                )
+            elif kind < 0.05:
+                # A checkbox or link inside a cell
+                box = (left + 4, top + 3, 60, 15)
+        elements.append(make_element(index, *box, weight=weight))
+    return elements
+
+
+def pairwise_filter(elements: list, iou_threshold: float = 0.7) -> list:
+    from ii_agent.browser.utils import calculate_iou, is_fully_contained
+
+    elements.sort(key=lambda e: (-(e.rect.width * e.rect.height), -e.weight))
+    filtered = []
+    for current in elements:
+        should_add = True
+        for existing in filtered:
+            if calculate_iou(current.rect, existing.rect) > iou_threshold:
+                should_add = False
+                break
+            if is_fully_contained(current.rect, existing.rect):
+                if (
+                    existing.weight >= current.weight
+                    and existing.z_index == current.z_index
+                ):
+                    should_add = False
+                    break
+                if (
+                    current.rect.width * current.rect.height
+                    >= existing.rect.width * existing.rect.height * 0.5
+                ):
+                    filtered.remove(existing)
+                    break
+        if should_add:
+            filtered.append(current)
+    return filtered
+
+
+def median_ms(fn, elements: list, repeats: int) -> tuple[float, list]:
+    times = []
+    for _ in range(repeats):
+        copy = list(elements)
+        start = time.perf_counter()
+        result = fn(copy)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+def main():
+    from ii_agent.browser.utils import filter_overlapping_elements
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--pairwise-max", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{'elements':<10}{'kept':>8}{'grid (ms)':>12}{'pairwise (ms)':>16}")
+    for size in args.sizes:
+        elements = make_layout(size)
+        grid_ms, kept = median_ms(filter_overlapping_elements, elements, args.repeats)
+        pairwise = "-"
+        if size <= args.pairwise_max:
+            pairwise_ms, expected = median_ms(
+                pairwise_filter, elements, max(args.repeats // 2, 1)
+            )
+            assert [id(e) for e in kept] == [id(e) for e in expected]
+            pairwise = f"{pairwise_ms:.1f}"
+        print(f"{size:<10}{len(kept):>8}{grid_ms:>12.1f}{pairwise:>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Benchmark per-event commits against the write-behind EventSink.
+
+Persists the same stream of events twice into a fresh SQLite database: once
+with one `Events.save_event` call per event on the event loop (how the agent's
+message processor used to work), and once through `EventSink`. A probe
+coroutine measures how long the loop is blocked meanwhile.
+
+Usage:
+    python benchmarks/event_sink_benchmark.py --events 5000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+SRC_PATH = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_PATH))
+
+PROBE_INTERVAL = 0.001
+
+
+async def probe_loop_lag(lags: list[float], stop: asyncio.Event) -> None:
+    """Record how late each short sleep wakes up, i.e. loop blocking time."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(max(0.0, time.perf_counter() - start - PROBE_INTERVAL))
+
+
+def make_events(n: int):
+    from ii_agent.core.event import EventType, RealtimeEvent
+
+    return [
+        RealtimeEvent(
+            type=EventType.TOOL_RESULT,
+            content={"tool_name": "bash", "result": "x" * 512, "i": i},
+        )
+        for i in range(n)
+    ]
+
+
+async def run_direct(events) -> dict:
+    from ii_agent.db.manager import Events
+
+    session_id = uuid.uuid4()
+    lags: list[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_loop_lag(lags, stop))
+    await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    for event in events:
+        Events.save_event(session_id, event)
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await probe
+    return {"elapsed": elapsed, "lags": lags}
+
+
+async def run_sink(events, batch_size: int, flush_interval: float) -> dict:
+    from ii_agent.db.event_sink import EventSink
+
+    session_id = uuid.uuid4()
+    sink = EventSink(session_id, max_batch_size=batch_size, flush_interval=flush_interval)
+    lags: list[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_loop_lag(lags, stop))
+    await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    for event in events:
+        sink.put(event)
+        await asyncio.sleep(0)
+    await sink.aclose()
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await probe
+    return {"elapsed": elapsed, "lags": lags}
+
+
+def report(name: str, n: int, result: dict) -> None:
+    lags = sorted(result["lags"]) or [0.0]
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+    print(
+        f"{name:<10} {n / result['elapsed']:>12.0f} events/s   "
+        f"loop lag: max {max(lags) * 1000:8.2f} ms  "
+        f"p99 {p99 * 1000:8.2f} ms  "
+        f"mean {statistics.fmean(lags) * 1000:8.3f} ms  "
+        f"total {sum(lags):8.3f} s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--flush-interval", type=float, default=0.5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # The engine URL is relative to the working directory.
+        os.chdir(tmp_dir)
+        os.makedirs("db")
+
+        events = make_events(args.events)
+        direct = asyncio.run(run_direct(events))
+        sink = asyncio.run(run_sink(events, args.batch_size, args.flush_interval))
+
+        from ii_agent.db.manager import engine
+
+        engine.dispose()
+
+    print(f"{args.events} events, batch size {args.batch_size}")
+    report("direct", args.events, direct)
+    report("sink", args.events, sink)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Time the session/event API queries on a large events database.
+
+Seeds a scratch SQLite database (1M events by default), then times the
+queries behind the sessions API with and without the event/session indexes.
+
+Usage:
+    python benchmarks/events_db_benchmark.py --events 1000000 --sessions 2000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+SRC_PATH = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_PATH))
+
+EVENT_TYPES = ["user_message", "tool_call", "tool_result", "agent_thinking", "file_edit"]
+INSERT_BATCH_SIZE = 20_000
+
+
+def seed(engine, n_events: int, n_sessions: int, n_devices: int) -> list[dict]:
+    from sqlalchemy import insert
+
+    from ii_agent.db.models import Event, Session
+
+    start = datetime(2025, 1, 1)
+    sessions = [
+        {
+            "id": str(uuid.uuid4()),
+            "workspace_dir": f"/workspace/{i}",
+            "created_at": start + timedelta(minutes=i),
+            "device_id": f"device-{i % n_devices}",
+            "name": f"session {i}",
+        }
+        for i in range(n_sessions)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(Session), sessions)
+
+    rng = random.Random(0)
+    rows = []
+    for i in range(n_events):
+        session = sessions[rng.randrange(n_sessions)]
+        event_type = EVENT_TYPES[rng.randrange(len(EVENT_TYPES))]
+        rows.append(
+            {
+                "id": str(uuid.uuid4()),
+                "session_id": session["id"],
+                "timestamp": start + timedelta(seconds=i),
+                "event_type": event_type,
+                "event_payload": {"type": event_type, "content": {"text": "x" * 64}},
+            }
+        )
+        if len(rows) == INSERT_BATCH_SIZE:
+            with engine.begin() as conn:
+                conn.execute(insert(Event), rows)
+            rows = []
+    if rows:
+        with engine.begin() as conn:
+            conn.execute(insert(Event), rows)
+    return sessions
+
+
+def timed(fn, repeats: int) -> float:
+    """Median wall time of `fn` in milliseconds."""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run_queries(sessions: list[dict], repeats: int, rng: random.Random) -> dict:
+    from ii_agent.db.manager import Events, Sessions
+
+    picks = [rng.choice(sessions) for _ in range(repeats)]
+    it = iter(picks)
+    history = timed(lambda: Events.get_session_events_with_details(next(it)["id"]), repeats)
+
+    it = iter(picks)
+    by_device = timed(lambda: Sessions.get_sessions_by_device_id(next(it)["device_id"]), repeats)
+
+    # Deleting mutates the data, so every sample uses a different session.
+    victims = iter(rng.sample(sessions, repeats))
+    prune = timed(
+        lambda: Events.delete_events_from_last_to_user_message(uuid.UUID(next(victims)["id"])),
+        repeats,
+    )
+    return {
+        "session history": history,
+        "sessions by device": by_device,
+        "prune to last user message": prune,
+    }
+
+
+def set_indexes(engine, enabled: bool) -> None:
+    from ii_agent.db.models import Event, Session
+
+    indexes = list(Event.__table__.indexes) + list(Session.__table__.indexes)
+    with engine.begin() as conn:
+        for index in indexes:
+            if enabled:
+                index.create(conn, checkfirst=True)
+            else:
+                index.drop(conn, checkfirst=True)
+        conn.exec_driver_sql("ANALYZE")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--sessions", type=int, default=2_000)
+    parser.add_argument("--devices", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # The engine URL is relative to the working directory.
+        os.chdir(tmp_dir)
+        os.makedirs("db")
+        from ii_agent.db.manager import engine
+
+        start = time.perf_counter()
+        sessions = seed(engine, args.events, args.sessions, args.devices)
+        print(
+            f"Seeded {args.events} events in {args.sessions} sessions "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
+
+        rng = random.Random(1)
+        set_indexes(engine, enabled=False)
+        without = run_queries(sessions, args.repeats, rng)
+        set_indexes(engine, enabled=True)
+        with_indexes = run_queries(sessions, args.repeats, rng)
+        engine.dispose()
+
+    print(f"{'query (median ms)':<30}{'no indexes':>12}{'indexes':>12}")
+    for name in without:
+        print(f"{name:<30}{without[name]:>12.2f}{with_indexes[name]:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Time the conversion of a growing history into an OpenRouter request.
+
+Simulates an agent session: every turn appends a tool call and its result to
+the history and builds the request for the next model call. Prints the
+median time per request at a few history lengths, with the per-turn payload
+cache and with a fresh client (no cache hits) for every request. With the
+cache only the two new turns are converted; what still grows with the history
+is assembling the message list itself.
+
+Usage:
+    python benchmarks/payload_conversion_benchmark.py --turns 400
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+SRC_PATH = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_PATH))
+
+TOOL_OUTPUT = "file contents\n" * 200
+
+
+def make_tools(n_tools: int) -> list:
+    from ii_agent.llm.base import ToolParam
+
+    schema = {
+        "type": "object",
+        "properties": {"command": {"type": "string"}, "timeout": {"type": "number"}},
+        "required": ["command"],
+    }
+    return [
+        ToolParam(name=f"tool_{i}", description="Run a command", input_schema=schema)
+        for i in range(n_tools)
+    ]
+
+
+def run(turns: int, report_every: int, n_tools: int, cached: bool) -> dict[int, float]:
+    from ii_agent.llm.base import TextPrompt, ToolCall, ToolFormattedResult
+    from ii_agent.llm.openrouter import OpenRouterClient
+
+    client = OpenRouterClient(model_name="benchmark")
+    tools = make_tools(n_tools)
+    messages = [[TextPrompt(text="Summarize the repository")]]
+    samples: dict[int, list[float]] = {}
+    for turn in range(1, turns + 1):
+        call_id = f"call-{turn}"
+        messages.append(
+            [ToolCall(tool_call_id=call_id, tool_name="tool_0", tool_input={"command": "cat"})]
+        )
+        messages.append(
+            [ToolFormattedResult(tool_call_id=call_id, tool_name="tool_0", tool_output=TOOL_OUTPUT)]
+        )
+        if not cached:
+            client = OpenRouterClient(model_name="benchmark")
+        start = time.perf_counter()
+        client._build_request_kwargs(
+            messages,
+            1024,
+            "You are a helpful agent.",
+            0.0,
+            tools,
+            None,
+            tool_args={"deep_research": True},
+        )
+        bucket = (turn - 1) // report_every * report_every + report_every
+        samples.setdefault(bucket, []).append((time.perf_counter() - start) * 1000)
+    return {bucket: statistics.median(times) for bucket, times in samples.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=400)
+    parser.add_argument("--report-every", type=int, default=50)
+    parser.add_argument("--tools", type=int, default=30)
+    args = parser.parse_args()
+
+    uncached = run(args.turns, args.report_every, args.tools, cached=False)
+    cached = run(args.turns, args.report_every, args.tools, cached=True)
+
+    print(f"{'turns (median ms)':<20}{'no cache':>12}{'cache':>12}")
+    for bucket in uncached:
+        print(f"{bucket:<20}{uncached[bucket]:>12.3f}{cached[bucket]:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,10 +13,15 @@ import asyncio
 from dotenv import load_dotenv
 
 from ii_agent.llm.message_history import MessageHistory
+from ii_agent.llm.image_eviction import ImageEvictionPolicy
 
 load_dotenv()
 
 from ii_agent.core.event import RealtimeEvent, EventType
+from ii_agent.browser.pool import aclose_browser_pool
+from ii_agent.llm.http_client import aclose_async_http_client
+from ii_agent.tools.http_session import aclose_aiohttp_session
+from ii_agent.core.tracing import configure_tracing, shutdown_tracing
 from ii_agent.utils.constants import TOKEN_BUDGET
 from utils import parse_common_args, create_workspace_manager_for_connection
 from rich.console import Console
@@ -42,6 +47,7 @@ async def async_main():
     parser = parse_common_args(parser)
 
     args = parser.parse_args()
+    configure_tracing(args.trace_file, args.otlp_endpoint)
 
     if os.path.exists(args.logs_path):
         os.remove(args.logs_path)
@@ -94,7 +100,7 @@ async def async_main():
         "model_name": args.model_name,
     }
     if args.llm_client == "anthropic-direct":
-        client_kwargs["use_caching"] = False  # Or a configurable value if needed later
+        client_kwargs["use_caching"] = args.prompt_caching
         client_kwargs["project_id"] = args.project_id
         client_kwargs["region"] = args.region
     elif args.llm_client == "openai-direct":
@@ -120,7 +126,10 @@ async def async_main():
         logger=logger_for_agent_logs,
         token_budget=TOKEN_BUDGET,
     )
-    init_history = MessageHistory(context_manager)
+    init_history = MessageHistory(
+        context_manager,
+        image_policy=ImageEvictionPolicy.for_model(client.model_name),
+    )
 
     queue = asyncio.Queue()
     tools = get_system_tools(
@@ -196,6 +205,10 @@ async def async_main():
     finally:
         # Cleanup tasks
         message_task.cancel()
+        await aclose_browser_pool()
+        await aclose_async_http_client()
+        await aclose_aiohttp_session()
+        shutdown_tracing()
 
     console.print("[bold]Goodbye![/bold]")
 
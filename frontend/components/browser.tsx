@@ -43,7 +43,7 @@ const Browser = ({ className, url, screenshot, raw }: BrowserProps) => {
       <div className="bg-black/80 h-full">
         {screenshot && (
           <img
-            src={`data:image/jpeg;base64,${screenshot}`}
+            src={screenshot}
             alt="Browser"
             className="w-full h-full object-contain object-top"
           />
@@ -7,6 +7,7 @@ import { toast } from "sonner";
 import { AppAction, useAppContext } from "@/context/app-context";
 import { AgentEvent, TOOL, ActionStep, Message, TAB } from "@/typings/agent";
 import { Terminal as XTerm } from "@xterm/xterm";
+import { imageSourceUrl } from "@/lib/utils";
 
 export function useAppEvents({
   xtermRef,
@@ -229,9 +230,11 @@ export function useAppEvents({
                 ) {
                   lastMessage.action.data.result =
                     data.content.result && Array.isArray(data.content.result)
-                      ? data.content.result.find(
-                          (item) => item.type === "image"
-                        )?.source?.data
+                      ? imageSourceUrl(
+                          data.content.result.find(
+                            (item) => item.type === "image"
+                          )?.source
+                        )
                       : undefined;
                 }
                 lastMessage.action.data.isResult = true;
@@ -258,6 +261,34 @@ export function useAppEvents({
           }
           break;
 
+        case AgentEvent.AGENT_RESPONSE_DELTA: {
+          // Deltas of one model turn share a message_id; grow that message.
+          const messageId = data.content.message_id as string;
+          const existing = messagesRef.current.find(
+            (msg) => msg.id === messageId
+          );
+          if (existing) {
+            safeDispatch({
+              type: "UPDATE_MESSAGE",
+              payload: {
+                ...existing,
+                content: (existing.content || "") + (data.content.text as string),
+              },
+            });
+          } else {
+            safeDispatch({
+              type: "ADD_MESSAGE",
+              payload: {
+                id: messageId,
+                role: "assistant",
+                content: data.content.text as string,
+                timestamp: Date.now(),
+              },
+            });
+          }
+          break;
+        }
+
         case AgentEvent.AGENT_RESPONSE:
           // safeDispatch({
           //   type: "ADD_MESSAGE",
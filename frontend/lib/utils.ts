@@ -4,3 +4,19 @@ import { twMerge } from "tailwind-merge"
 export function cn(...inputs: ClassValue[]) {
   return twMerge(clsx(inputs))
 }
+
+export interface ImageSource {
+  type: string
+  media_type?: string
+  data?: string
+  digest?: string
+}
+
+// Images in events are either inline base64 or references to the blob store.
+export function imageSourceUrl(source?: ImageSource) {
+  if (!source) return undefined
+  if (source.type === "blob") {
+    return `${process.env.NEXT_PUBLIC_API_URL}/api/blobs/${source.digest}`
+  }
+  return `data:${source.media_type || "image/png"};base64,${source.data}`
+}
@@ -53,6 +53,7 @@ export enum AgentEvent {
   TOOL_CALL = "tool_call",
   TOOL_RESULT = "tool_result",
   AGENT_RESPONSE = "agent_response",
+  AGENT_RESPONSE_DELTA = "agent_response_delta",
   STREAM_COMPLETE = "stream_complete",
   ERROR = "error",
   SYSTEM = "system",
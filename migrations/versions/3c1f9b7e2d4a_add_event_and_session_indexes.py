@@ -0,0 +1,47 @@
+"""Add event and session indexes
+
+Revision ID: 3c1f9b7e2d4a
+Revises: a89eabebd4fa
+Create Date: 2025-06-20 10:12:07.318220
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f9b7e2d4a'
+down_revision: Union[str, None] = 'a89eabebd4fa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Databases created by Base.metadata.create_all already have these.
+    op.create_index(
+        'ix_event_session_id_timestamp',
+        'event',
+        ['session_id', 'timestamp'],
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ix_event_session_id_event_type_timestamp',
+        'event',
+        ['session_id', 'event_type', 'timestamp'],
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ix_session_device_id_created_at',
+        'session',
+        ['device_id', 'created_at'],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_session_device_id_created_at', table_name='session')
+    op.drop_index('ix_event_session_id_event_type_timestamp', table_name='event')
+    op.drop_index('ix_event_session_id_timestamp', table_name='event')
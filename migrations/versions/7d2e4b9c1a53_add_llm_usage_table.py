@@ -0,0 +1,57 @@
+"""Add llm_usage table
+
+Revision ID: 7d2e4b9c1a53
+Revises: 3c1f9b7e2d4a
+Create Date: 2025-06-24 09:41:52.604117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2e4b9c1a53'
+down_revision: Union[str, None] = '3c1f9b7e2d4a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Databases created by Base.metadata.create_all already have the table.
+    op.create_table(
+        'llm_usage',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('session_id', sa.String(length=36), nullable=False),
+        sa.Column('run_id', sa.String(), nullable=True),
+        sa.Column('timestamp', sa.DateTime(), nullable=True),
+        sa.Column('model', sa.String(), nullable=False),
+        sa.Column('purpose', sa.String(), nullable=False),
+        sa.Column('latency_ms', sa.Float(), nullable=False),
+        sa.Column('ttfb_ms', sa.Float(), nullable=True),
+        sa.Column('input_tokens', sa.Integer(), nullable=False),
+        sa.Column('output_tokens', sa.Integer(), nullable=False),
+        sa.Column('cache_read_input_tokens', sa.Integer(), nullable=False),
+        sa.Column('cache_creation_input_tokens', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['session_id'], ['session.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ix_llm_usage_session_id_timestamp',
+        'llm_usage',
+        ['session_id', 'timestamp'],
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ix_llm_usage_run_id', 'llm_usage', ['run_id'], if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_llm_usage_run_id', table_name='llm_usage')
+    op.drop_index('ix_llm_usage_session_id_timestamp', table_name='llm_usage')
+    op.drop_table('llm_usage')
@@ -21,10 +21,13 @@ from datasets import load_dataset, Dataset
 from huggingface_hub import snapshot_download
 import uuid
 import asyncio
-from ii_agent.db.models import Session, Event
+from ii_agent.db.models import Session, Event, LLMUsage
 from ii_agent.agents.function_call import FunctionCallAgent
 from ii_agent.browser.browser import Browser
+from ii_agent.browser.pool import aclose_browser_pool, get_browser_pool
 from ii_agent.llm.message_history import MessageHistory
+from ii_agent.llm.image_eviction import ImageEvictionPolicy
+from ii_agent.llm.usage import UsageLedger, use_usage_ledger
 from ii_agent.prompts.gaia_system_prompt import GAIA_SYSTEM_PROMPT
 from ii_agent.tools.bash_tool import BashTool
 from ii_agent.tools.browser_tools import (
@@ -53,13 +56,27 @@ from ii_agent.tools.visualizer import DisplayImageTool
 from ii_agent.tools.web_search_tool import WebSearchTool
 from ii_agent.utils import WorkspaceManager
 from ii_agent.llm import get_client
+from ii_agent.llm.http_client import aclose_async_http_client
 from ii_agent.llm.context_manager.llm_summarizing import LLMSummarizingContextManager
+from ii_agent.llm.response_cache import (
+    CachedLLMClient,
+    LLMResponseCache,
+    ResponseCacheMode,
+)
 from ii_agent.llm.token_counter import TokenCounter
-from ii_agent.utils.constants import DEFAULT_MODEL, TOKEN_BUDGET, UPLOAD_FOLDER_NAME
+from ii_agent.utils.constants import (
+    DEFAULT_MODEL,
+    LLM_RESPONSE_CACHE_MAX_BYTES,
+    LLM_RESPONSE_CACHE_PATH,
+    TOKEN_BUDGET,
+    UPLOAD_FOLDER_NAME,
+)
 from utils import parse_common_args
 from ii_agent.db.manager import Sessions, get_db
 from ii_agent.core.event import RealtimeEvent, EventType
+from ii_agent.core.tracing import configure_tracing, shutdown_tracing
 from ii_agent.tools.youtube_transcript_tool import YoutubeTranscriptTool
+from ii_agent.tools.http_session import aclose_aiohttp_session
 
 # Global lock for thread-safe file appending
 append_answer_lock = Lock()
@@ -113,6 +130,26 @@ def parse_args():
         nargs="+",
         help="Specify one or more task UUIDs to run only those specific tasks",
     )
+    parser.add_argument(
+        "--llm-cache-mode",
+        type=str,
+        choices=[mode.value for mode in ResponseCacheMode],
+        default=ResponseCacheMode.PASSTHROUGH.value,
+        help="Record model responses, replay recorded ones without calling the "
+        "model, or leave the response cache unused",
+    )
+    parser.add_argument(
+        "--llm-cache-path",
+        type=str,
+        default=LLM_RESPONSE_CACHE_PATH,
+        help="SQLite file of the model response cache",
+    )
+    parser.add_argument(
+        "--llm-cache-max-mb",
+        type=int,
+        default=LLM_RESPONSE_CACHE_MAX_BYTES // 2**20,
+        help="Size above which the least recently used responses are evicted",
+    )
 
     return parser.parse_args()
 
@@ -186,6 +223,8 @@ async def answer_single_question(
     client,
     context_manager,
     container_workspace: bool,
+    run_name: str,
+    shell_path: str | None = None,
 ) -> None:
     """Process a single GAIA question using the agent."""
     # Create workspace using task_id
@@ -204,6 +243,9 @@ async def answer_single_question(
         with get_db() as session:
             # Delete all events for this session
             session.query(Event).filter(Event.session_id == str(session_id)).delete()
+            session.query(LLMUsage).filter(
+                LLMUsage.session_id == str(session_id)
+            ).delete()
             # Delete the session itself
             session.query(Session).filter(Session.id == str(session_id)).delete()
             logger.info(f"Removed old session and events for {session_id}")
@@ -279,7 +321,7 @@ async def answer_single_question(
         BashTool(
             workspace_root=workspace_path,
             require_confirmation=False,
-            shell_path=args.shell_path,
+            shell_path=shell_path,
         ),
         BrowserNavigationTool(browser=browser),
         BrowserRestartTool(browser=browser),
@@ -301,23 +343,29 @@ async def answer_single_question(
     ]
 
     system_prompt = GAIA_SYSTEM_PROMPT
-    init_history = MessageHistory(context_manager)
-
-    # Create agent instance for this question
-    agent = FunctionCallAgent(
-        system_prompt=system_prompt,
-        client=client,
-        tools=tools,
-        workspace_manager=workspace_manager,
-        message_queue=message_queue,
-        logger_for_agent_logs=logger,
-        init_history=init_history,
-        max_output_tokens_per_turn=32768,
-        max_turns=200,
-        session_id=session_id,  # Pass the session_id from database manager
-        interactive_mode=False,  # Run until the task is completed
+    init_history = MessageHistory(
+        context_manager,
+        image_policy=ImageEvictionPolicy.for_model(client.model_name),
     )
 
+    # Create agent instance for this question; its LLM calls, and the summaries
+    # made for it by the shared context manager, are recorded for the run
+    usage_ledger = UsageLedger(session_id, run_id=run_name)
+    with use_usage_ledger(usage_ledger):
+        agent = FunctionCallAgent(
+            system_prompt=system_prompt,
+            client=client,
+            tools=tools,
+            workspace_manager=workspace_manager,
+            message_queue=message_queue,
+            logger_for_agent_logs=logger,
+            init_history=init_history,
+            max_output_tokens_per_turn=32768,
+            max_turns=200,
+            session_id=session_id,  # Pass the session_id from database manager
+            interactive_mode=False,  # Run until the task is completed
+        )
+
     # Create background task for message processing
     message_task = agent.start_message_processing()
 
@@ -368,11 +416,19 @@ Run verification steps if that's needed, you must make sure you find the correct
             await message_queue.join()
         except asyncio.CancelledError:
             pass
+        # Hands the browser context back to the pool for the next question
+        await browser.close()
 
     end_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     # Get token counts
-    token_counts = 0  # TODO: add this
+    usage = usage_ledger.summary()
+    token_counts = (
+        usage["input_tokens"]
+        + usage["cache_read_input_tokens"]
+        + usage["cache_creation_input_tokens"]
+        + usage["output_tokens"]
+    )
 
     annotated_example = {
         "agent_name": "anthropic-fc",
@@ -387,6 +443,7 @@ Run verification steps if that's needed, you must make sure you find the correct
         "start_time": start_time,
         "end_time": end_time,
         "token_counts": token_counts,
+        "usage": usage,
         "workspace_id": task_id,
     }
 
@@ -412,11 +469,19 @@ def main():
     client = get_client(
         "anthropic-direct",
         model_name=DEFAULT_MODEL,
-        use_caching=False,
+        use_caching=args.prompt_caching,
         project_id=args.project_id,
         region=args.region,
         thinking_tokens=0,
     )
+    if args.llm_cache_mode != ResponseCacheMode.PASSTHROUGH.value:
+        client = CachedLLMClient(
+            client,
+            mode=args.llm_cache_mode,
+            cache=LLMResponseCache(
+                path=args.llm_cache_path, max_bytes=args.llm_cache_max_mb * 2**20
+            ),
+        )
 
     # Initialize token counter and context manager
     token_counter = TokenCounter()
@@ -463,6 +528,7 @@ def main():
     async def process_tasks():
         # Create semaphore to limit concurrent tasks
         sem = asyncio.Semaphore(args.concurrency)
+        await get_browser_pool().start()
 
         async def process_with_semaphore(example):
             async with sem:
@@ -473,19 +539,32 @@ def main():
                     client,
                     context_manager,
                     args.use_container_workspace,
+                    args.run_name,
+                    args.shell_path,
                 )
 
         # Create tasks with semaphore
         tasks = [process_with_semaphore(example) for example in tasks_to_run]
 
         # Process tasks with progress bar
-        for f in tqdm(
-            asyncio.as_completed(tasks), total=len(tasks), desc="Processing GAIA tasks"
-        ):
-            await f
+        try:
+            for f in tqdm(
+                asyncio.as_completed(tasks),
+                total=len(tasks),
+                desc="Processing GAIA tasks",
+            ):
+                await f
+        finally:
+            await aclose_browser_pool()
+            await aclose_async_http_client()
+            await aclose_aiohttp_session()
 
     # Run the async task processing
-    asyncio.run(process_tasks())
+    configure_tracing(args.trace_file, args.otlp_endpoint)
+    try:
+        asyncio.run(process_tasks())
+    finally:
+        shutdown_tracing()
 
     print("All GAIA tasks processed.")
 
@@ -1,18 +1,33 @@
 import asyncio
 import logging
+from functools import partial
 from typing import Any, Optional
 import uuid
-from functools import partial
 
 from typing import List
 from fastapi import WebSocket
 from ii_agent.agents.base import BaseAgent
 from ii_agent.core.event import EventType, RealtimeEvent
-from ii_agent.llm.base import LLMClient, TextResult, ToolCallParameters
+from ii_agent.core.loop_monitor import loop_activity
+from ii_agent.core.tracing import trace_span
+from ii_agent.llm.base import (
+    LLMClient,
+    StreamDelta,
+    TextResult,
+    ToolCallParameters,
+)
 from ii_agent.llm.message_history import MessageHistory
+from ii_agent.llm.prompt_cache import PromptCacheStats
+from ii_agent.llm.usage import (
+    LLMCallPurpose,
+    LLMCallTimer,
+    UsageLedger,
+    current_usage_ledger,
+    use_usage_ledger,
+)
 from ii_agent.tools.base import ToolImplOutput, LLMTool
 from ii_agent.tools.utils import encode_image
-from ii_agent.db.manager import Events
+from ii_agent.db.event_sink import EventSink
 from ii_agent.tools import AgentToolManager
 from ii_agent.utils.constants import COMPLETE_MESSAGE
 import time
@@ -68,6 +83,8 @@ try breaking down the task into smaller steps. After call this tool to update or
         websocket: Optional[WebSocket] = None,
         session_id: Optional[uuid.UUID] = None,
         interactive_mode: bool = True,
+        stream_responses: bool = False,
+        parallel_tool_calls: bool = False,
     ):
         """Initialize the agent.
 
@@ -84,6 +101,10 @@ try breaking down the task into smaller steps. After call this tool to update or
             session_id: UUID of the session this agent belongs to
             interactive_mode: Whether to use interactive mode
             init_history: Optional initial history to use
+            stream_responses: Whether to stream model text to the message
+                queue as AGENT_RESPONSE_DELTA events while it is generated
+            parallel_tool_calls: Whether to accept every tool call of a turn
+                and run them concurrently, each with its own timeout
         """
         super().__init__()
         self.workspace_manager = workspace_manager
@@ -104,20 +125,33 @@ try breaking down the task into smaller steps. After call this tool to update or
         self.interrupted = False
         self.history = init_history
         self.session_id = session_id
-
-        # Initialize database manager
+        self.stream_responses = stream_responses
+        self.parallel_tool_calls = parallel_tool_calls
+        self.prompt_cache_stats = PromptCacheStats()
+        # Agents created for a chat session or a GAIA task share its ledger
+        ledger = current_usage_ledger()
+        self.usage_ledger = ledger if ledger is not None else UsageLedger(session_id)
+
+        # Events are persisted through a write-behind sink created on first use
+        self.event_sink: Optional[EventSink] = None
         self.message_queue = message_queue
         self.websocket = websocket
 
     async def _process_messages(self):
+        if self.session_id is not None and self.event_sink is None:
+            self.event_sink = EventSink(self.session_id)
         try:
             while True:
                 try:
                     message: RealtimeEvent = await self.message_queue.get()
 
-                    # Save all events to database if we have a session
-                    if self.session_id is not None:
-                        Events.save_event(self.session_id, message)
+                    # Save all events to database if we have a session.
+                    # Streaming deltas are transient; the assembled turn is
+                    # what gets persisted through the history.
+                    if message.type == EventType.AGENT_RESPONSE_DELTA:
+                        pass
+                    elif self.event_sink is not None:
+                        self.event_sink.put(message)
                     else:
                         self.logger_for_agent_logs.info(
                             f"No session ID, skipping event: {message}"
@@ -149,6 +183,9 @@ try breaking down the task into smaller steps. After call this tool to update or
             self.logger_for_agent_logs.info("Message processor stopped")
         except Exception as e:
             self.logger_for_agent_logs.error(f"Error in message processor: {str(e)}")
+        finally:
+            if self.event_sink is not None:
+                await self.event_sink.aclose()
 
     def _validate_tool_parameters(self):
         """Validate tool parameters and check for duplicates."""
@@ -160,6 +197,17 @@ try breaking down the task into smaller steps. After call this tool to update or
                 raise ValueError(f"Tool {sorted_names[i]} is duplicated")
         return tool_params
 
+    def _forward_stream_delta(self, message_id: str, delta: StreamDelta):
+        """Forward a streamed text delta of the current turn to the message queue."""
+        if delta.type != "text":
+            return
+        self.message_queue.put_nowait(
+            RealtimeEvent(
+                type=EventType.AGENT_RESPONSE_DELTA,
+                content={"message_id": message_id, "text": delta.delta},
+            )
+        )
+
     def start_message_processing(self):
         """Start processing the message queue."""
         return asyncio.create_task(self._process_messages())
@@ -209,68 +257,159 @@ try breaking down the task into smaller steps. After call this tool to update or
 
         remaining_turns = self.max_turns
         while remaining_turns > 0:
-            self.history.truncate()
             remaining_turns -= 1
+            with trace_span("agent.turn", turn=self.max_turns - remaining_turns):
+                await self.history.atruncate()
+
+                delimiter = "-" * 45 + " NEW TURN " + "-" * 45
+                self.logger_for_agent_logs.info(f"\n{delimiter}\n")
 
-            delimiter = "-" * 45 + " NEW TURN " + "-" * 45
-            self.logger_for_agent_logs.info(f"\n{delimiter}\n")
+                # Get tool parameters for available tools
+                all_tool_params = self._validate_tool_parameters()
 
-            # Get tool parameters for available tools
-            all_tool_params = self._validate_tool_parameters()
+                if self.interrupted:
+                    # Handle interruption during model generation or other operations
+                    self.add_fake_assistant_turn(AGENT_INTERRUPT_FAKE_MODEL_RSP)
+                    return ToolImplOutput(
+                        tool_output=AGENT_INTERRUPT_MESSAGE,
+                        tool_result_message=AGENT_INTERRUPT_MESSAGE,
+                    )
 
-            if self.interrupted:
-                # Handle interruption during model generation or other operations
-                self.add_fake_assistant_turn(AGENT_INTERRUPT_FAKE_MODEL_RSP)
-                return ToolImplOutput(
-                    tool_output=AGENT_INTERRUPT_MESSAGE,
-                    tool_result_message=AGENT_INTERRUPT_MESSAGE,
+                self.logger_for_agent_logs.info(
+                    f"(Current token count: {self.history.count_tokens()})\n"
+                )
+                timer = LLMCallTimer(
+                    self.client.model_name,
+                    LLMCallPurpose.MAIN,
+                    provider=self.client.provider,
                 )
+                with loop_activity(llm_call=self.client.model_name), trace_span(
+                    "llm.generate", model=self.client.model_name, purpose=timer.purpose
+                ):
+                    if self.stream_responses:
+                        model_response, metadata = await self.client.agenerate_stream(
+                            messages=self.history.get_messages_for_llm(),
+                            max_tokens=self.max_output_tokens,
+                            on_delta=timer.stream_callback(
+                                partial(self._forward_stream_delta, str(uuid.uuid4()))
+                            ),
+                            tools=all_tool_params,
+                            system_prompt=self.system_prompt,
+                        )
+                    else:
+                        model_response, metadata = await self.client.agenerate(
+                            messages=self.history.get_messages_for_llm(),
+                            max_tokens=self.max_output_tokens,
+                            tools=all_tool_params,
+                            system_prompt=self.system_prompt,
+                        )
+                    await timer.afinish(metadata)
 
-            self.logger_for_agent_logs.info(
-                f"(Current token count: {self.history.count_tokens()})\n"
-            )
-            loop = asyncio.get_event_loop()
-            model_response, _ = await loop.run_in_executor(
-                None,
-                partial(
-                    self.client.generate,
-                    messages=self.history.get_messages_for_llm(),
-                    max_tokens=self.max_output_tokens,
-                    tools=all_tool_params,
-                    system_prompt=self.system_prompt,
-                ),
-            )
+                self._record_cache_usage(metadata)
 
-            if len(model_response) == 0:
-                model_response = [TextResult(text=COMPLETE_MESSAGE)]
+                if len(model_response) == 0:
+                    model_response = [TextResult(text=COMPLETE_MESSAGE)]
 
-            # Add the raw response to the canonical history
-            self.history.add_assistant_turn(model_response)
+                # Add the raw response to the canonical history
+                self.history.add_assistant_turn(
+                    model_response, parallel_tool_calls=self.parallel_tool_calls
+                )
 
-            # Handle tool calls
-            pending_tool_calls = self.history.get_pending_tool_calls()
+                # Handle tool calls
+                pending_tool_calls = self.history.get_pending_tool_calls()
+
+                if len(pending_tool_calls) == 0:
+                    # No tools were called, so assume the task is complete
+                    self.logger_for_agent_logs.info("[no tools were called]")
+                    self.message_queue.put_nowait(
+                        RealtimeEvent(
+                            type=EventType.AGENT_RESPONSE,
+                            content={"text": "Task completed"},
+                        )
+                    )
+                    return ToolImplOutput(
+                        tool_output=self.history.get_last_assistant_text_response(),
+                        tool_result_message="Task completed",
+                    )
+
+                if len(pending_tool_calls) > 1:
+                    result = await self._run_parallel_tool_calls(pending_tool_calls)
+                    if result is not None:
+                        return result
+                    continue
+
+                tool_call = pending_tool_calls[0]
 
-            if len(pending_tool_calls) == 0:
-                # No tools were called, so assume the task is complete
-                self.logger_for_agent_logs.info("[no tools were called]")
                 self.message_queue.put_nowait(
                     RealtimeEvent(
-                        type=EventType.AGENT_RESPONSE,
-                        content={"text": "Task completed"},
+                        type=EventType.TOOL_CALL,
+                        content={
+                            "tool_call_id": tool_call.tool_call_id,
+                            "tool_name": tool_call.tool_name,
+                            "tool_input": tool_call.tool_input,
+                        },
                     )
                 )
-                return ToolImplOutput(
-                    tool_output=self.history.get_last_assistant_text_response(),
-                    tool_result_message="Task completed",
-                )
+                self.tool_start_time = time.monotonic()
+
+                text_results = [
+                    item for item in model_response if isinstance(item, TextResult)
+                ]
+                if len(text_results) > 0:
+                    text_result = text_results[0]
+                    self.logger_for_agent_logs.info(
+                        f"Top-level agent planning next step: {text_result.text}\n",
+                    )
 
-            if len(pending_tool_calls) > 1:
-                raise ValueError("Only one tool call per turn is supported")
+                # Handle tool call by the agent
+                if self.interrupted:
+                    # Handle interruption during tool execution
+                    self.add_tool_call_result(tool_call, TOOL_RESULT_INTERRUPT_MESSAGE)
+                    self.add_fake_assistant_turn(TOOL_CALL_INTERRUPT_FAKE_MODEL_RSP)
+                    return ToolImplOutput(
+                        tool_output=TOOL_RESULT_INTERRUPT_MESSAGE,
+                        tool_result_message=TOOL_RESULT_INTERRUPT_MESSAGE,
+                    )
+                try:
+                    tool_result = await asyncio.wait_for(
+                        self.tool_manager.run_tool(tool_call, self.history),
+                        timeout=self.tool_timeout,
+                    )
+                except asyncio.TimeoutError:
+                    self.add_tool_call_result(tool_call, TOOL_CALL_TIMEOUT_MESSAGE)
+                    self.add_fake_assistant_turn(TOOL_CALL_TIMEOUT_FAKE_MODEL_RSP)
+                    return ToolImplOutput(
+                        tool_output=TOOL_CALL_TIMEOUT_MESSAGE,
+                        tool_result_message=TOOL_CALL_TIMEOUT_MESSAGE,
+                    )
 
-            assert len(pending_tool_calls) == 1
+                self.add_tool_call_result(tool_call, tool_result)
+                if self.tool_manager.should_stop():
+                    # Add a fake model response, so the next turn is the user's
+                    # turn in case they want to resume
+                    self.add_fake_assistant_turn(self.tool_manager.get_final_answer())
+                    return ToolImplOutput(
+                        tool_output=self.tool_manager.get_final_answer(),
+                        tool_result_message="Task completed",
+                    )
 
-            tool_call = pending_tool_calls[0]
+        agent_answer = "Agent did not complete after max turns"
+        self.message_queue.put_nowait(
+            RealtimeEvent(type=EventType.AGENT_RESPONSE, content={"text": agent_answer})
+        )
+        return ToolImplOutput(
+            tool_output=agent_answer, tool_result_message=agent_answer
+        )
+
+    async def _run_parallel_tool_calls(
+        self, tool_calls: list[ToolCallParameters]
+    ) -> Optional[ToolImplOutput]:
+        """Run all tool calls of a turn concurrently and record their results.
 
+        Returns:
+            The output ending the run, or None if the agent should continue.
+        """
+        for tool_call in tool_calls:
             self.message_queue.put_nowait(
                 RealtimeEvent(
                     type=EventType.TOOL_CALL,
@@ -281,55 +420,42 @@ try breaking down the task into smaller steps. After call this tool to update or
                     },
                 )
             )
-            self.tool_start_time = time.monotonic()
-
-            text_results = [
-                item for item in model_response if isinstance(item, TextResult)
-            ]
-            if len(text_results) > 0:
-                text_result = text_results[0]
-                self.logger_for_agent_logs.info(
-                    f"Top-level agent planning next step: {text_result.text}\n",
-                )
-
-            # Handle tool call by the agent
-            if self.interrupted:
-                # Handle interruption during tool execution
-                self.add_tool_call_result(tool_call, TOOL_RESULT_INTERRUPT_MESSAGE)
-                self.add_fake_assistant_turn(TOOL_CALL_INTERRUPT_FAKE_MODEL_RSP)
-                return ToolImplOutput(
-                    tool_output=TOOL_RESULT_INTERRUPT_MESSAGE,
-                    tool_result_message=TOOL_RESULT_INTERRUPT_MESSAGE,
-                )
-            try:
-                tool_result = await asyncio.wait_for(
-                    self.tool_manager.run_tool(tool_call, self.history),
-                    timeout=self.tool_timeout,
-                )
-            except asyncio.TimeoutError:
-                self.add_tool_call_result(tool_call, TOOL_CALL_TIMEOUT_MESSAGE)
-                self.add_fake_assistant_turn(TOOL_CALL_TIMEOUT_FAKE_MODEL_RSP)
-                return ToolImplOutput(
-                    tool_output=TOOL_CALL_TIMEOUT_MESSAGE,
-                    tool_result_message=TOOL_CALL_TIMEOUT_MESSAGE,
-                )
+        self.tool_start_time = time.monotonic()
 
-            self.add_tool_call_result(tool_call, tool_result)
-            if self.tool_manager.should_stop():
-                # Add a fake model response, so the next turn is the user's
-                # turn in case they want to resume
-                self.add_fake_assistant_turn(self.tool_manager.get_final_answer())
-                return ToolImplOutput(
-                    tool_output=self.tool_manager.get_final_answer(),
-                    tool_result_message="Task completed",
-                )
+        if self.interrupted:
+            self.add_tool_call_results(
+                tool_calls, [TOOL_RESULT_INTERRUPT_MESSAGE] * len(tool_calls)
+            )
+            self.add_fake_assistant_turn(TOOL_CALL_INTERRUPT_FAKE_MODEL_RSP)
+            return ToolImplOutput(
+                tool_output=TOOL_RESULT_INTERRUPT_MESSAGE,
+                tool_result_message=TOOL_RESULT_INTERRUPT_MESSAGE,
+            )
 
-        agent_answer = "Agent did not complete after max turns"
-        self.message_queue.put_nowait(
-            RealtimeEvent(type=EventType.AGENT_RESPONSE, content={"text": agent_answer})
+        tool_results = await self.tool_manager.run_tools(
+            tool_calls, self.history, timeout=self.tool_timeout
         )
-        return ToolImplOutput(
-            tool_output=agent_answer, tool_result_message=agent_answer
+        self.add_tool_call_results(tool_calls, tool_results)
+        if self.tool_manager.should_stop():
+            self.add_fake_assistant_turn(self.tool_manager.get_final_answer())
+            return ToolImplOutput(
+                tool_output=self.tool_manager.get_final_answer(),
+                tool_result_message="Task completed",
+            )
+        return None
+
+    def _record_cache_usage(self, metadata: dict[str, Any] | None) -> None:
+        """Record the prompt cache usage of a model call for this session."""
+        usage = self.prompt_cache_stats.record(metadata)
+        if usage is None:
+            return
+        self.logger_for_agent_logs.info(
+            f"Prompt cache: {usage.cache_read_input_tokens} read, "
+            f"{usage.cache_creation_input_tokens} written, "
+            f"{usage.input_tokens} uncached input tokens "
+            f"(turn hit rate {usage.hit_rate:.0%}, "
+            f"session hit rate {self.prompt_cache_stats.hit_rate:.0%}, "
+            f"{self.prompt_cache_stats.saved_input_tokens} tokens saved)"
         )
 
     def get_tool_start_message(self, tool_input: dict[str, Any]) -> str:
@@ -365,7 +491,10 @@ try breaking down the task into smaller steps. After call this tool to update or
         }
         if orientation_instruction:
             tool_input["orientation_instruction"] = orientation_instruction
-        return await self.run_async(tool_input, self.history)
+        with use_usage_ledger(self.usage_ledger), trace_span(
+            "agent.run", session_id=str(self.session_id), model=self.client.model_name
+        ):
+            return await self.run_async(tool_input, self.history)
 
     def run_agent(
         self,
@@ -404,18 +533,33 @@ try breaking down the task into smaller steps. After call this tool to update or
 
     def add_tool_call_result(self, tool_call: ToolCallParameters, tool_result: str):
         """Add a tool call result to the history and send it to the message queue."""
-        self.history.add_tool_call_result(tool_call, tool_result)
+        self.add_tool_call_results([tool_call], [tool_result])
 
-        self.message_queue.put_nowait(
-            RealtimeEvent(
-                type=EventType.TOOL_RESULT,
-                content={
-                    "tool_call_id": tool_call.tool_call_id,
-                    "tool_name": tool_call.tool_name,
-                    "result": tool_result,
-                },
+    def add_tool_call_results(
+        self, tool_calls: list[ToolCallParameters], tool_results: list[str]
+    ):
+        """Add the results of a turn's tool calls as one user turn and send them to the message queue."""
+        # Store images once; the history and the events share the blob reference
+        tool_results = [
+            self.history.blob_store.externalize_tool_output(tool_result)
+            for tool_result in tool_results
+        ]
+        self.history.add_tool_call_results(tool_calls, tool_results)
+
+        for tool_call, tool_result in zip(tool_calls, tool_results):
+            self.message_queue.put_nowait(
+                RealtimeEvent(
+                    type=EventType.TOOL_RESULT,
+                    content={
+                        "tool_call_id": tool_call.tool_call_id,
+                        "tool_name": tool_call.tool_name,
+                        # The UI shows the full-size version of screenshots
+                        "result": self.history.blob_store.display_tool_output(
+                            tool_result
+                        ),
+                    },
+                )
             )
-        )
 
     def add_fake_assistant_turn(self, text: str):
         """Add a fake assistant turn to the history and send it to the message queue."""
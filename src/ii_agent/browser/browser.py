@@ -38,9 +38,21 @@ from ii_agent.browser.models import (
 from ii_agent.browser.utils import (
     filter_elements,
     put_highlight_elements_on_screenshot,
-    scale_b64_image,
 )
 from ii_agent.browser.utils import is_pdf_url
+from ii_agent.browser.page_tracker import PageChange, PageChangeTracker
+from ii_agent.core.metrics import SCREENSHOT_BYTES
+from ii_agent.utils.constants import (
+    BROWSER_MODEL_SCREENSHOT_SCALE,
+    BROWSER_SCREENSHOT_FORMAT,
+    BROWSER_SCREENSHOT_QUALITY,
+)
+from ii_agent.browser.pool import (
+    CHROMIUM_ARGS,
+    BrowserLease,
+    BrowserPool,
+    get_browser_pool,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -72,6 +84,20 @@ class BrowserConfig:
             detector: Optional[Detector] = None
                     Detector instance for CV element detection. If None, CV detection is disabled.
 
+            use_pool: bool = True
+                    Open a context on a shared, already running browser of the
+                    browser pool instead of launching a browser. Ignored with cdp_url.
+
+            screenshot_format: str = "jpeg"
+                    Encoding of screenshots: "jpeg", "webp" or "png"
+
+            screenshot_quality: int = 80
+                    Quality (0-100) of JPEG and WebP screenshots
+
+            model_screenshot_scale: float = 1.0
+                    Size of the screenshot sent to the model relative to the one
+                    shown in the UI. Below 1, both are captured.
+
     """
 
     cdp_url: Optional[str] = None
@@ -80,6 +106,10 @@ class BrowserConfig:
     )
     storage_state: Optional[StorageState] = None
     detector: Optional[Detector] = None
+    use_pool: bool = True
+    screenshot_format: str = BROWSER_SCREENSHOT_FORMAT
+    screenshot_quality: int = BROWSER_SCREENSHOT_QUALITY
+    model_screenshot_scale: float = BROWSER_MODEL_SCREENSHOT_SCALE
 
 
 class Browser:
@@ -88,7 +118,10 @@ class Browser:
     """
 
     def __init__(
-        self, config: BrowserConfig = BrowserConfig(), close_context: bool = True
+        self,
+        config: BrowserConfig = BrowserConfig(),
+        close_context: bool = True,
+        pool: Optional[BrowserPool] = None,
     ):
         logger.debug("Initializing browser")
         self.config = config
@@ -98,6 +131,10 @@ class Browser:
         self.playwright_browser: Optional[PlaywrightBrowser] = None
         self.context: Optional[PlaywrightBrowserContext] = None
 
+        # Pool the context is leased from; the event loop's pool if not given
+        self.pool = pool
+        self._lease: Optional[BrowserLease] = None
+
         # Page and state management
         self.current_page: Optional[Page] = None
         self._state: Optional[BrowserState] = None
@@ -108,6 +145,9 @@ class Browser:
 
         self.screenshot_scale_factor = None
 
+        # Lets update_state skip the work for a page that has not changed
+        self.page_tracker = PageChangeTracker()
+
         # Initialize state
         self._init_state()
 
@@ -133,8 +173,9 @@ class Browser:
     async def _init_browser(self):
         """Initialize the browser and context"""
         logger.debug("Initializing browser context")
-        # Start playwright if needed
-        if self.playwright is None:
+        # Start playwright if needed; pooled browsers run on the pool's
+        pooled = self.config.use_pool and not self.config.cdp_url
+        if self.playwright is None and not pooled:
             self.playwright = await async_playwright().start()
 
         # Initialize browser if needed
@@ -164,16 +205,20 @@ class Browser:
                 logger.info(
                     f"Connected to remote browser via CDP {self.config.cdp_url}"
                 )
+            elif pooled:
+                if self.pool is None:
+                    self.pool = get_browser_pool()
+                # The browser is shared with other sessions, the context is ours
+                self._lease = await self.pool.acquire(**self._context_options())
+                self.playwright_browser = self._lease.browser
+                self.context = self._lease.context
+                await self._apply_anti_detection_scripts()
             else:
                 logger.info("Launching new browser instance")
                 self.playwright_browser = await self.playwright.chromium.launch(
                     headless=False,
                     args=[
-                        "--no-sandbox",
-                        "--disable-blink-features=AutomationControlled",
-                        "--disable-web-security",
-                        "--disable-site-isolation-trials",
-                        "--disable-features=IsolateOrigins,site-per-process",
+                        *CHROMIUM_ARGS,
                         f"--window-size={self.config.viewport_size['width']},{self.config.viewport_size['height']}",
                     ],
                 )
@@ -184,11 +229,7 @@ class Browser:
                 self.context = self.playwright_browser.contexts[0]
             else:
                 self.context = await self.playwright_browser.new_context(
-                    viewport=self.config.viewport_size,
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/85.0.4183.102 Safari/537.36",
-                    java_script_enabled=True,
-                    bypass_csp=True,
-                    ignore_https_errors=True,
+                    **self._context_options()
                 )
 
             # Apply anti-detection scripts
@@ -208,6 +249,15 @@ class Browser:
 
         return self
 
+    def _context_options(self) -> dict[str, Any]:
+        return {
+            "viewport": self.config.viewport_size,
+            "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/85.0.4183.102 Safari/537.36",
+            "java_script_enabled": True,
+            "bypass_csp": True,
+            "ignore_https_errors": True,
+        }
+
     async def _on_page_change(self, page: Page):
         """Handle page change events"""
         logger.info(f"Current page changed to {page.url}")
@@ -281,6 +331,13 @@ class Browser:
             # Close CDP session if exists
             self._cdp_session = None
 
+            # Return a pooled context; the browser keeps serving other sessions
+            if self._lease is not None:
+                lease, self._lease = self._lease, None
+                await self.pool.release(lease)
+                self.context = None
+                self.playwright_browser = None
+
             # Close context
             if self.context:
                 try:
@@ -304,6 +361,8 @@ class Browser:
         except Exception as e:
             logger.error(f"Error during browser cleanup: {e}")
         finally:
+            self.page_tracker.reset()
+            self._lease = None
             self.context = None
             self.current_page = None
             self._state = None
@@ -372,6 +431,10 @@ class Browser:
 
     async def get_current_page(self) -> Page:
         """Get the current page"""
+        if self._lease is not None and not self._lease.browser.is_connected():
+            # The pooled browser crashed; continue in a context of another one
+            logger.warning("Pooled browser crashed, opening a new context")
+            await self.restart()
         if self.current_page is None:
             await self._init_browser()
         return self.current_page
@@ -386,7 +449,25 @@ class Browser:
         return self._state
 
     async def _update_state(self) -> BrowserState:
-        """Update and return state."""
+        """Update and return state.
+
+        The state is reused as is when the page has not changed since it was
+        computed. When only the scroll position changed, the screenshot and
+        the interactive elements, whose positions are relative to the
+        viewport, are recomputed but the tabs are kept.
+        """
+        try:
+            page = await self.get_current_page()
+            snapshot = await self.page_tracker.snapshot(page, len(self.context.pages))
+        except Exception as e:
+            # Retried, and reported if it keeps failing, below
+            logger.debug(f"Failed to read page changes: {e}")
+            snapshot = None
+        change = self.page_tracker.change(snapshot)
+        if change == PageChange.NONE and self._state is not None:
+            logger.debug("Page unchanged since the last update, reusing its state")
+            return self._state
+        previous_tabs = self._state.tabs if self._state is not None else None
 
         @retry(
             stop=stop_after_attempt(3),
@@ -395,13 +476,19 @@ class Browser:
             reraise=True,
         )
         async def get_stable_state():
-            if self.current_page is None:
-                await self._init_browser()
+            await self.get_current_page()
             url = self.current_page.url
 
             detect_sheets = "docs.google.com/spreadsheets/d" in url
 
             screenshot_b64 = await self.fast_screenshot()
+            model_screenshot_b64 = None
+            if self.config.model_screenshot_scale != 1.0:
+                # Captured at its own size rather than resized from the other
+                model_screenshot_b64 = await self.fast_screenshot(
+                    self._ui_screenshot_scale() * self.config.model_screenshot_scale
+                )
+            self._observe_screenshot_sizes(screenshot_b64, model_screenshot_b64)
 
             interactive_elements_data = await self.get_interactive_elements(
                 screenshot_b64, detect_sheets
@@ -410,26 +497,28 @@ class Browser:
                 element.index: element for element in interactive_elements_data.elements
             }
 
-            # Create highlighted version of the screenshot
-            screenshot_with_highlights = put_highlight_elements_on_screenshot(
-                interactive_elements, screenshot_b64
-            )
-
-            tabs = await self.get_tabs_info()
+            if change == PageChange.SCROLL and previous_tabs is not None:
+                tabs = previous_tabs
+            else:
+                tabs = await self.get_tabs_info()
 
             return BrowserState(
                 url=url,
                 tabs=tabs,
-                screenshot_with_highlights=screenshot_with_highlights,
                 screenshot=screenshot_b64,
+                model_screenshot=model_screenshot_b64,
+                screenshot_media_type=f"image/{self.config.screenshot_format}",
                 viewport=interactive_elements_data.viewport,
                 interactive_elements=interactive_elements,
             )
 
         try:
             self._state = await get_stable_state()
+            # Mutations made while the state was computed count as changes
+            self.page_tracker.record(snapshot)
             return self._state
         except Exception as e:
+            self.page_tracker.reset()
             logger.error(f"Failed to update state after multiple attempts: {str(e)}")
             # Return last known good state if available
             if hasattr(self, "_state"):
@@ -514,29 +603,85 @@ class Browser:
 
         return self._cdp_session
 
-    async def fast_screenshot(self) -> str:
+    def _ui_screenshot_scale(self) -> float:
+        return self.screenshot_scale_factor or 1.0
+
+    def _observe_screenshot_sizes(
+        self, screenshot_b64: str, model_screenshot_b64: Optional[str]
+    ) -> None:
+        image_format = self.config.screenshot_format
+        # Decoded size, without decoding
+        SCREENSHOT_BYTES.observe(
+            len(screenshot_b64) * 3 // 4, format=image_format, target="ui"
+        )
+        SCREENSHOT_BYTES.observe(
+            len(model_screenshot_b64 or screenshot_b64) * 3 // 4,
+            format=image_format,
+            target="model",
+        )
+
+    async def fast_screenshot(self, scale: Optional[float] = None) -> str:
         """
         Returns a base64 encoded screenshot of the current page.
 
+        The browser encodes the screenshot in the configured format and at
+        the requested size, so it is not decoded or resized here.
+
+        Args:
+                scale: Size relative to the viewport in CSS pixels. Defaults
+                        to the screenshot_scale_factor of the browser.
+
         Returns:
                 Base64 encoded screenshot
         """
         # Use cached CDP session instead of creating a new one each time
         cdp_session = await self.get_cdp_session()
+        if scale is None:
+            scale = self._ui_screenshot_scale()
         screenshot_params = {
-            "format": "png",
+            "format": self.config.screenshot_format,
             "fromSurface": False,
             "captureBeyondViewport": False,
         }
+        if self.config.screenshot_format != "png":
+            screenshot_params["quality"] = self.config.screenshot_quality
+        if scale != 1.0:
+            # The clip is in page coordinates, so it follows the scroll position
+            metrics = await cdp_session.send("Page.getLayoutMetrics")
+            visual_viewport = metrics["cssVisualViewport"]
+            screenshot_params["clip"] = {
+                "x": visual_viewport["pageX"],
+                "y": visual_viewport["pageY"],
+                "width": visual_viewport["clientWidth"],
+                "height": visual_viewport["clientHeight"],
+                "scale": scale,
+            }
 
         # Capture screenshot using CDP Session
         screenshot_data = await cdp_session.send(
             "Page.captureScreenshot", screenshot_params
         )
-        screenshot_b64 = screenshot_data["data"]
+        return screenshot_data["data"]
 
-        screenshot_b64 = scale_b64_image(screenshot_b64, self.screenshot_scale_factor)
-        return screenshot_b64
+    def get_screenshot_with_highlights(self) -> Optional[str]:
+        """
+        Returns the model's screenshot of the current state with the interactive
+        elements outlined and numbered. It is drawn on first use.
+        """
+        state = self._state
+        if state is None or not state.screenshot:
+            return None
+        if state.screenshot_with_highlights is None:
+            scale = self._ui_screenshot_scale()
+            if state.model_screenshot is not None:
+                scale *= self.config.model_screenshot_scale
+            state.screenshot_with_highlights = put_highlight_elements_on_screenshot(
+                state.interactive_elements,
+                state.model_screenshot or state.screenshot,
+                scale=scale,
+                quality=self.config.screenshot_quality,
+            )
+        return state.screenshot_with_highlights
 
     async def get_cookies(self) -> list[dict[str, Any]]:
         """Get cookies from the browser"""
@@ -93,4 +93,7 @@ class BrowserState:
     viewport: Viewport = field(default_factory=Viewport)
     screenshot_with_highlights: Optional[str] = None
     screenshot: Optional[str] = None
+    # Smaller screenshot for the model, when it gets a lower resolution
+    model_screenshot: Optional[str] = None
+    screenshot_media_type: str = "image/png"
     interactive_elements: dict[int, InteractiveElement] = field(default_factory=dict)
@@ -0,0 +1,153 @@
+"""
+Detection of page changes between two browser state updates.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, replace
+from enum import Enum
+from typing import Callable, Optional
+
+from playwright.async_api import Page
+
+from ii_agent.browser.utils import is_pdf_url
+from ii_agent.utils.constants import BROWSER_STATE_MAX_AGE
+
+logger = logging.getLogger(__name__)
+
+# Installs a counter of DOM mutations and user input events in the page on
+# first use. Each new document gets a fresh counter and a new random id. The
+# attributes findVisibleInteractiveElements.js sets on elements are ignored.
+PAGE_CHANGES_JS_CODE = """
+() => {
+	const ownAttributes = ["data-element-index", "data-browser-agent-id"];
+	const count = (records) => records.filter(
+		(record) => !ownAttributes.includes(record.attributeName)
+	).length;
+	let tracker = window.__iiAgentPageChanges;
+	if (tracker === undefined) {
+		tracker = {
+			document: Math.random().toString(36).slice(2),
+			changes: 0,
+			observer: new MutationObserver((records) => {
+				tracker.changes += count(records);
+			}),
+		};
+		tracker.observer.observe(document, {
+			subtree: true,
+			childList: true,
+			attributes: true,
+			characterData: true,
+		});
+		// Input values, focus and canvas drawing do not show up as mutations
+		for (const type of [
+			"input", "change", "focusin", "focusout", "click", "keydown",
+			"load", "transitionend", "animationend",
+		]) {
+			document.addEventListener(type, () => { tracker.changes += 1; }, true);
+		}
+		window.__iiAgentPageChanges = tracker;
+	}
+	tracker.changes += count(tracker.observer.takeRecords());
+	return {
+		document: tracker.document,
+		changes: tracker.changes,
+		scrollX: Math.round(window.scrollX),
+		scrollY: Math.round(window.scrollY),
+		width: window.innerWidth,
+		height: window.innerHeight,
+	};
+}
+"""
+
+
+class PageChange(Enum):
+    """What changed on the page since the last state update."""
+
+    NONE = "none"
+    SCROLL = "scroll"
+    PAGE = "page"
+
+
+@dataclass(frozen=True)
+class PageSnapshot:
+    """What a browser state was computed from."""
+
+    page_id: int
+    tab_count: int
+    url: str
+    document: str
+    changes: int
+    scroll_x: int
+    scroll_y: int
+    width: int
+    height: int
+
+
+class PageChangeTracker:
+    """
+    Tells whether the page changed since the browser state was last computed.
+
+    A page is unchanged when it is the same document at the same URL, in the
+    same tab and viewport, and no DOM mutation or input event happened in it.
+    PDFs are shown by a viewer plugin that reports neither, so they always
+    count as changed, as does a state older than ``max_age`` seconds.
+    """
+
+    def __init__(
+        self,
+        max_age: float = BROWSER_STATE_MAX_AGE,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_age = max_age
+        self.clock = clock
+        self._recorded: Optional[PageSnapshot] = None
+        self._recorded_at = 0.0
+        self.skipped = 0
+
+    async def snapshot(self, page: Page, tab_count: int) -> Optional[PageSnapshot]:
+        """Read the page's change counters, or None if the page cannot tell."""
+        if is_pdf_url(page.url):
+            return None
+        try:
+            data = await page.evaluate(PAGE_CHANGES_JS_CODE)
+        except Exception as e:
+            logger.debug(f"Failed to read page changes: {e}")
+            return None
+        return PageSnapshot(
+            page_id=id(page),
+            tab_count=tab_count,
+            url=page.url,
+            document=data["document"],
+            changes=data["changes"],
+            scroll_x=data["scrollX"],
+            scroll_y=data["scrollY"],
+            width=data["width"],
+            height=data["height"],
+        )
+
+    def change(self, snapshot: Optional[PageSnapshot]) -> PageChange:
+        """Compare a snapshot with the one the current state was computed from."""
+        recorded = self._recorded
+        if (
+            snapshot is None
+            or recorded is None
+            or self.clock() - self._recorded_at >= self.max_age
+        ):
+            return PageChange.PAGE
+        if snapshot == recorded:
+            self.skipped += 1
+            return PageChange.NONE
+        if snapshot == replace(
+            recorded, scroll_x=snapshot.scroll_x, scroll_y=snapshot.scroll_y
+        ):
+            return PageChange.SCROLL
+        return PageChange.PAGE
+
+    def record(self, snapshot: Optional[PageSnapshot]) -> None:
+        """Remember the snapshot a new state was computed from."""
+        self._recorded = snapshot
+        self._recorded_at = self.clock()
+
+    def reset(self) -> None:
+        self._recorded = None
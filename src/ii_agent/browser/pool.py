@@ -0,0 +1,344 @@
+"""Process-wide pool of warm Chromium instances for the browser tools.
+
+Launching Chromium takes seconds and a few hundred MB per process. Instead
+of one process per agent session, `BrowserPool` keeps a small number of
+Chromium instances running and hands every session its own
+``BrowserContext``, which isolates cookies, storage and pages between
+sessions at a fraction of the cost of a new process.
+
+A Chromium instance is replaced once it has served ``max_uses`` sessions,
+to bound the memory it accumulates, and as soon as it crashes. Instances
+left without sessions for ``idle_timeout`` seconds are closed, except for
+the ``min_browsers`` kept warm for the next session.
+"""
+
+import asyncio
+import logging
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+from playwright.async_api import Browser as PlaywrightBrowser
+from playwright.async_api import BrowserContext as PlaywrightBrowserContext
+from playwright.async_api import Playwright, async_playwright
+
+from ii_agent.browser.models import BrowserError
+from ii_agent.utils.constants import (
+    BROWSER_POOL_ACQUIRE_TIMEOUT,
+    BROWSER_POOL_IDLE_TIMEOUT,
+    BROWSER_POOL_MAX_BROWSERS,
+    BROWSER_POOL_MAX_CONTEXTS_PER_BROWSER,
+    BROWSER_POOL_MAX_USES,
+    BROWSER_POOL_MIN_BROWSERS,
+)
+
+logger = logging.getLogger(__name__)
+
+CHROMIUM_ARGS = [
+    "--no-sandbox",
+    "--disable-blink-features=AutomationControlled",
+    "--disable-web-security",
+    "--disable-site-isolation-trials",
+    "--disable-features=IsolateOrigins,site-per-process",
+]
+
+Launcher = Callable[[], Awaitable[PlaywrightBrowser]]
+
+
+@dataclass(eq=False)
+class PooledBrowser:
+    """A Chromium instance of the pool and the sessions it serves."""
+
+    browser: PlaywrightBrowser
+    idle_since: float
+    active: int = 0
+    uses: int = 0
+    # Retired instances take no new sessions and close once they have none
+    retired: bool = False
+
+
+@dataclass
+class BrowserLease:
+    """A browser context handed out by the pool, returned with `release`."""
+
+    browser: PlaywrightBrowser
+    context: PlaywrightBrowserContext
+    pooled: PooledBrowser = field(repr=False)
+
+
+class BrowserPool:
+    """Shares warm Chromium instances between sessions, one context each."""
+
+    def __init__(
+        self,
+        min_browsers: int = BROWSER_POOL_MIN_BROWSERS,
+        max_browsers: int = BROWSER_POOL_MAX_BROWSERS,
+        max_contexts_per_browser: int = BROWSER_POOL_MAX_CONTEXTS_PER_BROWSER,
+        max_uses: int = BROWSER_POOL_MAX_USES,
+        idle_timeout: float = BROWSER_POOL_IDLE_TIMEOUT,
+        acquire_timeout: float = BROWSER_POOL_ACQUIRE_TIMEOUT,
+        window_size: tuple[int, int] = (1268, 951),
+        launch: Optional[Launcher] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the pool. No browser is launched before `start` or `acquire`.
+
+        Args:
+            min_browsers: Instances kept running while idle.
+            max_browsers: Upper bound on running instances.
+            max_contexts_per_browser: Sessions served at once by an instance.
+                Once every instance is full, `acquire` waits for a release.
+            max_uses: Sessions an instance serves before it is replaced.
+            idle_timeout: Seconds after which an instance without sessions is
+                closed, when more than ``min_browsers`` are running.
+            acquire_timeout: Seconds `acquire` waits for a free slot before
+                raising a BrowserError.
+            window_size: Window size of launched instances. Contexts set
+                their own viewport.
+            launch: Optional coroutine function launching an instance, used
+                instead of launching Chromium with Playwright.
+            clock: Time source for the idle timeout.
+        """
+        self.min_browsers = min_browsers
+        self.max_browsers = max_browsers
+        self.max_contexts_per_browser = max_contexts_per_browser
+        self.max_uses = max_uses
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.window_size = window_size
+        self.clock = clock
+        self._launch = launch or self._launch_chromium
+        self._playwright: Optional[Playwright] = None
+        self._browsers: list[PooledBrowser] = []
+        self._launching = 0
+        self._condition = asyncio.Condition()
+        self._reaper: Optional[asyncio.Task] = None
+        self.launched = 0
+        self.recycled = 0
+
+    async def _launch_chromium(self) -> PlaywrightBrowser:
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        width, height = self.window_size
+        return await self._playwright.chromium.launch(
+            headless=False, args=[*CHROMIUM_ARGS, f"--window-size={width},{height}"]
+        )
+
+    async def start(self) -> None:
+        """Launch the warm instances and start closing idle ones."""
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_periodically())
+        try:
+            await self._fill()
+        except Exception as e:
+            # Sessions launch their browser on first use instead
+            logger.warning(f"Failed to launch warm pooled browsers: {e}")
+
+    async def _fill(self) -> None:
+        while True:
+            async with self._condition:
+                self._forget_disconnected()
+                warm = sum(not pooled.retired for pooled in self._browsers)
+                if (
+                    warm + self._launching >= self.min_browsers
+                    or len(self._browsers) + self._launching >= self.max_browsers
+                ):
+                    return
+                self._launching += 1
+            await self._add_browser()
+
+    async def _add_browser(self) -> None:
+        """Launch an instance into a slot reserved with ``_launching``."""
+        pooled = None
+        try:
+            browser = await self._launch()
+            pooled = PooledBrowser(browser=browser, idle_since=self.clock())
+            browser.on("disconnected", lambda _: self._on_disconnected(pooled))
+            self.launched += 1
+            logger.info(f"Launched pooled browser ({self.launched} so far)")
+        finally:
+            async with self._condition:
+                self._launching -= 1
+                if pooled is not None:
+                    self._browsers.append(pooled)
+                self._condition.notify_all()
+
+    def _on_disconnected(self, pooled: PooledBrowser) -> None:
+        if not pooled.retired:
+            logger.warning("Pooled browser disconnected, it will be replaced")
+        pooled.retired = True
+
+    def _forget_disconnected(self) -> None:
+        self._browsers = [
+            pooled for pooled in self._browsers if pooled.browser.is_connected()
+        ]
+
+    def _least_loaded(self) -> Optional[PooledBrowser]:
+        candidates = [
+            pooled
+            for pooled in self._browsers
+            if not pooled.retired and pooled.active < self.max_contexts_per_browser
+        ]
+        return min(candidates, key=lambda pooled: pooled.active, default=None)
+
+    async def acquire(self, **context_options: Any) -> BrowserLease:
+        """Open a new context for a session on the least loaded instance.
+
+        Args:
+            **context_options: Passed to ``Browser.new_context``.
+
+        Raises:
+            BrowserError: If no instance has room for ``acquire_timeout`` seconds.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.acquire_timeout
+        while True:
+            async with self._condition:
+                self._forget_disconnected()
+                pooled = self._least_loaded()
+                if pooled is None:
+                    if len(self._browsers) + self._launching >= self.max_browsers:
+                        try:
+                            await asyncio.wait_for(
+                                self._condition.wait(), deadline - loop.time()
+                            )
+                        except asyncio.TimeoutError:
+                            raise BrowserError(
+                                f"No pooled browser became available within "
+                                f"{self.acquire_timeout} seconds"
+                            ) from None
+                        continue
+                    self._launching += 1
+                else:
+                    pooled.active += 1
+                    pooled.uses += 1
+                    if pooled.uses >= self.max_uses:
+                        pooled.retired = True
+            if pooled is None:
+                await self._add_browser()
+                continue
+
+            try:
+                context = await pooled.browser.new_context(**context_options)
+            except Exception:
+                await self._release_slot(pooled)
+                if not pooled.browser.is_connected():
+                    # Crashed since it was picked, try another instance
+                    continue
+                raise
+            return BrowserLease(browser=pooled.browser, context=context, pooled=pooled)
+
+    async def release(self, lease: BrowserLease) -> None:
+        """Close the context of a session and free its slot."""
+        try:
+            await lease.context.close()
+        except Exception as e:
+            logger.debug(f"Failed to close pooled browser context: {e}")
+        await self._release_slot(lease.pooled)
+
+    async def _release_slot(self, pooled: PooledBrowser) -> None:
+        async with self._condition:
+            pooled.active -= 1
+            pooled.idle_since = self.clock()
+            drained = pooled.retired and pooled.active == 0
+            if drained and pooled in self._browsers:
+                self._browsers.remove(pooled)
+            self._condition.notify_all()
+        if drained:
+            self.recycled += 1
+            await self._close_browser(pooled)
+
+    async def _close_browser(self, pooled: PooledBrowser) -> None:
+        pooled.retired = True
+        try:
+            await pooled.browser.close()
+        except Exception as e:
+            logger.debug(f"Failed to close pooled browser: {e}")
+
+    async def reap_idle(self) -> None:
+        """Close instances idle for too long and replace recycled ones."""
+        now = self.clock()
+        async with self._condition:
+            self._forget_disconnected()
+            idle = sorted(
+                (
+                    pooled
+                    for pooled in self._browsers
+                    if pooled.active == 0
+                    and (pooled.retired or now - pooled.idle_since >= self.idle_timeout)
+                ),
+                key=lambda pooled: (not pooled.retired, pooled.idle_since),
+            )
+            warm = sum(not pooled.retired for pooled in self._browsers)
+            # Retired instances go first, then the longest idle ones
+            to_close = []
+            for pooled in idle:
+                if not pooled.retired:
+                    if warm <= self.min_browsers:
+                        break
+                    warm -= 1
+                to_close.append(pooled)
+            for pooled in to_close:
+                self._browsers.remove(pooled)
+        for pooled in to_close:
+            await self._close_browser(pooled)
+        await self._fill()
+
+    async def _reap_periodically(self) -> None:
+        interval = max(1.0, self.idle_timeout / 2)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reap_idle()
+            except Exception as e:
+                logger.error(f"Failed to reap idle pooled browsers: {e}")
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "browsers": len(self._browsers),
+            "contexts": sum(pooled.active for pooled in self._browsers),
+            "launched": self.launched,
+            "recycled": self.recycled,
+        }
+
+    async def close(self) -> None:
+        """Stop the reaper and close every instance, with their contexts."""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            try:
+                await self._reaper
+            except asyncio.CancelledError:
+                pass
+            self._reaper = None
+        async with self._condition:
+            browsers, self._browsers = self._browsers, []
+        for pooled in browsers:
+            await self._close_browser(pooled)
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+
+# Playwright objects are bound to the loop they were created on, so pools are
+# keyed by event loop. In the server there is exactly one loop and one pool.
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, BrowserPool]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_browser_pool() -> BrowserPool:
+    """Return the browser pool of the running event loop."""
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = _pools[loop] = BrowserPool()
+    return pool
+
+
+async def aclose_browser_pool() -> None:
+    """Close the browser pool of the running event loop, if any."""
+    pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.close()
+        logger.info("Closed browser pool")
@@ -1,6 +1,7 @@
 import base64
 import logging
 import requests
+from collections import defaultdict
 from io import BytesIO
 from pathlib import Path
 from typing import List
@@ -8,14 +9,30 @@ from urllib.parse import urlparse
 from PIL import Image, ImageDraw, ImageFont
 
 from ii_agent.browser.models import InteractiveElement, Rect
+from ii_agent.utils.constants import BROWSER_SCREENSHOT_QUALITY
 
 logger = logging.getLogger(__name__)
 
+# filter_overlapping_elements compares elements sharing a cell of a grid.
+# Elements spanning more cells are compared with every element instead.
+MIN_GRID_CELL_SIZE = 16  # pixels
+MAX_GRID_CELLS_PER_ELEMENT = 16
+
 
 def put_highlight_elements_on_screenshot(
-    elements: dict[int, InteractiveElement], screenshot_b64: str
+    elements: dict[int, InteractiveElement],
+    screenshot_b64: str,
+    scale: float = 1.0,
+    quality: int = BROWSER_SCREENSHOT_QUALITY,
 ) -> str:
-    """Highlight elements using Pillow instead of OpenCV"""
+    """Highlight elements using Pillow instead of OpenCV.
+
+    Args:
+        elements: Elements to outline, with positions in CSS pixels.
+        screenshot_b64: Base64 encoded screenshot; the result has its format.
+        scale: Size of the screenshot relative to the viewport in CSS pixels.
+        quality: Encoding quality of JPEG and WebP screenshots.
+    """
     try:
         # Decode base64 to PIL Image
         image_data = base64.b64decode(screenshot_b64)
@@ -74,6 +91,15 @@ def put_highlight_elements_on_screenshot(
             color = generate_unique_color(base_color, idx)
 
             rect = element.rect
+            if scale != 1.0:
+                rect = Rect(
+                    left=round(rect.left * scale),
+                    top=round(rect.top * scale),
+                    right=round(rect.right * scale),
+                    bottom=round(rect.bottom * scale),
+                    width=round(rect.width * scale),
+                    height=round(rect.height * scale),
+                )
 
             # Draw rectangle
             draw.rectangle(
@@ -149,9 +175,13 @@ def put_highlight_elements_on_screenshot(
 
             placed_labels.append(label_rect)
 
-        # Convert back to base64
+        # Convert back to base64, in the format of the screenshot
         buffer = BytesIO()
-        image.save(buffer, format="PNG")
+        image_format = image.format or "PNG"
+        if image_format in ("JPEG", "WEBP"):
+            image.save(buffer, format=image_format, quality=quality)
+        else:
+            image.save(buffer, format=image_format)
         new_image_base64 = base64.b64encode(buffer.getvalue()).decode()
 
         return new_image_base64
@@ -257,12 +287,30 @@ def is_fully_contained(rect1: Rect, rect2: Rect) -> bool:
     )
 
 
+def _grid_cell_size(boxes: List[tuple[int, int, int, int]]) -> int:
+    """Side of the grid cells: the median size of the elements."""
+    sizes = sorted(
+        max(abs(right - left), abs(bottom - top)) for left, top, right, bottom in boxes
+    )
+    return max(sizes[len(sizes) // 2], MIN_GRID_CELL_SIZE)
+
+
 def filter_overlapping_elements(
     elements: List[InteractiveElement], iou_threshold: float = 0.7
 ) -> List[InteractiveElement]:
     """
     Filter overlapping elements using weight and IoU.
 
+    Elements are added from the largest down. An element is dropped if it
+    overlaps an added one by more than ``iou_threshold``, or lies within one
+    of at least its weight at the same z-index. Otherwise, an added element
+    that contains it and is at most twice its size is replaced by it. The
+    first added element to match, in the order they were added, decides.
+
+    Added elements are kept in a grid of cells about the size of a median
+    element, so each element is only compared with the added elements
+    sharing a cell with it, which are the only ones it can overlap.
+
     Args:
         elements: Elements to filter
         iou_threshold: Threshold for considering elements as overlapping
@@ -280,42 +328,104 @@ def filter_overlapping_elements(
             -e.weight,  # Negative weight for descending sort
         )
     )
+    if iou_threshold < 0:
+        # Even disjoint elements overlap by more than the threshold
+        return elements[:1]
+
+    # Plain tuples, as attribute access on the models dominates otherwise
+    boxes = [(e.rect.left, e.rect.top, e.rect.right, e.rect.bottom) for e in elements]
+    sizes = [e.rect.width * e.rect.height for e in elements]
+    weights = [e.weight for e in elements]
+    z_indexes = [e.z_index for e in elements]
+
+    cell_size = _grid_cell_size(boxes)
+    grid: dict[tuple[int, int], List[int]] = defaultdict(list)
+    # Added elements spanning too many cells, compared with every element
+    large: List[int] = []
+    # Elements are added in index order; removed ones are only marked
+    added: List[int] = []
+    active = [False] * len(elements)
+
+    for current, (left, top, right, bottom) in enumerate(boxes):
+        # Cells of the closed rectangle, so that touching elements share one
+        min_x, max_x = (left, right) if left <= right else (right, left)
+        min_y, max_y = (top, bottom) if top <= bottom else (bottom, top)
+        min_x, max_x = min_x // cell_size, max_x // cell_size
+        min_y, max_y = min_y // cell_size, max_y // cell_size
+        is_large = (max_x - min_x + 1) * (
+            max_y - min_y + 1
+        ) > MAX_GRID_CELLS_PER_ELEMENT
+
+        if is_large:
+            cells = []
+            candidates = added
+        elif min_x == max_x and min_y == max_y and not large:
+            # Cells list the elements in the order they were added
+            cells = [(min_x, min_y)]
+            candidates = grid.get(cells[0], ())
+        else:
+            cells = [
+                (x, y)
+                for x in range(min_x, max_x + 1)
+                for y in range(min_y, max_y + 1)
+            ]
+            candidate_set = set(large)
+            for cell in cells:
+                candidate_set.update(grid.get(cell, ()))
+            candidates = sorted(candidate_set)
 
-    filtered_elements: List[InteractiveElement] = []
-
-    # Add elements one by one, checking against already added elements
-    for current in elements:
         should_add = True
+        area = (right - left) * (bottom - top)
+        for existing in candidates:
+            if not active[existing]:
+                continue
+            e_left, e_top, e_right, e_bottom = boxes[existing]
+
+            # Check overlap with IoU, as calculate_iou
+            intersect_left = left if left > e_left else e_left
+            intersect_top = top if top > e_top else e_top
+            intersect_right = right if right < e_right else e_right
+            intersect_bottom = bottom if bottom < e_bottom else e_bottom
+            if intersect_right >= intersect_left and intersect_bottom >= intersect_top:
+                intersection_area = (intersect_right - intersect_left) * (
+                    intersect_bottom - intersect_top
+                )
+                union_area = (
+                    area + (e_right - e_left) * (e_bottom - e_top) - intersection_area
+                )
+                iou = intersection_area / union_area if union_area > 0 else 0.0
+                if iou > iou_threshold:
+                    should_add = False
+                    break
 
-        # For each element already in our filtered list
-        for existing in filtered_elements:
-            # Check overlap with IoU
-            iou = calculate_iou(current.rect, existing.rect)
-            if iou > iou_threshold:
-                should_add = False
-                break
-
-            # Check if current element is fully contained within an existing element with higher weight
-            if is_fully_contained(current.rect, existing.rect):
+            # Check if current element is fully contained within an existing element
+            if (
+                left >= e_left
+                and right <= e_right
+                and top >= e_top
+                and bottom <= e_bottom
+            ):
                 if (
-                    existing.weight >= current.weight
-                    and existing.z_index == current.z_index
+                    weights[existing] >= weights[current]
+                    and z_indexes[existing] == z_indexes[current]
                 ):
                     should_add = False
                     break
-                else:
-                    # If current element has higher weight and is more than 50% of the size of the existing element, remove the existing element
-                    if (
-                        current.rect.width * current.rect.height
-                        >= existing.rect.width * existing.rect.height * 0.5
-                    ):
-                        filtered_elements.remove(existing)
-                        break
+                # If current element has higher weight and is more than 50% of the size of the existing element, remove the existing element
+                if sizes[current] >= sizes[existing] * 0.5:
+                    active[existing] = False
+                    break
 
         if should_add:
-            filtered_elements.append(current)
+            active[current] = True
+            added.append(current)
+            if is_large:
+                large.append(current)
+            else:
+                for cell in cells:
+                    grid[cell].append(current)
 
-    return filtered_elements
+    return [elements[index] for index in added if active[index]]
 
 
 def sort_elements_by_position(
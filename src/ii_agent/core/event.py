@@ -1,7 +1,9 @@
-from pydantic import BaseModel
-from typing import Any
+from pydantic import BaseModel, Field
+from typing import Any, Optional
 import enum
 
+from ii_agent.core.tracing import current_span_id, current_trace_id
+
 
 class EventType(str, enum.Enum):
     CONNECTION_ESTABLISHED = "connection_established"
@@ -12,6 +14,7 @@ class EventType(str, enum.Enum):
     TOOL_CALL = "tool_call"
     TOOL_RESULT = "tool_result"
     AGENT_RESPONSE = "agent_response"
+    AGENT_RESPONSE_DELTA = "agent_response_delta"
     AGENT_RESPONSE_INTERRUPTED = "agent_response_interrupted"
     STREAM_COMPLETE = "stream_complete"
     ERROR = "error"
@@ -27,3 +30,6 @@ class EventType(str, enum.Enum):
 class RealtimeEvent(BaseModel):
     type: EventType
     content: dict[str, Any]
+    # Span the event was emitted in, if tracing is on
+    trace_id: Optional[str] = Field(default_factory=current_trace_id)
+    span_id: Optional[str] = Field(default_factory=current_span_id)
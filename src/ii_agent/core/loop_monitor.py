@@ -0,0 +1,260 @@
+"""Event loop lag monitor.
+
+All websocket sessions share one asyncio loop, so any synchronous work done
+on it (a pexpect call, a large file read, image processing, an SQLite commit)
+stalls every session at once. The monitor measures how late a periodic
+heartbeat is scheduled. A watchdog thread notices when the loop has not
+run the heartbeat for longer than the threshold and captures the stack of the
+loop thread while it is still blocked, together with the session, tool and
+LLM call the blocking task was working on.
+
+Code attributes its work with `loop_activity`, e.g.
+``with loop_activity(tool="bash"): ...``.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import logging
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Iterator, Optional
+
+from ii_agent.core.metrics import EVENT_LOOP_LAG
+from ii_agent.utils.constants import (
+    LOOP_MONITOR_INTERVAL,
+    LOOP_MONITOR_MAX_REPORTS,
+    LOOP_MONITOR_THRESHOLD,
+)
+
+logger = logging.getLogger(__name__)
+
+_activity: contextvars.ContextVar[dict[str, str]] = contextvars.ContextVar(
+    "loop_activity", default={}
+)
+# Other threads cannot read a task's context variables, so the watchdog
+# looks the attribution of the running task up here.
+_task_activities: "weakref.WeakKeyDictionary[asyncio.Task, dict[str, str]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+@contextlib.contextmanager
+def loop_activity(**attributes: Any) -> Iterator[None]:
+    """Attribute the work done inside the block, e.g. to a session or tool.
+
+    Attributes nest: a tool run inside a session run is reported with both.
+    """
+    merged = {**_activity.get(), **{k: str(v) for k, v in attributes.items()}}
+    token = _activity.set(merged)
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    previous = _task_activities.get(task) if task is not None else None
+    if task is not None:
+        _task_activities[task] = merged
+    try:
+        yield
+    finally:
+        _activity.reset(token)
+        if task is not None:
+            if previous is None:
+                _task_activities.pop(task, None)
+            else:
+                _task_activities[task] = previous
+
+
+def _make_task_factory(previous_factory):
+    """Build a task factory that lets new tasks inherit the creator's activity."""
+
+    def task_factory(loop, coro, **kwargs):
+        if previous_factory is None:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        else:
+            task = previous_factory(loop, coro, **kwargs)
+        activity = _activity.get()
+        if activity:
+            _task_activities[task] = activity
+        return task
+
+    return task_factory
+
+
+def current_activity() -> dict[str, str]:
+    """Return the attribution of the code currently running."""
+    return dict(_activity.get())
+
+
+@dataclass
+class BlockingReport:
+    """A period during which the event loop did not run other callbacks."""
+
+    started_at: float
+    duration: float
+    activity: dict[str, str] = field(default_factory=dict)
+    task: Optional[str] = None
+    stack: Optional[list[str]] = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class LoopLagMonitor:
+    """Samples scheduling delay of an event loop and reports blocking calls."""
+
+    def __init__(
+        self,
+        interval: float = LOOP_MONITOR_INTERVAL,
+        threshold: float = LOOP_MONITOR_THRESHOLD,
+        max_reports: int = LOOP_MONITOR_MAX_REPORTS,
+    ):
+        """Initialize the monitor.
+
+        Args:
+            interval: Seconds between heartbeats.
+            threshold: Lag in seconds above which the loop counts as blocked.
+            max_reports: Number of most recent blocking reports to keep.
+        """
+        self.interval = interval
+        self.threshold = threshold
+        self.reports: deque[BlockingReport] = deque(maxlen=max_reports)
+        self.samples = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.blocked_count = 0
+        self._recent_lags: deque[float] = deque(maxlen=1000)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._previous_task_factory = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._last_beat = 0.0
+        # Report captured by the watchdog for the stall in progress, if any
+        self._open_report: Optional[BlockingReport] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._heartbeat_task is not None and not self._heartbeat_task.done()
+
+    def start(self) -> None:
+        """Start monitoring the running event loop."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._previous_task_factory = self._loop.get_task_factory()
+        self._loop.set_task_factory(_make_task_factory(self._previous_task_factory))
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._heartbeat_task = self._loop.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-lag-watchdog", daemon=True
+        )
+        self._watchdog.start()
+        logger.info(
+            f"Monitoring event loop lag (threshold {self.threshold * 1000:.0f} ms)"
+        )
+
+    async def stop(self) -> None:
+        """Stop monitoring."""
+        self._stopped.set()
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._heartbeat_task
+            self._heartbeat_task = None
+            self._loop.set_task_factory(self._previous_task_factory)
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            scheduled = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._last_beat = now
+            self._record(max(0.0, now - scheduled - self.interval))
+
+    def _record(self, lag: float) -> None:
+        self.samples += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+        self._recent_lags.append(lag)
+        EVENT_LOOP_LAG.observe(lag)
+        with self._lock:
+            report, self._open_report = self._open_report, None
+        if report is None and lag < self.threshold:
+            return
+
+        if report is None:
+            # Too short for the watchdog to catch it in the act
+            report = BlockingReport(started_at=time.time() - lag, duration=lag)
+            self.reports.append(report)
+        report.duration = lag
+        self.blocked_count += 1
+        logger.warning(
+            f"Event loop blocked for {lag * 1000:.0f} ms"
+            + (f" by {report.activity}" if report.activity else ""),
+            extra={"loop_lag": report.to_dict()},
+        )
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.interval):
+            blocked_for = time.monotonic() - self._last_beat - self.interval
+            if blocked_for < self.threshold:
+                continue
+            with self._lock:
+                if self._open_report is not None:
+                    continue
+                self._open_report = self._capture(blocked_for)
+                self.reports.append(self._open_report)
+
+    def _capture(self, blocked_for: float) -> BlockingReport:
+        """Describe what the blocked loop thread is doing right now."""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame) if frame is not None else None
+        task = asyncio.tasks._current_tasks.get(self._loop)
+        activity = dict(_task_activities.get(task, {})) if task is not None else {}
+        return BlockingReport(
+            started_at=time.time() - blocked_for,
+            duration=blocked_for,
+            activity=activity,
+            task=task.get_name() if task is not None else None,
+            stack=stack,
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """Return lag statistics and the most recent blocking reports."""
+        recent = sorted(self._recent_lags)
+        p99 = recent[int(len(recent) * 0.99)] if recent else 0.0
+        return {
+            "running": self.running,
+            "interval_ms": self.interval * 1000,
+            "threshold_ms": self.threshold * 1000,
+            "samples": self.samples,
+            "mean_lag_ms": self.total_lag / self.samples * 1000 if self.samples else 0.0,
+            "p99_lag_ms": p99 * 1000,
+            "max_lag_ms": self.max_lag * 1000,
+            "blocked_count": self.blocked_count,
+            "reports": [report.to_dict() for report in reversed(self.reports)],
+        }
+
+
+_loop_monitor: Optional[LoopLagMonitor] = None
+
+
+def get_loop_monitor() -> LoopLagMonitor:
+    """Return the process-wide loop lag monitor."""
+    global _loop_monitor
+    if _loop_monitor is None:
+        _loop_monitor = LoopLagMonitor()
+    return _loop_monitor
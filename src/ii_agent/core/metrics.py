@@ -0,0 +1,288 @@
+"""Operational metrics in the Prometheus text format.
+
+The websocket server exposes the metrics below on ``/metrics`` for scraping:
+connections, running agent tasks and queued messages, latency histograms of
+LLM calls, tools, context summaries, database writes and event loop lag, and
+retry counts from the LLM clients' retry loops.
+
+Metrics are updated from the event loop and from worker threads, so every
+update takes the metric's lock. Gauges of server state (connections, tasks,
+queues) are read from callbacks when the metrics are rendered instead of
+being kept up to date on every change.
+
+Code updates a metric with e.g. ``TOOL_DURATION.observe(0.2, tool="bash")``
+or times a block with ``with DB_WRITE_DURATION.time(table="events"): ...``.
+"""
+
+import bisect
+import contextlib
+import math
+import threading
+import time
+from typing import Callable, Iterator, Optional, Sequence, TypeVar, Union
+
+from ii_agent.utils.constants import (
+    FAST_LATENCY_BUCKETS,
+    LLM_LATENCY_BUCKETS,
+    SCREENSHOT_SIZE_BUCKETS,
+    TOOL_LATENCY_BUCKETS,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = tuple[str, ...]
+GaugeCallback = Callable[[], Union[float, dict[LabelValues, float]]]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: dict[str, object]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {_escape(self.documentation)}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """A monotonically increasing count, e.g. of retries."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: object) -> float:
+        return self._values.get(self._label_values(labels), 0.0)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values.items()
+        ]
+
+
+class Gauge(_Metric):
+    """A value that goes up and down, read from a callback at render time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._callback: Optional[GaugeCallback] = None
+
+    def set_function(self, callback: Optional[GaugeCallback]) -> None:
+        """Read the gauge from ``callback``.
+
+        The callback returns the value, or for a labelled gauge a mapping
+        from label values (in ``labelnames`` order) to values.
+        """
+        self._callback = callback
+
+    def _samples(self) -> list[str]:
+        if self._callback is None:
+            return []
+        values = self._callback()
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values.items()
+        ]
+
+
+class Histogram(_Metric):
+    """Counts observations, such as latencies in seconds, into buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = FAST_LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label values: count per bucket (plus +Inf), sum
+        self._values: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = self._label_values(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[index] += 1
+            total[0] += value
+
+    @contextlib.contextmanager
+    def time(self, **labels: object) -> Iterator[None]:
+        """Observe how long the block takes, also if it raises."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - started, **labels)
+
+    def count(self, **labels: object) -> int:
+        values = self._values.get(self._label_values(labels))
+        return sum(values[0]) if values is not None else 0
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            values = {
+                key: (list(counts), total[0])
+                for key, (counts, total) in self._values.items()
+            }
+        lines = []
+        for key, (counts, total) in values.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                labels = _format_labels(
+                    (*self.labelnames, "le"), (*key, _format_value(bound))
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+MetricT = TypeVar("MetricT", bound=_Metric)
+
+
+class MetricsRegistry:
+    """The metrics exposed on one endpoint."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: MetricT) -> MetricT:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+ACTIVE_CONNECTIONS = REGISTRY.register(
+    Gauge("ii_agent_active_connections", "Open websocket connections.")
+)
+RUNNING_AGENT_TASKS = REGISTRY.register(
+    Gauge("ii_agent_running_agent_tasks", "Agent runs in progress.")
+)
+MESSAGE_QUEUE_DEPTH = REGISTRY.register(
+    Gauge(
+        "ii_agent_message_queue_depth",
+        "Events waiting in a session's agent message queue.",
+        ["session_id"],
+    )
+)
+LLM_CALL_DURATION = REGISTRY.register(
+    Histogram(
+        "ii_agent_llm_call_duration_seconds",
+        "Latency of LLM calls, including retries.",
+        ["provider", "model", "purpose"],
+        buckets=LLM_LATENCY_BUCKETS,
+    )
+)
+LLM_RETRIES = REGISTRY.register(
+    Counter(
+        "ii_agent_llm_retries_total",
+        "LLM requests retried after a transient error, by reason.",
+        ["provider", "model", "reason"],
+    )
+)
+TOOL_DURATION = REGISTRY.register(
+    Histogram(
+        "ii_agent_tool_duration_seconds",
+        "Latency of tool runs.",
+        ["tool"],
+        buckets=TOOL_LATENCY_BUCKETS,
+    )
+)
+SUMMARIZATION_DURATION = REGISTRY.register(
+    Histogram(
+        "ii_agent_summarization_duration_seconds",
+        "Latency of context summaries; the count is the number of summaries.",
+        buckets=LLM_LATENCY_BUCKETS,
+    )
+)
+DB_WRITE_DURATION = REGISTRY.register(
+    Histogram(
+        "ii_agent_db_write_duration_seconds",
+        "Latency of writes to the events database, by table.",
+        ["table"],
+    )
+)
+SCREENSHOT_BYTES = REGISTRY.register(
+    Histogram(
+        "ii_agent_browser_screenshot_bytes",
+        "Encoded size of browser screenshots, for the model or the UI.",
+        ["format", "target"],
+        buckets=SCREENSHOT_SIZE_BUCKETS,
+    )
+)
+EVENT_LOOP_LAG = REGISTRY.register(
+    Histogram(
+        "ii_agent_event_loop_lag_seconds",
+        "Scheduling delay of the event loop heartbeat.",
+    )
+)
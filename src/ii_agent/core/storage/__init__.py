@@ -1,7 +1,18 @@
+from ii_agent.core.storage.blobs import BlobStore, get_blob_store, set_blob_store
 from ii_agent.core.storage.files import FileStore
 from ii_agent.core.storage.local import LocalFileStore
 from ii_agent.core.storage.memory import InMemoryFileStore
 
+__all__ = [
+    "BlobStore",
+    "FileStore",
+    "InMemoryFileStore",
+    "LocalFileStore",
+    "get_blob_store",
+    "get_file_store",
+    "set_blob_store",
+]
+
 
 def get_file_store(
     file_store_type: str,
@@ -0,0 +1,175 @@
+import base64
+import hashlib
+import re
+from typing import Any
+
+from ii_agent.core.storage.files import FileStore
+from ii_agent.core.storage.locations import get_blob_filename
+from ii_agent.core.storage.memory import InMemoryFileStore
+
+BLOB_SOURCE_TYPE = "blob"
+
+_DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+# Keys of a base64 image source that LLM providers accept
+_LLM_SOURCE_KEYS = ("type", "media_type", "data")
+
+
+class BlobStore:
+    """Content-addressed store for large payloads such as screenshots.
+
+    Payloads are written once to the underlying `FileStore`, keyed by the
+    SHA-256 digest of their bytes. Message history, events and websocket
+    frames carry an image source of the form
+    ``{"type": "blob", "media_type": ..., "digest": ...}`` instead of the
+    base64 data, which is only materialized again when it is sent to the LLM
+    or served to the UI.
+    """
+
+    def __init__(self, file_store: FileStore):
+        self.file_store = file_store
+        self._known_digests: set[str] = set()
+
+    def __deepcopy__(self, memo) -> "BlobStore":
+        # Blobs are immutable, so copies of a message history share the store
+        return self
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def put(self, data: bytes) -> str:
+        """Store `data` unless already present and return its digest."""
+        digest = self.digest(data)
+        if digest not in self._known_digests:
+            path = get_blob_filename(digest)
+            if not self.file_store.exists(path):
+                self.file_store.write(path, data)
+            self._known_digests.add(digest)
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        """Return the bytes stored under `digest`.
+
+        Raises:
+            ValueError: If `digest` is not a SHA-256 hex digest
+            FileNotFoundError: If no blob is stored under `digest`
+        """
+        if not _DIGEST_PATTERN.match(digest):
+            raise ValueError(f"Invalid blob digest: {digest}")
+        return self.file_store.read_bytes(get_blob_filename(digest))
+
+    def exists(self, digest: str) -> bool:
+        if not _DIGEST_PATTERN.match(digest):
+            return False
+        return digest in self._known_digests or self.file_store.exists(
+            get_blob_filename(digest)
+        )
+
+    def externalize_image_source(self, source: dict[str, Any]) -> dict[str, Any]:
+        """Replace inline base64 image data with a blob reference.
+
+        An image shown in the UI at a larger size than the one sent to the
+        LLM carries it as ``display_data``, stored as ``display_digest``. A
+        ``description`` of the image is kept, for when it is evicted from the
+        history.
+        """
+        if source.get("type") != "base64":
+            return source
+        externalized = {
+            "type": BLOB_SOURCE_TYPE,
+            "media_type": source.get("media_type"),
+            "digest": self.put(base64.b64decode(source["data"])),
+        }
+        if source.get("display_data"):
+            externalized["display_digest"] = self.put(
+                base64.b64decode(source["display_data"])
+            )
+        if source.get("description"):
+            externalized["description"] = source["description"]
+        return externalized
+
+    def resolve_image_source(self, source: dict[str, Any]) -> dict[str, Any]:
+        """Turn a blob reference back into an inline base64 image source."""
+        if source.get("type") == "base64" and source.keys() - set(_LLM_SOURCE_KEYS):
+            return {key: source[key] for key in _LLM_SOURCE_KEYS if key in source}
+        if source.get("type") != BLOB_SOURCE_TYPE:
+            return source
+        return {
+            "type": "base64",
+            "media_type": source.get("media_type"),
+            "data": base64.b64encode(self.get(source["digest"])).decode(),
+        }
+
+    @staticmethod
+    def display_image_source(source: dict[str, Any]) -> dict[str, Any]:
+        """Point a blob reference at the image shown in the UI."""
+        if source.get("type") != BLOB_SOURCE_TYPE or "display_digest" not in source:
+            return source
+        return {
+            "type": BLOB_SOURCE_TYPE,
+            "media_type": source.get("media_type"),
+            "digest": source["display_digest"],
+        }
+
+    def externalize_tool_output(
+        self, tool_output: list[dict[str, Any]] | str
+    ) -> list[dict[str, Any]] | str:
+        """Move the images of a tool output into the store."""
+        return self._map_image_sources(tool_output, self.externalize_image_source)
+
+    def resolve_tool_output(
+        self, tool_output: list[dict[str, Any]] | str
+    ) -> list[dict[str, Any]] | str:
+        """Inline the blob-referenced images of a tool output."""
+        return self._map_image_sources(tool_output, self.resolve_image_source)
+
+    def display_tool_output(
+        self, tool_output: list[dict[str, Any]] | str
+    ) -> list[dict[str, Any]] | str:
+        """Reference the UI version of the images of an externalized tool output."""
+        return self._map_image_sources(tool_output, self.display_image_source)
+
+    @staticmethod
+    def _map_image_sources(tool_output, fn):
+        if not isinstance(tool_output, list):
+            return tool_output
+        mapped = []
+        for item in tool_output:
+            if (
+                isinstance(item, dict)
+                and item.get("type") == "image"
+                and isinstance(item.get("source"), dict)
+            ):
+                item = {**item, "source": fn(item["source"])}
+            mapped.append(item)
+        return mapped
+
+
+def has_blob_reference(tool_output: list[dict[str, Any]] | str) -> bool:
+    """Whether a tool output holds any blob-referenced image."""
+    return isinstance(tool_output, list) and any(
+        isinstance(item, dict)
+        and isinstance(item.get("source"), dict)
+        and item["source"].get("type") == BLOB_SOURCE_TYPE
+        for item in tool_output
+    )
+
+
+_blob_store: BlobStore | None = None
+
+
+def get_blob_store() -> BlobStore:
+    """Return the process-wide blob store.
+
+    Falls back to an in-memory store until `set_blob_store` is called, e.g.
+    when running the agent from the CLI.
+    """
+    global _blob_store
+    if _blob_store is None:
+        _blob_store = BlobStore(InMemoryFileStore())
+    return _blob_store
+
+
+def set_blob_store(blob_store: BlobStore) -> None:
+    global _blob_store
+    _blob_store = blob_store
@@ -10,6 +10,14 @@ class FileStore:
     def read(self, path: str) -> str:
         pass
 
+    @abstractmethod
+    def read_bytes(self, path: str) -> bytes:
+        pass
+
+    @abstractmethod
+    def exists(self, path: str) -> bool:
+        pass
+
     @abstractmethod
     def list(self, path: str) -> list[str]:
         pass
@@ -1,5 +1,10 @@
 CONVERSATION_BASE_DIR = "sessions"
+BLOB_BASE_DIR = "blobs"
 
 
 def get_conversation_agent_history_filename(sid: str) -> str:
     return f"{CONVERSATION_BASE_DIR}/{sid}/agent_state.json"
+
+
+def get_blob_filename(digest: str) -> str:
+    return f"{BLOB_BASE_DIR}/{digest[:2]}/{digest}"
@@ -0,0 +1,354 @@
+"""Span tracing of agent runs.
+
+An agent run is traced as a tree of spans: the run, each turn, each LLM call
+(with retry attempts as span events), each tool call, context summaries and
+event database flushes. Finished spans are exported in the background to a
+JSONL file and/or an OTLP/HTTP collector (e.g. a local OpenTelemetry
+Collector or Jaeger), using the OTLP JSON encoding.
+
+Tracing is off until `configure_tracing` is called. While it is off,
+`trace_span` returns a shared no-op context manager and no span objects,
+ids or timestamps are created.
+
+Code traces its work with ``with trace_span("tool.run", tool="bash"): ...``.
+"""
+
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+from typing import Any, Iterator, Optional, Protocol, Sequence
+
+import httpx
+
+from ii_agent.utils.constants import TRACE_EXPORT_INTERVAL, TRACE_EXPORT_MAX_BATCH
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "ii-agent"
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "attributes",
+        "events",
+        "start_time_ns",
+        "end_time_ns",
+        "error",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str],
+        attributes: dict[str, Any],
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.events: list[tuple[str, int, dict[str, Any]]] = []
+        self.start_time_ns = time.time_ns()
+        self.end_time_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        self.events.append((name, time.time_ns(), attributes))
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the span as a flat record, as written to JSONL files."""
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time_ns": self.start_time_ns,
+            "end_time_ns": self.end_time_ns,
+            "duration_ms": (self.end_time_ns - self.start_time_ns) / 1e6
+            if self.end_time_ns is not None
+            else None,
+            "attributes": self.attributes,
+            "events": [
+                {"name": name, "time_ns": time_ns, "attributes": attributes}
+                for name, time_ns, attributes in self.events
+            ],
+            "error": self.error,
+        }
+
+    def to_otlp(self) -> dict[str, Any]:
+        """Return the span in the OTLP JSON encoding."""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            # SPAN_KIND_INTERNAL
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_time_ns),
+            "endTimeUnixNano": str(self.end_time_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "events": [
+                {
+                    "timeUnixNano": str(time_ns),
+                    "name": name,
+                    "attributes": _otlp_attributes(attributes),
+                }
+                for name, time_ns, attributes in self.events
+            ],
+            # STATUS_CODE_ERROR or STATUS_CODE_UNSET
+            "status": {"code": 2, "message": self.error} if self.error else {},
+        }
+        if self.parent_id is not None:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def _otlp_attributes(attributes: dict[str, Any]) -> list[dict[str, Any]]:
+    encoded = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            any_value = {"boolValue": value}
+        elif isinstance(value, int):
+            any_value = {"intValue": str(value)}
+        elif isinstance(value, float):
+            any_value = {"doubleValue": value}
+        else:
+            any_value = {"stringValue": str(value)}
+        encoded.append({"key": key, "value": any_value})
+    return encoded
+
+
+class SpanExporter(Protocol):
+    def export(self, spans: Sequence[Span]) -> None: ...
+
+    def shutdown(self) -> None: ...
+
+
+class JSONLSpanExporter:
+    """Appends finished spans to a JSONL file, one span per line."""
+
+    def __init__(self, path: str):
+        self.path = os.path.expanduser(path)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def export(self, spans: Sequence[Span]) -> None:
+        with open(self.path, "a") as f:
+            for span in spans:
+                f.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+    def shutdown(self) -> None:
+        pass
+
+
+class OTLPSpanExporter:
+    """Sends finished spans to an OTLP/HTTP collector as JSON."""
+
+    def __init__(self, endpoint: str, timeout: float = 10.0):
+        """Initialize the exporter.
+
+        Args:
+            endpoint: Base URL of the collector, e.g. http://localhost:4318.
+                Spans are posted to its ``/v1/traces`` path.
+            timeout: Timeout of one export request in seconds.
+        """
+        endpoint = endpoint.rstrip("/")
+        if not endpoint.endswith("/v1/traces"):
+            endpoint += "/v1/traces"
+        self.endpoint = endpoint
+        self._client = httpx.Client(timeout=timeout)
+
+    def export(self, spans: Sequence[Span]) -> None:
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _otlp_attributes({"service.name": SERVICE_NAME})
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "ii_agent"},
+                            "spans": [span.to_otlp() for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        response = self._client.post(self.endpoint, json=payload)
+        response.raise_for_status()
+
+    def shutdown(self) -> None:
+        self._client.close()
+
+
+class Tracer:
+    """Creates spans and exports them in batches from a background thread."""
+
+    def __init__(
+        self,
+        exporters: Sequence[SpanExporter],
+        export_interval: float = TRACE_EXPORT_INTERVAL,
+        max_batch_size: int = TRACE_EXPORT_MAX_BATCH,
+    ):
+        self.exporters = list(exporters)
+        self.export_interval = export_interval
+        self.max_batch_size = max_batch_size
+        self._queue: "queue.SimpleQueue[Span]" = queue.SimpleQueue()
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(
+            target=self._run, name="span-exporter", daemon=True
+        )
+        self._worker.start()
+
+    @contextlib.contextmanager
+    def start_as_current_span(
+        self, name: str, attributes: dict[str, Any]
+    ) -> Iterator[Span]:
+        parent = _current_span.get()
+        span = Span(
+            name,
+            trace_id=parent.trace_id if parent is not None else secrets.token_hex(16),
+            parent_id=parent.span_id if parent is not None else None,
+            attributes=attributes,
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_time_ns = time.time_ns()
+            self._queue.put(span)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.export_interval):
+            self._export_pending()
+
+    def _export_pending(self) -> None:
+        while True:
+            batch = []
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            for exporter in self.exporters:
+                try:
+                    exporter.export(batch)
+                except Exception as e:
+                    logger.warning(f"Failed to export {len(batch)} spans: {e}")
+
+    def shutdown(self) -> None:
+        """Export the remaining spans and stop the exporters."""
+        self._stopped.set()
+        self._worker.join()
+        self._export_pending()
+        for exporter in self.exporters:
+            exporter.shutdown()
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+_tracer: Optional[Tracer] = None
+
+
+class _NoopSpan:
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        pass
+
+
+_NOOP_SPAN_CONTEXT = contextlib.nullcontext(_NoopSpan())
+
+
+def trace_span(name: str, **attributes: Any):
+    """Trace the block as a span, child of the current span if there is one.
+
+    Returns a context manager yielding the span, or a no-op stand-in with the
+    same methods while tracing is off.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NOOP_SPAN_CONTEXT
+    return tracer.start_as_current_span(name, attributes)
+
+
+def add_span_event(name: str, **attributes: Any) -> None:
+    """Add an event, such as a retry attempt, to the current span."""
+    span = _current_span.get()
+    if span is not None:
+        span.add_event(name, **attributes)
+
+
+def set_span_attributes(**attributes: Any) -> None:
+    """Set attributes, such as token counts, on the current span."""
+    span = _current_span.get()
+    if span is not None:
+        span.attributes.update(attributes)
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current_span.get()
+    return span.trace_id if span is not None else None
+
+
+def current_span_id() -> Optional[str]:
+    span = _current_span.get()
+    return span.span_id if span is not None else None
+
+
+def configure_tracing(
+    trace_file: Optional[str] = None, otlp_endpoint: Optional[str] = None
+) -> Optional[Tracer]:
+    """Turn tracing on for the given exports, or leave it off if there are none.
+
+    Args:
+        trace_file: Path of a JSONL file to append finished spans to.
+        otlp_endpoint: Base URL of an OTLP/HTTP collector.
+
+    Returns:
+        The process-wide tracer, or None if tracing is off.
+    """
+    global _tracer
+    exporters: list[SpanExporter] = []
+    if trace_file:
+        exporters.append(JSONLSpanExporter(trace_file))
+    if otlp_endpoint:
+        exporters.append(OTLPSpanExporter(otlp_endpoint))
+    if not exporters:
+        return None
+    shutdown_tracing()
+    _tracer = Tracer(exporters)
+    logger.info(f"Tracing to {', '.join(type(e).__name__ for e in exporters)}")
+    return _tracer
+
+
+def shutdown_tracing() -> None:
+    """Export the remaining spans and turn tracing off."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None:
+        tracer.shutdown()
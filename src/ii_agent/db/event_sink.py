@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import uuid
+import weakref
+from datetime import datetime
+from typing import Optional
+
+from ii_agent.core.event import RealtimeEvent
+from ii_agent.core.metrics import DB_WRITE_DURATION
+from ii_agent.core.tracing import trace_span
+from ii_agent.db.manager import Events
+from ii_agent.utils.constants import (
+    EVENT_SINK_FLUSH_INTERVAL,
+    EVENT_SINK_MAX_BATCH_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+_live_sinks: "weakref.WeakSet[EventSink]" = weakref.WeakSet()
+
+
+class EventSink:
+    """Write-behind buffer in front of `Events.save_event` for one session.
+
+    `put` only appends to an in-memory buffer. A background task writes the
+    buffer in a single transaction, off the event loop, once it holds
+    `max_batch_size` events or `flush_interval` seconds after the first
+    buffered event. Flushes are serialized, so rows are written in the order
+    events were put.
+    """
+
+    def __init__(
+        self,
+        session_id: uuid.UUID,
+        max_batch_size: int = EVENT_SINK_MAX_BATCH_SIZE,
+        flush_interval: float = EVENT_SINK_FLUSH_INTERVAL,
+    ):
+        """Initialize the sink.
+
+        Args:
+            session_id: The UUID of the session the events belong to
+            max_batch_size: Buffered events that trigger an immediate flush
+            flush_interval: Longest time in seconds an event stays buffered
+        """
+        self.session_id = session_id
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self._buffer: list[tuple[RealtimeEvent, datetime]] = []
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+        self._closed = False
+        _live_sinks.add(self)
+
+    @property
+    def pending(self) -> int:
+        """Number of buffered events not yet written."""
+        return len(self._buffer)
+
+    def put(self, event: RealtimeEvent) -> None:
+        """Buffer an event for persistence. Never blocks.
+
+        The timestamp is taken here rather than at insert time, so batched
+        rows keep the order and spacing in which events were produced.
+        """
+        if self._closed:
+            raise RuntimeError("EventSink is closed")
+        self._buffer.append((event, datetime.utcnow()))
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._run_flusher())
+        if len(self._buffer) >= self.max_batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        """Write every buffered event now."""
+        async with self._flush_lock:
+            while self._buffer:
+                batch = self._buffer[: self.max_batch_size]
+                del self._buffer[: len(batch)]
+                try:
+                    with trace_span(
+                        "db.flush", session_id=str(self.session_id), events=len(batch)
+                    ), DB_WRITE_DURATION.time(table="events"):
+                        await asyncio.to_thread(
+                            Events.save_events, self.session_id, batch
+                        )
+                except Exception as e:
+                    logger.error(
+                        f"Failed to persist {len(batch)} events for session {self.session_id}: {e}"
+                    )
+
+    async def aclose(self) -> None:
+        """Flush remaining events and stop the background task."""
+        self._closed = True
+        # Let an in-flight flush finish instead of cancelling it: the worker
+        # thread would keep writing and could race with the final flush.
+        self._wakeup.set()
+        if self._flusher is not None:
+            await self._flusher
+        await self.flush()
+
+    async def _run_flusher(self) -> None:
+        while self._buffer:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+
+async def flush_all_event_sinks() -> None:
+    """Flush every live sink, e.g. on server shutdown."""
+    for sink in list(_live_sinks):
+        await sink.flush()
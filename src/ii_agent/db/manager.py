@@ -1,16 +1,38 @@
 from contextlib import contextmanager
-from typing import Optional, Generator, List
+from datetime import datetime
+from typing import Optional, Generator, Iterator, List
 import uuid
 from pathlib import Path
-from sqlalchemy import create_engine, asc, text
+from sqlalchemy import create_engine, and_, asc, insert, or_, text
+from sqlalchemy import event as sqlalchemy_event
 from sqlalchemy.orm import sessionmaker, Session as DBSession
-from ii_agent.db.models import Base, Session, Event
+from ii_agent.db.models import Base, Session, Event, LLMUsage
 from ii_agent.core.event import EventType, RealtimeEvent
 
 
 # Database setup
 DATABASE_URL = "sqlite:///db/events.db"
+SQLITE_BUSY_TIMEOUT_MS = 5000
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+
+
+def configure_sqlite_connection(dbapi_connection, connection_record) -> None:
+    """Apply per-connection SQLite settings.
+
+    WAL lets readers (the sessions API) proceed while the event sink writes,
+    synchronous=NORMAL drops the fsync on every commit (safe in WAL mode), and
+    the busy timeout makes concurrent writers wait instead of failing with
+    "database is locked".
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+
+sqlalchemy_event.listen(engine, "connect", configure_sqlite_connection)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, expire_on_commit=False)
 
 # Create tables if they don't exist
@@ -181,6 +203,34 @@ class EventsTable:
             db.flush()  # This will populate the id field
             return uuid.UUID(db_event.id)
 
+    def save_events(
+        self,
+        session_id: uuid.UUID,
+        events: List[tuple[RealtimeEvent, datetime]],
+    ) -> None:
+        """Save a batch of events for a session in a single transaction.
+
+        Args:
+            session_id: The UUID of the session the events belong to
+            events: (event, timestamp) pairs in the order they were emitted
+        """
+        if not events:
+            return
+        with get_db() as db:
+            db.execute(
+                insert(Event),
+                [
+                    {
+                        "id": str(uuid.uuid4()),
+                        "session_id": str(session_id),
+                        "timestamp": timestamp,
+                        "event_type": event.type.value,
+                        "event_payload": event.model_dump(),
+                    }
+                    for event, timestamp in events
+                ],
+            )
+
     def get_session_events(self, session_id: uuid.UUID) -> list[Event]:
         """Get all events for a session.
 
@@ -244,30 +294,162 @@ class EventsTable:
         Returns:
             A list of event dictionaries with their details, sorted by timestamp ascending
         """
+        return self.get_session_events_page(session_id)
+
+    def get_session_events_page(
+        self,
+        session_id: str,
+        limit: Optional[int] = None,
+        after: Optional[tuple[datetime, str]] = None,
+        event_types: Optional[List[str]] = None,
+    ) -> List[dict]:
+        """Get a page of a session's events with session details.
+
+        Events are ordered by (timestamp, id) and fetched together with the
+        session's workspace directory in one joined query.
+
+        Args:
+            session_id: The session identifier to look up events for
+            limit: Maximum number of events to return, or None for all
+            after: Only return events strictly after this (timestamp, id) key
+            event_types: Only return events of these types, if given
+
+        Returns:
+            A list of event dictionaries, sorted by timestamp ascending
+        """
         with get_db() as db:
-            events = (
-                db.query(Event)
+            query = (
+                db.query(
+                    Event.id,
+                    Event.session_id,
+                    Event.timestamp,
+                    Event.event_type,
+                    Event.event_payload,
+                    Session.workspace_dir,
+                )
+                .join(Session, Session.id == Event.session_id)
                 .filter(Event.session_id == session_id)
-                .order_by(asc(Event.timestamp))
-                .all()
             )
+            if event_types:
+                query = query.filter(Event.event_type.in_(event_types))
+            if after is not None:
+                after_timestamp, after_id = after
+                query = query.filter(
+                    or_(
+                        Event.timestamp > after_timestamp,
+                        and_(Event.timestamp == after_timestamp, Event.id > after_id),
+                    )
+                )
+            query = query.order_by(asc(Event.timestamp), asc(Event.id))
+            if limit is not None:
+                query = query.limit(limit)
 
-            # Convert events to a list of dictionaries
-            event_list = []
-            for e in events:
-                event_data = {
-                    "id": e.id,
-                    "session_id": e.session_id,
-                    "timestamp": e.timestamp.isoformat(),
-                    "event_type": e.event_type,
-                    "event_payload": e.event_payload,
-                    "workspace_dir": e.session.workspace_dir,
+            return [
+                {
+                    "id": row.id,
+                    "session_id": row.session_id,
+                    "timestamp": row.timestamp.isoformat(),
+                    "event_type": row.event_type,
+                    "event_payload": row.event_payload,
+                    "workspace_dir": row.workspace_dir,
                 }
-                event_list.append(event_data)
+                for row in query
+            ]
+
+    def iter_session_events(
+        self,
+        session_id: str,
+        event_types: Optional[List[str]] = None,
+        batch_size: int = 500,
+    ) -> Iterator[dict]:
+        """Iterate over a session's events in timestamp order, one page at a time.
+
+        Each page is read in its own short transaction, so arbitrarily long
+        histories are streamed with bounded memory.
+
+        Args:
+            session_id: The session identifier to look up events for
+            event_types: Only yield events of these types, if given
+            batch_size: Number of events read per query
+
+        Yields:
+            Event dictionaries as returned by `get_session_events_page`
+        """
+        after = None
+        while True:
+            page = self.get_session_events_page(
+                session_id, limit=batch_size, after=after, event_types=event_types
+            )
+            yield from page
+            if len(page) < batch_size:
+                return
+            last = page[-1]
+            after = (datetime.fromisoformat(last["timestamp"]), last["id"])
+
+
+class LLMUsageTable:
+    """Table class for LLM usage ledger operations."""
 
-            return event_list
+    def save_usage(
+        self, session_id: uuid.UUID, usage: dict, run_id: Optional[str] = None
+    ) -> None:
+        """Save the usage of one LLM call.
+
+        Args:
+            session_id: The UUID of the session the call was made for
+            usage: Column values: model, purpose, latency and token counts
+            run_id: Optional identifier of the run the session belongs to
+        """
+        with get_db() as db:
+            db.execute(
+                insert(LLMUsage),
+                [
+                    {
+                        "id": str(uuid.uuid4()),
+                        "session_id": str(session_id),
+                        "run_id": run_id,
+                        **usage,
+                    }
+                ],
+            )
+
+    def get_usage(
+        self, session_id: Optional[str] = None, run_id: Optional[str] = None
+    ) -> List[dict]:
+        """Get the recorded LLM calls of a session or a run, oldest first.
+
+        Args:
+            session_id: Only return calls of this session, if given
+            run_id: Only return calls of this run, if given
+
+        Returns:
+            A list of usage dictionaries, sorted by timestamp ascending
+        """
+        with get_db() as db:
+            query = db.query(LLMUsage)
+            if session_id is not None:
+                query = query.filter(LLMUsage.session_id == str(session_id))
+            if run_id is not None:
+                query = query.filter(LLMUsage.run_id == run_id)
+            return [
+                {
+                    "session_id": row.session_id,
+                    "run_id": row.run_id,
+                    "timestamp": row.timestamp.isoformat(),
+                    "model": row.model,
+                    "purpose": row.purpose,
+                    "latency_ms": row.latency_ms,
+                    "ttfb_ms": row.ttfb_ms,
+                    "input_tokens": row.input_tokens,
+                    "output_tokens": row.output_tokens,
+                    "cache_read_input_tokens": row.cache_read_input_tokens,
+                    "cache_creation_input_tokens": row.cache_creation_input_tokens,
+                }
+                for row in query.order_by(asc(LLMUsage.timestamp))
+            ]
 
 
 # Create singleton instances following Open WebUI pattern
 Sessions = SessionsTable()
 Events = EventsTable()
+LLMUsageEntries = LLMUsageTable()
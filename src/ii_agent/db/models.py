@@ -1,6 +1,6 @@
 from datetime import datetime
 import uuid
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, Float, ForeignKey, Index, Integer
 from sqlalchemy.orm import relationship, declarative_base
 from sqlalchemy.dialects.sqlite import JSON as SQLiteJSON
 from typing import Optional
@@ -12,6 +12,10 @@ class Session(Base):
     """Database model for agent sessions."""
 
     __tablename__ = "session"
+    __table_args__ = (
+        # Sessions listing filters by device and sorts by creation time
+        Index("ix_session_device_id_created_at", "device_id", "created_at"),
+    )
 
     # Store UUID as string in SQLite
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -24,6 +28,7 @@ class Session(Base):
     events = relationship(
         "Event", back_populates="session", cascade="all, delete-orphan"
     )
+    llm_usage = relationship("LLMUsage", cascade="all, delete-orphan")
 
     def __init__(
         self, id: uuid.UUID, workspace_dir: str, device_id: Optional[str] = None, name: Optional[str] = None
@@ -46,6 +51,16 @@ class Event(Base):
     """Database model for agent events."""
 
     __tablename__ = "event"
+    __table_args__ = (
+        # Session history is read and pruned in timestamp order per session
+        Index("ix_event_session_id_timestamp", "session_id", "timestamp"),
+        Index(
+            "ix_event_session_id_event_type_timestamp",
+            "session_id",
+            "event_type",
+            "timestamp",
+        ),
+    )
 
     # Store UUID as string in SQLite
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -72,6 +87,33 @@ class Event(Base):
         self.event_payload = event_payload
 
 
+class LLMUsage(Base):
+    """Database model for the usage of one LLM call."""
+
+    __tablename__ = "llm_usage"
+    __table_args__ = (
+        Index("ix_llm_usage_session_id_timestamp", "session_id", "timestamp"),
+        Index("ix_llm_usage_run_id", "run_id"),
+    )
+
+    # Store UUID as string in SQLite
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    session_id = Column(
+        String(36), ForeignKey("session.id", ondelete="CASCADE"), nullable=False
+    )
+    # Groups the sessions of one evaluation run, e.g. a GAIA run name
+    run_id = Column(String, nullable=True)
+    timestamp = Column(DateTime, default=datetime.utcnow)
+    model = Column(String, nullable=False)
+    purpose = Column(String, nullable=False)  # main, summary, enhancement, ...
+    latency_ms = Column(Float, nullable=False)
+    ttfb_ms = Column(Float, nullable=True)  # Only known for streamed calls
+    input_tokens = Column(Integer, nullable=False, default=0)
+    output_tokens = Column(Integer, nullable=False, default=0)
+    cache_read_input_tokens = Column(Integer, nullable=False, default=0)
+    cache_creation_input_tokens = Column(Integer, nullable=False, default=0)
+
+
 def init_db(engine):
     """Initialize the database by creating all tables."""
     Base.metadata.create_all(engine)
@@ -1,3 +1,4 @@
+import asyncio
 import os
 
 import random
@@ -42,6 +43,9 @@ from anthropic.types.message_create_params import (
 from ii_agent.llm.base import (
     LLMClient,
     AssistantContentBlock,
+    GeneralContentBlock,
+    StreamCallback,
+    StreamDelta,
     ToolParam,
     TextPrompt,
     ToolCall,
@@ -52,12 +56,17 @@ from ii_agent.llm.base import (
     recursively_remove_invoke_tag,
     ImageBlock,
 )
+from ii_agent.llm.http_client import PooledAsyncClient
+from ii_agent.llm.payload_cache import ToolPayloadCache, TurnPayloadCache
+from ii_agent.llm.prompt_cache import plan_cache_breakpoints
 from ii_agent.utils.constants import DEFAULT_MODEL
 
 
 class AnthropicDirectClient(LLMClient):
     """Use Anthropic models via first party API."""
 
+    provider = "anthropic"
+
     def __init__(
         self,
         model_name=DEFAULT_MODEL,
@@ -76,11 +85,28 @@ class AnthropicDirectClient(LLMClient):
                 timeout=60 * 5,
                 max_retries=1,
             )
+            self.async_client = PooledAsyncClient(
+                lambda http_client: anthropic.AsyncAnthropicVertex(
+                    project_id=project_id,
+                    region=region,
+                    timeout=60 * 5,
+                    max_retries=1,
+                    http_client=http_client,
+                )
+            )
         else:
             api_key = os.getenv("ANTHROPIC_API_KEY")
             self.client = anthropic.Anthropic(
                 api_key=api_key, max_retries=1, timeout=60 * 5
             )
+            self.async_client = PooledAsyncClient(
+                lambda http_client: anthropic.AsyncAnthropic(
+                    api_key=api_key,
+                    max_retries=1,
+                    timeout=60 * 5,
+                    http_client=http_client,
+                )
+            )
             model_name = model_name.replace(
                 "@", "-"
             )  # Quick fix for Anthropic Vertex API
@@ -92,6 +118,8 @@ class AnthropicDirectClient(LLMClient):
         else:
             self.headers = {"anthropic-beta": "prompt-caching-2024-07-31"}
         self.thinking_tokens = thinking_tokens
+        self._turn_payloads: TurnPayloadCache[dict[str, Any]] = TurnPayloadCache()
+        self._tool_payloads: ToolPayloadCache[list[Any]] = ToolPayloadCache()
 
     def generate(
         self,
@@ -116,77 +144,281 @@ class AnthropicDirectClient(LLMClient):
         Returns:
             A generated response.
         """
+        request_kwargs = self._build_request_kwargs(
+            messages,
+            max_tokens,
+            system_prompt,
+            temperature,
+            tools,
+            tool_choice,
+            thinking_tokens,
+        )
 
-        # Turn GeneralContentBlock into Anthropic message format
-        anthropic_messages = []
-        for idx, message_list in enumerate(messages):
-            role = (
-                "user" if isinstance(message_list[0], UserContentBlock) else "assistant"
-            )
-            message_content_list = []
-            for message in message_list:
-                # Check string type to avoid import issues particularly with reloads.
-                if str(type(message)) == str(TextPrompt):
-                    message = cast(TextPrompt, message)
-                    message_content = AnthropicTextBlock(
-                        type="text",
-                        text=message.text,
-                    )
-                elif str(type(message)) == str(ImageBlock):
-                    message = cast(ImageBlock, message)
-                    message_content = AnthropicImageBlockParam(
-                        type="image",
-                        source=message.source,
-                    )
-                elif str(type(message)) == str(TextResult):
-                    message = cast(TextResult, message)
-                    message_content = AnthropicTextBlock(
-                        type="text",
-                        text=message.text,
-                    )
-                elif str(type(message)) == str(ToolCall):
-                    message = cast(ToolCall, message)
-                    message_content = AnthropicToolUseBlock(
-                        type="tool_use",
-                        id=message.tool_call_id,
-                        name=message.tool_name,
-                        input=message.tool_input,
-                    )
-                elif str(type(message)) == str(ToolFormattedResult):
-                    message = cast(ToolFormattedResult, message)
-                    message_content = AnthropicToolResultBlockParam(
-                        type="tool_result",
-                        tool_use_id=message.tool_call_id,
-                        content=message.tool_output,
-                    )
-                elif str(type(message)) == str(AnthropicRedactedThinkingBlock):
-                    message = cast(AnthropicRedactedThinkingBlock, message)
-                    message_content = message
-                elif str(type(message)) == str(AnthropicThinkingBlock):
-                    message = cast(AnthropicThinkingBlock, message)
-                    message_content = message
+        response = None
+        for retry in range(self.max_retries):
+            try:
+                response = self.client.messages.create(**request_kwargs)  # type: ignore
+                break
+            except (
+                AnthropicAPIConnectionError,
+                AnthropicInternalServerError,
+                AnthropicRateLimitError,
+                AnthropicOverloadedError,
+            ) as e:
+                if retry == self.max_retries - 1:
+                    print(f"Failed Anthropic request after {retry + 1} retries")
+                    raise e
                 else:
-                    print(
-                        f"Unknown message type: {type(message)}, expected one of {str(TextPrompt)}, {str(TextResult)}, {str(ToolCall)}, {str(ToolFormattedResult)}"
+                    print(f"Retrying LLM request: {retry + 1}/{self.max_retries}")
+                    self._record_retry(
+                        retry + 1, e, rate_limited=isinstance(e, AnthropicRateLimitError)
                     )
-                    raise ValueError(
-                        f"Unknown message type: {type(message)}, expected one of {str(TextPrompt)}, {str(TextResult)}, {str(ToolCall)}, {str(ToolFormattedResult)}"
+                    # Sleep 12-18 seconds with jitter to avoid thundering herd.
+                    time.sleep(15 * random.uniform(0.8, 1.2))
+            except Exception as e:
+                raise e
+
+        assert response is not None
+        return self._parse_response(response)
+
+    async def agenerate(
+        self,
+        messages: LLMMessages,
+        max_tokens: int,
+        system_prompt: str | None = None,
+        temperature: float = 0.0,
+        tools: list[ToolParam] = [],
+        tool_choice: dict[str, str] | None = None,
+        thinking_tokens: int | None = None,
+    ) -> Tuple[list[AssistantContentBlock], dict[str, Any]]:
+        """Generate responses with the async SDK client.
+
+        Args:
+            messages: A list of messages.
+            max_tokens: The maximum number of tokens to generate.
+            system_prompt: A system prompt.
+            temperature: The temperature.
+            tools: A list of tools.
+            tool_choice: A tool choice.
+
+        Returns:
+            A generated response.
+        """
+        request_kwargs = self._build_request_kwargs(
+            messages,
+            max_tokens,
+            system_prompt,
+            temperature,
+            tools,
+            tool_choice,
+            thinking_tokens,
+        )
+
+        response = None
+        for retry in range(self.max_retries):
+            try:
+                response = await self.async_client.get().messages.create(  # type: ignore
+                    **request_kwargs
+                )
+                break
+            except (
+                AnthropicAPIConnectionError,
+                AnthropicInternalServerError,
+                AnthropicRateLimitError,
+                AnthropicOverloadedError,
+            ) as e:
+                if retry == self.max_retries - 1:
+                    print(f"Failed Anthropic request after {retry + 1} retries")
+                    raise e
+                else:
+                    print(f"Retrying LLM request: {retry + 1}/{self.max_retries}")
+                    self._record_retry(
+                        retry + 1, e, rate_limited=isinstance(e, AnthropicRateLimitError)
                     )
-                message_content_list.append(message_content)
+                    # Sleep 12-18 seconds with jitter to avoid thundering herd.
+                    await asyncio.sleep(15 * random.uniform(0.8, 1.2))
+            except Exception as e:
+                raise e
 
-            # Anthropic supports up to 4 cache breakpoints, so we put them on the last 4 messages.
-            if self.use_caching and idx >= len(messages) - 4:
-                if isinstance(message_content_list[-1], dict):
-                    message_content_list[-1]["cache_control"] = {"type": "ephemeral"}
+        assert response is not None
+        return self._parse_response(response)
+
+    async def agenerate_stream(
+        self,
+        messages: LLMMessages,
+        max_tokens: int,
+        on_delta: StreamCallback,
+        system_prompt: str | None = None,
+        temperature: float = 0.0,
+        tools: list[ToolParam] = [],
+        tool_choice: dict[str, str] | None = None,
+        thinking_tokens: int | None = None,
+    ) -> Tuple[list[AssistantContentBlock], dict[str, Any]]:
+        """Generate responses over server-sent events.
+
+        Args:
+            messages: A list of messages.
+            max_tokens: The maximum number of tokens to generate.
+            on_delta: Called with every text, thinking and tool input delta.
+            system_prompt: A system prompt.
+            temperature: The temperature.
+            tools: A list of tools.
+            tool_choice: A tool choice.
+
+        Returns:
+            A generated response.
+        """
+        request_kwargs = self._build_request_kwargs(
+            messages,
+            max_tokens,
+            system_prompt,
+            temperature,
+            tools,
+            tool_choice,
+            thinking_tokens,
+        )
+
+        response = None
+        for retry in range(self.max_retries):
+            streamed = False
+            try:
+                async with self.async_client.get().messages.stream(  # type: ignore
+                    **request_kwargs
+                ) as stream:
+                    tool_uses: dict[int, Any] = {}
+                    async for event in stream:
+                        delta = self._to_stream_delta(event, tool_uses)
+                        if delta is not None:
+                            streamed = True
+                            on_delta(delta)
+                    response = await stream.get_final_message()
+                break
+            except (
+                AnthropicAPIConnectionError,
+                AnthropicInternalServerError,
+                AnthropicRateLimitError,
+                AnthropicOverloadedError,
+            ) as e:
+                # Deltas already handed out cannot be taken back, so only
+                # retry when the stream failed before producing anything.
+                if streamed or retry == self.max_retries - 1:
+                    print(f"Failed Anthropic request after {retry + 1} retries")
+                    raise e
                 else:
-                    message_content_list[-1].cache_control = {"type": "ephemeral"}
+                    print(f"Retrying LLM request: {retry + 1}/{self.max_retries}")
+                    self._record_retry(
+                        retry + 1, e, rate_limited=isinstance(e, AnthropicRateLimitError)
+                    )
+                    # Sleep 12-18 seconds with jitter to avoid thundering herd.
+                    await asyncio.sleep(15 * random.uniform(0.8, 1.2))
+            except Exception as e:
+                raise e
+
+        assert response is not None
+        return self._parse_response(response)
 
-            anthropic_messages.append(
-                {
-                    "role": role,
-                    "content": message_content_list,
-                }
+    @staticmethod
+    def _to_stream_delta(event: Any, tool_uses: dict[int, Any]) -> StreamDelta | None:
+        """Map a raw Anthropic stream event to a StreamDelta, if it carries one."""
+        if event.type == "content_block_start":
+            if event.content_block.type == "tool_use":
+                tool_uses[event.index] = event.content_block
+            return None
+        if event.type != "content_block_delta":
+            return None
+
+        delta = event.delta
+        if delta.type == "text_delta":
+            return StreamDelta(type="text", delta=delta.text, index=event.index)
+        if delta.type == "thinking_delta":
+            return StreamDelta(type="thinking", delta=delta.thinking, index=event.index)
+        if delta.type == "input_json_delta":
+            tool_use = tool_uses.get(event.index)
+            return StreamDelta(
+                type="tool_input",
+                delta=delta.partial_json,
+                index=event.index,
+                tool_call_id=tool_use.id if tool_use else None,
+                tool_name=tool_use.name if tool_use else None,
             )
+        return None
+
+    @staticmethod
+    def _convert_turn(message_list: list[GeneralContentBlock]) -> dict[str, Any]:
+        """Turn one history turn into an Anthropic message."""
+        role = (
+            "user" if isinstance(message_list[0], UserContentBlock) else "assistant"
+        )
+        message_content_list = []
+        for message in message_list:
+            # Check string type to avoid import issues particularly with reloads.
+            if str(type(message)) == str(TextPrompt):
+                message = cast(TextPrompt, message)
+                message_content = AnthropicTextBlock(
+                    type="text",
+                    text=message.text,
+                )
+            elif str(type(message)) == str(ImageBlock):
+                message = cast(ImageBlock, message)
+                message_content = AnthropicImageBlockParam(
+                    type="image",
+                    source=message.source,
+                )
+            elif str(type(message)) == str(TextResult):
+                message = cast(TextResult, message)
+                message_content = AnthropicTextBlock(
+                    type="text",
+                    text=message.text,
+                )
+            elif str(type(message)) == str(ToolCall):
+                message = cast(ToolCall, message)
+                message_content = AnthropicToolUseBlock(
+                    type="tool_use",
+                    id=message.tool_call_id,
+                    name=message.tool_name,
+                    input=message.tool_input,
+                )
+            elif str(type(message)) == str(ToolFormattedResult):
+                message = cast(ToolFormattedResult, message)
+                message_content = AnthropicToolResultBlockParam(
+                    type="tool_result",
+                    tool_use_id=message.tool_call_id,
+                    content=message.tool_output,
+                )
+            elif str(type(message)) == str(AnthropicRedactedThinkingBlock):
+                message = cast(AnthropicRedactedThinkingBlock, message)
+                message_content = message
+            elif str(type(message)) == str(AnthropicThinkingBlock):
+                message = cast(AnthropicThinkingBlock, message)
+                message_content = message
+            else:
+                print(
+                    f"Unknown message type: {type(message)}, expected one of {str(TextPrompt)}, {str(TextResult)}, {str(ToolCall)}, {str(ToolFormattedResult)}"
+                )
+                raise ValueError(
+                    f"Unknown message type: {type(message)}, expected one of {str(TextPrompt)}, {str(TextResult)}, {str(ToolCall)}, {str(ToolFormattedResult)}"
+                )
+            message_content_list.append(message_content)
+
+        return {"role": role, "content": message_content_list}
+
+    def _build_request_kwargs(
+        self,
+        messages: LLMMessages,
+        max_tokens: int,
+        system_prompt: str | None,
+        temperature: float,
+        tools: list[ToolParam],
+        tool_choice: dict[str, str] | None,
+        thinking_tokens: int | None,
+    ) -> dict[str, Any]:
+        """Convert internal messages and options into `messages.create` kwargs."""
+        # Cached turn payloads are shared between requests, so each request
+        # gets its own content lists for the cache planner to mark.
+        anthropic_messages = [
+            {"role": payload["role"], "content": list(payload["content"])}
+            for payload in self._turn_payloads.convert(messages, self._convert_turn)
+        ]
 
         if self.use_caching:
             extra_headers = self.headers
@@ -210,16 +442,27 @@ class AnthropicDirectClient(LLMClient):
         if len(tools) == 0:
             tool_params = Anthropic_NOT_GIVEN
         else:
-            tool_params = [
-                AnthropicToolParam(
-                    input_schema=tool.input_schema,
-                    name=tool.name,
-                    description=tool.description,
-                )
-                for tool in tools
-            ]
+            tool_params = self._tool_payloads.convert(
+                tools,
+                lambda tools: [
+                    AnthropicToolParam(
+                        input_schema=tool.input_schema,
+                        name=tool.name,
+                        description=tool.description,
+                    )
+                    for tool in tools
+                ],
+            )
 
-        response = None
+        system_param = system_prompt or Anthropic_NOT_GIVEN
+        if self.use_caching:
+            cached_system, cached_tools = plan_cache_breakpoints(
+                anthropic_messages,
+                system=system_prompt,
+                tools=tool_params if tools else None,
+            )
+            system_param = cached_system or Anthropic_NOT_GIVEN
+            tool_params = cached_tools or tool_params
 
         if thinking_tokens is None:
             thinking_tokens = self.thinking_tokens
@@ -231,39 +474,24 @@ class AnthropicDirectClient(LLMClient):
         else:
             extra_body = None
 
-        for retry in range(self.max_retries):
-            try:
-                response = self.client.messages.create(  # type: ignore
-                    max_tokens=max_tokens,
-                    messages=anthropic_messages,
-                    model=self.model_name,
-                    temperature=temperature,
-                    system=system_prompt or Anthropic_NOT_GIVEN,
-                    tool_choice=tool_choice_param,  # type: ignore
-                    tools=tool_params,
-                    extra_headers=extra_headers,
-                    extra_body=extra_body,
-                )
-                break
-            except (
-                AnthropicAPIConnectionError,
-                AnthropicInternalServerError,
-                AnthropicRateLimitError,
-                AnthropicOverloadedError,
-            ) as e:
-                if retry == self.max_retries - 1:
-                    print(f"Failed Anthropic request after {retry + 1} retries")
-                    raise e
-                else:
-                    print(f"Retrying LLM request: {retry + 1}/{self.max_retries}")
-                    # Sleep 12-18 seconds with jitter to avoid thundering herd.
-                    time.sleep(15 * random.uniform(0.8, 1.2))
-            except Exception as e:
-                raise e
+        return dict(
+            max_tokens=max_tokens,
+            messages=anthropic_messages,
+            model=self.model_name,
+            temperature=temperature,
+            system=system_param,
+            tool_choice=tool_choice_param,
+            tools=tool_params,
+            extra_headers=extra_headers,
+            extra_body=extra_body,
+        )
 
+    def _parse_response(
+        self, response: Any
+    ) -> Tuple[list[AssistantContentBlock], dict[str, Any]]:
+        """Convert an Anthropic response back into internal content blocks."""
         # Convert messages back to internal format
         internal_messages = []
-        assert response is not None
         for message in response.content:
             if "</invoke>" in str(message):
                 warning_msg = "\n".join(
@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
+import asyncio
 import json
 from dataclasses import dataclass
-from typing import Any, Tuple
+from typing import Any, Callable, Tuple
 from dataclasses_json import DataClassJsonMixin
 from anthropic.types import (
     ThinkingBlock as AnthropicThinkingBlock,
@@ -9,6 +10,9 @@ from anthropic.types import (
 )
 from typing import Literal
 
+from ii_agent.core.metrics import LLM_RETRIES
+from ii_agent.core.tracing import add_span_event
+
 
 import logging
 
@@ -114,6 +118,24 @@ class TextResult(DataClassJsonMixin):
     text: str
 
 
+@dataclass
+class StreamDelta:
+    """Incremental piece of an assistant turn received while streaming.
+
+    ``type`` is ``"text"``, ``"thinking"`` or ``"tool_input"``; for the latter,
+    ``delta`` is a fragment of the tool call's JSON arguments.
+    """
+
+    type: Literal["text", "thinking", "tool_input"]
+    delta: str
+    index: int = 0
+    tool_call_id: str | None = None
+    tool_name: str | None = None
+
+
+StreamCallback = Callable[[StreamDelta], None]
+
+
 AssistantContentBlock = (
     TextResult | ToolCall | AnthropicRedactedThinkingBlock | AnthropicThinkingBlock
 )
@@ -125,6 +147,21 @@ LLMMessages = list[list[GeneralContentBlock]]
 class LLMClient(ABC):
     """A client for LLM APIs for the use in agents."""
 
+    # Set by every client; recorded in logs and usage accounting
+    model_name: str = "unknown"
+    provider: str = "unknown"
+
+    def _record_retry(
+        self, attempt: int, error: Exception, rate_limited: bool
+    ) -> None:
+        """Note a retried request on the current span and in the metrics."""
+        add_span_event("llm.retry", attempt=attempt, error=str(error))
+        LLM_RETRIES.inc(
+            provider=self.provider,
+            model=self.model_name,
+            reason="rate_limit" if rate_limited else "error",
+        )
+
     @abstractmethod
     def generate(
         self,
@@ -151,6 +188,86 @@ class LLMClient(ABC):
         """
         raise NotImplementedError
 
+    async def agenerate(
+        self,
+        messages: LLMMessages,
+        max_tokens: int,
+        system_prompt: str | None = None,
+        temperature: float = 0.0,
+        tools: list[ToolParam] = [],
+        tool_choice: dict[str, str] | None = None,
+        thinking_tokens: int | None = None,
+    ) -> Tuple[list[AssistantContentBlock], dict[str, Any]]:
+        """Generate responses without blocking the event loop.
+
+        Clients backed by an async SDK override this. The default runs the
+        synchronous ``generate`` in a worker thread.
+
+        Args:
+            messages: A list of messages.
+            max_tokens: The maximum number of tokens to generate.
+            system_prompt: A system prompt.
+            temperature: The temperature.
+            tools: A list of tools.
+            tool_choice: A tool choice.
+
+        Returns:
+            A generated response.
+        """
+        return await asyncio.to_thread(
+            self.generate,
+            messages=messages,
+            max_tokens=max_tokens,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            tools=tools,
+            tool_choice=tool_choice,
+            thinking_tokens=thinking_tokens,
+        )
+
+    async def agenerate_stream(
+        self,
+        messages: LLMMessages,
+        max_tokens: int,
+        on_delta: StreamCallback,
+        system_prompt: str | None = None,
+        temperature: float = 0.0,
+        tools: list[ToolParam] = [],
+        tool_choice: dict[str, str] | None = None,
+        thinking_tokens: int | None = None,
+    ) -> Tuple[list[AssistantContentBlock], dict[str, Any]]:
+        """Generate responses, reporting deltas to ``on_delta`` as they arrive.
+
+        The return value is the same fully assembled turn as ``agenerate``.
+        Clients without a streaming implementation report each text block as
+        a single delta once generation has finished.
+
+        Args:
+            messages: A list of messages.
+            max_tokens: The maximum number of tokens to generate.
+            on_delta: Called with every StreamDelta, in order.
+            system_prompt: A system prompt.
+            temperature: The temperature.
+            tools: A list of tools.
+            tool_choice: A tool choice.
+
+        Returns:
+            A generated response.
+        """
+        response, metadata = await self.agenerate(
+            messages=messages,
+            max_tokens=max_tokens,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            tools=tools,
+            tool_choice=tool_choice,
+            thinking_tokens=thinking_tokens,
+        )
+        for index, block in enumerate(response):
+            if isinstance(block, TextResult):
+                on_delta(StreamDelta(type="text", delta=block.text, index=index))
+        return response, metadata
+
 
 def recursively_remove_invoke_tag(obj):
     """Recursively remove the </invoke> tag from a dictionary or list."""
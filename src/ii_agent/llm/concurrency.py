@@ -0,0 +1,55 @@
+"""Bounded concurrency for auxiliary LLM calls.
+
+Prompt enhancement, sub-agents such as the presentation tool and memory
+summarization run on the same event loop as every agent session. They go
+through `agenerate_auxiliary`, which never blocks the loop and shares one
+semaphore per loop, so a burst of them cannot exhaust the worker threads of
+synchronous clients or the provider's rate limit.
+"""
+
+import asyncio
+import time
+import weakref
+from typing import Any, Tuple
+
+from ii_agent.core.tracing import trace_span
+from ii_agent.llm.base import AssistantContentBlock, LLMClient
+from ii_agent.llm.usage import LLMCallPurpose, LLMCallTimer
+from ii_agent.utils.constants import AUXILIARY_LLM_MAX_CONCURRENCY
+
+# Semaphores are bound to the loop they are used on, so they are keyed by loop.
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def get_auxiliary_llm_semaphore() -> asyncio.Semaphore:
+    """Return the semaphore bounding auxiliary LLM calls on the running loop."""
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(AUXILIARY_LLM_MAX_CONCURRENCY)
+        _semaphores[loop] = semaphore
+    return semaphore
+
+
+async def agenerate_auxiliary(
+    client: LLMClient,
+    purpose: LLMCallPurpose = LLMCallPurpose.AUXILIARY,
+    **kwargs: Any,
+) -> Tuple[list[AssistantContentBlock], dict[str, Any]]:
+    """Call ``client.agenerate`` within the auxiliary concurrency bound.
+
+    Args:
+        client: The LLM client to call.
+        purpose: What the call is for, as recorded in the usage ledger.
+        **kwargs: Arguments for ``LLMClient.agenerate``.
+
+    Returns:
+        The generated response, as returned by ``agenerate``.
+    """
+    timer = LLMCallTimer(client.model_name, purpose, provider=client.provider)
+    with trace_span("llm.generate", model=client.model_name, purpose=timer.purpose):
+        async with get_auxiliary_llm_semaphore():
+            timer.started = time.monotonic()
+            response, metadata = await client.agenerate(**kwargs)
+        await timer.afinish(metadata)
+    return response, metadata
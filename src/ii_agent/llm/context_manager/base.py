@@ -1,6 +1,9 @@
+import asyncio
 import json
 import logging
+import weakref
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from typing import final
 from ii_agent.llm.base import (
     GeneralContentBlock,
@@ -18,6 +21,14 @@ from ii_agent.llm.base import (
 from ii_agent.utils.constants import TOKEN_BUDGET
 
 
+@dataclass
+class _PendingTruncation:
+    """A truncation running in the background on a snapshot of the history."""
+
+    snapshot: list[list[GeneralContentBlock]]
+    task: "asyncio.Task[list[list[GeneralContentBlock]]]"
+
+
 class ContextManager(ABC):
     """Abstract base class for context management strategies."""
 
@@ -26,69 +37,125 @@ class ContextManager(ABC):
         token_counter: TokenCounter,
         logger: logging.Logger,
         token_budget: int = TOKEN_BUDGET,
+        soft_token_budget: int | None = None,
     ):
+        """Initialize the context manager.
+
+        Args:
+            token_counter: Counts the tokens of message contents.
+            logger: Logger for truncation progress.
+            token_budget: Hard limit above which the history is truncated
+                before the next LLM call.
+            soft_token_budget: Once the history passes this many tokens, the
+                async path starts truncating a snapshot in the background and
+                swaps the result in at a later turn boundary. Disabled if None.
+        """
         self.token_counter = token_counter
         self.logger = logger
         self._token_budget = token_budget
+        self._soft_token_budget = soft_token_budget
+        # Background truncations by the history they truncate, as one manager
+        # may serve several histories at once
+        self._pending_truncations: weakref.WeakKeyDictionary[
+            object, _PendingTruncation
+        ] = weakref.WeakKeyDictionary()
 
     @property
     def token_budget(self) -> int:
         """Return the token budget."""
         return self._token_budget
 
+    @property
+    def soft_token_budget(self) -> int | None:
+        """Return the token count that starts a background truncation."""
+        return self._soft_token_budget
+
+    def is_truncation_pending(self, owner: object | None = None) -> bool:
+        """Whether a background truncation of the history of ``owner`` is running."""
+        return (self if owner is None else owner) in self._pending_truncations
+
+    def count_turn_tokens(
+        self, message_list: list[GeneralContentBlock]
+    ) -> tuple[int, int]:
+        """Counts the tokens of a single turn.
+
+        Returns:
+            A tuple of (content_tokens, thinking_tokens). Thinking tokens are
+            reported separately because they only count in the very last turn.
+        """
+        content_tokens = 0
+        thinking_tokens = 0
+        for message in message_list:
+            if isinstance(message, (TextPrompt, TextResult)):
+                content_tokens += self.token_counter.count_tokens(message.text)
+            elif isinstance(message, ToolFormattedResult):
+                # Count truncated output if already truncated
+                content_tokens += self.token_counter.count_tokens(message.tool_output)
+            elif isinstance(message, ToolCall):
+                # Basic counting of input JSON
+                try:
+                    input_str = json.dumps(message.tool_input)
+                    content_tokens += self.token_counter.count_tokens(input_str)
+                except TypeError:
+                    self.logger.warning(
+                        f"Could not serialize tool input for token counting: {message.tool_input}"
+                    )
+                    content_tokens += 100  # Add arbitrary penalty
+            elif isinstance(message, ImageBlock):
+                # Images are expensive - assign a reasonable token count
+                # Typical image tokens range from 85-1700+ depending on size and detail
+                # Using a conservative estimate of 1000 tokens per image
+                content_tokens += 1000
+            elif isinstance(message, RedactedThinkingBlock):
+                pass  # Always 0 tokens
+            elif isinstance(message, ThinkingBlock):
+                thinking_tokens += self.token_counter.count_tokens(message.thinking)
+            else:
+                self.logger.warning(
+                    f"Unhandled message type for token counting: {type(message)}"
+                )
+        return content_tokens, thinking_tokens
+
     def count_tokens(self, message_lists: list[list[GeneralContentBlock]]) -> int:
         """Counts tokens, ignoring thinking blocks except in the very last message."""
         total_tokens = 0
         num_turns = len(message_lists)
         for i, message_list in enumerate(message_lists):
-            is_last_turn = i == num_turns - 1
-            for message in message_list:
-                if isinstance(message, (TextPrompt, TextResult)):
-                    total_tokens += self.token_counter.count_tokens(message.text)
-                elif isinstance(message, ToolFormattedResult):
-                    # Count truncated output if already truncated
-                    total_tokens += self.token_counter.count_tokens(message.tool_output)
-                elif isinstance(message, ToolCall):
-                    # Basic counting of input JSON
-                    try:
-                        input_str = json.dumps(message.tool_input)
-                        total_tokens += self.token_counter.count_tokens(input_str)
-                    except TypeError:
-                        self.logger.warning(
-                            f"Could not serialize tool input for token counting: {message.tool_input}"
-                        )
-                        total_tokens += 100  # Add arbitrary penalty
-                elif isinstance(message, ImageBlock):
-                    # Images are expensive - assign a reasonable token count
-                    # Typical image tokens range from 85-1700+ depending on size and detail
-                    # Using a conservative estimate of 1000 tokens per image
-                    total_tokens += 1000
-                elif isinstance(message, RedactedThinkingBlock):
-                    pass  # Always 0 tokens
-                elif isinstance(message, ThinkingBlock):
-                    # Only count thinking if it's in the very last message list
-                    if is_last_turn:
-                        total_tokens += self.token_counter.count_tokens(
-                            message.thinking
-                        )
-                else:
-                    self.logger.warning(
-                        f"Unhandled message type for token counting: {type(message)}"
-                    )
+            content_tokens, thinking_tokens = self.count_turn_tokens(message_list)
+            total_tokens += content_tokens
+            # Only count thinking if it's in the very last message list
+            if i == num_turns - 1:
+                total_tokens += thinking_tokens
         return total_tokens
 
-    def should_truncate(self, message_lists: list[list[GeneralContentBlock]]) -> bool:
-        """Check if truncation is needed based on the number of message lists."""
-        return self.count_tokens(message_lists) > self._token_budget
+    def should_truncate(
+        self,
+        message_lists: list[list[GeneralContentBlock]],
+        token_count: int | None = None,
+    ) -> bool:
+        """Check if truncation is needed based on the number of message lists.
+
+        Args:
+            message_lists: The message lists to check.
+            token_count: Pre-computed token count of ``message_lists``, if the
+                caller already has one. Counted from scratch otherwise.
+        """
+        if token_count is None:
+            token_count = self.count_tokens(message_lists)
+        return token_count > self._token_budget
 
     @final
     def apply_truncation_if_needed(
-        self, message_lists: list[list[GeneralContentBlock]]
+        self,
+        message_lists: list[list[GeneralContentBlock]],
+        token_count: int | None = None,
     ) -> list[list[GeneralContentBlock]]:
-        if not self.should_truncate(message_lists):
+        if token_count is None:
+            token_count = self.count_tokens(message_lists)
+        if not self.should_truncate(message_lists, token_count):
             return message_lists
 
-        current_tokens = self.count_tokens(message_lists)
+        current_tokens = token_count
         self.logger.warning(
             f"Token count {current_tokens}."
         )
@@ -100,6 +167,126 @@ class ContextManager(ABC):
         )
         return truncated_message_lists
 
+    def should_truncate_in_background(
+        self,
+        message_lists: list[list[GeneralContentBlock]],
+        token_count: int,
+    ) -> bool:
+        """Check if a background truncation should start for ``message_lists``."""
+        return (
+            self._soft_token_budget is not None
+            and token_count > self._soft_token_budget
+        )
+
+    @final
+    async def aapply_truncation_if_needed(
+        self,
+        message_lists: list[list[GeneralContentBlock]],
+        token_count: int | None = None,
+        owner: object | None = None,
+    ) -> list[list[GeneralContentBlock]]:
+        """Async counterpart of `apply_truncation_if_needed`.
+
+        Must be called at turn boundaries. Past the soft budget, truncation
+        runs as a background task and its result is swapped in at the first
+        boundary after it completes. Only exceeding the hard budget waits for
+        a truncation, and then without blocking the event loop.
+
+        Args:
+            message_lists: The history to truncate.
+            token_count: Pre-computed token count of ``message_lists``.
+            owner: The object holding the history, e.g. its `MessageHistory`.
+                Background truncations are tracked per owner, so that
+                histories sharing a manager do not discard each other's.
+                Defaults to the manager itself, for a single history.
+        """
+        owner = self if owner is None else owner
+        if token_count is None:
+            token_count = self.count_tokens(message_lists)
+        must_truncate = self.should_truncate(message_lists, token_count)
+
+        pending = self._pending_truncations.get(owner)
+        if pending is not None and (pending.task.done() or must_truncate):
+            del self._pending_truncations[owner]
+            truncated_message_lists = await self._afinish_pending_truncation(
+                pending, message_lists
+            )
+            if truncated_message_lists is not None:
+                new_token_count = self.count_tokens(truncated_message_lists)
+                self.logger.info(
+                    f"Swapped in background truncation, saving "
+                    f"~{token_count - new_token_count} tokens. "
+                    f"New count: {new_token_count}"
+                )
+                message_lists = truncated_message_lists
+                token_count = new_token_count
+                must_truncate = self.should_truncate(message_lists, token_count)
+
+        if must_truncate:
+            current_tokens = token_count
+            self.logger.warning(
+                f"Token count {current_tokens}."
+            )
+            truncated_message_lists = await self.aapply_truncation(message_lists)
+            new_token_count = self.count_tokens(truncated_message_lists)
+            tokens_saved = current_tokens - new_token_count
+            self.logger.info(
+                f"Truncation saved ~{tokens_saved} tokens. New count: {new_token_count}"
+            )
+            return truncated_message_lists
+
+        if owner not in self._pending_truncations and (
+            self.should_truncate_in_background(message_lists, token_count)
+        ):
+            self.logger.info(
+                f"Token count {token_count} passed the soft budget, "
+                "truncating in the background"
+            )
+            snapshot = list(message_lists)
+            self._pending_truncations[owner] = _PendingTruncation(
+                snapshot=snapshot,
+                task=asyncio.create_task(self.aapply_truncation(snapshot)),
+            )
+        return message_lists
+
+    async def _afinish_pending_truncation(
+        self,
+        pending: _PendingTruncation,
+        message_lists: list[list[GeneralContentBlock]],
+    ) -> list[list[GeneralContentBlock]] | None:
+        """Apply a background truncation to the current message lists.
+
+        Turns appended since the snapshot was taken are kept after the
+        truncated snapshot. Returns None if the result is unusable, e.g.
+        because the history was rewritten in the meantime.
+        """
+        snapshot = pending.snapshot
+        if len(message_lists) < len(snapshot) or any(
+            current is not old for current, old in zip(message_lists, snapshot)
+        ):
+            pending.task.cancel()
+            return None
+        try:
+            truncated_snapshot = await pending.task
+        except asyncio.CancelledError:
+            return None
+        except Exception as e:
+            self.logger.error(f"Background truncation failed: {e}")
+            return None
+        if truncated_snapshot is snapshot:
+            return None
+        return truncated_snapshot + message_lists[len(snapshot) :]
+
+    async def aapply_truncation(
+        self, message_lists: list[list[GeneralContentBlock]]
+    ) -> list[list[GeneralContentBlock]]:
+        """Apply truncation from async code.
+
+        Strategies that call an LLM override this so the call does not block
+        the event loop. Purely local strategies can rely on the default.
+        """
+        return self.apply_truncation(message_lists)
+
     @abstractmethod
     def apply_truncation(
         self, message_lists: list[list[GeneralContentBlock]]
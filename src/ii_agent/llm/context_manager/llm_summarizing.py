@@ -1,9 +1,30 @@
 import logging
+from dataclasses import dataclass
+from ii_agent.core.metrics import SUMMARIZATION_DURATION
+from ii_agent.core.tracing import trace_span
 from ii_agent.llm.base import GeneralContentBlock, TextPrompt, TextResult, ThinkingBlock, RedactedThinkingBlock
 from ii_agent.llm.context_manager.base import ContextManager
 from ii_agent.llm.token_counter import TokenCounter
 from ii_agent.llm.base import LLMClient
-from ii_agent.utils.constants import TOKEN_BUDGET, SUMMARY_MAX_TOKENS
+from ii_agent.llm.concurrency import agenerate_auxiliary
+from ii_agent.llm.usage import LLMCallPurpose, LLMCallTimer
+from ii_agent.utils.constants import (
+    CONVERSATION_SUMMARY_PREFIX,
+    SUMMARY_MAX_TOKENS,
+    SUMMARY_SOFT_BUDGET_RATIO,
+    TOKEN_BUDGET,
+)
+
+
+@dataclass
+class _TruncationPlan:
+    """Which turns to keep verbatim and which to fold into the summary."""
+
+    head: list[list[GeneralContentBlock]]
+    forgotten_events: list[list[GeneralContentBlock]]
+    tail: list[list[GeneralContentBlock]]
+    tail_description: str
+    previous_summary: str = "No events summarized"
 
 
 class LLMSummarizingContextManager(ContextManager):
@@ -12,6 +33,11 @@ class LLMSummarizingContextManager(ContextManager):
     Maintains a condensed history and forgets old events when it grows too large,
     keeping a special summarization event after the prefix that summarizes all previous
     summarizations and newly forgotten events.
+
+    When used through `aapply_truncation_if_needed`, summarization starts in the
+    background once the history passes ``soft_token_budget`` (by default
+    ``SUMMARY_SOFT_BUDGET_RATIO`` of the token budget), so the summary is usually
+    ready before the hard budget is reached.
     """
 
     def __init__(
@@ -22,11 +48,14 @@ class LLMSummarizingContextManager(ContextManager):
         token_budget: int = TOKEN_BUDGET,
         max_size: int = 100,
         max_event_length: int = 10_000,
+        soft_token_budget: int | None = None,
     ):
         if max_size < 1:
             raise ValueError(f"max_size ({max_size}) cannot be non-positive")
 
-        super().__init__(token_counter, logger, token_budget)
+        if soft_token_budget is None:
+            soft_token_budget = int(token_budget * SUMMARY_SOFT_BUDGET_RATIO)
+        super().__init__(token_counter, logger, token_budget, soft_token_budget)
         self.client = client
         self.max_size = max_size
         self.keep_first = 1
@@ -54,10 +83,14 @@ class LLMSummarizingContextManager(ContextManager):
                 parts.append(f"{type(message).__name__}: {str(message)}")
         return "\n".join(parts)
 
-    def should_truncate(self, message_lists: list[list[GeneralContentBlock]]) -> bool:
+    def should_truncate(
+        self,
+        message_lists: list[list[GeneralContentBlock]],
+        token_count: int | None = None,
+    ) -> bool:
         """Check if condensation is needed based on the number of message lists."""
         return len(message_lists) > self.max_size or super().should_truncate(
-            message_lists
+            message_lists, token_count
         )
 
     def _has_thinking_blocks(self, message_lists: list[list[GeneralContentBlock]]) -> bool:
@@ -80,24 +113,76 @@ class LLMSummarizingContextManager(ContextManager):
         self, message_lists: list[list[GeneralContentBlock]]
     ) -> list[list[GeneralContentBlock]]:
         """Apply truncation with LLM summarization when needed."""
+        plan = self._plan_truncation(message_lists)
+        if plan is None:
+            return message_lists
+        with trace_span(
+            "context.summarize", forgotten_turns=len(plan.forgotten_events)
+        ), SUMMARIZATION_DURATION.time():
+            summary = self._generate_summary(
+                plan.forgotten_events, plan.previous_summary
+            )
+        return self._condense(message_lists, plan, summary)
+
+    async def aapply_truncation(
+        self, message_lists: list[list[GeneralContentBlock]]
+    ) -> list[list[GeneralContentBlock]]:
+        """Apply truncation, generating the summary with the async LLM client."""
+        plan = self._plan_truncation(message_lists)
+        if plan is None:
+            return message_lists
+        with trace_span(
+            "context.summarize", forgotten_turns=len(plan.forgotten_events)
+        ), SUMMARIZATION_DURATION.time():
+            summary = await self._agenerate_summary(
+                plan.forgotten_events, plan.previous_summary
+            )
+        return self._condense(message_lists, plan, summary)
+
+    def _plan_truncation(
+        self, message_lists: list[list[GeneralContentBlock]]
+    ) -> _TruncationPlan | None:
+        """Decide which events to summarize, or None if nothing should change."""
         # Check if we have thinking blocks and route to appropriate method
         has_thinking_blocks = self._has_thinking_blocks(message_lists)
-        
+
         if has_thinking_blocks:
-            return self._apply_truncation_with_thinking_blocks(message_lists)
+            return self._plan_truncation_with_thinking_blocks(message_lists)
         else:
-            return self._apply_truncation_without_thinking_blocks(message_lists)
+            return self._plan_truncation_without_thinking_blocks(message_lists)
 
-    def _apply_truncation_with_thinking_blocks(
-        self, message_lists: list[list[GeneralContentBlock]]
+    def _condense(
+        self,
+        message_lists: list[list[GeneralContentBlock]],
+        plan: _TruncationPlan,
+        summary: str,
     ) -> list[list[GeneralContentBlock]]:
-        """Apply truncation when thinking blocks are present - only truncate before last TextPrompt."""
+        """Build the condensed message lists as head + summary + tail."""
+        condensed_messages = []
+        condensed_messages.extend(plan.head)
+        summary_message = [
+            TextResult(text=f"{CONVERSATION_SUMMARY_PREFIX} {summary}")
+        ]
+        condensed_messages.append(summary_message)
+        condensed_messages.extend(plan.tail)
+
+        self.logger.info(
+            f"Condensed {len(message_lists)} message lists to {len(condensed_messages)} "
+            f"(kept {len(plan.head)} head + 1 summary + {plan.tail_description})"
+        )
+
+        return condensed_messages
+
+    def _plan_truncation_with_thinking_blocks(
+        self, message_lists: list[list[GeneralContentBlock]]
+    ) -> _TruncationPlan | None:
+        """Plan truncation when thinking blocks are present - only truncate before last TextPrompt."""
         # New logic: only truncate before the last user message (TextPrompt)
         last_prompt_index = self._find_last_text_prompt_index(message_lists)
         
         # If we only have one or no TextPrompt, don't truncate
         if last_prompt_index <= 0:
-            return message_lists
+            return None
             
         # target size is half of the max size but we must keep from last text prompt onwards
         target_size = min(self.max_size, len(message_lists)) // 2
@@ -110,29 +195,19 @@ class LLMSummarizingContextManager(ContextManager):
             self.logger.info(
                 "No events to summarize, returning original message lists"
             )
-            return message_lists
-            
-        # Generate summary for events before the last TextPrompt
-        summary = self._generate_summary(events_to_summarize)
-        
-        # Create condensed message list with summary + events from last TextPrompt
-        condensed_messages = []
-        condensed_messages.extend(message_lists[:self.keep_first])
-        summary_message = [TextResult(text=f"Conversation Summary: {summary}")]
-        condensed_messages.append(summary_message)
-        condensed_messages.extend(events_to_keep)
-        
-        self.logger.info(
-            f"Condensed {len(message_lists)} message lists to {len(condensed_messages)} "
-            f"(kept {self.keep_first} head + 1 summary + {len(events_to_keep)} from last TextPrompt onwards)"
+            return None
+
+        return _TruncationPlan(
+            head=message_lists[: self.keep_first],
+            forgotten_events=events_to_summarize,
+            tail=events_to_keep,
+            tail_description=f"{len(events_to_keep)} from last TextPrompt onwards",
         )
-        
-        return condensed_messages
 
-    def _apply_truncation_without_thinking_blocks(
+    def _plan_truncation_without_thinking_blocks(
         self, message_lists: list[list[GeneralContentBlock]]
-    ) -> list[list[GeneralContentBlock]]:
-        """Apply truncation when no thinking blocks are present - use original logic."""
+    ) -> _TruncationPlan | None:
+        """Plan truncation when no thinking blocks are present - use original logic."""
         head = message_lists[: self.keep_first]
         target_size = min(self.max_size, len(message_lists)) // 2
         events_from_tail = target_size - len(head) - 1
@@ -146,7 +221,7 @@ class LLMSummarizingContextManager(ContextManager):
             and message_lists[self.keep_first]
             and isinstance(message_lists[self.keep_first][0], TextPrompt)
             and message_lists[self.keep_first][0].text.startswith(
-                "Conversation Summary:"
+                CONVERSATION_SUMMARY_PREFIX
             )
         ):  # TODO: this is a hack to get the summary from the previous summary
             summary_content = message_lists[self.keep_first][0].text
@@ -160,35 +235,76 @@ class LLMSummarizingContextManager(ContextManager):
         )
 
         if not forgotten_events:
-            return message_lists
-
-        # Generate summary using existing logic
-        summary = self._generate_summary(forgotten_events, summary_content)
-
-        # Create new condensed message list
-        condensed_messages = []
+            return None
+
+        return _TruncationPlan(
+            head=head,
+            forgotten_events=forgotten_events,
+            tail=message_lists[-events_from_tail:] if events_from_tail > 0 else [],
+            tail_description=f"{events_from_tail} tail",
+            previous_summary=summary_content,
+        )
 
-        # Add head messages
-        condensed_messages.extend(head)
+    def _generate_summary(self, forgotten_events: list[list[GeneralContentBlock]], previous_summary_content: str = "No events summarized") -> str:
+        """Generate a summary for the given forgotten events."""
+        prompt = self._build_summary_prompt(forgotten_events, previous_summary_content)
+        timer = LLMCallTimer(
+            self.client.model_name,
+            LLMCallPurpose.SUMMARY,
+            provider=self.client.provider,
+        )
+        try:
+            with trace_span(
+                "llm.generate", model=self.client.model_name, purpose=timer.purpose
+            ):
+                model_response, metadata = self.client.generate(
+                    messages=[[TextPrompt(text=prompt)]],
+                    max_tokens=SUMMARY_MAX_TOKENS,
+                    thinking_tokens=0,
+                )
+                timer.finish(metadata)
+        except Exception as e:
+            return self._summary_failure(forgotten_events, e)
+        return self._summary_from_response(forgotten_events, model_response)
 
-        # Add summary as a new message
-        summary_message = [TextResult(text=f"Conversation Summary: {summary}")]
-        condensed_messages.append(summary_message)
+    async def _agenerate_summary(self, forgotten_events: list[list[GeneralContentBlock]], previous_summary_content: str = "No events summarized") -> str:
+        """Async counterpart of `_generate_summary`."""
+        prompt = self._build_summary_prompt(forgotten_events, previous_summary_content)
+        try:
+            model_response, _ = await agenerate_auxiliary(
+                self.client,
+                purpose=LLMCallPurpose.SUMMARY,
+                messages=[[TextPrompt(text=prompt)]],
+                max_tokens=SUMMARY_MAX_TOKENS,
+                thinking_tokens=0,
+            )
+        except Exception as e:
+            return self._summary_failure(forgotten_events, e)
+        return self._summary_from_response(forgotten_events, model_response)
 
-        # Add tail messages
-        if events_from_tail > 0:
-            condensed_messages.extend(message_lists[-events_from_tail:])
+    def _summary_from_response(
+        self,
+        forgotten_events: list[list[GeneralContentBlock]],
+        model_response: list,
+    ) -> str:
+        summary = ""
+        for message in model_response:
+            if isinstance(message, TextResult):
+                summary += message.text
 
         self.logger.info(
-            f"Condensed {len(message_lists)} message lists to {len(condensed_messages)} "
-            f"(kept {len(head)} head + 1 summary + {events_from_tail} tail)"
+            f"Generated summary for {len(forgotten_events)} forgotten events"
         )
+        return summary
 
-        return condensed_messages
+    def _summary_failure(
+        self, forgotten_events: list[list[GeneralContentBlock]], error: Exception
+    ) -> str:
+        self.logger.error(f"Failed to generate summary: {error}")
+        return f"Failed to summarize {len(forgotten_events)} events due to error: {str(error)}"
 
-    def _generate_summary(self, forgotten_events: list[list[GeneralContentBlock]], previous_summary_content: str = "No events summarized") -> str:
-        """Generate a summary for the given forgotten events."""
-        # Construct prompt for summarization
+    def _build_summary_prompt(self, forgotten_events: list[list[GeneralContentBlock]], previous_summary_content: str = "No events summarized") -> str:
+        """Build the summarization prompt for the given forgotten events."""
         prompt = """You are maintaining a context-aware state summary for an interactive agent. You will be given a list of events corresponding to actions taken by the agent, and the most recent previous summary if one exists. Track:
 
 USER_CONTEXT: (Preserve essential user requirements, goals, and clarifications in concise form)
@@ -234,7 +350,7 @@ CURRENT_STATE: Last flip: Heads, Haiku count: 15/20
 
         # Add the previous summary if it exists
         previous_summary = (
-            previous_summary_content.replace("Conversation Summary: ", "")
+            previous_summary_content.replace(f"{CONVERSATION_SUMMARY_PREFIX} ", "")
             if previous_summary_content != "No events summarized"
             else ""
         )
@@ -248,26 +364,4 @@ CURRENT_STATE: Last flip: Heads, Haiku count: 15/20
             prompt += f"<EVENT id={i}>\n{event_content}\n</EVENT>\n"
 
         prompt += "\nNow summarize the events using the rules above."
-        
-        # Generate summary using LLM
-        try:
-            summary_messages = [[TextPrompt(text=prompt)]]
-            model_response, _ = self.client.generate(
-                messages=summary_messages,
-                max_tokens=SUMMARY_MAX_TOKENS,
-                thinking_tokens=0,
-            )
-            summary = ""
-            for message in model_response:
-                if isinstance(message, TextResult):
-                    summary += message.text
-
-            self.logger.info(
-                f"Generated summary for {len(forgotten_events)} forgotten events"
-            )
-
-        except Exception as e:
-            self.logger.error(f"Failed to generate summary: {e}")
-            summary = f"Failed to summarize {len(forgotten_events)} events due to error: {str(e)}"
-
-        return summary
+        return prompt
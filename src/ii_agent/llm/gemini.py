@@ -1,3 +1,4 @@
+import asyncio
 import os
 import time
 import random
@@ -16,6 +17,7 @@ from ii_agent.llm.base import (
     ToolFormattedResult,
     ImageBlock,
 )
+from ii_agent.llm.utils import resolve_blob_references
 
 def generate_tool_call_id() -> str:
     """Generate a unique ID for a tool call.
@@ -31,6 +33,8 @@ def generate_tool_call_id() -> str:
 class GeminiDirectClient(LLMClient):
     """Use Gemini models via first party API."""
 
+    provider = "gemini"
+
     def __init__(self, model_name: str, max_retries: int = 2, project_id: None | str = None, region: None | str = None):
         self.model_name = model_name
 
@@ -54,8 +58,84 @@ class GeminiDirectClient(LLMClient):
         temperature: float = 0.0,
         tools: list[ToolParam] = [],
         tool_choice: dict[str, str] | None = None,
+        thinking_tokens: int | None = None,
     ) -> Tuple[list[AssistantContentBlock], dict[str, Any]]:
-        
+        request_kwargs = self._build_request_kwargs(
+            messages, max_tokens, system_prompt, temperature, tools, tool_choice
+        )
+
+        for retry in range(self.max_retries):
+            try:
+                response = self.client.models.generate_content(**request_kwargs)
+                break
+            except errors.APIError as e:
+                # 503: The service may be temporarily overloaded or down.
+                # 429: The request was throttled.
+                if e.code in [503, 429]:
+                    if retry == self.max_retries - 1:
+                        print(f"Failed Gemini request after {retry + 1} retries")
+                        raise e
+                    else:
+                        print(f"Error: {e}")
+                        print(f"Retrying Gemini request: {retry + 1}/{self.max_retries}")
+                        self._record_retry(retry + 1, e, rate_limited=e.code == 429)
+                        # Sleep 12-18 seconds with jitter to avoid thundering herd.
+                        time.sleep(15 * random.uniform(0.8, 1.2))
+                else:
+                    raise e
+
+        return self._parse_response(response)
+
+    async def agenerate(
+        self,
+        messages: LLMMessages,
+        max_tokens: int,
+        system_prompt: str | None = None,
+        temperature: float = 0.0,
+        tools: list[ToolParam] = [],
+        tool_choice: dict[str, str] | None = None,
+        thinking_tokens: int | None = None,
+    ) -> Tuple[list[AssistantContentBlock], dict[str, Any]]:
+        # The genai client owns its own async transport (`client.aio`), which
+        # is reused across calls for the lifetime of this client.
+        request_kwargs = self._build_request_kwargs(
+            messages, max_tokens, system_prompt, temperature, tools, tool_choice
+        )
+
+        for retry in range(self.max_retries):
+            try:
+                response = await self.client.aio.models.generate_content(
+                    **request_kwargs
+                )
+                break
+            except errors.APIError as e:
+                # 503: The service may be temporarily overloaded or down.
+                # 429: The request was throttled.
+                if e.code in [503, 429]:
+                    if retry == self.max_retries - 1:
+                        print(f"Failed Gemini request after {retry + 1} retries")
+                        raise e
+                    else:
+                        print(f"Error: {e}")
+                        print(f"Retrying Gemini request: {retry + 1}/{self.max_retries}")
+                        self._record_retry(retry + 1, e, rate_limited=e.code == 429)
+                        # Sleep 12-18 seconds with jitter to avoid thundering herd.
+                        await asyncio.sleep(15 * random.uniform(0.8, 1.2))
+                else:
+                    raise e
+
+        return self._parse_response(response)
+
+    def _build_request_kwargs(
+        self,
+        messages: LLMMessages,
+        max_tokens: int,
+        system_prompt: str | None,
+        temperature: float,
+        tools: list[ToolParam],
+        tool_choice: dict[str, str] | None,
+    ) -> dict[str, Any]:
+        messages = resolve_blob_references(messages)
         gemini_messages = []
         for idx, message_list in enumerate(messages):
             role = "user" if idx % 2 == 0 else "model"
@@ -122,35 +202,21 @@ class GeminiDirectClient(LLMClient):
         else:
             raise ValueError(f"Unknown tool_choice type for Gemini: {tool_choice['type']}")
 
-        for retry in range(self.max_retries):
-            try:
-                response = self.client.models.generate_content(
-                    model=self.model_name,
-                    config=types.GenerateContentConfig(
-                        tools=tool_params,
-                        system_instruction=system_prompt,
-                        temperature=temperature,
-                        max_output_tokens=max_tokens,
-                        tool_config={'function_calling_config': {'mode': mode}}
-                        ),
-                    contents=gemini_messages,
-                )
-                break
-            except errors.APIError as e:
-                # 503: The service may be temporarily overloaded or down.
-                # 429: The request was throttled.
-                if e.code in [503, 429]:
-                    if retry == self.max_retries - 1:
-                        print(f"Failed Gemini request after {retry + 1} retries")
-                        raise e
-                    else:
-                        print(f"Error: {e}")
-                        print(f"Retrying Gemini request: {retry + 1}/{self.max_retries}")
-                        # Sleep 12-18 seconds with jitter to avoid thundering herd.
-                        time.sleep(15 * random.uniform(0.8, 1.2))
-                else:
-                    raise e
+        return dict(
+            model=self.model_name,
+            config=types.GenerateContentConfig(
+                tools=tool_params,
+                system_instruction=system_prompt,
+                temperature=temperature,
+                max_output_tokens=max_tokens,
+                tool_config={'function_calling_config': {'mode': mode}}
+                ),
+            contents=gemini_messages,
+        )
 
+    def _parse_response(
+        self, response: Any
+    ) -> Tuple[list[AssistantContentBlock], dict[str, Any]]:
         internal_messages = []
         if response.text:
             internal_messages.append(TextResult(text=response.text))
@@ -0,0 +1,84 @@
+"""Process-wide pooled HTTP transport for the async LLM SDK clients.
+
+The Anthropic and OpenAI async SDK clients accept an ``httpx.AsyncClient``.
+Sharing one per event loop lets every agent session in the process reuse
+keep-alive connections instead of opening a new pool per client instance.
+"""
+
+import asyncio
+import logging
+import weakref
+from typing import Callable, Generic, TypeVar
+
+import httpx
+
+from ii_agent.utils.constants import (
+    LLM_HTTP_KEEPALIVE_EXPIRY,
+    LLM_HTTP_MAX_CONNECTIONS,
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Connections are bound to the loop they were opened on, so the pool is keyed
+# by event loop. In the server there is exactly one loop and thus one pool.
+_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Return the shared pooled HTTP client for the running event loop.
+
+    Returns:
+        The ``httpx.AsyncClient`` shared by all LLM clients on this loop.
+    """
+    loop = asyncio.get_running_loop()
+    http_client = _http_clients.get(loop)
+    if http_client is None or http_client.is_closed:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=LLM_HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(60 * 5, connect=10.0),
+            follow_redirects=True,
+        )
+        _http_clients[loop] = http_client
+    return http_client
+
+
+async def aclose_async_http_client() -> None:
+    """Close the shared HTTP client of the running event loop, if any."""
+    loop = asyncio.get_running_loop()
+    http_client = _http_clients.pop(loop, None)
+    if http_client is not None and not http_client.is_closed:
+        await http_client.aclose()
+        logger.info("Closed shared LLM HTTP client")
+
+
+class PooledAsyncClient(Generic[T]):
+    """Lazily builds an async SDK client on top of the shared HTTP pool.
+
+    The SDK client is rebuilt only when the underlying pool changes, i.e. on
+    first use from a new event loop or after the pool has been closed.
+    """
+
+    def __init__(self, factory: Callable[[httpx.AsyncClient], T]):
+        """Initialize the pooled client.
+
+        Args:
+            factory: Builds the SDK client given the shared ``httpx.AsyncClient``.
+        """
+        self._factory = factory
+        self._client: T | None = None
+        self._http_client: httpx.AsyncClient | None = None
+
+    def get(self) -> T:
+        """Return the SDK client bound to the current loop's shared pool."""
+        http_client = get_async_http_client()
+        if self._client is None or self._http_client is not http_client:
+            self._client = self._factory(http_client)
+            self._http_client = http_client
+        return self._client
@@ -0,0 +1,125 @@
+"""Replacement of old screenshots in the message history by text placeholders.
+
+Browser tools return a screenshot with every result. Only the most recent
+ones are useful to the model, so `ImageEvictionPolicy` keeps the last
+``max_images`` images of tool results and replaces older ones with a short
+description of the page they showed.
+
+The replaced turns are part of the prompt prefix that Anthropic caches, so
+evicting one image per turn would invalidate the cache from that image on at
+every turn. Images are instead left to accumulate ``batch_size`` past the
+limit and then evicted together, oldest first, which keeps the prefix
+unchanged in between and never changes a turn that was already evicted.
+"""
+
+from dataclasses import replace
+from typing import Any
+
+from ii_agent.llm.base import GeneralContentBlock, LLMMessages, ToolFormattedResult
+from ii_agent.utils.constants import (
+    IMAGE_EVICTION_BATCH_SIZE,
+    MAX_HISTORY_IMAGES,
+    MAX_HISTORY_IMAGES_BY_MODEL,
+)
+
+
+def max_history_images(model_name: str) -> int:
+    """Return the number of full screenshots kept for a model."""
+    model_name = model_name.lower()
+    for pattern, max_images in MAX_HISTORY_IMAGES_BY_MODEL.items():
+        if pattern in model_name:
+            return max_images
+    return MAX_HISTORY_IMAGES
+
+
+def image_placeholder(source: dict[str, Any]) -> str:
+    """Text that stands in for an evicted image."""
+    description = source.get("description") or source.get("media_type", "image")
+    return f"[Earlier screenshot removed from the context: {description}]"
+
+
+def _is_image(item: Any) -> bool:
+    return (
+        isinstance(item, dict)
+        and item.get("type") == "image"
+        and isinstance(item.get("source"), dict)
+    )
+
+
+def _count_images(block: GeneralContentBlock) -> int:
+    if not isinstance(block, ToolFormattedResult) or not isinstance(
+        block.tool_output, list
+    ):
+        return 0
+    return sum(_is_image(item) for item in block.tool_output)
+
+
+class ImageEvictionPolicy:
+    """Keeps the most recent images of tool results in the history."""
+
+    def __init__(
+        self,
+        max_images: int = MAX_HISTORY_IMAGES,
+        batch_size: int = IMAGE_EVICTION_BATCH_SIZE,
+    ):
+        """
+        Args:
+            max_images: Most recent images always kept at full fidelity.
+            batch_size: Images evicted at once, at least one. Once
+                ``max_images + batch_size`` images have accumulated, the
+                oldest are evicted until ``max_images`` are left.
+        """
+        self.max_images = max_images
+        self.batch_size = max(batch_size, 1)
+        self.evicted = 0
+
+    @classmethod
+    def for_model(cls, model_name: str) -> "ImageEvictionPolicy":
+        return cls(max_images=max_history_images(model_name))
+
+    def apply(self, message_lists: LLMMessages) -> tuple[LLMMessages, int]:
+        """Evict old images if there are too many.
+
+        Turns with evicted images are replaced by new turns, the others are
+        kept as they are, so caches keyed on turn identity stay valid.
+
+        Returns:
+            The message lists and the index of the first replaced turn, which
+            is ``len(message_lists)`` if nothing was evicted.
+        """
+        total = sum(
+            _count_images(block) for turn in message_lists for block in turn
+        )
+        if total < self.max_images + self.batch_size:
+            return message_lists, len(message_lists)
+        to_evict = total - self.max_images
+
+        first_replaced = len(message_lists)
+        evicted_lists = list(message_lists)
+        for idx, turn in enumerate(message_lists):
+            if to_evict == 0:
+                break
+            if not any(_count_images(block) for block in turn):
+                continue
+            new_turn = []
+            for block in turn:
+                if to_evict and _count_images(block):
+                    block, count = self._evict_block(block, to_evict)
+                    to_evict -= count
+                new_turn.append(block)
+            evicted_lists[idx] = new_turn
+            first_replaced = min(first_replaced, idx)
+        return evicted_lists, first_replaced
+
+    def _evict_block(
+        self, block: ToolFormattedResult, limit: int
+    ) -> tuple[ToolFormattedResult, int]:
+        count = 0
+        tool_output = []
+        for item in block.tool_output:
+            if count < limit and _is_image(item):
+                item = {"type": "text", "text": image_placeholder(item["source"])}
+                count += 1
+            tool_output.append(item)
+        self.evicted += count
+        return replace(block, tool_output=tool_output), count
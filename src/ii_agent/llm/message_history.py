@@ -4,6 +4,7 @@ import json
 from typing import Optional, cast, Any
 
 from pydantic import TypeAdapter
+from ii_agent.core.storage.blobs import BlobStore, get_blob_store
 from ii_agent.core.storage.files import FileStore
 from ii_agent.core.storage.locations import get_conversation_agent_history_filename
 from ii_agent.llm.base import (
@@ -18,17 +19,32 @@ from ii_agent.llm.base import (
     ImageBlock,
 )
 from ii_agent.llm.context_manager.base import ContextManager
+from ii_agent.llm.image_eviction import ImageEvictionPolicy
 
 
 class MessageHistory:
     """Stores the sequence of messages in a dialog."""
 
-    def __init__(self, context_manager: ContextManager):
+    def __init__(
+        self,
+        context_manager: ContextManager,
+        blob_store: BlobStore | None = None,
+        image_policy: ImageEvictionPolicy | None = None,
+    ):
         self._context_manager = context_manager
+        # Images are kept as blob references; LLM clients inline them per request
+        self.blob_store = blob_store or get_blob_store()
+        # Replaces old screenshots with placeholders before truncation, if set
+        self.image_policy = image_policy
         self._message_lists: list[list[GeneralContentBlock]] = []
         self._last_user_prompt_index: int | None = (
             None  # Track the last user prompt index
         )
+        # Per-turn token cache, aligned with a prefix of _message_lists.
+        # Each entry is (cumulative content tokens up to and including the
+        # turn, thinking tokens of the turn).
+        self._turn_token_counts: list[tuple[int, int]] = []
+        self._token_recounts = 0
 
     @classmethod
     def _ensure_tool_call_integrity(
@@ -91,7 +107,11 @@ class MessageHistory:
                         has_non_tool_call_content = True
 
                 if has_non_tool_call_content or has_valid_tool_call:
-                    cleaned_turns.append(new_turn_blocks)
+                    # Keep the original turn object when nothing was dropped so
+                    # that per-turn caches keyed on it stay valid.
+                    cleaned_turns.append(
+                        turn if len(new_turn_blocks) == len(turn) else new_turn_blocks
+                    )
 
             elif contains_tool_results:
                 for block in turn:
@@ -99,7 +119,9 @@ class MessageHistory:
                         if block.tool_call_id in valid_tool_interaction_ids:
                             new_turn_blocks.append(block)
                 if new_turn_blocks:
-                    cleaned_turns.append(new_turn_blocks)
+                    cleaned_turns.append(
+                        turn if len(new_turn_blocks) == len(turn) else new_turn_blocks
+                    )
 
             else:  # User prompt, system message, or assistant reply without any tool calls
                 cleaned_turns.append(turn)
@@ -119,6 +141,7 @@ class MessageHistory:
             message_lists = message_lists_type_adapter.validate_python(message_lists)
 
             self._message_lists = message_lists
+            self._invalidate_token_cache()
         except FileNotFoundError:
             raise FileNotFoundError(
                 f"Could not restore history from file for session id: {session_id}"
@@ -136,7 +159,8 @@ class MessageHistory:
         user_turn = []
         if image_blocks is not None:
             for img_block in image_blocks:
-                user_turn.append(ImageBlock(type="image", source=img_block["source"]))
+                source = self.blob_store.externalize_image_source(img_block["source"])
+                user_turn.append(ImageBlock(type="image", source=source))
 
         user_turn.append(TextPrompt(prompt))
         self.add_user_turn(user_turn)
@@ -151,8 +175,19 @@ class MessageHistory:
                 raise TypeError(f"Invalid message type for user turn: {type(msg)}")
         self._message_lists.append(messages)
 
-    def add_assistant_turn(self, messages: list[AssistantContentBlock]):
-        """Adds an assistant turn (text response and/or tool calls)."""
+    def add_assistant_turn(
+        self,
+        messages: list[AssistantContentBlock],
+        parallel_tool_calls: bool = False,
+    ):
+        """Adds an assistant turn (text response and/or tool calls).
+
+        Unless `parallel_tool_calls` is set, only the first tool call of the
+        turn is kept.
+        """
+        if parallel_tool_calls:
+            self._message_lists.append(cast(list[GeneralContentBlock], list(messages)))
+            return
         messages_with_one_tool_call = []
         has_tool_call = False
         for message in messages:
@@ -202,7 +237,7 @@ class MessageHistory:
                 ToolFormattedResult(
                     tool_call_id=params.tool_call_id,
                     tool_name=params.tool_name,
-                    tool_output=result,
+                    tool_output=self.blob_store.externalize_tool_output(result),
                 )
                 for params, result in zip(parameters, results)
             ]
@@ -223,6 +258,7 @@ class MessageHistory:
         """Removes all messages."""
         self._message_lists = []
         self._last_user_prompt_index = None
+        self._invalidate_token_cache()
 
     def clear_from_last_to_user_message(self):
         """Clears messages from the last turn backwards to the last user prompt (inclusive).
@@ -233,6 +269,7 @@ class MessageHistory:
 
         # Keep messages up to and excluding the last user prompt
         self._message_lists = self._message_lists[: self._last_user_prompt_index]
+        self._invalidate_token_cache(keep=self._last_user_prompt_index)
         # Reset the last user prompt index since we've cleared after it
         self._last_user_prompt_index = None
 
@@ -276,16 +313,93 @@ class MessageHistory:
 
     def set_message_list(self, message_list: list[list[GeneralContentBlock]]):
         """Sets the message list and ensures tool call integrity."""
-        self._message_lists = MessageHistory._ensure_tool_call_integrity(message_list)
+        cleaned_message_list = MessageHistory._ensure_tool_call_integrity(message_list)
+
+        # Cached token counts stay valid for the common prefix of unchanged turns
+        unchanged_prefix = 0
+        for old_turn, new_turn in zip(self._message_lists, cleaned_message_list):
+            if old_turn is not new_turn:
+                break
+            unchanged_prefix += 1
+
+        self._message_lists = cleaned_message_list
+        self._invalidate_token_cache(keep=unchanged_prefix)
+
+    @property
+    def token_recounts(self) -> int:
+        """Number of turns whose tokens have been counted since creation."""
+        return self._token_recounts
+
+    def _invalidate_token_cache(self, keep: int = 0) -> None:
+        """Drops cached token counts for every turn from index ``keep`` onwards."""
+        del self._turn_token_counts[keep:]
+
+    def _update_token_cache(self) -> None:
+        """Counts tokens for turns that are not cached yet."""
+        # Turns are only ever appended between invalidations, so the cache
+        # covers a prefix of the message list.
+        if len(self._turn_token_counts) > len(self._message_lists):
+            self._invalidate_token_cache(keep=len(self._message_lists))
+
+        for turn in self._message_lists[len(self._turn_token_counts) :]:
+            content_tokens, thinking_tokens = self._context_manager.count_turn_tokens(
+                turn
+            )
+            previous_total = (
+                self._turn_token_counts[-1][0] if self._turn_token_counts else 0
+            )
+            self._turn_token_counts.append(
+                (previous_total + content_tokens, thinking_tokens)
+            )
+            self._token_recounts += 1
 
     def count_tokens(self):
-        """Counts the tokens in the message list."""
-        return self._context_manager.count_tokens(self.get_messages_for_llm())
+        """Counts the tokens in the message list.
+
+        Only turns added since the last call (or invalidated by truncation) are
+        counted; the rest come from the per-turn cache.
+        """
+        self._update_token_cache()
+        if not self._turn_token_counts:
+            return 0
+        # Thinking blocks only count in the very last turn
+        total_tokens, last_turn_thinking_tokens = self._turn_token_counts[-1]
+        return total_tokens + last_turn_thinking_tokens
+
+    def evict_images(self) -> None:
+        """Replace old screenshots with placeholders, per the image policy."""
+        if self.image_policy is None:
+            return
+        context_manager = self._context_manager
+        if context_manager is not None and context_manager.is_truncation_pending(
+            self
+        ):
+            # Rewriting the history would discard the background truncation
+            # of its snapshot, which drops old turns anyway
+            return
+        message_lists, first_replaced = self.image_policy.apply(self._message_lists)
+        if first_replaced < len(message_lists):
+            self._message_lists = message_lists
+            self._invalidate_token_cache(keep=first_replaced)
 
     def truncate(self) -> None:
         """Remove oldest messages when context window limit is exceeded."""
+        self.evict_images()
         truncated_messages_for_llm = self._context_manager.apply_truncation_if_needed(
-            self.get_messages_for_llm()
+            self.get_messages_for_llm(), token_count=self.count_tokens()
+        )
+
+        self.set_message_list(truncated_messages_for_llm)
+
+    async def atruncate(self) -> None:
+        """Like `truncate`, but summarizes without blocking the event loop."""
+        self.evict_images()
+        truncated_messages_for_llm = (
+            await self._context_manager.aapply_truncation_if_needed(
+                self.get_messages_for_llm(),
+                token_count=self.count_tokens(),
+                owner=self,
+            )
         )
 
         self.set_message_list(truncated_messages_for_llm)
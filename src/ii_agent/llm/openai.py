@@ -1,5 +1,6 @@
 """LLM client for Anthropic models."""
 
+import asyncio
 import json
 import os
 import random
@@ -22,17 +23,114 @@ from openai import (
 from openai._types import (
     NOT_GIVEN as OpenAI_NOT_GIVEN,  # pyright: ignore[reportPrivateImportUsage]
 )
+from openai.types import CompletionUsage
+from openai.types.chat import (
+    ChatCompletion,
+    ChatCompletionMessage,
+    ChatCompletionMessageToolCall,
+)
+from openai.types.chat.chat_completion import Choice
 
 from ii_agent.llm.base import (
     LLMClient,
     AssistantContentBlock,
     LLMMessages,
+    StreamCallback,
+    StreamDelta,
     ToolParam,
     TextPrompt,
     ToolCall,
     TextResult,
     ToolFormattedResult,
 )
+from ii_agent.llm.http_client import PooledAsyncClient
+from ii_agent.llm.utils import resolve_blob_references
+
+class _ChatCompletionStreamAccumulator:
+    """Folds streamed chat completion chunks back into a ChatCompletion."""
+
+    def __init__(self):
+        self.id = ""
+        self.model = ""
+        self.created = 0
+        self.content_parts: list[str] = []
+        self.tool_calls: dict[int, dict[str, Any]] = {}
+        self.finish_reason = None
+        self.usage = None
+
+    def add_chunk(self, chunk: Any) -> list[StreamDelta]:
+        """Record a chunk and return the deltas it carries."""
+        self.id = chunk.id or self.id
+        self.model = chunk.model or self.model
+        self.created = chunk.created or self.created
+        if chunk.usage is not None:
+            self.usage = chunk.usage
+
+        deltas = []
+        for choice in chunk.choices:
+            if choice.finish_reason is not None:
+                self.finish_reason = choice.finish_reason
+            delta = choice.delta
+            # OpenRouter forwards reasoning tokens as a non-standard field.
+            reasoning = getattr(delta, "reasoning", None)
+            if reasoning:
+                deltas.append(StreamDelta(type="thinking", delta=reasoning))
+            if delta.content:
+                self.content_parts.append(delta.content)
+                deltas.append(StreamDelta(type="text", delta=delta.content))
+            for tool_call_delta in delta.tool_calls or []:
+                tool_call = self.tool_calls.setdefault(
+                    tool_call_delta.index, {"id": None, "name": None, "arguments": ""}
+                )
+                if tool_call_delta.id:
+                    tool_call["id"] = tool_call_delta.id
+                function = tool_call_delta.function
+                if function is not None and function.name:
+                    tool_call["name"] = function.name
+                if function is not None and function.arguments:
+                    tool_call["arguments"] += function.arguments
+                    deltas.append(
+                        StreamDelta(
+                            type="tool_input",
+                            delta=function.arguments,
+                            index=tool_call_delta.index,
+                            tool_call_id=tool_call["id"],
+                            tool_name=tool_call["name"],
+                        )
+                    )
+        return deltas
+
+    def to_completion(self) -> ChatCompletion:
+        """Build the ChatCompletion the non-streaming API would have returned."""
+        tool_calls = [
+            ChatCompletionMessageToolCall(
+                id=tool_call["id"] or "",
+                type="function",
+                function={"name": tool_call["name"] or "", "arguments": tool_call["arguments"]},
+            )
+            for _, tool_call in sorted(self.tool_calls.items())
+        ]
+        message = ChatCompletionMessage(
+            role="assistant",
+            content="".join(self.content_parts) or None,
+            tool_calls=tool_calls or None,
+        )
+        return ChatCompletion(
+            id=self.id,
+            model=self.model,
+            created=self.created,
+            object="chat.completion",
+            choices=[
+                Choice(
+                    index=0,
+                    finish_reason=self.finish_reason or "stop",
+                    message=message,
+                )
+            ],
+            usage=self.usage
+            or CompletionUsage(prompt_tokens=0, completion_tokens=0, total_tokens=0),
+        )
+
 
 # NOTE: This client is also used by OpenRouter because their API is
 # OpenAI-compatible.  We therefore rely on the OpenAI function-calling
@@ -43,6 +141,8 @@ from ii_agent.llm.base import (
 class OpenAIDirectClient(LLMClient):
     """LLM client that speaks the OpenAI chat-completions protocol."""
 
+    provider = "openai"
+
     def __init__(self, model_name: str, max_retries=2, cot_model: bool = True, azure_model: bool = False):
         """Initialize the OpenAI first party client."""
         api_key = os.getenv("OPENAI_API_KEY", "EMPTY")
@@ -57,8 +157,25 @@ class OpenAIDirectClient(LLMClient):
                 api_version=api_version,
                 max_retries=max_retries,
             )
+            self.async_client = PooledAsyncClient(
+                lambda http_client: openai.AsyncAzureOpenAI(
+                    api_key=api_key,
+                    azure_endpoint=azure_endpoint,
+                    api_version=api_version,
+                    max_retries=max_retries,
+                    http_client=http_client,
+                )
+            )
         else:
             self.client = openai.OpenAI(api_key=api_key, base_url=base_url, max_retries=max_retries)
+            self.async_client = PooledAsyncClient(
+                lambda http_client: openai.AsyncOpenAI(
+                    api_key=api_key,
+                    base_url=base_url,
+                    max_retries=max_retries,
+                    http_client=http_client,
+                )
+            )
         self.model_name = model_name
         self.max_retries = max_retries
         self.cot_model = cot_model
@@ -86,7 +203,175 @@ class OpenAIDirectClient(LLMClient):
         Returns:
             A generated response.
         """
+        request_kwargs = self._build_request_kwargs(
+            messages, max_tokens, system_prompt, temperature, tools, tool_choice
+        )
+        response = self._create_completion(request_kwargs)
+        return self._parse_response(response, tools)
+
+    async def agenerate(
+        self,
+        messages: LLMMessages,
+        max_tokens: int,
+        system_prompt: str | None = None,
+        temperature: float = 0.0,
+        tools: list[ToolParam] = [],
+        tool_choice: dict[str, str] | None = None,
+        thinking_tokens: int | None = None,
+    ) -> Tuple[list[AssistantContentBlock], dict[str, Any]]:
+        """Generate responses with the async SDK client.
+
+        Args:
+            messages: A list of messages.
+            system_prompt: A system prompt.
+            max_tokens: The maximum number of tokens to generate.
+            temperature: The temperature.
+            tools: A list of tools.
+            tool_choice: A tool choice.
+
+        Returns:
+            A generated response.
+        """
+        request_kwargs = self._build_request_kwargs(
+            messages, max_tokens, system_prompt, temperature, tools, tool_choice
+        )
+        response = await self._acreate_completion(request_kwargs)
+        return self._parse_response(response, tools)
+
+    async def agenerate_stream(
+        self,
+        messages: LLMMessages,
+        max_tokens: int,
+        on_delta: StreamCallback,
+        system_prompt: str | None = None,
+        temperature: float = 0.0,
+        tools: list[ToolParam] = [],
+        tool_choice: dict[str, str] | None = None,
+        thinking_tokens: int | None = None,
+    ) -> Tuple[list[AssistantContentBlock], dict[str, Any]]:
+        """Generate responses over server-sent events.
+
+        Args:
+            messages: A list of messages.
+            max_tokens: The maximum number of tokens to generate.
+            on_delta: Called with every text, reasoning and tool argument delta.
+            system_prompt: A system prompt.
+            temperature: The temperature.
+            tools: A list of tools.
+            tool_choice: A tool choice.
+
+        Returns:
+            A generated response.
+        """
+        request_kwargs = self._build_request_kwargs(
+            messages, max_tokens, system_prompt, temperature, tools, tool_choice
+        )
+        response = await self._acreate_completion_stream(request_kwargs, on_delta)
+        return self._parse_response(response, tools)
+
+    def _create_completion(self, request_kwargs: dict[str, Any]) -> Any:
+        """Call `chat.completions.create` with retries on transient errors."""
+        response = None
+        for retry in range(self.max_retries):
+            try:
+                response = self.client.chat.completions.create(**request_kwargs)
+                break
+            except (
+                OpenAI_APIConnectionError,
+                OpenAI_InternalServerError,
+                OpenAI_RateLimitError,
+            ) as e:
+                if retry == self.max_retries - 1:
+                    print(f"Failed OpenAI request after {retry + 1} retries")
+                    raise e
+                else:
+                    print(f"Retrying OpenAI request: {retry + 1}/{self.max_retries}")
+                    self._record_retry(
+                        retry + 1, e, rate_limited=isinstance(e, OpenAI_RateLimitError)
+                    )
+                    # Sleep 8-12 seconds with jitter to avoid thundering herd.
+                    time.sleep(10 * random.uniform(0.8, 1.2))
+        assert response is not None
+        return response
+
+    async def _acreate_completion(self, request_kwargs: dict[str, Any]) -> Any:
+        """Async counterpart of `_create_completion`."""
+        response = None
+        for retry in range(self.max_retries):
+            try:
+                response = await self.async_client.get().chat.completions.create(
+                    **request_kwargs
+                )
+                break
+            except (
+                OpenAI_APIConnectionError,
+                OpenAI_InternalServerError,
+                OpenAI_RateLimitError,
+            ) as e:
+                if retry == self.max_retries - 1:
+                    print(f"Failed OpenAI request after {retry + 1} retries")
+                    raise e
+                else:
+                    print(f"Retrying OpenAI request: {retry + 1}/{self.max_retries}")
+                    self._record_retry(
+                        retry + 1, e, rate_limited=isinstance(e, OpenAI_RateLimitError)
+                    )
+                    # Sleep 8-12 seconds with jitter to avoid thundering herd.
+                    await asyncio.sleep(10 * random.uniform(0.8, 1.2))
+        assert response is not None
+        return response
+
+    async def _acreate_completion_stream(
+        self, request_kwargs: dict[str, Any], on_delta: StreamCallback
+    ) -> ChatCompletion:
+        """Stream a chat completion, forwarding deltas, and return it assembled."""
+        response = None
+        for retry in range(self.max_retries):
+            streamed = False
+            try:
+                stream = await self.async_client.get().chat.completions.create(
+                    **request_kwargs,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                )
+                accumulator = _ChatCompletionStreamAccumulator()
+                async for chunk in stream:
+                    for delta in accumulator.add_chunk(chunk):
+                        streamed = True
+                        on_delta(delta)
+                response = accumulator.to_completion()
+                break
+            except (
+                OpenAI_APIConnectionError,
+                OpenAI_InternalServerError,
+                OpenAI_RateLimitError,
+            ) as e:
+                # Deltas already handed out cannot be taken back, so only
+                # retry when the stream failed before producing anything.
+                if streamed or retry == self.max_retries - 1:
+                    print(f"Failed OpenAI request after {retry + 1} retries")
+                    raise e
+                else:
+                    print(f"Retrying OpenAI request: {retry + 1}/{self.max_retries}")
+                    self._record_retry(
+                        retry + 1, e, rate_limited=isinstance(e, OpenAI_RateLimitError)
+                    )
+                    # Sleep 8-12 seconds with jitter to avoid thundering herd.
+                    await asyncio.sleep(10 * random.uniform(0.8, 1.2))
+        assert response is not None
+        return response
 
+    def _build_request_kwargs(
+        self,
+        messages: LLMMessages,
+        max_tokens: int,
+        system_prompt: str | None,
+        temperature: float,
+        tools: list[ToolParam],
+        tool_choice: dict[str, str] | None,
+    ) -> dict[str, Any]:
+        """Convert internal messages and options into `chat.completions.create` kwargs."""
+        messages = resolve_blob_references(messages)
         openai_messages = []
         system_prompt_applied = False
 
@@ -96,77 +381,62 @@ class OpenAIDirectClient(LLMClient):
                 openai_messages.append(system_message)
                 system_prompt_applied = True
 
-        for idx, message_list in enumerate(messages):
-            if len(message_list) > 1:
-                raise ValueError("Only one entry per message supported for openai")
-            internal_message = message_list[0]
-            
-            current_message_text = ""
-            is_user_prompt = False
-
-            if str(type(internal_message)) == str(TextPrompt):
-                internal_message = cast(TextPrompt, internal_message)
-                current_message_text = internal_message.text
-                is_user_prompt = True
-                role = "user"
-            elif str(type(internal_message)) == str(TextResult):
-                internal_message = cast(TextResult, internal_message)
-                # For TextResult (assistant), content is handled differently by OpenAI API
-                message_content_obj = {"type": "text", "text": internal_message.text}
-                openai_message = {"role": "assistant", "content": [message_content_obj]}
-                openai_messages.append(openai_message)
-                continue # Move to next message in outer loop
-            elif str(type(internal_message)) == str(ToolCall):
-                internal_message = cast(ToolCall, internal_message)
-                # Ensure arguments are stringified JSON for the OpenAI API call
-                try:
-                    arguments_str = json.dumps(internal_message.tool_input)
-                except TypeError as e:
-                    logger.error(f"Failed to serialize tool_input to JSON string for tool '{internal_message.tool_name}': {internal_message.tool_input}. Error: {str(e)}")
-                    # Decide how to handle: skip this message, or raise, or send with potentially malformed args? For now, let's raise.
-                    raise ValueError(f"Cannot serialize tool arguments for {internal_message.tool_name}: {str(e)}") from e
-                
-                tool_call_payload = {
-                    "type": "function",
-                    "id": internal_message.tool_call_id,
-                    "function": {
-                        "name": internal_message.tool_name,
-                        "arguments": arguments_str, # Use the JSON string
-                    },
-                }
-                openai_message = {
-                    "role": "assistant",
-                    "tool_calls": [tool_call_payload],
-                    # Content is implicitly None or omitted by not setting it
-                }
-                openai_messages.append(openai_message)
-                continue # Move to next message in outer loop
-            elif str(type(internal_message)) == str(ToolFormattedResult):
-                internal_message = cast(ToolFormattedResult, internal_message)
-                openai_message = {
-                    "role": "tool",
-                    "tool_call_id": internal_message.tool_call_id,
-                    "content": internal_message.tool_output,
-                }
-                openai_messages.append(openai_message)
-                continue # Move to next message in outer loop
-            else:
-                print(
-                    f"Unknown message type: {type(internal_message)}, expected one of {str(TextPrompt)}, {str(TextResult)}, {str(ToolCall)}, {str(ToolFormattedResult)}"
-                )
-                raise ValueError(f"Unknown message type: {type(internal_message)}")
-
-            # This part now only applies to TextPrompt (user messages)
-            if is_user_prompt:
-                final_text_for_user_message = current_message_text
-                # If cot_model is True, system_prompt is not None, and it hasn't been applied yet (i.e., this is the first user message opportunity)
-                if self.cot_model and system_prompt and not system_prompt_applied:
-                    final_text_for_user_message = f"{system_prompt}\n\n{current_message_text}"
-                    system_prompt_applied = True # Mark as applied
-                
-                message_content_obj = {"type": "text", "text": final_text_for_user_message}
-                openai_message = {"role": role, "content": [message_content_obj]}
-                openai_messages.append(openai_message)
+        for message_list in messages:
+            # Text and tool calls of one assistant turn form a single message
+            assistant_message = None
+            for internal_message in message_list:
+                if str(type(internal_message)) == str(TextPrompt):
+                    internal_message = cast(TextPrompt, internal_message)
+                    final_text_for_user_message = internal_message.text
+                    # If cot_model is True, system_prompt is not None, and it hasn't been applied yet (i.e., this is the first user message opportunity)
+                    if self.cot_model and system_prompt and not system_prompt_applied:
+                        final_text_for_user_message = f"{system_prompt}\n\n{internal_message.text}"
+                        system_prompt_applied = True # Mark as applied
+
+                    message_content_obj = {"type": "text", "text": final_text_for_user_message}
+                    openai_messages.append({"role": "user", "content": [message_content_obj]})
+                elif str(type(internal_message)) == str(TextResult):
+                    internal_message = cast(TextResult, internal_message)
+                    if assistant_message is None:
+                        assistant_message = {"role": "assistant"}
+                        openai_messages.append(assistant_message)
+                    assistant_message.setdefault("content", []).append(
+                        {"type": "text", "text": internal_message.text}
+                    )
+                elif str(type(internal_message)) == str(ToolCall):
+                    internal_message = cast(ToolCall, internal_message)
+                    # Ensure arguments are stringified JSON for the OpenAI API call
+                    try:
+                        arguments_str = json.dumps(internal_message.tool_input)
+                    except TypeError as e:
+                        logger.error(f"Failed to serialize tool_input to JSON string for tool '{internal_message.tool_name}': {internal_message.tool_input}. Error: {str(e)}")
+                        raise ValueError(f"Cannot serialize tool arguments for {internal_message.tool_name}: {str(e)}") from e
+
+                    tool_call_payload = {
+                        "type": "function",
+                        "id": internal_message.tool_call_id,
+                        "function": {
+                            "name": internal_message.tool_name,
+                            "arguments": arguments_str, # Use the JSON string
+                        },
+                    }
+                    if assistant_message is None:
+                        assistant_message = {"role": "assistant"}
+                        openai_messages.append(assistant_message)
+                    assistant_message.setdefault("tool_calls", []).append(tool_call_payload)
+                elif str(type(internal_message)) == str(ToolFormattedResult):
+                    internal_message = cast(ToolFormattedResult, internal_message)
+                    openai_message = {
+                        "role": "tool",
+                        "tool_call_id": internal_message.tool_call_id,
+                        "content": internal_message.tool_output,
+                    }
+                    openai_messages.append(openai_message)
+                else:
+                    print(
+                        f"Unknown message type: {type(internal_message)}, expected one of {str(TextPrompt)}, {str(TextResult)}, {str(ToolCall)}, {str(ToolFormattedResult)}"
+                    )
+                    raise ValueError(f"Unknown message type: {type(internal_message)}")
 
         # If cot_model is True and system_prompt was provided but not applied (e.g., no user messages found, though unlikely for an agent)
         if self.cot_model and system_prompt and not system_prompt_applied:
@@ -206,47 +476,32 @@ class OpenAIDirectClient(LLMClient):
             }
             openai_tools.append(openai_tool_object)
 
-        response = None
-        for retry in range(self.max_retries):
-            try:
-                extra_body = {}
-                openai_max_tokens = max_tokens
-                openai_temperature = temperature
-                if self.cot_model:
-                    extra_body["max_completion_tokens"] = max_tokens
-                    openai_max_tokens = OpenAI_NOT_GIVEN
-                    openai_temperature = OpenAI_NOT_GIVEN
-                logger.debug(
-                    "Calling model %s with tool_choice=%s tools=%s",
-                    self.model_name,
-                    tool_choice_param,
-                    [t.name for t in tools],
-                )
-                response = self.client.chat.completions.create(
-                    model=self.model_name,
-                    messages=openai_messages,
-                    tools=openai_tools if len(openai_tools) > 0 else OpenAI_NOT_GIVEN,
-                    tool_choice=tool_choice_param,
-                    max_tokens=openai_max_tokens,
-                    extra_body=extra_body,
-                )
-                break
-            except (
-                OpenAI_APIConnectionError,
-                OpenAI_InternalServerError,
-                OpenAI_RateLimitError,
-            ) as e:
-                if retry == self.max_retries - 1:
-                    print(f"Failed OpenAI request after {retry + 1} retries")
-                    raise e
-                else:
-                    print(f"Retrying OpenAI request: {retry + 1}/{self.max_retries}")
-                    # Sleep 8-12 seconds with jitter to avoid thundering herd.
-                    time.sleep(10 * random.uniform(0.8, 1.2))
+        extra_body = {}
+        openai_max_tokens = max_tokens
+        if self.cot_model:
+            extra_body["max_completion_tokens"] = max_tokens
+            openai_max_tokens = OpenAI_NOT_GIVEN
+        logger.debug(
+            "Calling model %s with tool_choice=%s tools=%s",
+            self.model_name,
+            tool_choice_param,
+            [t.name for t in tools],
+        )
+        return dict(
+            model=self.model_name,
+            messages=openai_messages,
+            tools=openai_tools if len(openai_tools) > 0 else OpenAI_NOT_GIVEN,
+            tool_choice=tool_choice_param,
+            max_tokens=openai_max_tokens,
+            extra_body=extra_body,
+        )
 
+    def _parse_response(
+        self, response: Any, tools: list[ToolParam]
+    ) -> Tuple[list[AssistantContentBlock], dict[str, Any]]:
+        """Convert a chat completion back into internal content blocks."""
         # Convert messages back to internal format
         internal_messages = []
-        assert response is not None
         openai_response_messages = response.choices
         if len(openai_response_messages) > 1:
             raise ValueError("Only one message supported for OpenAI")
@@ -254,12 +509,12 @@ class OpenAIDirectClient(LLMClient):
         tool_calls = openai_response_message.tool_calls
         content = openai_response_message.content
 
-        # Exactly one of tool_calls or content should be present
-        if tool_calls and content:
-            raise ValueError("Only one of tool_calls or content should be present")
-        elif not tool_calls and not content:
+        if not tool_calls and not content:
             raise ValueError("Either tool_calls or content should be present")
 
+        # Text accompanying tool calls is kept ahead of them, as in Anthropic turns
+        if content:
+            internal_messages.append(TextResult(text=content))
         if tool_calls:
             available_tool_names = {t.name for t in tools} # Get set of known tool names
             logger.info(f"Model returned {len(tool_calls)} tool_calls. Available tools: {available_tool_names}")
@@ -296,19 +551,13 @@ class OpenAIDirectClient(LLMClient):
                         )
                     )
                     processed_tool_call = True
-                    logger.info(f"Successfully processed and selected tool call: {tool_name_from_model}")
-                    break # Processed the first valid and available tool call
+                    logger.info(f"Successfully processed tool call: {tool_name_from_model}")
                 else:
                     logger.warning(f"Skipping tool call with unknown or placeholder name: '{tool_name_from_model}'. Not in available tools: {available_tool_names}")
             
             if not processed_tool_call:
                 logger.warning("No valid and available tool calls found after filtering.")
 
-        elif content:
-            internal_messages.append(TextResult(text=content))
-        else:
-            raise ValueError(f"Unknown message type: {openai_response_message}")
-
         assert response.usage is not None
         message_metadata = {
             "raw_response": response,
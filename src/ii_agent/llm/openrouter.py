@@ -1,20 +1,9 @@
 import os
 import json
-import random
-import time
 import logging
 from typing import Any, Tuple, cast
 
 import openai
-from openai import (
-    APIConnectionError as OpenAI_APIConnectionError,
-)
-from openai import (
-    InternalServerError as OpenAI_InternalServerError,
-)
-from openai import (
-    RateLimitError as OpenAI_RateLimitError,
-)
 from openai._types import (
     NOT_GIVEN as OpenAI_NOT_GIVEN,  # pyright: ignore[reportPrivateImportUsage]
 )
@@ -22,13 +11,17 @@ from openai._types import (
 from ii_agent.llm.openai import OpenAIDirectClient
 from ii_agent.llm.base import (
     AssistantContentBlock,
+    GeneralContentBlock,
     LLMMessages,
+    StreamCallback,
     ToolParam,
     TextPrompt,
     ToolCall,
     TextResult,
     ToolFormattedResult,
 )
+from ii_agent.llm.http_client import PooledAsyncClient
+from ii_agent.llm.payload_cache import ToolPayloadCache, TurnPayloadCache
 from ii_agent.llm.token_counter import TokenCounter
 
 logger = logging.getLogger(__name__)
@@ -37,9 +30,17 @@ logger = logging.getLogger(__name__)
 class OpenRouterClient(OpenAIDirectClient):
     """LLM client for OpenRouter (OpenAI-compatible API)."""
 
+    provider = "openrouter"
+
     DEEP_RESEARCH_TOKEN_THRESHOLD = 75
 
-    def __init__(self, model_name: str, max_retries: int = 2, cot_model: bool = True):
+    def __init__(
+        self,
+        model_name: str,
+        max_retries: int = 2,
+        cot_model: bool = True,
+        parallel_tool_calls: bool = False,
+    ):
         base_url = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
         api_key = os.getenv("OPENROUTER_API_KEY", "")
         headers = {
@@ -55,9 +56,23 @@ class OpenRouterClient(OpenAIDirectClient):
             max_retries=max_retries,
             default_headers=headers,
         )
+        self.async_client = PooledAsyncClient(
+            lambda http_client: openai.AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                max_retries=max_retries,
+                default_headers=headers,
+                http_client=http_client,
+            )
+        )
         self.model_name = model_name
         self.max_retries = max_retries
         self.cot_model = cot_model
+        self.parallel_tool_calls = parallel_tool_calls
+        self._turn_payloads: TurnPayloadCache[
+            tuple[list[dict[str, Any]], int]
+        ] = TurnPayloadCache()
+        self._tool_payloads: ToolPayloadCache[list[dict[str, Any]]] = ToolPayloadCache()
 
     def generate(
         self,
@@ -71,35 +86,88 @@ class OpenRouterClient(OpenAIDirectClient):
         tool_args: dict[str, Any] | None = None,
     ) -> Tuple[list[AssistantContentBlock], dict[str, Any]]:
         """Generate responses using the OpenRouter API."""
+        request_kwargs = self._build_request_kwargs(
+            messages,
+            max_tokens,
+            system_prompt,
+            temperature,
+            tools,
+            tool_choice,
+            tool_args=tool_args,
+        )
+        response = self._create_completion(request_kwargs)
+        return self._parse_response(response, tools)
 
-        openai_messages = []
-        system_prompt_applied = False
-
-        if system_prompt is not None:
-            if not self.cot_model:
-                system_message = {"role": "system", "content": system_prompt}
-                openai_messages.append(system_message)
-                system_prompt_applied = True
-
-        for idx, message_list in enumerate(messages):
-            if len(message_list) > 1:
-                raise ValueError("Only one entry per message supported for openai")
-            internal_message = message_list[0]
+    async def agenerate(
+        self,
+        messages: LLMMessages,
+        max_tokens: int,
+        system_prompt: str | None = None,
+        temperature: float = 0.0,
+        tools: list[ToolParam] = [],
+        tool_choice: dict[str, str] | None = None,
+        thinking_tokens: int | None = None,
+        tool_args: dict[str, Any] | None = None,
+    ) -> Tuple[list[AssistantContentBlock], dict[str, Any]]:
+        """Generate responses using the OpenRouter API without blocking."""
+        request_kwargs = self._build_request_kwargs(
+            messages,
+            max_tokens,
+            system_prompt,
+            temperature,
+            tools,
+            tool_choice,
+            tool_args=tool_args,
+        )
+        response = await self._acreate_completion(request_kwargs)
+        return self._parse_response(response, tools)
 
-            current_message_text = ""
-            is_user_prompt = False
+    async def agenerate_stream(
+        self,
+        messages: LLMMessages,
+        max_tokens: int,
+        on_delta: StreamCallback,
+        system_prompt: str | None = None,
+        temperature: float = 0.0,
+        tools: list[ToolParam] = [],
+        tool_choice: dict[str, str] | None = None,
+        thinking_tokens: int | None = None,
+        tool_args: dict[str, Any] | None = None,
+    ) -> Tuple[list[AssistantContentBlock], dict[str, Any]]:
+        """Stream responses from the OpenRouter API."""
+        request_kwargs = self._build_request_kwargs(
+            messages,
+            max_tokens,
+            system_prompt,
+            temperature,
+            tools,
+            tool_choice,
+            tool_args=tool_args,
+        )
+        response = await self._acreate_completion_stream(request_kwargs, on_delta)
+        return self._parse_response(response, tools)
 
+    @staticmethod
+    def _convert_turn(
+        message_list: list[GeneralContentBlock],
+    ) -> tuple[list[dict[str, Any]], int]:
+        """Turn one history turn into OpenAI messages and their token count."""
+        openai_messages = []
+        # Text and tool calls of one assistant turn form a single message
+        assistant_message = None
+        for internal_message in message_list:
             if str(type(internal_message)) == str(TextPrompt):
                 internal_message = cast(TextPrompt, internal_message)
-                current_message_text = internal_message.text
-                is_user_prompt = True
-                role = "user"
+                message_content_obj = {"type": "text", "text": internal_message.text}
+                openai_messages.append({"role": "user", "content": [message_content_obj]})
             elif str(type(internal_message)) == str(TextResult):
                 internal_message = cast(TextResult, internal_message)
-                message_content_obj = {"type": "text", "text": internal_message.text}
-                openai_message = {"role": "assistant", "content": [message_content_obj]}
-                openai_messages.append(openai_message)
-                continue
+                if assistant_message is None:
+                    assistant_message = {"role": "assistant"}
+                    openai_messages.append(assistant_message)
+                assistant_message.setdefault("content", []).append(
+                    {"type": "text", "text": internal_message.text}
+                )
             elif str(type(internal_message)) == str(ToolCall):
                 internal_message = cast(ToolCall, internal_message)
                 arguments_str = json.dumps(internal_message.tool_input)
@@ -111,12 +179,12 @@ class OpenRouterClient(OpenAIDirectClient):
                         "arguments": arguments_str,
                     },
                 }
-                openai_message = {
-                    "role": "assistant",
-                    "tool_calls": [tool_call_payload],
-                }
-                openai_messages.append(openai_message)
-                continue
+                if assistant_message is None:
+                    assistant_message = {"role": "assistant"}
+                    openai_messages.append(assistant_message)
+                assistant_message.setdefault("tool_calls", []).append(
+                    tool_call_payload
+                )
             elif str(type(internal_message)) == str(ToolFormattedResult):
                 internal_message = cast(ToolFormattedResult, internal_message)
                 openai_message = {
@@ -125,21 +193,67 @@ class OpenRouterClient(OpenAIDirectClient):
                     "content": internal_message.tool_output,
                 }
                 openai_messages.append(openai_message)
-                continue
             else:
                 raise ValueError(f"Unknown message type: {type(internal_message)}")
+        return openai_messages, TokenCounter().count_tokens(openai_messages)
 
-            if is_user_prompt:
-                final_text = current_message_text
-                if self.cot_model and system_prompt and not system_prompt_applied:
-                    final_text = f"{system_prompt}\n\n{current_message_text}"
-                    system_prompt_applied = True
-                message_content_obj = {"type": "text", "text": final_text}
-                openai_message = {"role": role, "content": [message_content_obj]}
-                openai_messages.append(openai_message)
+    @staticmethod
+    def _convert_tools(tools: list[ToolParam]) -> list[dict[str, Any]]:
+        """Turn tool definitions into OpenAI function tools."""
+        return [
+            {
+                "type": "function",
+                "function": {
+                    "name": tool.name,
+                    "description": tool.description,
+                    "parameters": {**tool.input_schema, "strict": True},
+                },
+            }
+            for tool in tools
+        ]
 
-        if self.cot_model and system_prompt and not system_prompt_applied:
-            openai_messages.insert(0, {"role": "user", "content": [{"type": "text", "text": system_prompt}]})
+    def _build_request_kwargs(
+        self,
+        messages: LLMMessages,
+        max_tokens: int,
+        system_prompt: str | None,
+        temperature: float,
+        tools: list[ToolParam],
+        tool_choice: dict[str, str] | None,
+        tool_args: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Convert internal messages and options into `chat.completions.create` kwargs."""
+        turn_payloads = self._turn_payloads.convert(messages, self._convert_turn)
+        openai_messages = [
+            message for turn_messages, _ in turn_payloads for message in turn_messages
+        ]
+        prompt_tokens = sum(token_count for _, token_count in turn_payloads)
+
+        token_counter = TokenCounter()
+        if system_prompt is not None and not self.cot_model:
+            system_message = {"role": "system", "content": system_prompt}
+            openai_messages.insert(0, system_message)
+            prompt_tokens += token_counter.count_tokens([system_message])
+        elif system_prompt:
+            # Models without a system role get the system prompt ahead of the
+            # first user prompt. Cached messages are shared, so it goes on a copy.
+            first_user = next(
+                (idx for idx, m in enumerate(openai_messages) if m["role"] == "user"),
+                None,
+            )
+            if first_user is None:
+                prefixed = {
+                    "role": "user",
+                    "content": [{"type": "text", "text": system_prompt}],
+                }
+                openai_messages.insert(0, prefixed)
+            else:
+                message = openai_messages[first_user]
+                text = f"{system_prompt}\n\n{message['content'][0]['text']}"
+                prefixed = {"role": "user", "content": [{"type": "text", "text": text}]}
+                openai_messages[first_user] = prefixed
+                prompt_tokens -= token_counter.count_tokens([message])
+            prompt_tokens += token_counter.count_tokens([prefixed])
 
         if tool_choice is None:
             tool_choice_param = "auto" if len(tools) > 0 else OpenAI_NOT_GIVEN
@@ -152,19 +266,7 @@ class OpenRouterClient(OpenAIDirectClient):
         else:
             raise ValueError(f"Unknown tool_choice type: {tool_choice['type']}")
 
-        openai_tools = []
-        for tool in tools:
-            tool_def = {
-                "name": tool.name,
-                "description": tool.description,
-                "parameters": tool.input_schema,
-            }
-            tool_def["parameters"]["strict"] = True
-            openai_tool_object = {"type": "function", "function": tool_def}
-            openai_tools.append(openai_tool_object)
-
-        token_counter = TokenCounter()
-        prompt_tokens = token_counter.count_tokens(openai_messages)
+        openai_tools = self._tool_payloads.convert(tools, self._convert_tools)
 
         force_tool_choice = False
         if (
@@ -187,36 +289,29 @@ class OpenRouterClient(OpenAIDirectClient):
             )
             tool_choice_param = "required"
 
-        response = None
-        for retry in range(self.max_retries):
-            try:
-                extra_body = {}
-                openai_max_tokens = max_tokens
-                if self.cot_model:
-                    extra_body["max_completion_tokens"] = max_tokens
-                    openai_max_tokens = OpenAI_NOT_GIVEN
-                if override_tool_choice:
-                    extra_body["parallel_tool_calls"] = False
-                response = self.client.chat.completions.create(
-                    model=self.model_name,
-                    messages=openai_messages,
-                    tools=openai_tools if len(openai_tools) > 0 else OpenAI_NOT_GIVEN,
-                    tool_choice=tool_choice_param,
-                    max_tokens=openai_max_tokens,
-                    extra_body=extra_body,
-                )
-                break
-            except (
-                OpenAI_APIConnectionError,
-                OpenAI_InternalServerError,
-                OpenAI_RateLimitError,
-            ) as e:
-                if retry == self.max_retries - 1:
-                    raise e
-                time.sleep(10 * random.uniform(0.8, 1.2))
+        extra_body = {}
+        openai_max_tokens = max_tokens
+        if self.cot_model:
+            extra_body["max_completion_tokens"] = max_tokens
+            openai_max_tokens = OpenAI_NOT_GIVEN
+        if self.parallel_tool_calls:
+            extra_body["parallel_tool_calls"] = True
+        elif override_tool_choice:
+            extra_body["parallel_tool_calls"] = False
+        return dict(
+            model=self.model_name,
+            messages=openai_messages,
+            tools=openai_tools if len(openai_tools) > 0 else OpenAI_NOT_GIVEN,
+            tool_choice=tool_choice_param,
+            max_tokens=openai_max_tokens,
+            extra_body=extra_body,
+        )
 
+    def _parse_response(
+        self, response: Any, tools: list[ToolParam]
+    ) -> Tuple[list[AssistantContentBlock], dict[str, Any]]:
+        """Convert a chat completion back into internal content blocks."""
         internal_messages = []
-        assert response is not None
         openai_response_messages = response.choices
         if len(openai_response_messages) > 1:
             raise ValueError("Only one message supported for OpenAI")
@@ -224,11 +319,12 @@ class OpenRouterClient(OpenAIDirectClient):
         tool_calls = openai_response_message.tool_calls
         content = openai_response_message.content
 
-        if tool_calls and content:
-            raise ValueError("Only one of tool_calls or content should be present")
-        elif not tool_calls and not content:
+        if not tool_calls and not content:
             raise ValueError("Either tool_calls or content should be present")
 
+        # Text accompanying tool calls is kept ahead of them, as in Anthropic turns
+        if content:
+            internal_messages.append(TextResult(text=content))
         if tool_calls:
             for tool_call_data in tool_calls:
                 args_data = tool_call_data.function.arguments
@@ -243,11 +339,6 @@ class OpenRouterClient(OpenAIDirectClient):
                         tool_call_id=tool_call_data.id,
                     )
                 )
-                break
-        elif content:
-            internal_messages.append(TextResult(text=content))
-        else:
-            raise ValueError(f"Unknown message type: {openai_response_message}")
 
         assert response.usage is not None
         message_metadata = {
@@ -0,0 +1,132 @@
+"""Memoized conversion of history turns and tool lists into provider payloads.
+
+Every request sends the whole history, but between two turns only the last
+one or two turns are new. `TurnPayloadCache` converts each turn once and
+reuses the payload for as long as the turn stays in the history.
+`ToolPayloadCache` does the same for the tool definitions, which only change
+when the tool set does.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, Sequence, TypeVar
+
+from ii_agent.llm.base import GeneralContentBlock, LLMMessages, ToolParam
+from ii_agent.llm.utils import resolve_blob_references, turn_has_blob_reference
+from ii_agent.utils.constants import (
+    IMAGE_TURN_PAYLOAD_CACHE_SIZE,
+    TURN_PAYLOAD_CACHE_SIZE,
+)
+
+T = TypeVar("T")
+
+
+class _LRU(Generic[T]):
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, tuple[Any, T]] = OrderedDict()
+
+    def get(self, key: Hashable) -> T | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: Hashable, owner: Any, value: T) -> None:
+        # Keys hold object ids. Keeping the owners alive guarantees that the
+        # ids are not reused by other objects while the entry is cached.
+        self._entries[key] = (owner, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TurnPayloadCache(Generic[T]):
+    """Converts history turns into provider payloads, once per turn.
+
+    Turns are keyed by identity and length: the message history appends new
+    turn lists and replaces rather than edits old ones, so a turn that was
+    converted before converts to the same payload again. Payloads of turns
+    with blob-referenced images hold the inlined base64 data, so they are
+    kept in a separate, smaller cache.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = TURN_PAYLOAD_CACHE_SIZE,
+        image_maxsize: int = IMAGE_TURN_PAYLOAD_CACHE_SIZE,
+    ):
+        self._payloads: _LRU[T] = _LRU(maxsize)
+        self._image_payloads: _LRU[T] = _LRU(image_maxsize)
+        self.hits = 0
+        self.misses = 0
+
+    def convert(
+        self,
+        messages: LLMMessages,
+        convert_turn: Callable[[list[GeneralContentBlock]], T],
+    ) -> list[T]:
+        """Return the payload of every turn of ``messages``, in order.
+
+        Args:
+            messages: The history to convert.
+            convert_turn: Converts one turn, with blob references already
+                resolved, into its payload. Cached payloads are shared
+                between calls and must not be modified by the caller.
+        """
+        payloads = []
+        for turn in messages:
+            key = (id(turn), len(turn))
+            payload = self._payloads.get(key)
+            if payload is None:
+                payload = self._image_payloads.get(key)
+            if payload is None:
+                self.misses += 1
+                payload = self._convert(turn, convert_turn)
+            else:
+                self.hits += 1
+            payloads.append(payload)
+        return payloads
+
+    def _convert(
+        self,
+        turn: list[GeneralContentBlock],
+        convert_turn: Callable[[list[GeneralContentBlock]], T],
+    ) -> T:
+        key = (id(turn), len(turn))
+        if turn_has_blob_reference(turn):
+            payload = convert_turn(resolve_blob_references([turn])[0])
+            self._image_payloads.put(key, turn, payload)
+        else:
+            payload = convert_turn(turn)
+            self._payloads.put(key, turn, payload)
+        return payload
+
+
+class ToolPayloadCache(Generic[T]):
+    """Converts a list of tools into a provider payload, once per tool set.
+
+    Agents build fresh `ToolParam` objects every turn, but their schemas are
+    the tools' own class-level dicts, so a tool set is keyed by the name,
+    description and schema identity of its tools.
+    """
+
+    def __init__(self, maxsize: int = 16):
+        self._payloads: _LRU[T] = _LRU(maxsize)
+
+    def convert(
+        self,
+        tools: Sequence[ToolParam],
+        convert_tools: Callable[[Sequence[ToolParam]], T],
+    ) -> T:
+        """Return the payload of ``tools``; it must not be modified by the caller."""
+        key = tuple((tool.name, tool.description, id(tool.input_schema)) for tool in tools)
+        schemas = tuple(tool.input_schema for tool in tools)
+        payload = self._payloads.get(key)
+        if payload is None:
+            payload = convert_tools(tools)
+            self._payloads.put(key, schemas, payload)
+        return payload
@@ -0,0 +1,190 @@
+"""Prompt cache breakpoint planning and cache usage accounting.
+
+Anthropic caches the request prefix (tools, then system prompt, then
+messages) up to each block marked with ``cache_control``, and allows at most
+four such breakpoints per request. `plan_cache_breakpoints` spends them on
+the parts of the prefix that stay stable from turn to turn:
+
+1. the last tool definition, so the tool schemas are cached on their own,
+2. the system prompt, which extends that prefix,
+3. the conversation summary, if the history was summarized, because the
+   head and summary stay unchanged until the next summarization,
+4. the last message, which the next turn reads back. If there is no summary,
+   the last message of the previous turn gets the remaining breakpoint, so
+   that it is still read back after long turns.
+"""
+
+import copy
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from ii_agent.utils.constants import CONVERSATION_SUMMARY_PREFIX
+
+MAX_CACHE_BREAKPOINTS = 4
+CACHE_CONTROL = {"type": "ephemeral"}
+
+# Content blocks that cannot carry cache_control
+_UNCACHEABLE_BLOCK_TYPES = ("thinking", "redacted_thinking")
+
+
+def _block_type(block: Any) -> Optional[str]:
+    if isinstance(block, dict):
+        return block.get("type")
+    return getattr(block, "type", None)
+
+
+def _with_cache_control(block: Any) -> Any:
+    # Blocks may be shared with the client's payload cache, so they are
+    # copied rather than marked in place.
+    if isinstance(block, dict):
+        return {**block, "cache_control": CACHE_CONTROL}
+    block = copy.copy(block)
+    block.cache_control = CACHE_CONTROL
+    return block
+
+
+def _mark_at_or_before(messages: list[dict[str, Any]], idx: int) -> Optional[int]:
+    """Mark the last cacheable block at or before message ``idx``.
+
+    Returns the index of the marked message, or None if there is none.
+    """
+    for message_idx in range(idx, -1, -1):
+        content = messages[message_idx]["content"]
+        for block_idx in range(len(content) - 1, -1, -1):
+            if _block_type(content[block_idx]) not in _UNCACHEABLE_BLOCK_TYPES:
+                content[block_idx] = _with_cache_control(content[block_idx])
+                return message_idx
+    return None
+
+
+def find_summary_index(messages: list[dict[str, Any]]) -> Optional[int]:
+    """Return the index of the conversation summary message, if any."""
+    for idx, message in enumerate(messages):
+        for block in message["content"]:
+            text = (
+                block.get("text") if isinstance(block, dict) else getattr(block, "text", None)
+            )
+            if isinstance(text, str) and text.startswith(CONVERSATION_SUMMARY_PREFIX):
+                return idx
+    return None
+
+
+def plan_cache_breakpoints(
+    messages: list[dict[str, Any]],
+    system: Optional[str] = None,
+    tools: Optional[list[dict[str, Any]]] = None,
+) -> tuple[Any, Optional[list[dict[str, Any]]]]:
+    """Place cache breakpoints on an Anthropic request.
+
+    Args:
+        messages: Anthropic-format messages. Marked blocks are replaced by
+            marked copies in their message's content list.
+        system: The system prompt, if any.
+        tools: Anthropic-format tool definitions, if any.
+
+    Returns:
+        A tuple of the ``system`` and ``tools`` request parameters to use.
+        The system prompt is turned into a text block list so it can carry a
+        breakpoint, and the tool list is copied before its last entry is
+        marked.
+    """
+    budget = MAX_CACHE_BREAKPOINTS
+    if tools:
+        tools = [*tools[:-1], {**tools[-1], "cache_control": CACHE_CONTROL}]
+        budget -= 1
+    if system:
+        system = [{"type": "text", "text": system, "cache_control": CACHE_CONTROL}]
+        budget -= 1
+
+    candidates = []
+    summary_index = find_summary_index(messages)
+    if summary_index is not None:
+        candidates.append(summary_index)
+    if messages:
+        candidates.append(len(messages) - 1)
+        # A turn adds an assistant message and a user message
+        candidates.append(len(messages) - 3)
+
+    marked = set()
+    for idx in candidates:
+        if budget == 0:
+            break
+        if idx < 0 or idx in marked:
+            continue
+        marked_idx = _mark_at_or_before(messages, idx)
+        if marked_idx is not None and marked_idx not in marked:
+            marked.add(marked_idx)
+            budget -= 1
+    return system, tools
+
+
+@dataclass
+class TurnCacheUsage:
+    """Prompt cache usage of one LLM call."""
+
+    input_tokens: int
+    cache_read_input_tokens: int
+    cache_creation_input_tokens: int
+
+    @property
+    def total_input_tokens(self) -> int:
+        return (
+            self.input_tokens
+            + self.cache_read_input_tokens
+            + self.cache_creation_input_tokens
+        )
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of the prompt that was read from the cache."""
+        total = self.total_input_tokens
+        return self.cache_read_input_tokens / total if total else 0.0
+
+
+@dataclass
+class PromptCacheStats:
+    """Prompt cache usage of a session, per turn and in total."""
+
+    turns: list[TurnCacheUsage] = field(default_factory=list)
+
+    def record(self, metadata: Optional[dict[str, Any]]) -> Optional[TurnCacheUsage]:
+        """Record the usage reported in an LLM response's metadata.
+
+        Clients that do not report usage are ignored.
+        """
+        if not metadata or "input_tokens" not in metadata:
+            return None
+
+        def tokens(key: str) -> int:
+            # Clients report -1 when the provider returned no value
+            value = metadata.get(key) or 0
+            return max(int(value), 0)
+
+        usage = TurnCacheUsage(
+            input_tokens=tokens("input_tokens"),
+            cache_read_input_tokens=tokens("cache_read_input_tokens"),
+            cache_creation_input_tokens=tokens("cache_creation_input_tokens"),
+        )
+        self.turns.append(usage)
+        return usage
+
+    @property
+    def saved_input_tokens(self) -> int:
+        """Input tokens read from the cache instead of being processed again."""
+        return sum(turn.cache_read_input_tokens for turn in self.turns)
+
+    @property
+    def hit_rate(self) -> float:
+        total = sum(turn.total_input_tokens for turn in self.turns)
+        return self.saved_input_tokens / total if total else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "turns": len(self.turns),
+            "hit_rate": self.hit_rate,
+            "saved_input_tokens": self.saved_input_tokens,
+            "cache_creation_input_tokens": sum(
+                turn.cache_creation_input_tokens for turn in self.turns
+            ),
+            "per_turn_hit_rate": [turn.hit_rate for turn in self.turns],
+        }
@@ -0,0 +1,235 @@
+"""Scripted LLM client for replaying recorded sessions offline.
+
+`ScriptedLLMClient` answers every request with the next response of a
+script instead of calling a model, so an agent can be driven through a
+session deterministically, without network access or cost. Scripts are
+recorded sessions, read from a saved ``agent_state.json`` history or from
+the events database, or are built by hand.
+
+The client also records when each request arrived and was answered, which
+lets a benchmark attribute the time between two model calls to the agent
+loop itself (see ``benchmarks/agent_loop_benchmark.py``).
+"""
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple
+
+from pydantic import TypeAdapter
+
+from ii_agent.core.event import EventType
+from ii_agent.db.manager import Events
+from ii_agent.llm.base import (
+    AssistantContentBlock,
+    GeneralContentBlock,
+    LLMClient,
+    LLMMessages,
+    TextPrompt,
+    TextResult,
+    ToolCall,
+    ToolFormattedResult,
+    ToolParam,
+)
+
+RequestBuilder = Callable[..., Any]
+
+
+@dataclass
+class ReplayScript:
+    """A recorded session: user prompts, model responses and tool outputs.
+
+    Attributes:
+        prompts: The user prompts, one per agent run.
+        responses: The model's turns, in the order they were generated.
+        tool_outputs: Outputs of each tool, in the order it was called.
+    """
+
+    prompts: list[str] = field(default_factory=list)
+    responses: list[list[AssistantContentBlock]] = field(default_factory=list)
+    tool_outputs: dict[str, list[str | list[dict[str, Any]]]] = field(
+        default_factory=dict
+    )
+
+    @classmethod
+    def from_message_lists(
+        cls, message_lists: list[list[GeneralContentBlock]]
+    ) -> "ReplayScript":
+        """Build the script of a message history."""
+        script = cls()
+        for turn in message_lists:
+            if any(isinstance(block, ToolFormattedResult) for block in turn):
+                for block in turn:
+                    if isinstance(block, ToolFormattedResult):
+                        script.tool_outputs.setdefault(block.tool_name, []).append(
+                            block.tool_output
+                        )
+            elif any(isinstance(block, TextPrompt) for block in turn):
+                prompts = [b.text for b in turn if isinstance(b, TextPrompt)]
+                script.prompts.append(prompts[-1])
+            else:
+                script.responses.append(list(turn))
+        return script
+
+    @classmethod
+    def from_agent_state(cls, path: str | Path) -> "ReplayScript":
+        """Build the script of a history saved as ``agent_state.json``."""
+        message_lists = TypeAdapter(list[list[GeneralContentBlock]]).validate_python(
+            json.loads(Path(path).read_text())
+        )
+        return cls.from_message_lists(message_lists)
+
+    @classmethod
+    def from_session_events(cls, session_id: str) -> "ReplayScript":
+        """Build the script of a session from its events in the database.
+
+        Events do not hold the text the model wrote, so replayed turns only
+        contain the tool calls. A run ends with the text of its AGENT_RESPONSE
+        event, which is the "Task completed" placeholder rather than the
+        model's final answer.
+        """
+        script = cls()
+        pending_calls: list[AssistantContentBlock] = []
+        for event in Events.iter_session_events(
+            session_id,
+            event_types=[
+                EventType.USER_MESSAGE.value,
+                EventType.TOOL_CALL.value,
+                EventType.TOOL_RESULT.value,
+                EventType.AGENT_RESPONSE.value,
+            ],
+        ):
+            event_type = event["event_type"]
+            content = event["event_payload"]["content"]
+            if event_type == EventType.TOOL_CALL.value:
+                pending_calls.append(
+                    ToolCall(
+                        tool_call_id=content["tool_call_id"],
+                        tool_name=content["tool_name"],
+                        tool_input=content["tool_input"],
+                    )
+                )
+                continue
+            if pending_calls:
+                script.responses.append(pending_calls)
+                pending_calls = []
+            if event_type == EventType.USER_MESSAGE.value:
+                script.prompts.append(content["text"])
+            elif event_type == EventType.TOOL_RESULT.value:
+                script.tool_outputs.setdefault(content["tool_name"], []).append(
+                    content["result"]
+                )
+            else:
+                script.responses.append([TextResult(text=content["text"])])
+        if pending_calls:
+            script.responses.append(pending_calls)
+        return script
+
+
+@dataclass
+class ScriptedCall:
+    """Timing of one request answered by a `ScriptedLLMClient`."""
+
+    started: float
+    finished: float
+    request_seconds: float
+    messages: int
+
+
+class ScriptedLLMClient(LLMClient):
+    """Answers requests with the responses of a script, in order."""
+
+    model_name = "scripted"
+    provider = "scripted"
+
+    def __init__(
+        self,
+        responses: list[list[AssistantContentBlock]],
+        latency: float = 0.0,
+        build_request: Optional[RequestBuilder] = None,
+    ):
+        """Initialize the client.
+
+        Args:
+            responses: The model turns to return. Once they are used up, every
+                request gets an empty response, which ends the agent's run.
+            latency: Seconds to wait before answering, as a stand-in for the
+                model's generation time.
+            build_request: Optional provider request builder, called with the
+                keyword arguments ``messages``, ``max_tokens``,
+                ``system_prompt`` and ``tools`` for every request, so the cost
+                of converting the history is paid as with a real client.
+        """
+        self.responses = list(responses)
+        self.latency = latency
+        self.build_request = build_request
+        self.calls: list[ScriptedCall] = []
+
+    def _respond(
+        self,
+        messages: LLMMessages,
+        max_tokens: int,
+        system_prompt: str | None,
+        tools: list[ToolParam],
+    ) -> Tuple[list[AssistantContentBlock], float, float]:
+        started = time.perf_counter()
+        if self.build_request is not None:
+            self.build_request(
+                messages=messages,
+                max_tokens=max_tokens,
+                system_prompt=system_prompt,
+                tools=tools,
+            )
+        request_seconds = time.perf_counter() - started
+        index = len(self.calls)
+        response = list(self.responses[index]) if index < len(self.responses) else []
+        return response, started, request_seconds
+
+    def _record(self, started: float, request_seconds: float, messages: LLMMessages):
+        self.calls.append(
+            ScriptedCall(
+                started=started,
+                finished=time.perf_counter(),
+                request_seconds=request_seconds,
+                messages=len(messages),
+            )
+        )
+
+    def generate(
+        self,
+        messages: LLMMessages,
+        max_tokens: int,
+        system_prompt: str | None = None,
+        temperature: float = 0.0,
+        tools: list[ToolParam] = [],
+        tool_choice: dict[str, str] | None = None,
+        thinking_tokens: int | None = None,
+    ) -> Tuple[list[AssistantContentBlock], dict[str, Any]]:
+        response, started, request_seconds = self._respond(
+            messages, max_tokens, system_prompt, tools
+        )
+        if self.latency:
+            time.sleep(self.latency)
+        self._record(started, request_seconds, messages)
+        return response, {}
+
+    async def agenerate(
+        self,
+        messages: LLMMessages,
+        max_tokens: int,
+        system_prompt: str | None = None,
+        temperature: float = 0.0,
+        tools: list[ToolParam] = [],
+        tool_choice: dict[str, str] | None = None,
+        thinking_tokens: int | None = None,
+    ) -> Tuple[list[AssistantContentBlock], dict[str, Any]]:
+        # Answered on the loop: a worker thread would add its own overhead
+        response, started, request_seconds = self._respond(
+            messages, max_tokens, system_prompt, tools
+        )
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self._record(started, request_seconds, messages)
+        return response, {}
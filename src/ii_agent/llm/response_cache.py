@@ -0,0 +1,404 @@
+"""Request-keyed cache of model responses, for rerunning evaluations.
+
+`CachedLLMClient` wraps any `LLMClient` and keys every request by a hash of
+everything that determines the response: provider, model, system prompt,
+tool schemas, messages and sampling parameters. Depending on its mode it
+records responses to an on-disk `LLMResponseCache`, replays them without
+calling the model, or passes requests straight through.
+
+Rerunning an evaluation in record mode only pays for the requests that
+changed; replay mode makes a rerun fully offline and deterministic, and
+fails loudly on a request that was never recorded.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from enum import Enum
+from typing import Any, Callable, Optional, Tuple
+
+from ii_agent.llm.base import (
+    AnthropicRedactedThinkingBlock,
+    AnthropicThinkingBlock,
+    AssistantContentBlock,
+    LLMClient,
+    LLMMessages,
+    StreamCallback,
+    StreamDelta,
+    TextResult,
+    ToolCall,
+    ToolParam,
+)
+from ii_agent.utils.constants import (
+    LLM_RESPONSE_CACHE_MAX_BYTES,
+    LLM_RESPONSE_CACHE_PATH,
+)
+
+logger = logging.getLogger(__name__)
+
+# System prompts state the current date ("Today is 2025-06-01."), which
+# would otherwise make every recording stale the next day
+_PROMPT_DATE = re.compile(r"\bToday is \d{4}-\d{2}-\d{2}\b")
+
+
+class ResponseCacheMode(str, Enum):
+    """How a `CachedLLMClient` uses its cache.
+
+    RECORD serves recorded responses and records the others, REPLAY only
+    serves recorded responses, PASSTHROUGH neither reads nor writes.
+    """
+
+    RECORD = "record"
+    REPLAY = "replay"
+    PASSTHROUGH = "passthrough"
+
+
+class ResponseCacheMiss(LookupError):
+    """Raised in replay mode for a request that was never recorded."""
+
+
+def _encode_block(block: Any) -> dict[str, Any]:
+    if hasattr(block, "to_dict"):
+        data = block.to_dict()
+    else:
+        data = block.model_dump(mode="json")
+    return {"block": type(block).__name__, **data}
+
+
+def _decode_block(data: dict[str, Any]) -> AssistantContentBlock:
+    data = dict(data)
+    kind = data.pop("block")
+    if kind == "TextResult":
+        return TextResult.from_dict(data)
+    if kind == "ToolCall":
+        return ToolCall.from_dict(data)
+    if kind == "ThinkingBlock":
+        return AnthropicThinkingBlock(**data)
+    if kind == "RedactedThinkingBlock":
+        return AnthropicRedactedThinkingBlock(**data)
+    raise ValueError(f"Unknown cached block type: {kind}")
+
+
+def request_key(
+    provider: str,
+    model_name: str,
+    messages: LLMMessages,
+    max_tokens: int,
+    system_prompt: str | None,
+    temperature: float,
+    tools: list[ToolParam],
+    tool_choice: dict[str, str] | None,
+    thinking_tokens: int | None,
+) -> str:
+    """Hash everything that determines the response to a request.
+
+    The current date in the system prompt is left out, so that a recording
+    can be replayed on a later day.
+    """
+    if system_prompt is not None:
+        system_prompt = _PROMPT_DATE.sub("Today is <date>", system_prompt)
+    request = {
+        "provider": provider,
+        "model": model_name,
+        "system_prompt": system_prompt,
+        "tools": [tool.to_dict() for tool in tools],
+        "messages": [[_encode_block(block) for block in turn] for turn in messages],
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+        "tool_choice": tool_choice,
+        "thinking_tokens": thinking_tokens,
+    }
+    encoded = json.dumps(
+        request, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Model responses stored in SQLite, keyed by request hash.
+
+    Once the stored responses take more than ``max_bytes``, the least
+    recently used ones are evicted. Entries do not expire: a recorded
+    response stays valid for as long as the request is unchanged.
+    """
+
+    def __init__(
+        self,
+        path: str = LLM_RESPONSE_CACHE_PATH,
+        max_bytes: int = LLM_RESPONSE_CACHE_MAX_BYTES,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = os.path.expanduser(path)
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._connection = sqlite3.connect(
+            self.path, check_same_thread=False, timeout=5.0
+        )
+        with self._lock, self._connection:
+            if self.path != ":memory:":
+                self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_llm_responses_last_accessed_at "
+                "ON llm_responses (last_accessed_at)"
+            )
+
+    def get(
+        self, key: str
+    ) -> Optional[Tuple[list[AssistantContentBlock], dict[str, Any]]]:
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT response FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._connection.execute(
+                "UPDATE llm_responses SET last_accessed_at = ? WHERE key = ?",
+                (self.clock(), key),
+            )
+            self.hits += 1
+        entry = json.loads(row[0])
+        return [_decode_block(block) for block in entry["blocks"]], entry["metadata"]
+
+    def put(
+        self,
+        key: str,
+        model: str,
+        response: list[AssistantContentBlock],
+        metadata: dict[str, Any],
+    ) -> None:
+        encoded = json.dumps(
+            {
+                "blocks": [_encode_block(block) for block in response],
+                "metadata": metadata,
+            },
+            default=str,
+        )
+        size = len(encoded.encode())
+        now = self.clock()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO llm_responses "
+                "(key, model, response, size, created_at, last_accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, encoded, size, now, now),
+            )
+            (total,) = self._connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM llm_responses"
+            ).fetchone()
+            if total <= self.max_bytes:
+                return
+            evicted = []
+            for old_key, old_size in self._connection.execute(
+                "SELECT key, size FROM llm_responses ORDER BY last_accessed_at, rowid"
+            ):
+                if total <= self.max_bytes:
+                    break
+                evicted.append((old_key,))
+                total -= old_size
+            self._connection.executemany(
+                "DELETE FROM llm_responses WHERE key = ?", evicted
+            )
+            self.evictions += len(evicted)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            entries, size = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_responses"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class CachedLLMClient(LLMClient):
+    """
+    Serves repeated requests from an `LLMResponseCache` instead of the model.
+
+    Failed requests are not cached. Responses served from the cache report
+    ``{"response_cache_hit": True}`` as metadata, without token counts, so
+    usage accounting only counts the tokens that were paid for.
+    """
+
+    def __init__(
+        self,
+        client: LLMClient,
+        mode: ResponseCacheMode | str = ResponseCacheMode.RECORD,
+        cache: Optional[LLMResponseCache] = None,
+    ):
+        self.client = client
+        self.mode = ResponseCacheMode(mode)
+        self._cache = cache
+        self.model_name = client.model_name
+        self.provider = client.provider
+
+    def __getattr__(self, name: str) -> Any:
+        # Client-specific attributes, e.g. thinking_tokens, come from the
+        # wrapped client
+        if name == "client":
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+    @property
+    def cache(self) -> LLMResponseCache:
+        # Resolved on first request so that creating clients does not touch disk
+        if self._cache is None:
+            self._cache = get_llm_response_cache()
+        return self._cache
+
+    def _lookup(
+        self, **request: Any
+    ) -> Tuple[str, Optional[Tuple[list[AssistantContentBlock], dict[str, Any]]]]:
+        key = request_key(self.provider, self.model_name, **request)
+        cached = self.cache.get(key)
+        if cached is None:
+            if self.mode == ResponseCacheMode.REPLAY:
+                raise ResponseCacheMiss(
+                    f"No recorded response for {self.model_name} request {key}"
+                )
+            return key, None
+        logger.debug(f"LLM response cache hit for {self.model_name} request {key}")
+        return key, (cached[0], {"response_cache_hit": True})
+
+    def _store(
+        self,
+        key: str,
+        response: list[AssistantContentBlock],
+        metadata: dict[str, Any],
+    ) -> None:
+        self.cache.put(key, self.model_name, response, metadata)
+
+    def generate(
+        self,
+        messages: LLMMessages,
+        max_tokens: int,
+        system_prompt: str | None = None,
+        temperature: float = 0.0,
+        tools: list[ToolParam] = [],
+        tool_choice: dict[str, str] | None = None,
+        thinking_tokens: int | None = None,
+    ) -> Tuple[list[AssistantContentBlock], dict[str, Any]]:
+        request = dict(
+            messages=messages,
+            max_tokens=max_tokens,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            tools=tools,
+            tool_choice=tool_choice,
+            thinking_tokens=thinking_tokens,
+        )
+        if self.mode == ResponseCacheMode.PASSTHROUGH:
+            return self.client.generate(**request)
+        key, cached = self._lookup(**request)
+        if cached is not None:
+            return cached
+        response, metadata = self.client.generate(**request)
+        self._store(key, response, metadata)
+        return response, metadata
+
+    async def agenerate(
+        self,
+        messages: LLMMessages,
+        max_tokens: int,
+        system_prompt: str | None = None,
+        temperature: float = 0.0,
+        tools: list[ToolParam] = [],
+        tool_choice: dict[str, str] | None = None,
+        thinking_tokens: int | None = None,
+    ) -> Tuple[list[AssistantContentBlock], dict[str, Any]]:
+        request = dict(
+            messages=messages,
+            max_tokens=max_tokens,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            tools=tools,
+            tool_choice=tool_choice,
+            thinking_tokens=thinking_tokens,
+        )
+        if self.mode == ResponseCacheMode.PASSTHROUGH:
+            return await self.client.agenerate(**request)
+        # Hashing a long history and SQLite calls are kept off the event loop
+        key, cached = await asyncio.to_thread(self._lookup, **request)
+        if cached is not None:
+            return cached
+        response, metadata = await self.client.agenerate(**request)
+        await asyncio.to_thread(self._store, key, response, metadata)
+        return response, metadata
+
+    async def agenerate_stream(
+        self,
+        messages: LLMMessages,
+        max_tokens: int,
+        on_delta: StreamCallback,
+        system_prompt: str | None = None,
+        temperature: float = 0.0,
+        tools: list[ToolParam] = [],
+        tool_choice: dict[str, str] | None = None,
+        thinking_tokens: int | None = None,
+    ) -> Tuple[list[AssistantContentBlock], dict[str, Any]]:
+        request = dict(
+            messages=messages,
+            max_tokens=max_tokens,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            tools=tools,
+            tool_choice=tool_choice,
+            thinking_tokens=thinking_tokens,
+        )
+        if self.mode == ResponseCacheMode.PASSTHROUGH:
+            return await self.client.agenerate_stream(on_delta=on_delta, **request)
+        key, cached = await asyncio.to_thread(self._lookup, **request)
+        if cached is not None:
+            for index, block in enumerate(cached[0]):
+                if isinstance(block, TextResult):
+                    on_delta(StreamDelta(type="text", delta=block.text, index=index))
+            return cached
+        response, metadata = await self.client.agenerate_stream(
+            on_delta=on_delta, **request
+        )
+        await asyncio.to_thread(self._store, key, response, metadata)
+        return response, metadata
+
+
+_llm_response_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_response_cache() -> LLMResponseCache:
+    """Return the process-wide on-disk LLM response cache."""
+    global _llm_response_cache
+    if _llm_response_cache is None:
+        _llm_response_cache = LLMResponseCache()
+    return _llm_response_cache
@@ -4,6 +4,8 @@ from typing import Any, Union
 from PIL import Image
 import io
 
+from ii_agent.core.storage.blobs import BLOB_SOURCE_TYPE, get_blob_store
+
 
 class TokenCounter:
     def count_tokens(self, prompt_chars: Union[str, list[dict[str, Any]]]) -> int:
@@ -15,8 +17,12 @@ class TokenCounter:
                 if item.get("type") == "image" and "source" in item:
                     # For images, calculate tokens based on image dimensions
                     try:
-                        # Decode base64 image data
-                        image_data = base64.b64decode(item["source"]["data"])
+                        source = item["source"]
+                        if source.get("type") == BLOB_SOURCE_TYPE:
+                            image_data = get_blob_store().get(source["digest"])
+                        else:
+                            # Decode base64 image data
+                            image_data = base64.b64decode(source["data"])
                         # Open image to get dimensions
                         with Image.open(io.BytesIO(image_data)) as img:
                             width, height = img.size
@@ -0,0 +1,242 @@
+"""Per-session accounting of LLM calls.
+
+Every model call made for a session (agent turns, context summaries, prompt
+enhancement, sub-agents) is timed with an `LLMCallTimer` and recorded, with
+the token counts the client reports in its response metadata, in the
+session's `UsageLedger`. The ledger keeps the calls in memory and writes
+them to the events database, so usage can be aggregated per session and per
+evaluation run later.
+
+The ledger of the code currently running is held in a context variable and
+set with `use_usage_ledger`, so calls made deep inside shared components,
+such as a context manager used by several agents, are attributed to the
+session that triggered them.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import enum
+import logging
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Any, Iterable, Iterator, Optional
+
+from ii_agent.core.metrics import DB_WRITE_DURATION, LLM_CALL_DURATION
+from ii_agent.core.tracing import set_span_attributes
+from ii_agent.db.manager import LLMUsageEntries
+from ii_agent.llm.base import StreamCallback, StreamDelta
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_read_input_tokens",
+    "cache_creation_input_tokens",
+)
+
+
+class LLMCallPurpose(str, enum.Enum):
+    """Why an LLM call was made."""
+
+    MAIN = "main"
+    SUMMARY = "summary"
+    ENHANCEMENT = "enhancement"
+    AUXILIARY = "auxiliary"
+
+
+@dataclass
+class LLMCallUsage:
+    """Latency and token usage of one LLM call."""
+
+    model: str
+    purpose: str
+    latency_ms: float
+    ttfb_ms: Optional[float] = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class UsageLedger:
+    """LLM calls made for one session, kept in memory and persisted."""
+
+    def __init__(
+        self, session_id: Optional[uuid.UUID] = None, run_id: Optional[str] = None
+    ):
+        """Initialize the ledger.
+
+        Args:
+            session_id: The session the calls are made for. Without one the
+                calls are only kept in memory.
+            run_id: Optional identifier of the run the session belongs to
+        """
+        self.session_id = session_id
+        self.run_id = run_id
+        self.calls: list[LLMCallUsage] = []
+
+    def record(self, usage: LLMCallUsage) -> None:
+        """Record a call, writing it to the database on the calling thread."""
+        self.calls.append(usage)
+        self._persist(usage)
+
+    async def arecord(self, usage: LLMCallUsage) -> None:
+        """Record a call, writing it to the database off the event loop."""
+        self.calls.append(usage)
+        await asyncio.to_thread(self._persist, usage)
+
+    def _persist(self, usage: LLMCallUsage) -> None:
+        if self.session_id is None:
+            return
+        try:
+            with DB_WRITE_DURATION.time(table="llm_usage"):
+                LLMUsageEntries.save_usage(
+                    self.session_id, usage.to_dict(), self.run_id
+                )
+        except Exception as e:
+            # Accounting must never fail the call it accounts for
+            logger.error(f"Failed to save LLM usage for {self.session_id}: {e}")
+
+    def summary(self) -> dict[str, Any]:
+        """Aggregate the recorded calls, see `summarize_usage`."""
+        return summarize_usage(usage.to_dict() for usage in self.calls)
+
+
+def summarize_usage(calls: Iterable[dict[str, Any]]) -> dict[str, Any]:
+    """Aggregate LLM calls in total, per purpose and per model.
+
+    Args:
+        calls: Usage dictionaries, as produced by `LLMCallUsage.to_dict` or
+            read back from the database.
+
+    Returns:
+        Call count, token totals and mean latency and time to first byte in
+        total, with the same figures under ``by_purpose`` and ``by_model``.
+    """
+    calls = list(calls)
+
+    def aggregate(group: list[dict[str, Any]]) -> dict[str, Any]:
+        ttfbs = [call["ttfb_ms"] for call in group if call.get("ttfb_ms") is not None]
+        totals: dict[str, Any] = {
+            "calls": len(group),
+            "total_latency_ms": sum(call["latency_ms"] for call in group),
+            "mean_latency_ms": (
+                sum(call["latency_ms"] for call in group) / len(group) if group else 0.0
+            ),
+            "mean_ttfb_ms": sum(ttfbs) / len(ttfbs) if ttfbs else None,
+        }
+        for field in _TOKEN_FIELDS:
+            totals[field] = sum(call.get(field) or 0 for call in group)
+        return totals
+
+    def group_by(key: str) -> dict[str, dict[str, Any]]:
+        groups: dict[str, list[dict[str, Any]]] = {}
+        for call in calls:
+            groups.setdefault(call[key], []).append(call)
+        return {name: aggregate(group) for name, group in groups.items()}
+
+    return {
+        **aggregate(calls),
+        "by_purpose": group_by("purpose"),
+        "by_model": group_by("model"),
+    }
+
+
+_ledger: contextvars.ContextVar[Optional[UsageLedger]] = contextvars.ContextVar(
+    "usage_ledger", default=None
+)
+
+
+def current_usage_ledger() -> Optional[UsageLedger]:
+    """Return the ledger LLM calls are currently recorded in, if any."""
+    return _ledger.get()
+
+
+@contextlib.contextmanager
+def use_usage_ledger(ledger: UsageLedger) -> Iterator[UsageLedger]:
+    """Record the LLM calls made inside the block, and in tasks it starts, in ``ledger``."""
+    token = _ledger.set(ledger)
+    try:
+        yield ledger
+    finally:
+        _ledger.reset(token)
+
+
+class LLMCallTimer:
+    """Times one LLM call and records its usage in the current ledger."""
+
+    def __init__(
+        self, model: str, purpose: LLMCallPurpose | str, provider: str = "unknown"
+    ):
+        self.model = model
+        self.purpose = LLMCallPurpose(purpose).value
+        self.provider = provider
+        self.started = time.monotonic()
+        self.first_byte: Optional[float] = None
+
+    def stream_callback(self, on_delta: StreamCallback) -> StreamCallback:
+        """Wrap a stream callback to note when the first delta arrives."""
+
+        def callback(delta: StreamDelta) -> None:
+            if self.first_byte is None:
+                self.first_byte = time.monotonic()
+            on_delta(delta)
+
+        return callback
+
+    def usage(self, metadata: Optional[dict[str, Any]]) -> LLMCallUsage:
+        """Build the usage of the finished call from its response metadata."""
+        metadata = metadata or {}
+        tokens = {
+            # Clients report -1 or None when the provider returned no value
+            field: max(int(metadata.get(field) or 0), 0)
+            for field in _TOKEN_FIELDS
+        }
+        return LLMCallUsage(
+            model=self.model,
+            purpose=self.purpose,
+            latency_ms=(time.monotonic() - self.started) * 1000,
+            ttfb_ms=(
+                (self.first_byte - self.started) * 1000
+                if self.first_byte is not None
+                else None
+            ),
+            **tokens,
+        )
+
+    def finish(self, metadata: Optional[dict[str, Any]]) -> LLMCallUsage:
+        """Record the finished call in the current ledger, if any."""
+        usage = self.usage(metadata)
+        self._report(usage)
+        ledger = current_usage_ledger()
+        if ledger is not None:
+            ledger.record(usage)
+        return usage
+
+    async def afinish(self, metadata: Optional[dict[str, Any]]) -> LLMCallUsage:
+        """Async counterpart of `finish` that does not block the event loop."""
+        usage = self.usage(metadata)
+        self._report(usage)
+        ledger = current_usage_ledger()
+        if ledger is not None:
+            await ledger.arecord(usage)
+        return usage
+
+    def _report(self, usage: LLMCallUsage) -> None:
+        """Add the call to the current span and the latency metrics."""
+        set_span_attributes(
+            **{field: getattr(usage, field) for field in _TOKEN_FIELDS},
+            ttfb_ms=usage.ttfb_ms if usage.ttfb_ms is not None else -1.0,
+        )
+        LLM_CALL_DURATION.observe(
+            usage.latency_ms / 1000,
+            provider=self.provider,
+            model=self.model,
+            purpose=self.purpose,
+        )
@@ -1,3 +1,11 @@
+from dataclasses import replace
+
+from ii_agent.core.storage.blobs import (
+    BLOB_SOURCE_TYPE,
+    BlobStore,
+    get_blob_store,
+    has_blob_reference,
+)
 from ii_agent.llm.base import (
     GeneralContentBlock,
     LLMMessages,
@@ -14,6 +22,51 @@ from anthropic.types import (
 from copy import deepcopy
 
 
+def resolve_blob_references(
+    messages: LLMMessages, blob_store: BlobStore | None = None
+) -> LLMMessages:
+    """Inline the blob-referenced images of `messages` for an LLM request.
+
+    Only turns that hold a reference are copied; the history itself keeps the
+    references, so the base64 data lives only as long as the request.
+    """
+    blob_store = blob_store or get_blob_store()
+    resolved_messages = []
+    for message_list in messages:
+        if not turn_has_blob_reference(message_list):
+            resolved_messages.append(message_list)
+            continue
+        resolved_list = []
+        for message in message_list:
+            if isinstance(message, ImageBlock) and _is_blob_reference(message):
+                message = replace(
+                    message, source=blob_store.resolve_image_source(message.source)
+                )
+            elif isinstance(message, ToolFormattedResult) and _is_blob_reference(
+                message
+            ):
+                message = replace(
+                    message,
+                    tool_output=blob_store.resolve_tool_output(message.tool_output),
+                )
+            resolved_list.append(message)
+        resolved_messages.append(resolved_list)
+    return resolved_messages
+
+
+def turn_has_blob_reference(message_list: list[GeneralContentBlock]) -> bool:
+    """Whether any block of a turn refers to a blob."""
+    return any(_is_blob_reference(message) for message in message_list)
+
+
+def _is_blob_reference(message: GeneralContentBlock) -> bool:
+    if isinstance(message, ImageBlock):
+        return message.source.get("type") == BLOB_SOURCE_TYPE
+    if isinstance(message, ToolFormattedResult):
+        return has_blob_reference(message.tool_output)
+    return False
+
+
 def _hide_base64_image_from_tool_output(tool_output: list[dict]) -> list[dict]:
     """Hide the base64 image from the tool output.
 
@@ -4,5 +4,16 @@ REST API endpoints.
 
 from .upload import upload_router
 from .sessions import sessions_router
+from .blobs import blobs_router
+from .admin import admin_router
+from .usage import usage_router
+from .metrics import metrics_router
 
-__all__ = ["upload_router", "sessions_router"]
+__all__ = [
+    "upload_router",
+    "sessions_router",
+    "blobs_router",
+    "admin_router",
+    "usage_router",
+    "metrics_router",
+]
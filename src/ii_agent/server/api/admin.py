@@ -0,0 +1,27 @@
+"""
+Admin API endpoints.
+"""
+
+import logging
+
+from fastapi import APIRouter
+
+from ii_agent.core.loop_monitor import get_loop_monitor
+
+logger = logging.getLogger(__name__)
+
+admin_router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+
+@admin_router.get("/loop-lag")
+async def get_loop_lag():
+    """Get event loop lag statistics and recent blocking reports.
+
+    Each report holds how long the loop was blocked, the session, tool or LLM
+    call it is attributed to and, if it was caught in the act, the stack of
+    the blocking code.
+
+    Returns:
+        Lag statistics and the most recent reports, newest first
+    """
+    return get_loop_monitor().stats()
@@ -0,0 +1,60 @@
+"""
+Blob API endpoints.
+"""
+
+import asyncio
+import logging
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response
+
+from ii_agent.core.storage.blobs import get_blob_store
+
+logger = logging.getLogger(__name__)
+
+blobs_router = APIRouter(prefix="/api", tags=["blobs"])
+
+_MAGIC_NUMBERS = [
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+]
+
+
+def _sniff_media_type(data: bytes) -> str:
+    for magic, media_type in _MAGIC_NUMBERS:
+        if data.startswith(magic):
+            return media_type
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+@blobs_router.get("/blobs/{digest}")
+async def get_blob(digest: str):
+    """Get the content of a blob referenced from events or message history.
+
+    Blobs are content-addressed, so responses can be cached indefinitely.
+
+    Args:
+        digest: The SHA-256 hex digest of the blob
+
+    Returns:
+        The raw blob bytes
+    """
+    try:
+        data = await asyncio.to_thread(get_blob_store().get, digest)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid blob digest")
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Blob not found")
+
+    return Response(
+        content=data,
+        media_type=_sniff_media_type(data),
+        headers={
+            "Cache-Control": "public, max-age=31536000, immutable",
+            "ETag": f'"{digest}"',
+        },
+    )
@@ -0,0 +1,21 @@
+"""
+Prometheus metrics endpoint.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from ii_agent.core.metrics import CONTENT_TYPE, REGISTRY
+
+metrics_router = APIRouter(tags=["metrics"])
+
+
+@metrics_router.get("/metrics")
+async def get_metrics():
+    """Get operational metrics in the Prometheus text format.
+
+    Reports open connections, running agent tasks and queued messages per
+    session, latency histograms of LLM calls, tools, context summaries,
+    database writes and event loop lag, and LLM retry counts.
+    """
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
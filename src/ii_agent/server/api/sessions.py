@@ -2,8 +2,13 @@
 Session management API endpoints.
 """
 
+import base64
+import json
 import logging
-from fastapi import APIRouter, HTTPException
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
 from ii_agent.db.manager import Events, Sessions
 from ..models.messages import SessionResponse, EventResponse, SessionInfo, EventInfo
@@ -12,6 +17,27 @@ logger = logging.getLogger(__name__)
 
 sessions_router = APIRouter(prefix="/api", tags=["sessions"])
 
+MAX_EVENTS_PAGE_SIZE = 1000
+
+
+def _encode_cursor(event: dict) -> str:
+    """Encode the (timestamp, id) position of an event as an opaque cursor."""
+    raw = f"{event['timestamp']}|{event['id']}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """Decode a cursor produced by `_encode_cursor`.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        timestamp, event_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(timestamp), event_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 
 @sessions_router.get("/sessions/{device_id}", response_model=SessionResponse)
 def get_sessions_by_device_id(device_id: str):
@@ -36,23 +62,69 @@ def get_sessions_by_device_id(device_id: str):
 
 
 @sessions_router.get("/sessions/{session_id}/events", response_model=EventResponse)
-def get_session_events(session_id: str):
-    """Get all events for a specific session ID, sorted by timestamp ascending.
+def get_session_events(
+    session_id: str,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_EVENTS_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    event_type: Optional[List[str]] = Query(None),
+):
+    """Get events for a specific session ID, sorted by timestamp ascending.
+
+    Without ``limit`` all events are returned. With ``limit`` one page is
+    returned, and ``next_cursor`` is set when more events may follow; pass it
+    back as ``cursor`` to get the next page.
 
     Args:
         session_id: The session identifier to look up events for
+        limit: Maximum number of events to return
+        cursor: Position to resume from, taken from a previous ``next_cursor``
+        event_type: Only return events of these types (repeatable)
 
     Returns:
         A list of events with their details, sorted by timestamp ascending
     """
+    after = _decode_cursor(cursor) if cursor else None
     try:
-        events_raw = Events.get_session_events_with_details(session_id)
+        events_raw = Events.get_session_events_page(
+            session_id, limit=limit, after=after, event_types=event_type
+        )
         events = [EventInfo(**event) for event in events_raw]
-        return EventResponse(events=events)
-        
+        next_cursor = None
+        if limit is not None and len(events_raw) == limit:
+            next_cursor = _encode_cursor(events_raw[-1])
+        return EventResponse(events=events, next_cursor=next_cursor)
 
     except Exception as e:
         logger.error(f"Error retrieving events: {str(e)}")
         raise HTTPException(
             status_code=500, detail=f"Error retrieving events: {str(e)}"
         )
+
+
+@sessions_router.get("/sessions/{session_id}/events/stream")
+def stream_session_events(
+    session_id: str,
+    event_type: Optional[List[str]] = Query(None),
+):
+    """Stream all events of a session as newline-delimited JSON.
+
+    Events are read from the database page by page while the response is
+    being sent, so memory use does not grow with the size of the session.
+
+    Args:
+        session_id: The session identifier to look up events for
+        event_type: Only return events of these types (repeatable)
+
+    Returns:
+        An ``application/x-ndjson`` response with one event object per line
+    """
+
+    def generate():
+        try:
+            for event in Events.iter_session_events(session_id, event_types=event_type):
+                yield json.dumps(event) + "\n"
+        except Exception as e:
+            logger.error(f"Error streaming events: {str(e)}")
+            raise
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
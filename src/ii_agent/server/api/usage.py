@@ -0,0 +1,62 @@
+"""
+LLM usage API endpoints.
+"""
+
+import logging
+
+from fastapi import APIRouter, HTTPException
+
+from ii_agent.db.manager import LLMUsageEntries
+from ii_agent.llm.usage import summarize_usage
+
+logger = logging.getLogger(__name__)
+
+usage_router = APIRouter(prefix="/api", tags=["usage"])
+
+
+@usage_router.get("/sessions/{session_id}/usage")
+def get_session_usage(session_id: str):
+    """Get the LLM calls of a session and their aggregated usage.
+
+    Args:
+        session_id: The session identifier to look up usage for
+
+    Returns:
+        The aggregated usage under ``summary`` and every call, oldest first,
+        under ``calls``
+    """
+    try:
+        calls = LLMUsageEntries.get_usage(session_id=session_id)
+    except Exception as e:
+        logger.error(f"Error retrieving usage: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error retrieving usage: {str(e)}")
+    return {"session_id": session_id, "summary": summarize_usage(calls), "calls": calls}
+
+
+@usage_router.get("/runs/{run_id}/usage")
+def get_run_usage(run_id: str):
+    """Get the aggregated LLM usage of a run, such as a GAIA evaluation.
+
+    Args:
+        run_id: The run identifier, e.g. the GAIA run name
+
+    Returns:
+        The aggregated usage of the run under ``summary``, and per session
+        under ``sessions``
+    """
+    try:
+        calls = LLMUsageEntries.get_usage(run_id=run_id)
+    except Exception as e:
+        logger.error(f"Error retrieving usage: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error retrieving usage: {str(e)}")
+    sessions: dict[str, list[dict]] = {}
+    for call in calls:
+        sessions.setdefault(call["session_id"], []).append(call)
+    return {
+        "run_id": run_id,
+        "summary": summarize_usage(calls),
+        "sessions": {
+            session_id: summarize_usage(session_calls)
+            for session_id, session_calls in sessions.items()
+        },
+    }
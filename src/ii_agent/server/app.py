@@ -1,14 +1,33 @@
+import asyncio
 import logging
 from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 import os
 from fastapi.staticfiles import StaticFiles
 
-from ii_agent.core.storage import get_file_store
-from .api import upload_router, sessions_router
+from ii_agent.browser.pool import aclose_browser_pool, get_browser_pool
+from ii_agent.core.storage import BlobStore, get_file_store, set_blob_store
+from .api import (
+    upload_router,
+    sessions_router,
+    blobs_router,
+    admin_router,
+    usage_router,
+    metrics_router,
+)
 from ii_agent.server.websocket import ConnectionManager
 from ii_agent.server.factories import AgentFactory, AgentConfig, ClientFactory
 from ii_agent.core.config.utils import load_ii_agent_config
+from ii_agent.core.loop_monitor import get_loop_monitor
+from ii_agent.core.metrics import (
+    ACTIVE_CONNECTIONS,
+    MESSAGE_QUEUE_DEPTH,
+    RUNNING_AGENT_TASKS,
+)
+from ii_agent.core.tracing import configure_tracing, shutdown_tracing
+from ii_agent.db.event_sink import flush_all_event_sinks
+from ii_agent.llm.http_client import aclose_async_http_client
+from ii_agent.tools.http_session import aclose_aiohttp_session
 
 logger = logging.getLogger(__name__)
 
@@ -51,20 +70,33 @@ def create_app(args, client_kwargs: dict | None = None) -> FastAPI:
     )
     agent_factory = AgentFactory(agent_config)
 
+    file_store = get_file_store(
+        ii_agent_config.file_store, ii_agent_config.file_store_path
+    )
+    # Images in history and events are stored once, next to the agent state
+    set_blob_store(BlobStore(file_store))
+
     # Create connection manager with injected dependencies
     connection_manager = ConnectionManager(
         workspace_root=args.workspace,
         use_container_workspace=args.use_container_workspace,
         client_factory=client_factory,
         agent_factory=agent_factory,
-        file_store=get_file_store(
-            ii_agent_config.file_store, ii_agent_config.file_store_path
-        ),
+        file_store=file_store,
     )
 
+    # Server state is read by the /metrics endpoint when it is scraped
+    ACTIVE_CONNECTIONS.set_function(connection_manager.get_connection_count)
+    RUNNING_AGENT_TASKS.set_function(connection_manager.get_running_task_count)
+    MESSAGE_QUEUE_DEPTH.set_function(connection_manager.get_message_queue_depths)
+
     # Include API routers
     app.include_router(upload_router)
     app.include_router(sessions_router)
+    app.include_router(blobs_router)
+    app.include_router(admin_router)
+    app.include_router(usage_router)
+    app.include_router(metrics_router)
 
     # Setup workspace static files
     setup_workspace(app, args.workspace)
@@ -75,6 +107,46 @@ def create_app(args, client_kwargs: dict | None = None) -> FastAPI:
         session = await connection_manager.connect(websocket)
         await session.start_chat_loop()
 
+    @app.on_event("startup")
+    async def start_tracing():
+        configure_tracing(
+            getattr(args, "trace_file", None), getattr(args, "otlp_endpoint", None)
+        )
+
+    @app.on_event("startup")
+    async def start_loop_monitor():
+        get_loop_monitor().start()
+
+    @app.on_event("startup")
+    async def warm_browser_pool():
+        # Chromium starts in the background rather than delaying startup
+        app.state.browser_pool_warmup = asyncio.create_task(get_browser_pool().start())
+
+    @app.on_event("shutdown")
+    async def close_browser_pool():
+        await aclose_browser_pool()
+
+    @app.on_event("shutdown")
+    async def stop_loop_monitor():
+        await get_loop_monitor().stop()
+
+    @app.on_event("shutdown")
+    async def close_llm_http_client():
+        await aclose_async_http_client()
+
+    @app.on_event("shutdown")
+    async def close_web_tools_http_session():
+        await aclose_aiohttp_session()
+
+    @app.on_event("shutdown")
+    async def flush_event_sinks():
+        await flush_all_event_sinks()
+
+    @app.on_event("shutdown")
+    async def stop_tracing():
+        # Exports the remaining spans, possibly over the network
+        await asyncio.to_thread(shutdown_tracing)
+
     return app
 
 
@@ -7,6 +7,7 @@ from fastapi import WebSocket
 from ii_agent.core.storage.files import FileStore
 from ii_agent.llm.base import LLMClient
 from ii_agent.llm.message_history import MessageHistory
+from ii_agent.llm.image_eviction import ImageEvictionPolicy
 from ii_agent.utils import WorkspaceManager
 from ii_agent.agents.function_call import FunctionCallAgent
 from ii_agent.llm.context_manager.llm_summarizing import LLMSummarizingContextManager
@@ -38,6 +39,7 @@ class AgentConfig:
         max_output_tokens_per_turn: int = MAX_OUTPUT_TOKENS_PER_TURN,
         max_turns: int = MAX_TURNS,
         token_budget: int = TOKEN_BUDGET,
+        stream_responses: bool = True,
     ):
         self.logs_path = logs_path
         self.minimize_stdout_logs = minimize_stdout_logs
@@ -47,6 +49,7 @@ class AgentConfig:
         self.max_output_tokens_per_turn = max_output_tokens_per_turn
         self.max_turns = max_turns
         self.token_budget = token_budget
+        self.stream_responses = stream_responses
 
 
 class AgentFactory:
@@ -193,7 +196,10 @@ class AgentFactory:
             )
 
         # try to get history from file store
-        init_history = MessageHistory(context_manager)
+        init_history = MessageHistory(
+            context_manager,
+            image_policy=ImageEvictionPolicy.for_model(client.model_name),
+        )
         try:
             init_history.restore_from_session(str(session_id), file_store)
 
@@ -212,6 +218,8 @@ class AgentFactory:
             max_turns=self.config.max_turns,
             websocket=websocket,
             session_id=session_id,
+            stream_responses=self.config.stream_responses,
+            parallel_tool_calls=tool_args.get("parallel_tool_calls", False),
         )
 
         # Store the session ID in the agent for event tracking
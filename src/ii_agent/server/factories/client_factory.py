@@ -55,6 +55,9 @@ class ClientFactory:
             return get_client(
                 "openrouter",
                 model_name=cleaned_name,
+                parallel_tool_calls=bool(
+                    merged_tool_args.get("parallel_tool_calls", False)
+                ),
             )
         except Exception as exc:
             raise ValueError(
@@ -1,4 +1,4 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from pydantic import BaseModel
 
 
@@ -54,6 +54,7 @@ class EventResponse(BaseModel):
     """Response model for event queries."""
 
     events: List[EventInfo]
+    next_cursor: Optional[str] = None
 
 
 class QueryContent(BaseModel):
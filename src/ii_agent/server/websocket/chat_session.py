@@ -8,7 +8,10 @@ from pydantic import ValidationError
 
 from ii_agent.agents.base import BaseAgent
 from ii_agent.core.event import RealtimeEvent, EventType
+from ii_agent.core.loop_monitor import loop_activity
+from ii_agent.llm.usage import UsageLedger, use_usage_ledger
 from ii_agent.core.storage.files import FileStore
+from ii_agent.tools.browser_tools.base import BrowserTool
 from ii_agent.db.manager import Sessions, Events
 from ii_agent.utils.prompt_generator import enhance_user_prompt
 from ii_agent.utils.workspace_manager import WorkspaceManager
@@ -24,6 +27,32 @@ from ii_agent.core.config.model_tool_map import MODEL_TOOL_DEFAULTS
 
 logger = logging.getLogger(__name__)
 
+# The loop only keeps weak references to tasks, so cleanup tasks that outlive
+# their session are held here until they finish
+_cleanup_tasks: set[asyncio.Task] = set()
+
+
+def _run_cleanup_task(coro) -> asyncio.Task:
+    task = asyncio.get_running_loop().create_task(coro)
+    _cleanup_tasks.add(task)
+    task.add_done_callback(_cleanup_tasks.discard)
+    return task
+
+
+async def _close_browsers(browsers, cancelled_task: Optional[asyncio.Task]) -> None:
+    """Hand browser contexts back to the pool once the agent stopped using them."""
+    if cancelled_task is not None:
+        try:
+            await cancelled_task
+        except (asyncio.CancelledError, Exception):
+            # Cancelled or failed, either way it no longer uses the browsers
+            pass
+    for browser in browsers:
+        try:
+            await browser.close()
+        except Exception as e:
+            logger.error(f"Failed to close browser of session: {e}")
+
 
 class ChatSession:
     """Manages a single chat session with its own agent, workspace, and message handling."""
@@ -47,6 +76,7 @@ class ChatSession:
         self.agent: Optional[BaseAgent] = None
         self.active_task: Optional[asyncio.Task] = None
         self.message_processor: Optional[asyncio.Task] = None
+        self.usage_ledger = UsageLedger(session_uuid)
         self.first_message = True
 
     async def send_event(self, event: RealtimeEvent):
@@ -61,10 +91,15 @@ class ChatSession:
         """Start the chat loop for this session."""
         await self.handshake()
         try:
-            while True:
-                message_text = await self.websocket.receive_text()
-                message_data = json.loads(message_text)
-                await self.handle_message(message_data)
+            # Agent runs started from here inherit the session attribution
+            # and record their LLM calls in the session's ledger
+            with loop_activity(session_id=self.session_uuid), use_usage_ledger(
+                self.usage_ledger
+            ):
+                while True:
+                    message_text = await self.websocket.receive_text()
+                    message_data = json.loads(message_text)
+                    await self.handle_message(message_data)
         except json.JSONDecodeError:
             await self.send_event(
                 RealtimeEvent(
@@ -285,6 +320,9 @@ class ChatSession:
             # Delete events from database up to last user message if we have a session ID
             if self.agent.session_id:
                 try:
+                    # Buffered events must land before the range delete
+                    if self.agent.event_sink is not None:
+                        await self.agent.event_sink.flush()
                     Events.delete_events_from_last_to_user_message(
                         self.agent.session_id
                     )
@@ -434,7 +472,13 @@ class ChatSession:
     def cleanup(self):
         """Clean up resources associated with this session."""
         # Set websocket to None in the agent but keep the message processor running
+        browsers = set()
         if self.agent:
+            browsers = {
+                tool.browser
+                for tool in self.agent.tool_manager.get_tools()
+                if isinstance(tool, BrowserTool)
+            }
             self.agent.websocket = (
                 None  # This will prevent sending to websocket but keep processing
             )
@@ -442,12 +486,19 @@ class ChatSession:
                 self.agent.history.save_to_session(
                     str(self.session_uuid), self.file_store
                 )
+            if self.agent.event_sink is not None:
+                _run_cleanup_task(self.agent.event_sink.flush())
 
         # Cancel any running tasks
+        cancelled_task = None
         if self.active_task and not self.active_task.done():
             self.active_task.cancel()
+            cancelled_task = self.active_task
             self.active_task = None
 
+        if browsers:
+            _run_cleanup_task(_close_browsers(browsers, cancelled_task))
+
         # Clean up references
         self.websocket = None
         self.agent = None
@@ -83,3 +83,15 @@ class ConnectionManager:
     def get_connection_count(self) -> int:
         """Get the number of active connections."""
         return len(self.sessions)
+
+    def get_running_task_count(self) -> int:
+        """Get the number of agent runs in progress."""
+        return sum(session.has_active_task() for session in self.sessions.values())
+
+    def get_message_queue_depths(self) -> Dict[tuple[str], int]:
+        """Get the number of events queued for each session with an agent."""
+        return {
+            (str(session.session_uuid),): session.agent.message_queue.qsize()
+            for session in list(self.sessions.values())
+            if session.agent is not None
+        }
@@ -51,6 +51,11 @@ class LLMTool(ABC):
     name: str
     description: str
     input_schema: ToolInputSchema
+    # When a turn has several tool calls, calls to tools sharing a concurrency
+    # group run one at a time, in call order; tools without a group run in
+    # parallel. Tools that touch the workspace or other shared state keep the
+    # default group.
+    concurrency_group: Optional[str] = "default"
 
     @property
     def should_stop(self) -> bool:
@@ -21,6 +21,9 @@ def get_event_loop():
 
 
 class BrowserTool(LLMTool):
+    # All browser tools drive the same page
+    concurrency_group = "browser"
+
     def __init__(self, browser: Browser):
         self.browser = browser
 
@@ -84,7 +84,7 @@ class BrowserGetSelectOptionsTool(BrowserTool):
         msg += "\nIf you decide to use this select element, use the exact option name in select_dropdown_option"
         state = await self.browser.update_state()
 
-        return utils.format_screenshot_tool_output(state.screenshot, msg)
+        return utils.format_state_tool_output(state, msg)
 
 
 class BrowserSelectDropdownOptionTool(BrowserTool):
@@ -207,7 +207,7 @@ class BrowserSelectDropdownOptionTool(BrowserTool):
         if result.get("success"):
             msg = f"Selected option '{option}' with value '{result.get('value')}' at index {result.get('index')}"
             state = await self.browser.update_state()
-            return utils.format_screenshot_tool_output(state.screenshot, msg)
+            return utils.format_state_tool_output(state, msg)
         else:
             error_msg = result.get("error", "Unknown error")
             if "availableOptions" in result:
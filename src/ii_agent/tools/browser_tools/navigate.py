@@ -48,7 +48,7 @@ class BrowserNavigationTool(BrowserTool):
 
         msg = f"Navigated to {url}"
 
-        return utils.format_screenshot_tool_output(state.screenshot, msg)
+        return utils.format_state_tool_output(state, msg)
 
 
 class BrowserRestartTool(BrowserTool):
@@ -92,4 +92,4 @@ class BrowserRestartTool(BrowserTool):
 
         msg = f"Navigated to {url}"
 
-        return utils.format_screenshot_tool_output(state.screenshot, msg)
+        return utils.format_state_tool_output(state, msg)
@@ -44,4 +44,4 @@ class BrowserPressKeyTool(BrowserTool):
         msg = f'Pressed "{key}" on the keyboard.'
         state = await self.browser.update_state()
 
-        return utils.format_screenshot_tool_output(state.screenshot, msg)
+        return utils.format_state_tool_output(state, msg)
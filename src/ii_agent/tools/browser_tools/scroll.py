@@ -36,7 +36,7 @@ class BrowserScrollDownTool(BrowserTool):
         state = await self.browser.update_state()
 
         msg = "Scrolled page down"
-        return utils.format_screenshot_tool_output(state.screenshot, msg)
+        return utils.format_state_tool_output(state, msg)
 
 
 class BrowserScrollUpTool(BrowserTool):
@@ -67,4 +67,4 @@ class BrowserScrollUpTool(BrowserTool):
         state = await self.browser.update_state()
 
         msg = "Scrolled page up"
-        return utils.format_screenshot_tool_output(state.screenshot, msg)
+        return utils.format_state_tool_output(state, msg)
@@ -35,7 +35,7 @@ class BrowserSwitchTabTool(BrowserTool):
         msg = f"Switched to tab {index}"
         state = await self.browser.update_state()
 
-        return utils.format_screenshot_tool_output(state.screenshot, msg)
+        return utils.format_state_tool_output(state, msg)
 
 
 class BrowserOpenNewTabTool(BrowserTool):
@@ -56,4 +56,4 @@ class BrowserOpenNewTabTool(BrowserTool):
         msg = "Opened a new tab"
         state = await self.browser.update_state()
 
-        return utils.format_screenshot_tool_output(state.screenshot, msg)
+        return utils.format_state_tool_output(state, msg)
@@ -1,18 +1,69 @@
+from typing import Optional
+
+from ii_agent.browser.models import BrowserState
 from ii_agent.tools.base import ToolImplOutput
 
+# Elements named in the description of a screenshot
+DESCRIBED_ELEMENTS = 5
+
+
+def describe_state(state: BrowserState) -> str:
+    """Short text description of the page a screenshot shows."""
+    elements = list(state.interactive_elements.values())
+    names = []
+    for element in elements:
+        text = " ".join(element.text.split())[:40]
+        if text:
+            names.append(f'{element.tag_name} "{text}"')
+        if len(names) == DESCRIBED_ELEMENTS:
+            break
+    description = f"{state.url}, {len(elements)} interactive elements"
+    if names:
+        description += ": " + ", ".join(names)
+        if len(elements) > len(names):
+            description += ", ..."
+    return description
+
 
-def format_screenshot_tool_output(screenshot: str, msg: str) -> ToolImplOutput:
+def format_screenshot_tool_output(
+    screenshot: str,
+    msg: str,
+    media_type: str = "image/png",
+    display_screenshot: Optional[str] = None,
+    description: Optional[str] = None,
+) -> ToolImplOutput:
+    source = {
+        "type": "base64",
+        "media_type": media_type,
+        "data": screenshot,
+    }
+    if display_screenshot is not None:
+        # Shown in the UI instead of the model's lower resolution screenshot
+        source["display_data"] = display_screenshot
+    if description is not None:
+        # Replaces the screenshot once it is evicted from the history
+        source["description"] = description
     return ToolImplOutput(
         tool_output=[
-            {
-                "type": "image",
-                "source": {
-                    "type": "base64",
-                    "media_type": "image/png",
-                    "data": screenshot,
-                },
-            },
+            {"type": "image", "source": source},
             {"type": "text", "text": msg},
         ],
         tool_result_message=msg,
     )
+
+
+def format_state_tool_output(state: BrowserState, msg: str) -> ToolImplOutput:
+    if state.model_screenshot is None:
+        return format_screenshot_tool_output(
+            state.screenshot,
+            msg,
+            state.screenshot_media_type,
+            description=describe_state(state),
+        )
+    return format_screenshot_tool_output(
+        state.model_screenshot,
+        msg,
+        state.screenshot_media_type,
+        display_screenshot=state.screenshot,
+        description=describe_state(state),
+    )
@@ -41,5 +41,8 @@ Current viewport information:
 {highlighted_elements}"""
 
         return utils.format_screenshot_tool_output(
-            state.screenshot_with_highlights, msg
+            self.browser.get_screenshot_with_highlights(),
+            msg,
+            state.screenshot_media_type,
+            description=utils.describe_state(state),
         )
@@ -26,4 +26,4 @@ class BrowserWaitTool(BrowserTool):
 
         msg = "Waited for page"
 
-        return utils.format_screenshot_tool_output(state.screenshot, msg)
+        return utils.format_state_tool_output(state, msg)
@@ -0,0 +1,61 @@
+"""Process-wide pooled aiohttp session for the web search and visit clients.
+
+Creating an ``aiohttp.ClientSession`` per request pays DNS, TCP and TLS setup
+on every call. Sharing one session per event loop keeps connections to the
+search and scraping APIs alive between tool calls and across agent sessions.
+"""
+
+import asyncio
+import logging
+import weakref
+
+import aiohttp
+
+from ii_agent.utils.constants import (
+    WEB_HTTP_CONNECT_TIMEOUT,
+    WEB_HTTP_KEEPALIVE_TIMEOUT,
+    WEB_HTTP_MAX_CONNECTIONS,
+    WEB_HTTP_MAX_CONNECTIONS_PER_HOST,
+    WEB_HTTP_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+# Sessions are bound to the loop they were created on, so they are keyed by
+# event loop. In the server there is exactly one loop and thus one session.
+_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = weakref.WeakKeyDictionary()
+
+
+def get_aiohttp_session() -> aiohttp.ClientSession:
+    """Return the shared pooled aiohttp session for the running event loop.
+
+    Callers must not close the returned session. Per-request timeouts can be
+    passed to the request methods.
+
+    Returns:
+        The ``aiohttp.ClientSession`` shared by all web tools on this loop.
+    """
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=WEB_HTTP_MAX_CONNECTIONS,
+                limit_per_host=WEB_HTTP_MAX_CONNECTIONS_PER_HOST,
+                keepalive_timeout=WEB_HTTP_KEEPALIVE_TIMEOUT,
+            ),
+            timeout=aiohttp.ClientTimeout(
+                total=WEB_HTTP_TIMEOUT, connect=WEB_HTTP_CONNECT_TIMEOUT
+            ),
+        )
+        _sessions[loop] = session
+    return session
+
+
+async def aclose_aiohttp_session() -> None:
+    """Close the shared aiohttp session of the running event loop, if any."""
+    loop = asyncio.get_running_loop()
+    session = _sessions.pop(loop, None)
+    if session is not None and not session.closed:
+        await session.close()
+        logger.info("Closed shared web tools HTTP session")
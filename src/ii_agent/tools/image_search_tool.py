@@ -18,6 +18,7 @@ class ImageSearchTool(LLMTool):
         "required": ["query"],
     }
     output_type = "array"
+    concurrency_group = None
 
     def __init__(self, max_results=5, **kwargs):
         self.max_results = max_results
@@ -1,5 +1,6 @@
 import asyncio
 from ii_agent.core.event import EventType, RealtimeEvent
+from ii_agent.llm.concurrency import agenerate_auxiliary
 from ii_agent.llm.context_manager.base import ContextManager
 from ii_agent.tools.image_search_tool import ImageSearchTool
 from ii_agent.tools.base import LLMTool
@@ -190,6 +191,7 @@ action = init
         image_search_tool = ImageSearchTool()
         if image_search_tool.is_available():
             self.tools.append(image_search_tool)
+        self.context_manager = context_manager
         self.history = MessageHistory(context_manager=context_manager)
         self.tool_params = [tool.get_tool_param() for tool in self.tools]
         self.max_turns = 200
@@ -203,7 +205,7 @@ action = init
         description = tool_input["description"]
 
         if action == "init":
-            self.history = MessageHistory()
+            self.history = MessageHistory(context_manager=self.context_manager)
 
             # Clone the reveal.js repository to the specified path
             clone_result = await self.bash_tool.run_impl(
@@ -241,7 +243,7 @@ action = init
 
         remaining_turns = self.max_turns
         while remaining_turns > 0:
-            self.history.truncate()
+            await self.history.atruncate()
             remaining_turns -= 1
 
             delimiter = "-" * 45 + "PRESENTATION AGENT" + "-" * 45
@@ -260,7 +262,8 @@ action = init
             current_messages = self.history.get_messages_for_llm()
 
             # Generate response using the client
-            model_response, _ = self.client.generate(
+            model_response, _ = await agenerate_auxiliary(
+                self.client,
                 messages=current_messages,
                 max_tokens=8192,
                 tools=tool_params,
@@ -307,7 +310,7 @@ action = init
                 ) from exc
 
             # Execute the tool
-            result = tool.run(tool_call.tool_input, deepcopy(self.history))
+            result = await tool.run_async(tool_call.tool_input, deepcopy(self.history))
 
             # Handle both string results and tuples
             if isinstance(result, tuple):
@@ -0,0 +1,43 @@
+"""Tool that returns recorded outputs, for replaying sessions offline."""
+
+from typing import Any, Optional
+
+from ii_agent.llm.message_history import MessageHistory
+from ii_agent.tools.base import LLMTool, ToolImplOutput
+
+
+class ReplayTool(LLMTool):
+    """Stands in for a tool of a recorded session.
+
+    Every call returns the next recorded output of the tool, whatever its
+    input. Once the outputs are used up, calls return ``default_output``.
+    """
+
+    input_schema = {"type": "object"}
+
+    def __init__(
+        self,
+        name: str,
+        outputs: Optional[list[str | list[dict[str, Any]]]] = None,
+        default_output: str = "OK",
+        description: str = "Replays the recorded outputs of a tool.",
+    ):
+        super().__init__()
+        self.name = name
+        self.description = description
+        self.outputs = list(outputs or [])
+        self.default_output = default_output
+        self.calls = 0
+
+    async def run_impl(
+        self,
+        tool_input: dict[str, Any],
+        message_history: Optional[MessageHistory] = None,
+    ) -> ToolImplOutput:
+        output = (
+            self.outputs[self.calls]
+            if self.calls < len(self.outputs)
+            else self.default_output
+        )
+        self.calls += 1
+        return ToolImplOutput(output, f"Replayed {self.name} output")
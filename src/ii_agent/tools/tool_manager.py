@@ -1,9 +1,13 @@
 import os
 import asyncio
+import contextlib
 import logging
 from copy import deepcopy
 from typing import Optional, List, Dict, Any
 from ii_agent.core.config.model_tool_map import MODEL_TOOL_DEFAULTS
+from ii_agent.core.loop_monitor import loop_activity
+from ii_agent.core.metrics import TOOL_DURATION
+from ii_agent.core.tracing import trace_span
 from ii_agent.llm.base import LLMClient
 from ii_agent.llm.context_manager.llm_summarizing import LLMSummarizingContextManager
 from ii_agent.llm.token_counter import TokenCounter
@@ -58,6 +62,8 @@ from ii_agent.tools.deep_research_tool import DeepResearchTool
 from ii_agent.tools.list_html_links_tool import ListHtmlLinksTool
 from ii_agent.utils.constants import TOKEN_BUDGET
 
+TOOL_CALL_TIMEOUT_RESULT = "Tool call timed out after {timeout} seconds."
+
 
 def get_system_tools(
     client: LLMClient,
@@ -248,7 +254,10 @@ class AgentToolManager:
         self.logger_for_agent_logs.info(f"Running tool: {tool_name}")
         self.logger_for_agent_logs.info(f"Tool input: {tool_input}")
         try:
-            result = await llm_tool.run_async(tool_input, history)
+            with loop_activity(tool=tool_name), trace_span(
+                "tool.run", tool=tool_name, tool_call_id=tool_params.tool_call_id
+            ), TOOL_DURATION.time(tool=tool_name):
+                result = await llm_tool.run_async(tool_input, history)
         except Exception as exc:
             self.logger_for_agent_logs.error(
                 "Error running tool %s with input %s: %s",
@@ -280,6 +289,55 @@ class AgentToolManager:
 
         return tool_result
 
+    async def run_tools(
+        self,
+        tool_calls: list[ToolCallParameters],
+        history: MessageHistory,
+        timeout: Optional[float] = None,
+    ) -> list[str | list[dict[str, Any]]]:
+        """
+        Executes the tool calls of one turn concurrently.
+
+        Calls to tools in the same concurrency group run one at a time, in the
+        order they were made; all other calls run in parallel. A call that
+        exceeds `timeout` is reported as timed out without affecting the
+        others.
+
+        Args:
+            tool_calls (list[ToolCallParameters]): The tool calls of the turn.
+            history (MessageHistory): The history of the conversation.
+            timeout (float, optional): Timeout in seconds for each call.
+        Returns:
+            list: The tool results, in the order of `tool_calls`.
+        """
+        group_locks: dict[str, asyncio.Lock] = {}
+
+        async def run_one(tool_params: ToolCallParameters):
+            group = self.get_tool(tool_params.tool_name).concurrency_group
+            lock = (
+                group_locks.setdefault(group, asyncio.Lock())
+                if group is not None
+                else contextlib.nullcontext()
+            )
+            async with lock:
+                try:
+                    return await asyncio.wait_for(
+                        self.run_tool(tool_params, history), timeout=timeout
+                    )
+                except asyncio.TimeoutError:
+                    self.logger_for_agent_logs.warning(
+                        f"Tool {tool_params.tool_name} timed out after {timeout} seconds"
+                    )
+                    return TOOL_CALL_TIMEOUT_RESULT.format(timeout=timeout)
+
+        tasks = [asyncio.create_task(run_one(tool_call)) for tool_call in tool_calls]
+        try:
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
     def should_stop(self):
         """
         Checks if the agent should stop based on the completion tool.
@@ -1,5 +1,6 @@
 import asyncio
 import aiohttp
+from .http_session import get_aiohttp_session
 from .utils import truncate_content
 import os
 from ii_agent.utils.constants import VISIT_WEB_PAGE_MAX_OUTPUT_LENGTH
@@ -54,10 +55,10 @@ class MarkdownifyVisitClient(BaseVisitClient):
         try:
             # Send a GET request to the URL with a 20-second timeout
             timeout = aiohttp.ClientTimeout(total=20)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(url) as response:
-                    response.raise_for_status()
-                    html_content = await response.text()
+            session = get_aiohttp_session()
+            async with session.get(url, timeout=timeout) as response:
+                response.raise_for_status()
+                html_content = await response.text()
 
             # Convert the HTML content to Markdown (run in executor since markdownify is not async)
             loop = asyncio.get_event_loop()
@@ -78,6 +79,9 @@ class MarkdownifyVisitClient(BaseVisitClient):
             raise NetworkError(f"Error fetching the webpage: {str(e)}")
 
 
+TAVILY_EXTRACT_URL = "https://api.tavily.com/extract"
+
+
 class TavilyVisitClient(BaseVisitClient):
     name = "Tavily"
 
@@ -88,20 +92,23 @@ class TavilyVisitClient(BaseVisitClient):
             raise WebpageVisitException("TAVILY_API_KEY environment variable not set")
 
     async def forward_async(self, url: str) -> str:
-        try:
-            from tavily import AsyncTavilyClient
-        except ImportError as e:
-            raise ImportError(
-                "You must install package `tavily` to run this tool: for instance run `pip install tavily-python`."
-            ) from e
+        # Tavily's SDK opens a new HTTP client per request, so the REST API is
+        # called directly through the shared session
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        payload = {
+            "urls": url,
+            "include_images": True,
+            "extract_depth": "advanced",
+            "format": "markdown",
+        }
 
         try:
-            tavily_client = AsyncTavilyClient(api_key=self.api_key)
-            
-            # Extract webpage content
-            response = await tavily_client.extract(
-                url, include_images=True, extract_depth="advanced"
-            )
+            session = get_aiohttp_session()
+            async with session.post(
+                TAVILY_EXTRACT_URL, headers=headers, json=payload
+            ) as http_response:
+                http_response.raise_for_status()
+                response = await http_response.json()
 
             # Check if response contains results
             if not response or "results" not in response or not response["results"]:
@@ -147,12 +154,12 @@ class FireCrawlVisitClient(BaseVisitClient):
         payload = {"url": url, "onlyMainContent": False, "formats": ["markdown"]}
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    base_url, headers=headers, json=payload
-                ) as response:
-                    response.raise_for_status()
-                    response_data = await response.json()
+            session = get_aiohttp_session()
+            async with session.post(
+                base_url, headers=headers, json=payload
+            ) as response:
+                response.raise_for_status()
+                response_data = await response.json()
 
             data = response_data.get("data", {}).get("markdown")
             if not data:
@@ -186,10 +193,10 @@ class JinaVisitClient(BaseVisitClient):
         }
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(jina_url, headers=headers) as response:
-                    response.raise_for_status()
-                    json_response = await response.json()
+            session = get_aiohttp_session()
+            async with session.get(jina_url, headers=headers) as response:
+                response.raise_for_status()
+                json_response = await response.json()
 
             if not json_response or "data" not in json_response:
                 raise ContentExtractionError(
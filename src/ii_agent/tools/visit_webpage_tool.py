@@ -32,6 +32,7 @@ class VisitWebpageTool(LLMTool):
         "required": ["url"],
     }
     output_type = "string"
+    concurrency_group = None
 
     def __init__(
         self,
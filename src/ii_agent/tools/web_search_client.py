@@ -1,10 +1,24 @@
 import json
+import logging
 import os
 import asyncio
-import aiohttp
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+
 import urllib
+
+from ii_agent.utils.constants import (
+    WEB_SEARCH_CACHE_MAX_ENTRIES,
+    WEB_SEARCH_CACHE_PATH,
+    WEB_SEARCH_CACHE_TTL,
+)
+from .http_session import get_aiohttp_session
 from .utils import truncate_content
 
+logger = logging.getLogger(__name__)
+
 
 class BaseSearchClient:
     """
@@ -51,21 +65,21 @@ class JinaSearchClient(BaseSearchClient):
 
         search_response = []
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(encoded_url, headers=headers) as response:
-                    if response.status == 200:
-                        search_results_data = await response.json()
-                        search_results = search_results_data["data"]
-                        if search_results:
-                            for result in search_results:
-                                search_response.append(
-                                    {
-                                        "title": result.get("title", ""),
-                                        "url": result.get("url", ""),
-                                        "content": result.get("description", ""),
-                                    }
-                                )
-                        return search_response
+            session = get_aiohttp_session()
+            async with session.get(encoded_url, headers=headers) as response:
+                if response.status == 200:
+                    search_results_data = await response.json()
+                    search_results = search_results_data["data"]
+                    if search_results:
+                        for result in search_results:
+                            search_response.append(
+                                {
+                                    "title": result.get("title", ""),
+                                    "url": result.get("url", ""),
+                                    "content": result.get("description", ""),
+                                }
+                            )
+                    return search_response
         except Exception as e:
             print(f"Error: {e}. Failed fetching sources. Resulting in empty response.")
             search_response = []
@@ -102,24 +116,24 @@ class SerpAPISearchClient(BaseSearchClient):
         encoded_url = url + "?" + urllib.parse.urlencode(params)
         search_response = []
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(encoded_url) as response:
-                    if response.status == 200:
-                        search_results = await response.json()
-                        if search_results:
-                            results = search_results["organic_results"]
-                            results_processed = 0
-                            for result in results:
-                                if results_processed >= max_results:
-                                    break
-                                search_response.append(
-                                    {
-                                        "title": result["title"],
-                                        "url": result["link"],
-                                        "content": result["snippet"],
-                                    }
-                                )
-                                results_processed += 1
+            session = get_aiohttp_session()
+            async with session.get(encoded_url) as response:
+                if response.status == 200:
+                    search_results = await response.json()
+                    if search_results:
+                        results = search_results["organic_results"]
+                        results_processed = 0
+                        for result in results:
+                            if results_processed >= max_results:
+                                break
+                            search_response.append(
+                                {
+                                    "title": result["title"],
+                                    "url": result["link"],
+                                    "content": result["snippet"],
+                                }
+                            )
+                            results_processed += 1
         except Exception as e:
             print(f"Error: {e}. Failed fetching sources. Resulting in empty response.")
             search_response = []
@@ -169,6 +183,9 @@ class DuckDuckGoSearchClient(BaseSearchClient):
         )
 
 
+TAVILY_SEARCH_URL = "https://api.tavily.com/search"
+
+
 class TavilySearchClient(BaseSearchClient):
     """
     A client for the Tavily search engine.
@@ -185,18 +202,18 @@ class TavilySearchClient(BaseSearchClient):
             )
 
     async def forward_async(self, query: str) -> str:
-        try:
-            from tavily import AsyncTavilyClient
-        except ImportError as e:
-            raise ImportError(
-                "You must install package `tavily` to run this tool: for instance run `pip install tavily-python`."
-            ) from e
+        # Tavily's SDK opens a new HTTP client per request, so the REST API is
+        # called directly through the shared session
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        payload = {"query": query, "max_results": self.max_results}
 
         try:
-            # Initialize Tavily client
-            tavily_client = AsyncTavilyClient(api_key=self.api_key)
-
-            response = await tavily_client.search(query, max_results=self.max_results)
+            session = get_aiohttp_session()
+            async with session.post(
+                TAVILY_SEARCH_URL, headers=headers, json=payload
+            ) as http_response:
+                http_response.raise_for_status()
+                response = await http_response.json()
 
             # Check if response contains results
             if not response or "results" not in response or not response["results"]:
@@ -235,12 +252,12 @@ class FirecrawlSearchClient(BaseSearchClient):
         payload = {"query": query, "max_results": self.max_results}
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    base_url, headers=headers, json=payload
-                ) as response:
-                    response.raise_for_status()
-                    response_data = await response.json()
+            session = get_aiohttp_session()
+            async with session.post(
+                base_url, headers=headers, json=payload
+            ) as response:
+                response.raise_for_status()
+                response_data = await response.json()
 
             results = response_data.get("results") or response_data.get("data", {}).get(
                 "results"
@@ -276,25 +293,25 @@ class ImageSearchClient:
         encoded_url = url + "?" + urllib.parse.urlencode(params)
         search_response = []
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(encoded_url) as response:
-                    if response.status == 200:
-                        search_results = await response.json()
-                        if search_results:
-                            results = search_results["images_results"]
-                            results_processed = 0
-                            for result in results:
-                                if results_processed >= max_results:
-                                    break
-                                search_response.append(
-                                    {
-                                        "title": result["title"],
-                                        "image_url": result["original"],
-                                        "width": result["original_width"],
-                                        "height": result["original_height"],
-                                    }
-                                )
-                                results_processed += 1
+            session = get_aiohttp_session()
+            async with session.get(encoded_url) as response:
+                if response.status == 200:
+                    search_results = await response.json()
+                    if search_results:
+                        results = search_results["images_results"]
+                        results_processed = 0
+                        for result in results:
+                            if results_processed >= max_results:
+                                break
+                            search_response.append(
+                                {
+                                    "title": result["title"],
+                                    "image_url": result["original"],
+                                    "width": result["original_width"],
+                                    "height": result["original_height"],
+                                }
+                            )
+                            results_processed += 1
         except Exception as e:
             print(f"Error: {e}. Failed fetching sources. Resulting in empty response.")
             search_response = []
@@ -333,8 +350,202 @@ class MultiSearchClient(BaseSearchClient):
         return truncate_content(json.dumps(combined, indent=4))
 
 
+class SearchResultCache:
+    """
+    A cache of formatted search results, keyed by engine, max results and query.
+    """
+
+    def get(self, engine: str, query: str, max_results: int) -> Optional[str]:
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def put(self, engine: str, query: str, max_results: int, result: str) -> None:
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def stats(self) -> dict[str, int]:
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Case and whitespace differences do not change search results."""
+        return " ".join(query.lower().split())
+
+
+class SQLiteSearchResultCache(SearchResultCache):
+    """
+    A search result cache stored in SQLite, so it survives restarts and is
+    shared between sessions and processes.
+
+    Entries expire ``ttl`` seconds after they were stored. Once the cache
+    holds more than ``max_entries`` entries, the least recently used ones are
+    evicted.
+    """
+
+    def __init__(
+        self,
+        path: str = WEB_SEARCH_CACHE_PATH,
+        ttl: float = WEB_SEARCH_CACHE_TTL,
+        max_entries: int = WEB_SEARCH_CACHE_MAX_ENTRIES,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = os.path.expanduser(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._connection = sqlite3.connect(
+            self.path, check_same_thread=False, timeout=5.0
+        )
+        with self._lock, self._connection:
+            if self.path != ":memory:":
+                self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS search_results (
+                    engine TEXT NOT NULL,
+                    max_results INTEGER NOT NULL,
+                    query TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_accessed_at REAL NOT NULL,
+                    PRIMARY KEY (engine, max_results, query)
+                )
+                """
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_search_results_last_accessed_at "
+                "ON search_results (last_accessed_at)"
+            )
+
+    def get(self, engine: str, query: str, max_results: int) -> Optional[str]:
+        key = (engine, max_results, self.normalize_query(query))
+        now = self.clock()
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT result, created_at FROM search_results "
+                "WHERE engine = ? AND max_results = ? AND query = ?",
+                key,
+            ).fetchone()
+            if row is not None and now - row[1] >= self.ttl:
+                self._connection.execute(
+                    "DELETE FROM search_results "
+                    "WHERE engine = ? AND max_results = ? AND query = ?",
+                    key,
+                )
+                self.expired += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._connection.execute(
+                "UPDATE search_results SET last_accessed_at = ? "
+                "WHERE engine = ? AND max_results = ? AND query = ?",
+                (now, *key),
+            )
+            self.hits += 1
+            return row[0]
+
+    def put(self, engine: str, query: str, max_results: int, result: str) -> None:
+        now = self.clock()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO search_results "
+                "(engine, max_results, query, result, created_at, last_accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (engine, max_results, self.normalize_query(query), result, now, now),
+            )
+            (count,) = self._connection.execute(
+                "SELECT COUNT(*) FROM search_results"
+            ).fetchone()
+            if count > self.max_entries:
+                self._connection.execute(
+                    "DELETE FROM search_results WHERE rowid IN ("
+                    "SELECT rowid FROM search_results "
+                    "ORDER BY last_accessed_at LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+                self.evictions += count - self.max_entries
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            (entries,) = self._connection.execute(
+                "SELECT COUNT(*) FROM search_results"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "entries": entries,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class CachedSearchClient(BaseSearchClient):
+    """
+    Serves repeated queries from a SearchResultCache instead of the network.
+
+    Error and empty-result responses are not cached, so they are retried on
+    the next call.
+    """
+
+    def __init__(
+        self, client: BaseSearchClient, cache: Optional[SearchResultCache] = None
+    ):
+        self.client = client
+        self._cache = cache
+        self.name = client.name
+        self.max_results = client.max_results
+
+    @property
+    def cache(self) -> SearchResultCache:
+        # Resolved on first search so that creating tools does not touch disk
+        if self._cache is None:
+            self._cache = get_search_result_cache()
+        return self._cache
+
+    async def forward_async(self, query: str) -> str:
+        # SQLite calls are short but may wait on a lock held by another process
+        cached = await asyncio.to_thread(
+            self.cache.get, self.name, query, self.max_results
+        )
+        if cached is not None:
+            logger.debug(f"Search cache hit for {self.name} query: {query}")
+            return cached
+
+        result = await self.client.forward_async(query)
+        if not result.startswith(("Error", "No search results found")):
+            await asyncio.to_thread(
+                self.cache.put, self.name, query, self.max_results, result
+            )
+        return result
+
+
+_search_result_cache: Optional[SearchResultCache] = None
+
+
+def get_search_result_cache() -> SearchResultCache:
+    """Return the process-wide on-disk search result cache."""
+    global _search_result_cache
+    if _search_result_cache is None:
+        _search_result_cache = SQLiteSearchResultCache()
+    return _search_result_cache
+
+
 def create_search_client(
-    max_results: int = 10, multi_engine: bool = False, **kwargs
+    max_results: int = 10,
+    multi_engine: bool = False,
+    cache: Optional[SearchResultCache] = None,
+    use_cache: bool = True,
+    **kwargs,
 ) -> BaseSearchClient:
     """Create a search client based on available API keys.
 
@@ -342,7 +553,19 @@ def create_search_client(
     Firecrawl > SerpAPI > Jina > Tavily > DuckDuckGo
 
     When ``multi_engine`` is ``True`` all available engines are combined.
+
+    Unless ``use_cache`` is ``False``, results are cached in ``cache``, which
+    defaults to the shared on-disk cache.
     """
+    client = _create_uncached_search_client(max_results, multi_engine, **kwargs)
+    if not use_cache:
+        return client
+    return CachedSearchClient(client, cache)
+
+
+def _create_uncached_search_client(
+    max_results: int, multi_engine: bool, **kwargs
+) -> BaseSearchClient:
 
     clients: list[BaseSearchClient] = []
 
@@ -18,6 +18,7 @@ class WebSearchTool(LLMTool):
         "required": ["query"],
     }
     output_type = "string"
+    concurrency_group = None
 
     def __init__(self, max_results: int = 5, multi_engine: bool = False, **kwargs):
         self.max_results = max_results
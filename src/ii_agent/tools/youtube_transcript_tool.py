@@ -5,8 +5,8 @@ from ii_agent.tools.base import (
 from typing import Any, Optional
 from ii_agent.llm.message_history import MessageHistory
 import yt_dlp
-import aiohttp
 import asyncio
+from ii_agent.tools.http_session import get_aiohttp_session
 
 
 class YoutubeTranscriptTool(LLMTool):
@@ -26,6 +26,7 @@ class YoutubeTranscriptTool(LLMTool):
         "required": ["url"],
     }
     output_type = "string"
+    concurrency_group = None
 
     def __init__(self):
         super().__init__()
@@ -70,10 +71,10 @@ class YoutubeTranscriptTool(LLMTool):
             subtitle_url = subtitle_list[0]["url"]
 
             # Download subtitle text using aiohttp
-            async with aiohttp.ClientSession() as session:
-                async with session.get(subtitle_url) as response:
-                    response.raise_for_status()
-                    subtitle_data = await response.json()
+            session = get_aiohttp_session()
+            async with session.get(subtitle_url) as response:
+                response.raise_for_status()
+                subtitle_data = await response.json()
                     
             events = subtitle_data.get("events", [])
             subtitle_text = ""
@@ -4,4 +4,77 @@ DEFAULT_MODEL = "claude-sonnet-4@20250514"
 
 TOKEN_BUDGET = 120_000
 SUMMARY_MAX_TOKENS = 4000
-VISIT_WEB_PAGE_MAX_OUTPUT_LENGTH = 40_000
\ No newline at end of file
+CONVERSATION_SUMMARY_PREFIX = "Conversation Summary:"
+# Fraction of TOKEN_BUDGET at which summarization starts in the background
+SUMMARY_SOFT_BUDGET_RATIO = 0.8
+VISIT_WEB_PAGE_MAX_OUTPUT_LENGTH = 40_000
+
+LLM_HTTP_MAX_CONNECTIONS = 100
+LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS = 20
+LLM_HTTP_KEEPALIVE_EXPIRY = 30.0
+
+EVENT_SINK_MAX_BATCH_SIZE = 100
+EVENT_SINK_FLUSH_INTERVAL = 0.5  # seconds
+
+WEB_SEARCH_CACHE_PATH = "~/.ii_agent/cache/web_search.db"
+WEB_SEARCH_CACHE_TTL = 24 * 60 * 60  # seconds
+WEB_SEARCH_CACHE_MAX_ENTRIES = 10_000
+
+LLM_RESPONSE_CACHE_PATH = "~/.ii_agent/cache/llm_responses.db"
+LLM_RESPONSE_CACHE_MAX_BYTES = 2 * 1024**3
+
+WEB_HTTP_MAX_CONNECTIONS = 100
+WEB_HTTP_MAX_CONNECTIONS_PER_HOST = 10
+WEB_HTTP_KEEPALIVE_TIMEOUT = 30.0
+WEB_HTTP_TIMEOUT = 120.0  # seconds
+WEB_HTTP_CONNECT_TIMEOUT = 10.0
+
+AUXILIARY_LLM_MAX_CONCURRENCY = 4
+
+LOOP_MONITOR_INTERVAL = 0.1  # seconds
+LOOP_MONITOR_THRESHOLD = 0.25  # seconds
+LOOP_MONITOR_MAX_REPORTS = 50
+
+# Most recent screenshots of tool results always sent to the model at full
+# fidelity. Older ones are replaced with a text placeholder once
+# IMAGE_EVICTION_BATCH_SIZE of them have accumulated, so that the prompt
+# prefix only changes once every IMAGE_EVICTION_BATCH_SIZE screenshots.
+MAX_HISTORY_IMAGES = 5
+IMAGE_EVICTION_BATCH_SIZE = 3
+# Overrides of MAX_HISTORY_IMAGES, by substring of the model name
+MAX_HISTORY_IMAGES_BY_MODEL = {
+    # Gemini bills 258 tokens per 768x768 tile of an image
+    "gemini": 10,
+}
+
+# Converted provider payloads kept per LLM client, in turns
+TURN_PAYLOAD_CACHE_SIZE = 2048
+# Turns with images hold their base64 data, so fewer of them are kept
+IMAGE_TURN_PAYLOAD_CACHE_SIZE = 32
+
+# Finished spans are exported in batches from a background thread
+TRACE_EXPORT_INTERVAL = 1.0  # seconds
+TRACE_EXPORT_MAX_BATCH = 512
+
+# Histogram buckets of the /metrics endpoint, in seconds
+FAST_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+LLM_LATENCY_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+TOOL_LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+# Histogram buckets of browser screenshot sizes, in bytes
+SCREENSHOT_SIZE_BUCKETS = (25_000, 50_000, 100_000, 200_000, 400_000, 800_000, 1_600_000)
+
+# Chromium instances shared by the browser tools of all sessions
+BROWSER_POOL_MIN_BROWSERS = 1  # kept warm, even when idle
+BROWSER_POOL_MAX_BROWSERS = 4
+BROWSER_POOL_MAX_CONTEXTS_PER_BROWSER = 8
+# Sessions served by a Chromium instance before it is replaced
+BROWSER_POOL_MAX_USES = 50
+BROWSER_POOL_IDLE_TIMEOUT = 300.0  # seconds
+BROWSER_POOL_ACQUIRE_TIMEOUT = 60.0  # seconds
+# Browser state reused for an unchanged page is refreshed after this long
+BROWSER_STATE_MAX_AGE = 15.0  # seconds
+# Screenshots are "jpeg", "webp" or "png"; quality (0-100) is for the first two
+BROWSER_SCREENSHOT_FORMAT = "jpeg"
+BROWSER_SCREENSHOT_QUALITY = 80
+# Size of the screenshot the model gets, relative to the one the UI shows
+BROWSER_MODEL_SCREENSHOT_SCALE = 1.0
@@ -2,6 +2,8 @@ import logging
 from typing import List, Tuple, Optional
 
 from ii_agent.llm.base import TextPrompt, TextResult, LLMClient
+from ii_agent.llm.concurrency import agenerate_auxiliary
+from ii_agent.llm.usage import LLMCallPurpose
 
 # Create a logger
 logger = logging.getLogger("prompt_generator")
@@ -48,8 +50,10 @@ Format your response as a single, well-structured prompt without explanations or
             TextPrompt(text=f"Enhance this request into a detailed prompt: {user_input}\n\nAdditional context - {file_context}")
         ]]
         
-        # Use the Anthropic client's generate method
-        response_blocks, _ = client.generate(
+        # Use the client's async generate so the event loop is not blocked
+        response_blocks, _ = await agenerate_auxiliary(
+            client,
+            purpose=LLMCallPurpose.ENHANCEMENT,
             messages=messages,
             max_tokens=max_tokens,
             system_prompt=system_prompt,
@@ -1,6 +1,9 @@
+import asyncio
 import logging
 from unittest.mock import Mock
 
+import pytest
+
 from ii_agent.llm.base import (
     TextPrompt,
     TextResult,
@@ -9,8 +12,11 @@ from ii_agent.llm.base import (
     ToolFormattedResult,
 )
 from ii_agent.llm.context_manager.llm_summarizing import LLMSummarizingContextManager
+from ii_agent.llm.message_history import MessageHistory
 from ii_agent.llm.token_counter import TokenCounter
 
+pytest_plugins = ("pytest_asyncio",)
+
 
 def test_llm_summarizing_context_manager():
     mock_logger = Mock(spec=logging.Logger)
@@ -163,3 +169,170 @@ def test_llm_calls_during_summarization():
 
     assert result == expected_result
 
+
+
+@pytest.mark.asyncio
+async def test_aapply_truncation_uses_async_client():
+    mock_logger = Mock(spec=logging.Logger)
+    mock_llm_client = Mock(spec=LLMClient)
+    mock_llm_client.agenerate.return_value = (
+        [TextResult(text="async summary")],
+        None,
+    )
+
+    context_manager = LLMSummarizingContextManager(
+        client=mock_llm_client,
+        token_counter=TokenCounter(),
+        logger=mock_logger,
+        token_budget=1000,
+        max_size=10,
+    )
+
+    message_lists = []
+    for j in range(12):
+        if j % 2 == 0:
+            message_lists.append([TextPrompt(text=f"Turn {j // 2}")])
+        else:
+            message_lists.append([TextResult(text=f"Turn {j // 2}")])
+
+    result = await context_manager.aapply_truncation_if_needed(message_lists)
+
+    mock_llm_client.generate.assert_not_called()
+    mock_llm_client.agenerate.assert_awaited_once()
+    assert len(result) == 5
+    assert result[1][0].text == "Conversation Summary: async summary"
+    assert result[-1] == message_lists[-1]
+
+
+def make_turns(n):
+    return [
+        [TextPrompt(text=f"Turn {j // 2} " * 20)]
+        if j % 2 == 0
+        else [TextResult(text=f"Turn {j // 2} " * 20)]
+        for j in range(n)
+    ]
+
+
+def make_background_context_manager(client, message_lists, headroom):
+    token_count = TokenCounter().count_tokens(
+        " ".join(m[0].text for m in message_lists)
+    )
+    return LLMSummarizingContextManager(
+        client=client,
+        token_counter=TokenCounter(),
+        logger=Mock(spec=logging.Logger),
+        token_budget=token_count + headroom,
+        soft_token_budget=token_count // 2,
+        max_size=100,
+    )
+
+
+@pytest.mark.asyncio
+async def test_summary_runs_in_background_past_soft_budget():
+    release = asyncio.Event()
+
+    async def agenerate(**kwargs):
+        await release.wait()
+        return [TextResult(text="background summary")], None
+
+    client = Mock(spec=LLMClient)
+    client.agenerate.side_effect = agenerate
+    message_lists = make_turns(8)
+    context_manager = make_background_context_manager(client, message_lists, 10_000)
+
+    # Passing the soft budget does not wait for the summary
+    result = await context_manager.aapply_truncation_if_needed(message_lists)
+    assert result == message_lists
+    await asyncio.sleep(0)
+    client.agenerate.assert_called_once()
+
+    # Turns added meanwhile are kept after the summarized snapshot
+    message_lists = message_lists + [[TextPrompt(text="new turn")]]
+    release.set()
+    await asyncio.sleep(0)
+    result = await context_manager.aapply_truncation_if_needed(message_lists)
+
+    assert result[0] is message_lists[0]
+    assert result[1][0].text == "Conversation Summary: background summary"
+    assert result[-1] is message_lists[-1]
+    assert len(result) < len(message_lists)
+    assert client.agenerate.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_hard_budget_waits_for_background_summary():
+    release = asyncio.Event()
+
+    async def agenerate(**kwargs):
+        await release.wait()
+        return [TextResult(text="background summary")], None
+
+    client = Mock(spec=LLMClient)
+    client.agenerate.side_effect = agenerate
+    message_lists = make_turns(8)
+    context_manager = make_background_context_manager(client, message_lists, 0)
+    start = make_turns(6)
+    await context_manager.aapply_truncation_if_needed(start)
+    await asyncio.sleep(0)
+    assert client.agenerate.call_count == 1
+
+    # The history is over the hard budget now, so the pending summary is awaited
+    asyncio.get_running_loop().call_later(0.05, release.set)
+    result = await context_manager.aapply_truncation_if_needed(
+        start + make_turns(10)[6:]
+    )
+
+    assert result[1][0].text == "Conversation Summary: background summary"
+    assert client.agenerate.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_background_summary_discarded_when_history_was_rewritten():
+    client = Mock(spec=LLMClient)
+    client.agenerate.return_value = ([TextResult(text="stale summary")], None)
+    message_lists = make_turns(8)
+    context_manager = make_background_context_manager(client, message_lists, 10_000)
+
+    await context_manager.aapply_truncation_if_needed(message_lists)
+    await asyncio.sleep(0)
+    rewritten = [list(turn) for turn in message_lists]
+    result = await context_manager.aapply_truncation_if_needed(rewritten)
+
+    assert result == rewritten
+    assert "stale summary" not in str(result)
+
+
+@pytest.mark.asyncio
+async def test_histories_sharing_a_manager_keep_their_own_background_summary():
+    release = asyncio.Event()
+
+    async def agenerate(**kwargs):
+        await release.wait()
+        return [TextResult(text="background summary")], None
+
+    client = Mock(spec=LLMClient)
+    client.agenerate.side_effect = agenerate
+    first, second = make_turns(8), make_turns(8)
+    context_manager = make_background_context_manager(client, first, 10_000)
+    first_owner, second_owner = MessageHistory(context_manager), MessageHistory(
+        context_manager
+    )
+
+    await context_manager.aapply_truncation_if_needed(first, owner=first_owner)
+    assert context_manager.is_truncation_pending(first_owner)
+    assert not context_manager.is_truncation_pending(second_owner)
+
+    # The other history starts its own summary and leaves the first one alone
+    await context_manager.aapply_truncation_if_needed(second, owner=second_owner)
+    await asyncio.sleep(0)
+    assert client.agenerate.call_count == 2
+
+    release.set()
+    await asyncio.sleep(0)
+    for message_lists, owner in ((first, first_owner), (second, second_owner)):
+        result = await context_manager.aapply_truncation_if_needed(
+            message_lists, owner=owner
+        )
+        assert result[1][0].text == "Conversation Summary: background summary"
+        assert not context_manager.is_truncation_pending(owner)
+    assert client.agenerate.call_count == 2
@@ -0,0 +1,45 @@
+import pytest
+
+from ii_agent.llm.http_client import (
+    PooledAsyncClient,
+    aclose_async_http_client,
+    get_async_http_client,
+)
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+@pytest.mark.asyncio
+async def test_http_client_shared_within_loop():
+    first = get_async_http_client()
+    second = get_async_http_client()
+    assert first is second
+
+    await aclose_async_http_client()
+    assert first.is_closed
+    assert get_async_http_client() is not first
+    await aclose_async_http_client()
+
+
+@pytest.mark.asyncio
+async def test_pooled_client_rebuilt_only_when_pool_changes():
+    built = []
+
+    def factory(http_client):
+        built.append(http_client)
+        return object()
+
+    pooled_a = PooledAsyncClient(factory)
+    pooled_b = PooledAsyncClient(factory)
+
+    sdk_a = pooled_a.get()
+    assert pooled_a.get() is sdk_a
+    pooled_b.get()
+    # Both SDK clients sit on the same shared connection pool.
+    assert len(built) == 2 and built[0] is built[1]
+
+    await aclose_async_http_client()
+    assert pooled_a.get() is not sdk_a
+    assert built[-1] is not built[0]
+    await aclose_async_http_client()
+
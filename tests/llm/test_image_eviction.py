@@ -0,0 +1,162 @@
+import base64
+import io
+
+from PIL import Image
+
+from ii_agent.llm.base import TextPrompt, ToolCall, ToolCallParameters
+from ii_agent.llm.image_eviction import ImageEvictionPolicy, max_history_images
+from ii_agent.llm.message_history import MessageHistory
+from ii_agent.llm.payload_cache import TurnPayloadCache
+
+
+def screenshot(step):
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8), (step, 0, 0)).save(buffer, format="PNG")
+    return [
+        {
+            "type": "image",
+            "source": {
+                "type": "base64",
+                "media_type": "image/png",
+                "data": base64.b64encode(buffer.getvalue()).decode(),
+                "description": f"https://example.com/{step}",
+            },
+        },
+        {"type": "text", "text": f"Step {step}"},
+    ]
+
+
+def browse(history, steps):
+    for step in steps:
+        call = ToolCallParameters(
+            tool_call_id=str(step), tool_name="browser_view", tool_input={}
+        )
+        history.add_assistant_turn([ToolCall(**call.__dict__)])
+        history.add_tool_call_result(call, screenshot(step))
+        history.truncate()
+
+
+def image_steps(history):
+    steps, placeholders = [], []
+    for turn in history.get_messages_for_llm():
+        for block in turn:
+            for item in getattr(block, "tool_output", []):
+                if item["type"] == "image":
+                    steps.append(item["source"]["description"].split("/")[-1])
+                elif item["text"].startswith("[Earlier screenshot"):
+                    placeholders.append(item["text"])
+    return steps, placeholders
+
+
+class CountingContextManager:
+    truncation_pending = False
+
+    def is_truncation_pending(self, owner):
+        return self.truncation_pending
+
+    def count_turn_tokens(self, turn):
+        return len(turn), 0
+
+    def apply_truncation_if_needed(self, message_lists, token_count):
+        return message_lists
+
+
+def make_history(**policy):
+    return MessageHistory(
+        CountingContextManager(),
+        image_policy=ImageEvictionPolicy(**policy),
+    )
+
+
+def test_old_screenshots_are_replaced_in_batches():
+    history = make_history(max_images=4, batch_size=2)
+    history.add_user_prompt("browse")
+
+    browse(history, range(1, 6))
+    assert image_steps(history) == (["1", "2", "3", "4", "5"], [])
+
+    browse(history, [6])
+    steps, placeholders = image_steps(history)
+    assert steps == ["3", "4", "5", "6"]
+    assert placeholders[0] == (
+        "[Earlier screenshot removed from the context: https://example.com/1]"
+    )
+
+    # Nothing changes until the limit is passed again
+    before = history.get_messages_for_llm()
+    browse(history, [7])
+    after = history.get_messages_for_llm()
+    assert all(old is new for old, new in zip(before, after))
+    assert image_steps(history)[0] == ["3", "4", "5", "6", "7"]
+    assert history.image_policy.evicted == 2
+
+
+def test_the_latest_screenshots_are_always_kept():
+    history = make_history()
+    policy = history.image_policy
+    evicted_at = []
+
+    for step in range(1, 41):
+        browse(history, [step])
+        steps = [int(s) for s in image_steps(history)[0]]
+        # The newest max_images are always there, in full
+        expected_latest = list(range(max(step - policy.max_images, 0) + 1, step + 1))
+        assert steps[-policy.max_images :] == expected_latest
+        assert len(steps) < policy.max_images + policy.batch_size
+        if steps[0] != 1 and (not evicted_at or steps[0] != evicted_at[-1][1]):
+            evicted_at.append((step, steps[0]))
+
+    # The history only changes once every batch_size screenshots
+    steps_between = [b[0] - a[0] for a, b in zip(evicted_at, evicted_at[1:])]
+    assert set(steps_between) == {policy.batch_size}
+
+
+def test_eviction_keeps_the_unchanged_prefix_cached():
+    history = make_history(max_images=2, batch_size=1)
+    history.add_user_prompt("browse")
+    browse(history, [1, 2])
+    prompt_turn = history.get_messages_for_llm()[0]
+    cache = TurnPayloadCache()
+    cache.convert(history.get_messages_for_llm(), len)
+    history.count_tokens()
+    recounts = history.token_recounts
+
+    browse(history, [3])
+    messages = history.get_messages_for_llm()
+    cache.hits = cache.misses = 0
+    cache.convert(messages, len)
+
+    assert messages[0] is prompt_turn
+    # Back to two images: the prompt, the tool calls and the second result
+    # are reused, the evicted result and the new turns are converted
+    assert (cache.hits, cache.misses) == (4, 3)
+    history.count_tokens()
+    assert history.token_recounts - recounts == 5
+    assert history.blob_store.resolve_tool_output(
+        messages[2][0].tool_output
+    )[0]["text"].startswith("[Earlier screenshot")
+
+
+def test_no_eviction_while_a_background_truncation_is_pending():
+    history = make_history(max_images=1, batch_size=1)
+    history._context_manager.truncation_pending = True
+    browse(history, [1, 2, 3])
+    assert image_steps(history)[0] == ["1", "2", "3"]
+
+    history._context_manager.truncation_pending = False
+    history.evict_images()
+    assert image_steps(history)[0] == ["3"]
+
+
+def test_max_images_depend_on_the_model():
+    assert max_history_images("gemini-2.5-pro") == 10
+    assert max_history_images("claude-sonnet-4@20250514") == 5
+    assert ImageEvictionPolicy.for_model("Gemini-2.5-flash").max_images == 10
+    # The prompt is not a tool result and is never evicted
+    history = make_history(max_images=0)
+    history.add_user_prompt(
+        "look", [{"source": screenshot(1)[0]["source"]}]
+    )
+    history.evict_images()
+    assert history.get_messages_for_llm()[0][1] == TextPrompt(text="look")
+    assert history.get_messages_for_llm()[0][0].source["type"] == "blob"
@@ -0,0 +1,148 @@
+import base64
+import io
+import types
+from unittest.mock import MagicMock
+
+from PIL import Image
+
+import ii_agent.core.storage.blobs as blobs
+from ii_agent.core.storage import BlobStore, InMemoryFileStore
+from ii_agent.llm.base import (
+    ImageBlock,
+    TextPrompt,
+    TextResult,
+    ToolCall,
+    ToolFormattedResult,
+    ToolParam,
+)
+from ii_agent.llm.openrouter import OpenRouterClient
+from ii_agent.llm.payload_cache import ToolPayloadCache, TurnPayloadCache
+from ii_agent.llm.token_counter import TokenCounter
+
+
+def convert(turn):
+    return [block.text for block in turn]
+
+
+def test_only_new_turns_are_converted():
+    cache = TurnPayloadCache()
+    messages = [[TextPrompt(text="a")], [TextResult(text="b")]]
+
+    assert cache.convert(messages, convert) == [["a"], ["b"]]
+    messages.append([TextPrompt(text="c")])
+    assert cache.convert(messages, convert) == [["a"], ["b"], ["c"]]
+
+    assert (cache.hits, cache.misses) == (2, 3)
+
+
+def test_extended_turn_is_converted_again():
+    cache = TurnPayloadCache()
+    turn = [TextResult(text="a")]
+    cache.convert([turn], convert)
+
+    turn.append(TextResult(text="b"))
+
+    assert cache.convert([turn], convert) == [["a", "b"]]
+    assert cache.misses == 2
+
+
+def test_image_turns_are_resolved_and_kept_apart(monkeypatch):
+    store = BlobStore(InMemoryFileStore())
+    monkeypatch.setattr(blobs, "_blob_store", store)
+    buffer = io.BytesIO()
+    Image.new("RGB", (4, 4), "red").save(buffer, format="PNG")
+    data = base64.b64encode(buffer.getvalue()).decode()
+    source = store.externalize_image_source(
+        {"type": "base64", "media_type": "image/png", "data": data}
+    )
+    image_turns = [[ImageBlock(type="image", source=source)] for _ in range(3)]
+    text_turn = [TextPrompt(text="look")]
+    cache = TurnPayloadCache(image_maxsize=1)
+
+    def sources(turn):
+        return [getattr(block, "source", None) for block in turn]
+
+    payloads = cache.convert([text_turn, *image_turns], sources)
+    cache.convert([text_turn, *image_turns], sources)
+
+    assert payloads[1] == [{"type": "base64", "media_type": "image/png", "data": data}]
+    assert image_turns[0][0].source["type"] == "blob"
+    # Only the most recent image turn stays cached; the text turn is unaffected
+    assert len(cache._image_payloads) == 1
+    assert (cache.hits, cache.misses) == (1, 7)
+
+
+def test_tool_payload_is_reused_across_tool_params():
+    schema = {"type": "object", "properties": {}}
+    cache = ToolPayloadCache()
+    calls = []
+
+    def convert_tools(tools):
+        calls.append(tools)
+        return [tool.name for tool in tools]
+
+    for _ in range(3):
+        tools = [ToolParam(name="bash", description="run", input_schema=schema)]
+        assert cache.convert(tools, convert_tools) == ["bash"]
+
+    assert len(calls) == 1
+    tools = [ToolParam(name="bash", description="run", input_schema=dict(schema))]
+    cache.convert(tools, convert_tools)
+    assert len(calls) == 2
+
+
+def make_response():
+    return types.SimpleNamespace(
+        choices=[
+            types.SimpleNamespace(
+                message=types.SimpleNamespace(content="ok", tool_calls=None)
+            )
+        ],
+        usage=types.SimpleNamespace(prompt_tokens=1, completion_tokens=1),
+    )
+
+
+def test_openrouter_requests_are_unchanged_by_the_cache():
+    client = OpenRouterClient(model_name="test", cot_model=True)
+    client.client = MagicMock()
+    client.client.chat.completions.create.return_value = make_response()
+    schema = {"type": "object", "properties": {"command": {"type": "string"}}}
+    tool = ToolParam(name="bash", description="run", input_schema=schema)
+    messages = [
+        [TextPrompt(text="list files")],
+        [ToolCall(tool_call_id="1", tool_name="bash", tool_input={"command": "ls"})],
+        [ToolFormattedResult(tool_call_id="1", tool_name="bash", tool_output="a.txt")],
+    ]
+
+    sent = []
+    for _ in range(2):
+        client.generate(messages, max_tokens=5, system_prompt="Be brief", tools=[tool])
+        sent.append(client.client.chat.completions.create.call_args.kwargs)
+
+    assert sent[0]["messages"] == sent[1]["messages"]
+    assert sent[1]["messages"][0] == {
+        "role": "user",
+        "content": [{"type": "text", "text": "Be brief\n\nlist files"}],
+    }
+    assert sent[1]["messages"][2]["role"] == "tool"
+    assert sent[1]["tools"][0]["function"]["parameters"]["strict"] is True
+    # The tool's own schema is left as it was
+    assert "strict" not in schema
+    assert client._turn_payloads.hits == 3
+
+
+def test_openrouter_prompt_tokens_match_whole_history_count(monkeypatch):
+    client = OpenRouterClient(model_name="test", cot_model=True)
+    messages = [[TextPrompt(text="x" * 300)], [TextResult(text="y" * 30)]]
+
+    def tool_choice(threshold):
+        monkeypatch.setattr(OpenRouterClient, "DEEP_RESEARCH_TOKEN_THRESHOLD", threshold)
+        return client._build_request_kwargs(
+            messages, 5, "system", 0.0, [], None, tool_args={"deep_research": True}
+        )["tool_choice"]
+
+    request = client._build_request_kwargs(messages, 5, "system", 0.0, [], None)
+    total = TokenCounter().count_tokens(request["messages"])
+
+    assert tool_choice(total - 1) == "required"
+    assert tool_choice(total) != "required"
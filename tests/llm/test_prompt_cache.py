@@ -0,0 +1,157 @@
+import asyncio
+import logging
+
+import pytest
+
+from ii_agent.agents.function_call import FunctionCallAgent
+from ii_agent.llm.base import LLMClient, TextResult
+from ii_agent.llm.message_history import MessageHistory
+from ii_agent.llm.prompt_cache import (
+    CACHE_CONTROL,
+    MAX_CACHE_BREAKPOINTS,
+    PromptCacheStats,
+    plan_cache_breakpoints,
+)
+from ii_agent.utils.workspace_manager import WorkspaceManager
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def text_message(role, text):
+    return {"role": role, "content": [{"type": "text", "text": text}]}
+
+
+def conversation(n_turns, summary=False):
+    messages = [text_message("user", "Build a website")]
+    if summary:
+        messages.append(text_message("assistant", "Conversation Summary: did things"))
+    for i in range(n_turns):
+        messages.append(text_message("assistant", f"step {i}"))
+        messages.append(text_message("user", f"result {i}"))
+    return messages
+
+
+def marked_indices(messages):
+    return [
+        idx
+        for idx, message in enumerate(messages)
+        if any("cache_control" in block for block in message["content"])
+    ]
+
+
+TOOLS = [
+    {"name": "bash", "description": "", "input_schema": {}},
+    {"name": "browser", "description": "", "input_schema": {}},
+]
+
+
+def test_system_tools_and_history_are_marked():
+    messages = conversation(5)
+
+    system, tools = plan_cache_breakpoints(messages, system="You are an agent", tools=TOOLS)
+
+    assert system == [
+        {"type": "text", "text": "You are an agent", "cache_control": CACHE_CONTROL}
+    ]
+    assert tools[-1]["cache_control"] == CACHE_CONTROL
+    assert "cache_control" not in tools[0]
+    assert "cache_control" not in TOOLS[-1]
+    # Last message, and the last message of the previous turn
+    assert marked_indices(messages) == [len(messages) - 3, len(messages) - 1]
+
+
+def test_summary_prefix_is_kept_stable_after_summarization():
+    messages = conversation(5, summary=True)
+
+    plan_cache_breakpoints(messages, system="You are an agent", tools=TOOLS)
+
+    assert marked_indices(messages) == [1, len(messages) - 1]
+
+
+def test_unused_breakpoints_go_to_history():
+    messages = conversation(5, summary=True)
+
+    system, tools = plan_cache_breakpoints(messages)
+
+    assert system is None and tools is None
+    assert marked_indices(messages) == [1, len(messages) - 3, len(messages) - 1]
+    assert len(marked_indices(messages)) <= MAX_CACHE_BREAKPOINTS
+
+
+def test_thinking_blocks_are_not_marked():
+    messages = conversation(2)
+    messages[-2]["content"] = [
+        {"type": "text", "text": "calling a tool"},
+        {"type": "thinking", "thinking": "hmm", "signature": "x"},
+    ]
+    messages[-1]["content"] = [{"type": "redacted_thinking", "data": "x"}]
+
+    plan_cache_breakpoints(messages)
+
+    assert "cache_control" in messages[-2]["content"][0]
+    assert "cache_control" not in messages[-2]["content"][1]
+    assert "cache_control" not in messages[-1]["content"][0]
+
+
+def test_stats_track_hit_rate_and_saved_tokens():
+    stats = PromptCacheStats()
+
+    stats.record(
+        {"input_tokens": 100, "cache_creation_input_tokens": 900, "cache_read_input_tokens": 0}
+    )
+    turn = stats.record(
+        {"input_tokens": 100, "cache_creation_input_tokens": 100, "cache_read_input_tokens": 800}
+    )
+    stats.record({"input_tokens": 50, "cache_creation_input_tokens": -1, "cache_read_input_tokens": -1})
+    assert stats.record(None) is None
+
+    assert turn.hit_rate == 0.8
+    assert stats.saved_input_tokens == 800
+    assert stats.to_dict() == {
+        "turns": 3,
+        "hit_rate": 800 / 2050,
+        "saved_input_tokens": 800,
+        "cache_creation_input_tokens": 1000,
+        "per_turn_hit_rate": [0.0, 0.8, 0.0],
+    }
+
+
+class CachingLLM(LLMClient):
+    def __init__(self):
+        self.model_name = "dummy"
+
+    def generate(self, *args, **kwargs):
+        return [TextResult(text="done")], {
+            "input_tokens": 10,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 990,
+        }
+
+
+class DummyContextManager:
+    async def aapply_truncation_if_needed(
+        self, messages, token_count=None, owner=None
+    ):
+        return messages
+
+    def count_turn_tokens(self, message_list):
+        return 0, 0
+
+
+@pytest.mark.asyncio
+async def test_agent_records_cache_usage_per_turn(tmp_path):
+    agent = FunctionCallAgent(
+        system_prompt="",
+        client=CachingLLM(),
+        tools=[],
+        init_history=MessageHistory(context_manager=DummyContextManager()),
+        workspace_manager=WorkspaceManager(tmp_path),
+        message_queue=asyncio.Queue(),
+        logger_for_agent_logs=logging.getLogger("test"),
+    )
+
+    await agent.run_agent_async("hi")
+    await agent.run_agent_async("again", resume=True)
+
+    assert agent.prompt_cache_stats.to_dict()["per_turn_hit_rate"] == [0.99, 0.99]
+    assert agent.prompt_cache_stats.saved_input_tokens == 1980
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import uuid
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+import ii_agent.db.manager as db_manager
+from ii_agent.agents.function_call import FunctionCallAgent
+from ii_agent.core.event import EventType, RealtimeEvent
+from ii_agent.db.models import Base, Session
+from ii_agent.llm.base import TextResult, ToolCall
+from ii_agent.llm.message_history import MessageHistory
+from ii_agent.llm.replay import ReplayScript, ScriptedLLMClient
+from ii_agent.tools.replay_tool import ReplayTool
+from ii_agent.utils.workspace_manager import WorkspaceManager
+
+pytest_plugins = ("pytest_asyncio",)
+
+SCRIPT = ReplayScript(
+    prompts=["list and read the files"],
+    responses=[
+        [
+            TextResult(text="Listing"),
+            ToolCall(tool_call_id="1", tool_name="bash", tool_input={"command": "ls"}),
+        ],
+        [ToolCall(tool_call_id="2", tool_name="read", tool_input={"path": "a.txt"})],
+        [ToolCall(tool_call_id="3", tool_name="bash", tool_input={"command": "wc"})],
+        [TextResult(text="Done")],
+    ],
+    tool_outputs={"bash": ["a.txt", "1 a.txt"], "read": ["hello"]},
+)
+
+
+class DummyContextManager:
+    async def aapply_truncation_if_needed(
+        self, messages, token_count=None, owner=None
+    ):
+        return messages
+
+    def count_tokens(self, messages):
+        return 0
+
+    def count_turn_tokens(self, message_list):
+        return 0, 0
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'events.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(
+        db_manager,
+        "SessionLocal",
+        sessionmaker(
+            autocommit=False, autoflush=False, bind=engine, expire_on_commit=False
+        ),
+    )
+    yield engine
+    engine.dispose()
+
+
+async def replay(script, tmp_path, session_id=None):
+    client = ScriptedLLMClient(script.responses)
+    agent = FunctionCallAgent(
+        system_prompt="",
+        client=client,
+        tools=[
+            ReplayTool(name, outputs) for name, outputs in script.tool_outputs.items()
+        ],
+        init_history=MessageHistory(context_manager=DummyContextManager()),
+        workspace_manager=WorkspaceManager(Path(tmp_path)),
+        message_queue=asyncio.Queue(),
+        logger_for_agent_logs=logging.getLogger("test"),
+        max_turns=len(script.responses) + 1,
+        session_id=session_id,
+    )
+    processor = agent.start_message_processing()
+    for prompt in script.prompts:
+        agent.message_queue.put_nowait(
+            RealtimeEvent(type=EventType.USER_MESSAGE, content={"text": prompt})
+        )
+        await agent.run_agent_async(prompt)
+    await agent.message_queue.join()
+    processor.cancel()
+    await processor
+    return agent, client
+
+
+@pytest.mark.asyncio
+async def test_replaying_a_recorded_history_reproduces_it(tmp_path):
+    agent, client = await replay(SCRIPT, tmp_path)
+    history = agent.history.get_messages_for_llm()
+
+    script = ReplayScript.from_message_lists(history)
+    replayed, _ = await replay(script, tmp_path)
+
+    assert script == SCRIPT
+    assert replayed.history.get_messages_for_llm() == history
+    assert len(client.calls) == 4
+    assert all(call.finished >= call.started for call in client.calls)
+
+
+@pytest.mark.asyncio
+async def test_script_is_rebuilt_from_session_events(engine, tmp_path):
+    session_id = uuid.uuid4()
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Session), [{"id": str(session_id), "workspace_dir": str(tmp_path)}]
+        )
+    await replay(SCRIPT, tmp_path, session_id=session_id)
+
+    script = ReplayScript.from_session_events(str(session_id))
+
+    assert script.prompts == SCRIPT.prompts
+    assert script.tool_outputs == SCRIPT.tool_outputs
+    # The events keep the tool calls but not the text written next to them
+    assert script.responses[:3] == [
+        [block for block in response if isinstance(block, ToolCall)]
+        for response in SCRIPT.responses[:3]
+    ]
+    assert script.responses[3] == [TextResult(text="Task completed")]
+
+
+def test_requests_past_the_script_get_an_empty_response():
+    requests = []
+    client = ScriptedLLMClient(
+        [[TextResult(text="only")]],
+        build_request=lambda **kwargs: requests.append(kwargs),
+    )
+
+    assert client.generate([], max_tokens=5)[0] == [TextResult(text="only")]
+    assert client.generate([], max_tokens=5) == ([], {})
+    assert [request["max_tokens"] for request in requests] == [5, 5]
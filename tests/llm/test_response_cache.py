@@ -0,0 +1,121 @@
+import pytest
+
+from ii_agent.llm.base import TextPrompt, TextResult, ToolCall, ToolParam
+from ii_agent.llm.replay import ScriptedLLMClient
+from ii_agent.llm.response_cache import (
+    CachedLLMClient,
+    LLMResponseCache,
+    ResponseCacheMiss,
+    ResponseCacheMode,
+)
+
+pytest_plugins = ("pytest_asyncio",)
+
+RESPONSE = [
+    TextResult(text="Listing"),
+    ToolCall(tool_call_id="1", tool_name="bash", tool_input={"command": "ls"}),
+]
+TOOLS = [
+    ToolParam(
+        name="bash",
+        description="Run a command",
+        input_schema={"type": "object", "properties": {"command": {"type": "string"}}},
+    )
+]
+
+
+def request(text="list the files", **overrides):
+    return {
+        "messages": [[TextPrompt(text=text)]],
+        "max_tokens": 100,
+        "system_prompt": "Be brief.",
+        "tools": TOOLS,
+        **overrides,
+    }
+
+
+def test_recorded_responses_are_served_until_the_request_changes(tmp_path):
+    path = str(tmp_path / "responses.db")
+    model = ScriptedLLMClient([RESPONSE, [TextResult(text="other")]] * 3)
+    client = CachedLLMClient(model, cache=LLMResponseCache(path=path))
+
+    first = client.generate(**request())
+    second = client.generate(**request())
+    client.generate(**request(temperature=0.5))
+    client.generate(**request(text="read the files"))
+
+    assert first == (RESPONSE, {})
+    assert second == (RESPONSE, {"response_cache_hit": True})
+    assert len(model.calls) == 3
+    assert client.cache.stats()["entries"] == 3
+
+    # Another process replays the recording without calling the model
+    fresh = ScriptedLLMClient([])
+    replaying = CachedLLMClient(
+        fresh, mode="replay", cache=LLMResponseCache(path=path)
+    )
+    assert replaying.generate(**request())[0] == RESPONSE
+    with pytest.raises(ResponseCacheMiss):
+        replaying.generate(**request(max_tokens=200))
+    assert fresh.calls == []
+
+
+def test_recordings_replay_on_a_later_date(tmp_path):
+    path = str(tmp_path / "responses.db")
+    recording = CachedLLMClient(
+        ScriptedLLMClient([RESPONSE]), cache=LLMResponseCache(path=path)
+    )
+    recording.generate(
+        **request(system_prompt="Be brief.\n\nToday is 2025-06-01. Be accurate.")
+    )
+
+    replaying = CachedLLMClient(
+        ScriptedLLMClient([]), mode="replay", cache=LLMResponseCache(path=path)
+    )
+    later = request(system_prompt="Be brief.\n\nToday is 2025-06-02. Be accurate.")
+    assert replaying.generate(**later)[0] == RESPONSE
+    with pytest.raises(ResponseCacheMiss):
+        replaying.generate(
+            **request(system_prompt="Be terse.\n\nToday is 2025-06-02. Be accurate.")
+        )
+
+
+def test_least_recently_used_responses_are_evicted_above_the_size_limit():
+    ticks = iter(range(100))
+    cache = LLMResponseCache(path=":memory:", clock=lambda: next(ticks))
+    client = CachedLLMClient(ScriptedLLMClient([RESPONSE] * 4), cache=cache)
+    client.generate(**request(text="a"))
+    cache.max_bytes = cache.stats()["bytes"] * 5 // 2
+    client.generate(**request(text="b"))
+    client.generate(**request(text="a"))
+
+    client.generate(**request(text="c"))
+
+    assert cache.evictions == 1
+    client.generate(**request(text="a"))
+    client.generate(**request(text="c"))
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["entries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_async_and_streamed_requests_share_the_cache():
+    model = ScriptedLLMClient([RESPONSE])
+    client = CachedLLMClient(model, cache=LLMResponseCache(path=":memory:"))
+    deltas = []
+
+    await client.agenerate(**request())
+    response, metadata = await client.agenerate_stream(
+        on_delta=deltas.append, **request()
+    )
+
+    assert response == RESPONSE
+    assert metadata == {"response_cache_hit": True}
+    assert [delta.delta for delta in deltas] == ["Listing"]
+    assert len(model.calls) == 1
+
+    passthrough = CachedLLMClient(
+        model, mode=ResponseCacheMode.PASSTHROUGH, cache=client.cache
+    )
+    assert await passthrough.agenerate(**request()) == ([], {})
+    assert len(model.calls) == 2
@@ -0,0 +1,178 @@
+import base64
+import io
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import ii_agent.core.storage.blobs as blobs
+from ii_agent.core.storage import BlobStore, InMemoryFileStore, LocalFileStore
+from ii_agent.llm.base import (
+    ImageBlock,
+    TextPrompt,
+    ToolCallParameters,
+    ToolFormattedResult,
+)
+from ii_agent.llm.message_history import MessageHistory
+from ii_agent.llm.token_counter import TokenCounter
+from ii_agent.llm.utils import resolve_blob_references
+from ii_agent.server.api import blobs_router
+
+
+def png_base64(color="red", size=(30, 20)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+def screenshot_output(data):
+    return [
+        {
+            "type": "image",
+            "source": {"type": "base64", "media_type": "image/png", "data": data},
+        },
+        {"type": "text", "text": "Navigated"},
+    ]
+
+
+@pytest.fixture
+def blob_store(monkeypatch):
+    store = BlobStore(InMemoryFileStore())
+    monkeypatch.setattr(blobs, "_blob_store", store)
+    return store
+
+
+@pytest.mark.parametrize("backend", ["memory", "local"])
+def test_put_is_content_addressed(tmp_path, backend):
+    file_store = (
+        InMemoryFileStore() if backend == "memory" else LocalFileStore(str(tmp_path))
+    )
+    store = BlobStore(file_store)
+    data = base64.b64decode(png_base64())
+
+    digest = store.put(data)
+
+    assert store.put(data) == digest
+    assert BlobStore(file_store).put(data) == digest
+    assert store.get(digest) == data
+    assert store.exists(digest)
+    assert len(file_store.list("blobs/")) == 1
+
+
+def test_get_rejects_invalid_digest(blob_store):
+    with pytest.raises(ValueError):
+        blob_store.get("../sessions/x/agent_state.json")
+    with pytest.raises(FileNotFoundError):
+        blob_store.get("0" * 64)
+
+
+def test_history_stores_images_once(blob_store):
+    history = MessageHistory(context_manager=None)
+    data = png_base64()
+    history.add_user_prompt(
+        "look", [{"source": {"type": "base64", "media_type": "image/png", "data": data}}]
+    )
+    call = ToolCallParameters(tool_call_id="1", tool_name="browser_view", tool_input={})
+    history.add_tool_call_result(call, screenshot_output(data))
+
+    messages = history.get_messages_for_llm()
+    image, tool_result = messages[0][0], messages[1][0]
+    assert image.source["type"] == "blob"
+    assert tool_result.tool_output[0]["source"] == image.source
+    assert tool_result.tool_output[1] == {"type": "text", "text": "Navigated"}
+    assert data not in str(messages)
+    assert len(blob_store.file_store.files) == 1
+
+
+def test_resolve_blob_references_inlines_only_referencing_turns(blob_store):
+    data = png_base64()
+    source = blob_store.externalize_image_source(
+        {"type": "base64", "media_type": "image/png", "data": data}
+    )
+    text_turn = [TextPrompt(text="hi")]
+    messages = [
+        text_turn,
+        [ImageBlock(type="image", source=source)],
+        [
+            ToolFormattedResult(
+                tool_call_id="1",
+                tool_name="browser_view",
+                tool_output=blob_store.externalize_tool_output(screenshot_output(data)),
+            )
+        ],
+    ]
+
+    resolved = resolve_blob_references(messages)
+
+    assert resolved[0] is text_turn
+    assert resolved[1][0].source == {
+        "type": "base64",
+        "media_type": "image/png",
+        "data": data,
+    }
+    assert resolved[2][0].tool_output == screenshot_output(data)
+    # The history keeps the references
+    assert messages[1][0].source["type"] == "blob"
+
+
+def test_saved_session_state_holds_references(blob_store):
+    file_store = InMemoryFileStore()
+    history = MessageHistory(context_manager=None)
+    call = ToolCallParameters(tool_call_id="1", tool_name="browser_view", tool_input={})
+    data = png_base64()
+    history.add_tool_call_result(call, screenshot_output(data))
+
+    history.save_to_session("s1", file_store)
+
+    raw_state = file_store.read("sessions/s1/agent_state.json")
+    state = json.loads(raw_state)
+    assert state[0][0]["tool_output"][0]["source"]["type"] == "blob"
+    assert data not in raw_state
+
+
+def test_token_counter_reads_referenced_images(blob_store):
+    output = screenshot_output(png_base64(size=(750, 100)))
+    externalized = blob_store.externalize_tool_output(output)
+
+    counter = TokenCounter()
+
+    assert counter.count_tokens(externalized) == counter.count_tokens(output)
+
+
+def test_blob_endpoint_serves_content(blob_store):
+    app = FastAPI()
+    app.include_router(blobs_router)
+    client = TestClient(app)
+    data = base64.b64decode(png_base64())
+    digest = blob_store.put(data)
+
+    response = client.get(f"/api/blobs/{digest}")
+
+    assert response.status_code == 200
+    assert response.content == data
+    assert response.headers["content-type"] == "image/png"
+    assert "immutable" in response.headers["cache-control"]
+    assert client.get(f"/api/blobs/{'0' * 64}").status_code == 404
+    assert client.get("/api/blobs/not-a-digest").status_code == 400
+
+
+def test_ui_gets_the_display_version_of_screenshots(blob_store):
+    model_data, display_data = png_base64(size=(15, 10)), png_base64()
+    output = screenshot_output(model_data)
+    output[0]["source"]["display_data"] = display_data
+
+    externalized = blob_store.externalize_tool_output(output)
+    displayed = blob_store.display_tool_output(externalized)
+
+    source = externalized[0]["source"]
+    assert blob_store.get(source["display_digest"]) == base64.b64decode(display_data)
+    assert displayed[0]["source"] == {
+        "type": "blob",
+        "media_type": "image/png",
+        "digest": source["display_digest"],
+    }
+    assert blob_store.resolve_tool_output(externalized) == screenshot_output(model_data)
+    # Sources that were never externalized go to the model without the UI image
+    assert blob_store.resolve_tool_output(output) == screenshot_output(model_data)
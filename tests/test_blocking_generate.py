@@ -0,0 +1,148 @@
+import ast
+import asyncio
+import logging
+import threading
+from pathlib import Path
+
+import pytest
+
+import ii_agent
+from ii_agent.llm.base import LLMClient, TextResult
+from ii_agent.llm.context_manager.llm_summarizing import LLMSummarizingContextManager
+from ii_agent.llm.message_history import MessageHistory
+from ii_agent.llm.token_counter import TokenCounter
+from ii_agent.tools.memory.compactify_memory import CompactifyMemoryTool
+from ii_agent.tools.presentation_tool import PresentationTool
+from ii_agent.utils.constants import AUXILIARY_LLM_MAX_CONCURRENCY
+from ii_agent.utils.prompt_generator import enhance_user_prompt
+from ii_agent.utils.workspace_manager import WorkspaceManager
+
+pytest_plugins = ("pytest_asyncio",)
+
+# Synchronous methods that (may) call the LLM
+BLOCKING_LLM_METHODS = {"generate", "truncate", "apply_truncation", "apply_truncation_if_needed"}
+# The default ContextManager.aapply_truncation, for strategies that do not call an LLM
+ALLOWED_CALLS = {"llm/context_manager/base.py apply_truncation()"}
+
+
+def blocking_calls_in_coroutines(package_dir, path):
+    calls = []
+
+    def visit(node, in_coroutine):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.Lambda)):
+                visit(child, False)
+            elif isinstance(child, ast.AsyncFunctionDef):
+                visit(child, True)
+            else:
+                if (
+                    in_coroutine
+                    and isinstance(child, ast.Call)
+                    and isinstance(child.func, ast.Attribute)
+                    and child.func.attr in BLOCKING_LLM_METHODS
+                ):
+                    calls.append((child.lineno, f"{path} {child.func.attr}()"))
+                visit(child, in_coroutine)
+
+    visit(ast.parse((package_dir / path).read_text()), False)
+    return calls
+
+
+def test_no_coroutine_calls_blocking_llm_methods():
+    package_dir = Path(ii_agent.__file__).parent
+    calls = [
+        f"{call}:{lineno}"
+        for path in sorted(package_dir.rglob("*.py"))
+        for lineno, call in blocking_calls_in_coroutines(
+            package_dir, path.relative_to(package_dir)
+        )
+        if call not in ALLOWED_CALLS
+    ]
+
+    assert calls == []
+
+
+class LoopCheckingLLM(LLMClient):
+    """Fails if ``generate`` runs on an event loop thread."""
+
+    def __init__(self, delay=0.0):
+        self.model_name = "dummy"
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def generate(self, *args, **kwargs):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("generate() blocked the event loop")
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        threading.Event().wait(self.delay)
+        with self.lock:
+            self.active -= 1
+        return [TextResult(text="generated")], None
+
+
+def summarizing_context_manager(client):
+    return LLMSummarizingContextManager(
+        client=client,
+        token_counter=TokenCounter(),
+        logger=logging.getLogger("test"),
+        max_size=4,
+    )
+
+
+@pytest.mark.asyncio
+async def test_prompt_enhancement_does_not_block():
+    success, _, prompt = await enhance_user_prompt(LoopCheckingLLM(), "make a site", [])
+
+    assert success
+    assert prompt == "generated"
+
+
+@pytest.mark.asyncio
+async def test_presentation_agent_does_not_block(tmp_path):
+    client = LoopCheckingLLM()
+    tool = PresentationTool(
+        client=client,
+        workspace_manager=WorkspaceManager(tmp_path),
+        message_queue=asyncio.Queue(),
+        context_manager=summarizing_context_manager(client),
+    )
+
+    output = await tool.run_impl({"action": "update", "description": "Add a slide"})
+
+    assert output.tool_output == "generated"
+
+
+@pytest.mark.asyncio
+async def test_compactify_memory_does_not_block():
+    client = LoopCheckingLLM()
+    history = MessageHistory(context_manager=summarizing_context_manager(client))
+    for i in range(5):
+        history.add_user_prompt(f"question {i}")
+        history.add_assistant_turn([TextResult(text=f"answer {i}")])
+
+    output = await CompactifyMemoryTool(
+        history._context_manager
+    ).run_impl({}, history)
+
+    assert output.auxiliary_data["success"]
+    assert "generated" in str(history.get_messages_for_llm())
+
+
+@pytest.mark.asyncio
+async def test_auxiliary_calls_are_bounded():
+    client = LoopCheckingLLM(delay=0.05)
+
+    results = await asyncio.gather(
+        *(enhance_user_prompt(client, f"request {i}", []) for i in range(10))
+    )
+
+    assert all(success for success, _, _ in results)
+    assert client.max_active <= AUXILIARY_LLM_MAX_CONCURRENCY
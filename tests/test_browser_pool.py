@@ -0,0 +1,150 @@
+import asyncio
+
+import pytest
+
+from ii_agent.browser.browser import Browser
+from ii_agent.browser.models import BrowserError
+from ii_agent.browser.pool import BrowserPool
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+class FakeContext:
+    def __init__(self, options):
+        self.options = options
+        self.pages = []
+        self.closed = False
+
+    def on(self, event, handler):
+        pass
+
+    async def add_init_script(self, script):
+        pass
+
+    async def new_page(self):
+        page = object()
+        self.pages.append(page)
+        return page
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+        self.connected = True
+        self.handlers = []
+
+    def on(self, event, handler):
+        self.handlers.append(handler)
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **options):
+        context = FakeContext(options)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.crash()
+
+    def crash(self):
+        self.connected = False
+        for handler in self.handlers:
+            handler(self)
+
+
+def make_pool(**kwargs):
+    launched = []
+
+    async def launch():
+        launched.append(FakeBrowser())
+        return launched[-1]
+
+    return BrowserPool(launch=launch, **kwargs), launched
+
+
+@pytest.mark.asyncio
+async def test_sessions_get_their_own_context_on_shared_browsers():
+    pool, launched = make_pool(
+        min_browsers=1, max_browsers=2, max_contexts_per_browser=2, acquire_timeout=0.1
+    )
+    await pool.start()
+    assert len(launched) == 1
+
+    leases = [await pool.acquire(viewport={"width": 10}) for _ in range(4)]
+
+    assert len(launched) == 2
+    assert len({id(lease.context) for lease in leases}) == 4
+    assert [len(browser.contexts) for browser in launched] == [2, 2]
+    with pytest.raises(BrowserError):
+        await pool.acquire()
+
+    waiting = asyncio.create_task(pool.acquire())
+    await asyncio.sleep(0)
+    await pool.release(leases[0])
+    lease = await waiting
+    assert leases[0].context.closed
+    assert lease.browser is leases[0].browser
+    await pool.close()
+    assert not any(browser.connected for browser in launched)
+
+
+@pytest.mark.asyncio
+async def test_browsers_are_recycled_after_use_crash_and_idling():
+    now = [0.0]
+    pool, launched = make_pool(
+        min_browsers=1, max_browsers=3, max_uses=2, idle_timeout=10, clock=lambda: now[0]
+    )
+    first = await pool.acquire()
+    second = await pool.acquire()
+    # The first browser has served its sessions, a third gets a new one
+    third = await pool.acquire()
+    assert third.browser is launched[1]
+    await pool.release(first)
+    assert launched[0].connected
+    await pool.release(second)
+    assert not launched[0].connected
+    assert pool.stats()["recycled"] == 1
+
+    launched[1].crash()
+    fourth = await pool.acquire()
+    assert fourth.browser is launched[2]
+
+    await pool.release(third)
+    await pool.release(fourth)
+    now[0] = 20.0
+    await pool.reap_idle()
+    # Idle for too long, but kept warm for the next session
+    assert launched[2].connected
+    pool.min_browsers = 0
+    await pool.reap_idle()
+    assert not launched[2].connected
+    assert pool.stats() == {
+        "browsers": 0,
+        "contexts": 0,
+        "launched": 3,
+        "recycled": 2,
+    }
+
+
+@pytest.mark.asyncio
+async def test_browser_leases_a_context_and_reopens_it_after_a_crash():
+    pool, launched = make_pool(min_browsers=0)
+    browser = Browser(pool=pool)
+
+    page = await browser.get_current_page()
+    assert browser.playwright is None
+    assert browser.context.options["viewport"] == browser.config.viewport_size
+    assert browser.context.pages == [page]
+
+    launched[0].crash()
+    await browser.get_current_page()
+    assert browser.playwright_browser is launched[1]
+
+    context = browser.context
+    await browser.close()
+    assert context.closed
+    assert pool.stats()["contexts"] == 0
@@ -0,0 +1,78 @@
+import asyncio
+import gc
+import types
+import uuid
+
+import pytest
+
+from ii_agent.server.websocket import chat_session as chat_session_module
+from ii_agent.server.websocket.chat_session import ChatSession
+from ii_agent.tools.browser_tools.base import BrowserTool
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+class FakeEventSink:
+    def __init__(self):
+        self.flushed = False
+
+    async def flush(self):
+        await asyncio.sleep(0.01)
+        self.flushed = True
+
+
+def make_session(tools=()):
+    session = ChatSession(None, None, uuid.uuid4(), None, None, None)
+    session.agent = types.SimpleNamespace(
+        tool_manager=types.SimpleNamespace(get_tools=lambda: list(tools)),
+        websocket=object(),
+        history=None,
+        event_sink=FakeEventSink(),
+    )
+    return session
+
+
+@pytest.mark.asyncio
+async def test_cleanup_finishes_the_final_event_flush():
+    session = make_session()
+    sink = session.agent.event_sink
+
+    session.cleanup()
+    gc.collect()
+    await asyncio.gather(*chat_session_module._cleanup_tasks)
+
+    assert sink.flushed
+    assert not chat_session_module._cleanup_tasks
+
+
+class FakeBrowser:
+    def __init__(self, events):
+        self.events = events
+
+    async def close(self):
+        self.events.append("browser closed")
+
+
+@pytest.mark.asyncio
+async def test_browsers_are_closed_after_the_cancelled_agent_task():
+    events = []
+    tool = BrowserTool.__new__(BrowserTool)
+    tool.browser = FakeBrowser(events)
+    session = make_session([tool])
+
+    async def run_agent():
+        try:
+            await asyncio.sleep(10)
+        finally:
+            # The agent still uses the page while it unwinds
+            await asyncio.sleep(0.01)
+            events.append("agent stopped")
+
+    session.active_task = asyncio.create_task(run_agent())
+    await asyncio.sleep(0)
+
+    session.cleanup()
+    gc.collect()
+    await asyncio.gather(*chat_session_module._cleanup_tasks)
+
+    assert events == ["agent stopped", "browser closed"]
@@ -0,0 +1,52 @@
+from sqlalchemy import create_engine, event, inspect
+
+from ii_agent.db.manager import SQLITE_BUSY_TIMEOUT_MS, configure_sqlite_connection
+from ii_agent.db.models import Base
+
+
+def make_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'events.db'}")
+    event.listen(engine, "connect", configure_sqlite_connection)
+    return engine
+
+
+def test_sqlite_pragmas_applied(tmp_path):
+    engine = make_engine(tmp_path)
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        # 1 == NORMAL
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+        assert (
+            conn.exec_driver_sql("PRAGMA busy_timeout").scalar()
+            == SQLITE_BUSY_TIMEOUT_MS
+        )
+    engine.dispose()
+
+
+def test_history_queries_are_indexed(tmp_path):
+    engine = make_engine(tmp_path)
+    Base.metadata.create_all(engine)
+    inspector = inspect(engine)
+
+    event_indexes = {i["name"]: i["column_names"] for i in inspector.get_indexes("event")}
+    session_indexes = {
+        i["name"]: i["column_names"] for i in inspector.get_indexes("session")
+    }
+    assert event_indexes["ix_event_session_id_timestamp"] == ["session_id", "timestamp"]
+    assert event_indexes["ix_event_session_id_event_type_timestamp"] == [
+        "session_id",
+        "event_type",
+        "timestamp",
+    ]
+    assert session_indexes["ix_session_device_id_created_at"] == [
+        "device_id",
+        "created_at",
+    ]
+
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql(
+            "EXPLAIN QUERY PLAN SELECT * FROM event "
+            "WHERE session_id = 'x' ORDER BY timestamp"
+        ).fetchall()
+    assert "ix_event_session_id_timestamp" in " ".join(str(row) for row in plan)
+    engine.dispose()
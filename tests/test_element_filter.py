@@ -0,0 +1,158 @@
+import random
+from typing import List
+
+import pytest
+
+from ii_agent.browser.models import Coordinates, InteractiveElement, Rect
+from ii_agent.browser.utils import (
+    calculate_iou,
+    filter_overlapping_elements,
+    is_fully_contained,
+)
+
+
+def pairwise_filter_overlapping_elements(
+    elements: List[InteractiveElement], iou_threshold: float = 0.7
+) -> List[InteractiveElement]:
+    """The pairwise implementation the spatial index replaced."""
+    if not elements:
+        return []
+
+    elements.sort(key=lambda e: (-(e.rect.width * e.rect.height), -e.weight))
+
+    filtered_elements: List[InteractiveElement] = []
+    for current in elements:
+        should_add = True
+        for existing in filtered_elements:
+            iou = calculate_iou(current.rect, existing.rect)
+            if iou > iou_threshold:
+                should_add = False
+                break
+
+            if is_fully_contained(current.rect, existing.rect):
+                if (
+                    existing.weight >= current.weight
+                    and existing.z_index == current.z_index
+                ):
+                    should_add = False
+                    break
+                else:
+                    if (
+                        current.rect.width * current.rect.height
+                        >= existing.rect.width * existing.rect.height * 0.5
+                    ):
+                        filtered_elements.remove(existing)
+                        break
+
+        if should_add:
+            filtered_elements.append(current)
+
+    return filtered_elements
+
+
+def element(index, left, top, width, height, weight=1.0, z_index=0):
+    position = Coordinates(x=left, y=top, width=width, height=height)
+    return InteractiveElement(
+        index=index,
+        tag_name="div",
+        text="",
+        attributes={},
+        viewport=position,
+        page=position,
+        center=position,
+        weight=weight,
+        browser_agent_id=str(index),
+        rect=Rect(
+            left=left,
+            top=top,
+            right=left + width,
+            bottom=top + height,
+            width=width,
+            height=height,
+        ),
+        z_index=z_index,
+    )
+
+
+def random_layout(rng, count):
+    """Sheet cells, their detected duplicates, containers and odd shapes."""
+    elements = []
+    for index in range(count):
+        kind = rng.random()
+        weight = rng.choice([0.5, 1.0, 1.0, 2.0])
+        z_index = rng.choice([0, 0, 0, 1])
+        if kind < 0.4 or not elements:
+            left, top = rng.randrange(0, 1200, 40), rng.randrange(0, 900, 20)
+            box = (left, top, 40, 20)
+        elif kind < 0.7:
+            # Nearly the same box as an element found by another detector
+            other = rng.choice(elements).rect
+            box = (
+                other.left + rng.randint(-4, 4),
+                other.top + rng.randint(-4, 4),
+                max(other.width + rng.randint(-8, 8), 0),
+                max(other.height + rng.randint(-8, 8), 0),
+            )
+        elif kind < 0.8:
+            # An element inside or around another one
+            other = rng.choice(elements).rect
+            scale = rng.choice([0.3, 0.5, 0.75, 0.8, 0.9, 1.5, 4.0])
+            width, height = int(other.width * scale), int(other.height * scale)
+            box = (other.left + rng.randint(0, 4), other.top, width, height)
+        elif kind < 0.99:
+            box = (
+                rng.randint(-50, 1300),
+                rng.randint(-50, 1000),
+                rng.randint(0, 300),
+                rng.randint(0, 200),
+            )
+        else:
+            # Whole page containers
+            box = (0, 0, rng.choice([1268, 5000]), rng.choice([951, 20000]))
+        elements.append(element(index, *box, weight=weight, z_index=z_index))
+    return elements
+
+
+@pytest.mark.parametrize("seed", range(40))
+@pytest.mark.parametrize("iou_threshold", [0.0, 0.3, 0.7, 1.0])
+def test_matches_the_pairwise_filter(seed, iou_threshold):
+    rng = random.Random(seed)
+    elements = random_layout(rng, rng.choice([1, 5, 50, 300]))
+
+    expected = pairwise_filter_overlapping_elements(list(elements), iou_threshold)
+    actual = filter_overlapping_elements(list(elements), iou_threshold)
+
+    assert [id(e) for e in actual] == [id(e) for e in expected]
+
+
+def test_edge_cases_match_the_pairwise_filter():
+    layouts = [
+        [],
+        # Identical boxes, touching boxes and empty boxes
+        [element(i, 10, 10, 40, 20) for i in range(3)],
+        [element(0, 0, 0, 40, 20), element(1, 40, 0, 40, 20), element(2, 40, 20, 0, 0)],
+        # An inverted box within a normal one
+        [
+            element(0, 0, 0, 100, 100),
+            InteractiveElement.model_validate(
+                {
+                    **element(1, 0, 0, 0, 0).model_dump(),
+                    "rect": Rect(left=50, top=50, right=40, bottom=40, width=0, height=0),
+                }
+            ),
+        ],
+        # A larger element that replaces the one it is contained in, but still
+        # overlaps a later one
+        [
+            element(0, 0, 0, 100, 100, weight=1.0),
+            element(1, 5, 5, 94, 94, weight=0.5),
+            element(2, 0, 0, 90, 90, weight=2.0, z_index=1),
+        ],
+    ]
+    for elements in layouts:
+        for iou_threshold in (-0.5, 0.0, 0.7):
+            expected = pairwise_filter_overlapping_elements(
+                list(elements), iou_threshold
+            )
+            actual = filter_overlapping_elements(list(elements), iou_threshold)
+            assert [id(e) for e in actual] == [id(e) for e in expected]
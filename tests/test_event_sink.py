@@ -0,0 +1,108 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import ii_agent.db.manager as db_manager
+from ii_agent.core.event import EventType, RealtimeEvent
+from ii_agent.db.event_sink import EventSink, flush_all_event_sinks
+from ii_agent.db.models import Base
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'events.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(
+        db_manager,
+        "SessionLocal",
+        sessionmaker(
+            autocommit=False, autoflush=False, bind=engine, expire_on_commit=False
+        ),
+    )
+    yield engine
+    engine.dispose()
+
+
+def make_event(i):
+    return RealtimeEvent(type=EventType.TOOL_RESULT, content={"i": i})
+
+
+def stored_indices(session_id):
+    with db_manager.get_db() as db:
+        rows = (
+            db.query(db_manager.Event)
+            .filter(db_manager.Event.session_id == str(session_id))
+            .order_by(db_manager.Event.timestamp)
+            .all()
+        )
+        return [row.event_payload["content"]["i"] for row in rows]
+
+
+@pytest.mark.asyncio
+async def test_flushes_when_batch_is_full(temp_db):
+    session_id = uuid.uuid4()
+    sink = EventSink(session_id, max_batch_size=5, flush_interval=60)
+
+    for i in range(4):
+        sink.put(make_event(i))
+    await asyncio.sleep(0.05)
+    assert stored_indices(session_id) == []
+
+    sink.put(make_event(4))
+    for _ in range(100):
+        if sink.pending == 0 and len(stored_indices(session_id)) == 5:
+            break
+        await asyncio.sleep(0.01)
+    assert stored_indices(session_id) == [0, 1, 2, 3, 4]
+    await sink.aclose()
+
+
+@pytest.mark.asyncio
+async def test_flushes_after_interval(temp_db):
+    session_id = uuid.uuid4()
+    sink = EventSink(session_id, max_batch_size=1000, flush_interval=0.05)
+
+    sink.put(make_event(0))
+    sink.put(make_event(1))
+    await asyncio.sleep(0.3)
+
+    assert stored_indices(session_id) == [0, 1]
+    await sink.aclose()
+
+
+@pytest.mark.asyncio
+async def test_close_persists_everything_in_order(temp_db):
+    session_id = uuid.uuid4()
+    sink = EventSink(session_id, max_batch_size=7, flush_interval=60)
+
+    for i in range(50):
+        sink.put(make_event(i))
+    await sink.aclose()
+
+    assert sink.pending == 0
+    assert stored_indices(session_id) == list(range(50))
+    with pytest.raises(RuntimeError):
+        sink.put(make_event(50))
+
+
+@pytest.mark.asyncio
+async def test_flush_all_event_sinks(temp_db):
+    session_ids = [uuid.uuid4(), uuid.uuid4()]
+    sinks = [EventSink(s, flush_interval=60) for s in session_ids]
+    for sink in sinks:
+        sink.put(make_event(0))
+
+    await flush_all_event_sinks()
+
+    for session_id in session_ids:
+        assert stored_indices(session_id) == [0]
+    for sink in sinks:
+        await sink.aclose()
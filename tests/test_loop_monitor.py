@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import ii_agent.core.loop_monitor as loop_monitor
+from ii_agent.core.loop_monitor import LoopLagMonitor, current_activity, loop_activity
+from ii_agent.server.api import admin_router
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def blocking_tool_call():
+    time.sleep(0.4)
+
+
+async def run_monitored(coro_fn):
+    monitor = LoopLagMonitor(interval=0.02, threshold=0.1)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        await coro_fn()
+        await asyncio.sleep(0.1)
+    finally:
+        await monitor.stop()
+    return monitor
+
+
+@pytest.mark.asyncio
+async def test_blocking_call_is_captured_with_stack_and_attribution():
+    async def session():
+        with loop_activity(session_id="s1"):
+            with loop_activity(tool="bash"):
+                assert current_activity() == {"session_id": "s1", "tool": "bash"}
+                blocking_tool_call()
+            assert current_activity() == {"session_id": "s1"}
+
+    monitor = await run_monitored(session)
+
+    stats = monitor.stats()
+    assert stats["blocked_count"] == 1
+    assert stats["max_lag_ms"] >= 300
+    (report,) = stats["reports"]
+    assert report["activity"] == {"session_id": "s1", "tool": "bash"}
+    assert report["duration"] >= 0.3
+    assert any("blocking_tool_call" in frame for frame in report["stack"])
+
+
+@pytest.mark.asyncio
+async def test_tasks_inherit_attribution_from_their_creator():
+    async def session():
+        with loop_activity(session_id="s2"):
+            await asyncio.create_task(asyncio.to_thread(lambda: None))
+            await asyncio.create_task(child())
+
+    async def child():
+        blocking_tool_call()
+
+    monitor = await run_monitored(session)
+
+    (report,) = monitor.stats()["reports"]
+    assert report["activity"] == {"session_id": "s2"}
+
+
+@pytest.mark.asyncio
+async def test_short_lags_are_not_reported():
+    async def session():
+        for _ in range(5):
+            time.sleep(0.01)
+            await asyncio.sleep(0.01)
+
+    monitor = await run_monitored(session)
+
+    stats = monitor.stats()
+    assert stats["samples"] > 0
+    assert stats["blocked_count"] == 0
+    assert stats["reports"] == []
+
+
+def test_admin_endpoint_exposes_stats(monkeypatch):
+    monitor = LoopLagMonitor()
+    monitor._record(0.5)
+    monkeypatch.setattr(loop_monitor, "_loop_monitor", monitor)
+    app = FastAPI()
+    app.include_router(admin_router)
+
+    body = TestClient(app).get("/api/admin/loop-lag").json()
+
+    assert body["running"] is False
+    assert body["blocked_count"] == 1
+    assert body["reports"][0]["duration"] == 0.5
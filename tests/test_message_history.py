@@ -1,11 +1,18 @@
+import logging
+from unittest.mock import Mock
+
 import pytest
 from ii_agent.llm.base import (
+    LLMClient,
     TextPrompt,
     TextResult,
     ToolCall,
+    ToolCallParameters,
     ToolFormattedResult,
 )
+from ii_agent.llm.context_manager.llm_summarizing import LLMSummarizingContextManager
 from ii_agent.llm.message_history import MessageHistory
+from ii_agent.llm.token_counter import TokenCounter
 
 
 @pytest.fixture
@@ -103,3 +110,91 @@ class TestToolCallIntegrity:
             [TextResult(text="Done")],
         ]
         assert result == expected
+
+
+class CountingContextManager(LLMSummarizingContextManager):
+    """Summarizing context manager that records which turns get counted."""
+
+    def __init__(self, **kwargs):
+        super().__init__(
+            client=Mock(spec=LLMClient),
+            token_counter=TokenCounter(),
+            logger=Mock(spec=logging.Logger),
+            **kwargs,
+        )
+        self.counted_turns = []
+
+    def count_turn_tokens(self, message_list):
+        self.counted_turns.append(message_list)
+        return super().count_turn_tokens(message_list)
+
+
+class TestTokenCache:
+    def _add_exchange(self, history, idx):
+        call = ToolCall(tool_call_id=str(idx), tool_name="ls", tool_input={"n": idx})
+        history.add_assistant_turn([call])
+        history.add_tool_call_result(
+            ToolCallParameters(
+                tool_call_id=call.tool_call_id,
+                tool_name=call.tool_name,
+                tool_input=call.tool_input,
+            ),
+            "file.txt " * 10,
+        )
+
+    def test_each_turn_counted_once(self):
+        history = MessageHistory(CountingContextManager(token_budget=10**9))
+        history.add_user_prompt("Hello there")
+        for idx in range(20):
+            self._add_exchange(history, idx)
+            history.truncate()
+            history.count_tokens()
+
+        assert history.token_recounts == len(history)
+        assert history.count_tokens() == history._context_manager.count_tokens(
+            history.get_messages_for_llm()
+        )
+
+    def test_new_turns_only_are_counted(self):
+        history = MessageHistory(CountingContextManager(token_budget=10**9))
+        history.add_user_prompt("Hello there")
+        self._add_exchange(history, 0)
+        history.count_tokens()
+        recounts = history.token_recounts
+
+        history.add_assistant_turn([TextResult(text="done")])
+        history.count_tokens()
+
+        assert history.token_recounts == recounts + 1
+
+    def test_truncation_invalidates_cache(self):
+        history = MessageHistory(CountingContextManager(token_budget=10**9, max_size=6))
+        history._context_manager.client.generate.return_value = (
+            [TextResult(text="summary")],
+            None,
+        )
+        history.add_user_prompt("Hello there")
+        for idx in range(5):
+            self._add_exchange(history, idx)
+        history.truncate()
+
+        assert len(history) < 11
+        assert history.count_tokens() == history._context_manager.count_tokens(
+            history.get_messages_for_llm()
+        )
+
+    def test_clear_from_last_user_message_keeps_prefix(self):
+        history = MessageHistory(CountingContextManager(token_budget=10**9))
+        history.add_user_prompt("first")
+        self._add_exchange(history, 0)
+        history.add_user_prompt("second")
+        self._add_exchange(history, 1)
+        history.count_tokens()
+        recounts = history.token_recounts
+
+        history.clear_from_last_to_user_message()
+
+        assert history.count_tokens() == history._context_manager.count_tokens(
+            history.get_messages_for_llm()
+        )
+        assert history.token_recounts == recounts
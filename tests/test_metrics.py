@@ -0,0 +1,106 @@
+import asyncio
+import types
+from unittest.mock import MagicMock
+
+import httpx
+import openai
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import ii_agent.llm.openai as openai_client
+from ii_agent.core.metrics import (
+    ACTIVE_CONNECTIONS,
+    LLM_RETRIES,
+    MESSAGE_QUEUE_DEPTH,
+    RUNNING_AGENT_TASKS,
+    Counter,
+    Histogram,
+    MetricsRegistry,
+)
+from ii_agent.llm.base import TextPrompt
+from ii_agent.llm.openrouter import OpenRouterClient
+from ii_agent.server.api import metrics_router
+from ii_agent.server.websocket.manager import ConnectionManager
+
+
+def test_histograms_and_counters_render_in_the_text_format():
+    registry = MetricsRegistry()
+    latency = registry.register(
+        Histogram("latency_seconds", "Latency.", ["tool"], buckets=(0.1, 1.0))
+    )
+    errors = registry.register(Counter("errors_total", "Errors.", ["reason"]))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, tool="bash")
+    errors.inc(reason='say "hi"')
+
+    assert registry.render().splitlines() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{tool="bash",le="0.1"} 2',
+        'latency_seconds_bucket{tool="bash",le="1"} 3',
+        'latency_seconds_bucket{tool="bash",le="+Inf"} 4',
+        'latency_seconds_sum{tool="bash"} 3.65',
+        'latency_seconds_count{tool="bash"} 4',
+        "# HELP errors_total Errors.",
+        "# TYPE errors_total counter",
+        'errors_total{reason="say \\"hi\\""} 1',
+    ]
+
+
+def test_rate_limited_retries_are_counted(monkeypatch):
+    monkeypatch.setattr(openai_client.time, "sleep", lambda seconds: None)
+    client = OpenRouterClient(model_name="retry-test", max_retries=3)
+    response = httpx.Response(429, request=httpx.Request("POST", "http://test"))
+    client.client = MagicMock()
+    client.client.chat.completions.create.side_effect = [
+        openai.RateLimitError("slow down", response=response, body=None),
+        openai.APIConnectionError(request=response.request),
+        types.SimpleNamespace(
+            choices=[
+                types.SimpleNamespace(
+                    message=types.SimpleNamespace(content="ok", tool_calls=None)
+                )
+            ],
+            usage=types.SimpleNamespace(prompt_tokens=1, completion_tokens=1),
+        ),
+    ]
+
+    client.generate([[TextPrompt(text="hi")]], max_tokens=5)
+
+    labels = {"provider": "openrouter", "model": "retry-test"}
+    assert LLM_RETRIES.value(reason="rate_limit", **labels) == 1
+    assert LLM_RETRIES.value(reason="error", **labels) == 1
+
+
+def test_metrics_endpoint_reports_connections_tasks_and_queues(tmp_path):
+    manager = ConnectionManager(workspace_root=str(tmp_path), file_store=None)
+    queue = asyncio.Queue()
+    queue.put_nowait("event")
+    manager.sessions = {
+        "ws-1": types.SimpleNamespace(
+            session_uuid="s-1",
+            agent=types.SimpleNamespace(message_queue=queue),
+            has_active_task=lambda: True,
+        ),
+        "ws-2": types.SimpleNamespace(
+            session_uuid="s-2", agent=None, has_active_task=lambda: False
+        ),
+    }
+    ACTIVE_CONNECTIONS.set_function(manager.get_connection_count)
+    RUNNING_AGENT_TASKS.set_function(manager.get_running_task_count)
+    MESSAGE_QUEUE_DEPTH.set_function(manager.get_message_queue_depths)
+    app = FastAPI()
+    app.include_router(metrics_router)
+
+    try:
+        response = TestClient(app).get("/metrics")
+    finally:
+        for gauge in (ACTIVE_CONNECTIONS, RUNNING_AGENT_TASKS, MESSAGE_QUEUE_DEPTH):
+            gauge.set_function(None)
+
+    lines = response.text.splitlines()
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "ii_agent_active_connections 2" in lines
+    assert "ii_agent_running_agent_tasks 1" in lines
+    assert 'ii_agent_message_queue_depth{session_id="s-1"} 1' in lines
+    assert "# TYPE ii_agent_llm_call_duration_seconds histogram" in lines
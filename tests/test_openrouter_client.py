@@ -1,9 +1,13 @@
 import types
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
 
 from ii_agent.llm.openrouter import OpenRouterClient
 from ii_agent.llm.base import TextPrompt
 
+pytest_plugins = ("pytest_asyncio",)
+
 
 def make_response(content="hi"):
     return types.SimpleNamespace(
@@ -71,3 +75,26 @@ def test_flash_model_forces_tool_choice(monkeypatch):
     kwargs = mock_api.chat.completions.create.call_args.kwargs
     assert kwargs["tool_choice"] == "required"
     assert kwargs["extra_body"]["parallel_tool_calls"] is False
+
+
+@pytest.mark.asyncio
+async def test_agenerate_uses_async_client():
+    client = OpenRouterClient(model_name="super-flash-model")
+    sync_api = MagicMock()
+    client.client = sync_api
+    async_api = MagicMock()
+    async_api.chat.completions.create = AsyncMock(return_value=make_response("async"))
+    client.async_client = MagicMock()
+    client.async_client.get.return_value = async_api
+
+    blocks, metadata = await client.agenerate(
+        messages=[[TextPrompt(text="hi")]],
+        max_tokens=5,
+    )
+
+    assert blocks[0].text == "async"
+    assert metadata["input_tokens"] == 1
+    sync_api.chat.completions.create.assert_not_called()
+    kwargs = async_api.chat.completions.create.call_args.kwargs
+    assert kwargs["tool_choice"] == "required"
+    assert kwargs["extra_body"]["parallel_tool_calls"] is False
@@ -0,0 +1,104 @@
+import types
+
+import pytest
+
+import ii_agent.browser.browser as browser_module
+from ii_agent.browser.browser import Browser
+from ii_agent.browser.models import InteractiveElementsData, TabInfo, Viewport
+from ii_agent.browser.page_tracker import PageChange, PageChangeTracker
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+class FakePage:
+    def __init__(self, url="https://example.com"):
+        self.url = url
+        self.counters = {
+            "document": "doc-1",
+            "changes": 0,
+            "scrollX": 0,
+            "scrollY": 0,
+            "width": 1268,
+            "height": 951,
+        }
+
+    async def evaluate(self, script):
+        return dict(self.counters)
+
+
+@pytest.fixture
+def browser(monkeypatch):
+    browser = Browser()
+    page = FakePage()
+    browser.current_page = page
+    browser.context = types.SimpleNamespace(pages=[page])
+    browser.work = []
+
+    async def fast_screenshot():
+        browser.work.append("screenshot")
+        return f"shot-{len(browser.work)}"
+
+    async def get_interactive_elements(screenshot_b64, detect_sheets=False):
+        browser.work.append("elements")
+        return InteractiveElementsData(viewport=Viewport(), elements=[])
+
+    async def get_tabs_info():
+        browser.work.append("tabs")
+        return [TabInfo(page_id=0, url=page.url, title="Example")]
+
+    browser.fast_screenshot = fast_screenshot
+    browser.get_interactive_elements = get_interactive_elements
+    browser.get_tabs_info = get_tabs_info
+    monkeypatch.setattr(
+        browser_module,
+        "put_highlight_elements_on_screenshot",
+        lambda elements, screenshot: screenshot,
+    )
+    return browser
+
+
+@pytest.mark.asyncio
+async def test_unchanged_page_reuses_the_state(browser):
+    first = await browser.update_state()
+    second = await browser.update_state()
+
+    assert second is first
+    assert browser.work == ["screenshot", "elements", "tabs"]
+    assert browser.page_tracker.skipped == 1
+
+    browser.current_page.counters["changes"] += 1
+    third = await browser.update_state()
+    assert third is not first
+    assert browser.work.count("tabs") == 2
+
+
+@pytest.mark.asyncio
+async def test_scrolling_recomputes_the_screenshot_but_keeps_the_tabs(browser):
+    first = await browser.update_state()
+    browser.current_page.counters["scrollY"] = 500
+
+    second = await browser.update_state()
+
+    assert second.screenshot != first.screenshot
+    assert second.tabs == first.tabs
+    assert browser.work == ["screenshot", "elements", "tabs", "screenshot", "elements"]
+
+
+@pytest.mark.asyncio
+async def test_new_documents_pdfs_and_old_states_count_as_changed():
+    now = [0.0]
+    tracker = PageChangeTracker(max_age=10, clock=lambda: now[0])
+    page = FakePage()
+    tracker.record(await tracker.snapshot(page, 1))
+
+    assert tracker.change(await tracker.snapshot(page, 1)) == PageChange.NONE
+    assert tracker.change(await tracker.snapshot(page, 2)) == PageChange.PAGE
+    page.counters["document"] = "doc-2"
+    assert tracker.change(await tracker.snapshot(page, 1)) == PageChange.PAGE
+    page.counters["document"] = "doc-1"
+    now[0] = 10.0
+    assert tracker.change(await tracker.snapshot(page, 1)) == PageChange.PAGE
+
+    pdf = FakePage("https://example.com/paper.pdf")
+    tracker.record(await tracker.snapshot(pdf, 1))
+    assert tracker.change(await tracker.snapshot(pdf, 1)) == PageChange.PAGE
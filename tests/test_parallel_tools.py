@@ -0,0 +1,258 @@
+import asyncio
+import json
+import logging
+import tempfile
+import time
+import types
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from ii_agent.agents.function_call import FunctionCallAgent
+from ii_agent.core.event import EventType
+from ii_agent.llm.base import (
+    LLMClient,
+    TextPrompt,
+    TextResult,
+    ToolCall,
+    ToolCallParameters,
+    ToolFormattedResult,
+    ToolParam,
+)
+from ii_agent.llm.message_history import MessageHistory
+from ii_agent.llm.openrouter import OpenRouterClient
+from ii_agent.tools.base import LLMTool, ToolImplOutput
+from ii_agent.tools.tool_manager import AgentToolManager, TOOL_CALL_TIMEOUT_RESULT
+from ii_agent.utils.workspace_manager import WorkspaceManager
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+class DummyContextManager:
+    async def aapply_truncation_if_needed(
+        self, messages, token_count=None, owner=None
+    ):
+        return messages
+
+    def count_tokens(self, messages):
+        return 0
+
+    def count_turn_tokens(self, message_list):
+        return 0, 0
+
+
+class SleepTool(LLMTool):
+    description = "sleep"
+    input_schema = {
+        "type": "object",
+        "properties": {"seconds": {"type": "number"}},
+        "required": ["seconds"],
+    }
+
+    def __init__(self, name, concurrency_group=None):
+        self.name = name
+        self.concurrency_group = concurrency_group
+        self.spans = []
+
+    async def run_impl(self, tool_input, message_history=None):
+        start = time.monotonic()
+        await asyncio.sleep(tool_input["seconds"])
+        self.spans.append((start, time.monotonic(), tool_input["seconds"]))
+        return ToolImplOutput(
+            tool_output=f"{self.name} slept {tool_input['seconds']}",
+            tool_result_message="done",
+        )
+
+
+def call(tool_name, seconds, call_id=None):
+    return ToolCallParameters(
+        tool_call_id=call_id or f"{tool_name}-{seconds}",
+        tool_name=tool_name,
+        tool_input={"seconds": seconds},
+    )
+
+
+def make_manager(*tools):
+    return AgentToolManager(tools=list(tools), logger_for_agent_logs=logging.getLogger("test"))
+
+
+@pytest.mark.asyncio
+async def test_ungrouped_tools_run_in_parallel():
+    search = SleepTool("web_search")
+    manager = make_manager(search)
+
+    start = time.monotonic()
+    results = await manager.run_tools(
+        [call("web_search", 0.2, str(i)) for i in range(5)],
+        MessageHistory(DummyContextManager()),
+    )
+
+    assert time.monotonic() - start < 0.6
+    assert results == ["web_search slept 0.2"] * 5
+
+
+@pytest.mark.asyncio
+async def test_grouped_tools_run_one_at_a_time_in_call_order():
+    bash = SleepTool("bash", concurrency_group="default")
+    search = SleepTool("web_search")
+    manager = make_manager(bash, search)
+
+    results = await manager.run_tools(
+        [call("bash", 0.1), call("web_search", 0.1), call("bash", 0.05)],
+        MessageHistory(DummyContextManager()),
+    )
+
+    assert results == ["bash slept 0.1", "web_search slept 0.1", "bash slept 0.05"]
+    (first_start, first_end, first), (second_start, _, second) = bash.spans
+    assert (first, second) == (0.1, 0.05)
+    assert second_start >= first_end
+    # The search ran alongside the first bash call
+    assert search.spans[0][0] < first_end
+
+
+@pytest.mark.asyncio
+async def test_timeout_applies_per_call():
+    manager = make_manager(SleepTool("web_search"))
+
+    results = await manager.run_tools(
+        [call("web_search", 0.01), call("web_search", 5)],
+        MessageHistory(DummyContextManager()),
+        timeout=0.2,
+    )
+
+    assert results == [
+        "web_search slept 0.01",
+        TOOL_CALL_TIMEOUT_RESULT.format(timeout=0.2),
+    ]
+
+
+class MultiCallLLM(LLMClient):
+    def __init__(self):
+        self.model_name = "dummy"
+        self.calls = 0
+
+    def generate(self, *args, **kwargs):
+        self.calls += 1
+        if self.calls == 1:
+            return [
+                TextResult(text="Searching"),
+                ToolCall(tool_call_id="a", tool_name="web_search", tool_input={"seconds": 0.2}),
+                ToolCall(tool_call_id="b", tool_name="web_search", tool_input={"seconds": 0.2}),
+                ToolCall(tool_call_id="c", tool_name="visit_webpage", tool_input={"seconds": 0.2}),
+            ], None
+        return [TextResult(text="done")], None
+
+
+def make_agent(client, tools, parallel_tool_calls):
+    tmp_dir = tempfile.mkdtemp()
+    return FunctionCallAgent(
+        system_prompt="",
+        client=client,
+        tools=tools,
+        init_history=MessageHistory(context_manager=DummyContextManager()),
+        workspace_manager=WorkspaceManager(Path(tmp_dir)),
+        message_queue=asyncio.Queue(),
+        logger_for_agent_logs=logging.getLogger("test"),
+        max_turns=3,
+        parallel_tool_calls=parallel_tool_calls,
+    )
+
+
+@pytest.mark.asyncio
+async def test_agent_runs_all_tool_calls_of_a_turn():
+    agent = make_agent(
+        MultiCallLLM(), [SleepTool("web_search"), SleepTool("visit_webpage")], True
+    )
+
+    start = time.monotonic()
+    await agent.run_agent_async("research")
+
+    assert time.monotonic() - start < 0.5
+    messages = agent.history.get_messages_for_llm()
+    assert [type(m) for m in messages[1]] == [TextResult, ToolCall, ToolCall, ToolCall]
+    assert [r.tool_call_id for r in messages[2]] == ["a", "b", "c"]
+    assert all(isinstance(r, ToolFormattedResult) for r in messages[2])
+
+    events = []
+    while not agent.message_queue.empty():
+        events.append(agent.message_queue.get_nowait())
+    assert [e.content["tool_call_id"] for e in events if e.type == EventType.TOOL_RESULT] == [
+        "a",
+        "b",
+        "c",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_agent_keeps_first_tool_call_without_parallel_mode():
+    agent = make_agent(
+        MultiCallLLM(), [SleepTool("web_search"), SleepTool("visit_webpage")], False
+    )
+
+    await agent.run_agent_async("research")
+
+    messages = agent.history.get_messages_for_llm()
+    assert [type(m) for m in messages[1]] == [TextResult, ToolCall]
+    assert [r.tool_call_id for r in messages[2]] == ["a"]
+
+
+def make_tool_call(call_id, name, arguments):
+    return types.SimpleNamespace(
+        id=call_id,
+        function=types.SimpleNamespace(name=name, arguments=json.dumps(arguments)),
+    )
+
+
+def test_openrouter_sends_and_parses_multiple_tool_calls():
+    client = OpenRouterClient(model_name="test", parallel_tool_calls=True)
+    mock_api = MagicMock()
+    mock_api.chat.completions.create.return_value = types.SimpleNamespace(
+        choices=[
+            types.SimpleNamespace(
+                message=types.SimpleNamespace(
+                    content=None,
+                    tool_calls=[
+                        make_tool_call("c", "web_search", {"query": "x"}),
+                        make_tool_call("d", "web_search", {"query": "y"}),
+                    ],
+                )
+            )
+        ],
+        usage=types.SimpleNamespace(prompt_tokens=1, completion_tokens=1),
+    )
+    client.client = mock_api
+    tool = ToolParam(
+        name="web_search",
+        description="search",
+        input_schema={"type": "object", "properties": {"query": {"type": "string"}}},
+    )
+    messages = [
+        [TextPrompt(text="find")],
+        [
+            TextResult(text="Searching"),
+            ToolCall(tool_call_id="a", tool_name="web_search", tool_input={"query": "1"}),
+            ToolCall(tool_call_id="b", tool_name="web_search", tool_input={"query": "2"}),
+        ],
+        [
+            ToolFormattedResult(tool_call_id="a", tool_name="web_search", tool_output="r1"),
+            ToolFormattedResult(tool_call_id="b", tool_name="web_search", tool_output="r2"),
+        ],
+    ]
+
+    blocks, _ = client.generate(messages=messages, max_tokens=5, tools=[tool])
+
+    kwargs = mock_api.chat.completions.create.call_args.kwargs
+    assert kwargs["extra_body"]["parallel_tool_calls"] is True
+    sent = kwargs["messages"]
+    assert sent[1]["role"] == "assistant"
+    assert sent[1]["content"] == [{"type": "text", "text": "Searching"}]
+    assert [c["id"] for c in sent[1]["tool_calls"]] == ["a", "b"]
+    assert [(m["role"], m["tool_call_id"]) for m in sent[2:]] == [
+        ("tool", "a"),
+        ("tool", "b"),
+    ]
+    assert [(b.tool_call_id, b.tool_input) for b in blocks] == [
+        ("c", {"query": "x"}),
+        ("d", {"query": "y"}),
+    ]
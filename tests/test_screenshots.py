@@ -0,0 +1,130 @@
+import base64
+import io
+
+import pytest
+from PIL import Image
+
+from ii_agent.browser.browser import Browser, BrowserConfig
+from ii_agent.browser.models import BrowserState, Coordinates, InteractiveElement, Rect
+from ii_agent.browser.utils import put_highlight_elements_on_screenshot
+from ii_agent.tools.browser_tools.utils import format_state_tool_output
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def jpeg_base64(size=(200, 100)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, "white").save(buffer, format="JPEG")
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+def decode(data):
+    return Image.open(io.BytesIO(base64.b64decode(data)))
+
+
+def element(index, left, top, width, height):
+    position = Coordinates(x=left, y=top, width=width, height=height)
+    return InteractiveElement(
+        index=index,
+        tag_name="button",
+        text="OK",
+        attributes={},
+        viewport=position,
+        page=position,
+        center=position,
+        weight=1.0,
+        browser_agent_id=str(index),
+        rect=Rect(
+            left=left,
+            top=top,
+            right=left + width,
+            bottom=top + height,
+            width=width,
+            height=height,
+        ),
+        z_index=0,
+    )
+
+
+class FakeCDPSession:
+    def __init__(self, page):
+        self._page = page
+        self.calls = []
+
+    async def send(self, method, params=None):
+        self.calls.append((method, params))
+        if method == "Page.getLayoutMetrics":
+            return {
+                "cssVisualViewport": {
+                    "pageX": 0,
+                    "pageY": 300,
+                    "clientWidth": 1268,
+                    "clientHeight": 951,
+                }
+            }
+        return {"data": "c2hvdA=="}
+
+
+@pytest.mark.asyncio
+async def test_screenshots_are_encoded_and_scaled_by_the_browser():
+    browser = Browser(BrowserConfig(screenshot_format="jpeg", screenshot_quality=70))
+    browser.current_page = object()
+    cdp_session = browser._cdp_session = FakeCDPSession(browser.current_page)
+
+    await browser.fast_screenshot()
+    await browser.fast_screenshot(scale=0.5)
+
+    full, metrics, half = cdp_session.calls
+    assert full == (
+        "Page.captureScreenshot",
+        {
+            "format": "jpeg",
+            "fromSurface": False,
+            "captureBeyondViewport": False,
+            "quality": 70,
+        },
+    )
+    assert metrics[0] == "Page.getLayoutMetrics"
+    assert half[1]["clip"] == {
+        "x": 0,
+        "y": 300,
+        "width": 1268,
+        "height": 951,
+        "scale": 0.5,
+    }
+
+
+def test_highlights_keep_the_format_and_follow_the_scale():
+    highlighted = put_highlight_elements_on_screenshot(
+        {1: element(1, 100, 40, 80, 60)}, jpeg_base64(), scale=0.5
+    )
+
+    image = decode(highlighted)
+    assert image.format == "JPEG"
+    assert image.size == (200, 100)
+    # The element is outlined at half its CSS position
+    assert image.convert("RGB").getpixel((50, 35)) != (255, 255, 255)
+    assert image.convert("RGB").getpixel((150, 90)) == (255, 255, 255)
+
+
+def test_model_gets_its_own_screenshot_and_the_ui_the_full_one():
+    state = BrowserState(
+        url="https://example.com",
+        tabs=[],
+        screenshot="full",
+        model_screenshot="small",
+        screenshot_media_type="image/jpeg",
+    )
+
+    source = format_state_tool_output(state, "Clicked").tool_output[0]["source"]
+
+    assert source == {
+        "type": "base64",
+        "media_type": "image/jpeg",
+        "data": "small",
+        "display_data": "full",
+        "description": "https://example.com, 0 interactive elements",
+    }
+    state.model_screenshot = None
+    source = format_state_tool_output(state, "Clicked").tool_output[0]["source"]
+    assert "display_data" not in source and source["data"] == "full"
@@ -0,0 +1,150 @@
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+import ii_agent.db.manager as db_manager
+from ii_agent.db.models import Base, Event, Session
+from ii_agent.server.api import sessions_router
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'events.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(
+        db_manager,
+        "SessionLocal",
+        sessionmaker(
+            autocommit=False, autoflush=False, bind=engine, expire_on_commit=False
+        ),
+    )
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def client(engine):
+    app = FastAPI()
+    app.include_router(sessions_router)
+    return TestClient(app)
+
+
+def seed(engine, n_events):
+    session_id = str(uuid.uuid4())
+    start = datetime(2025, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Session),
+            [{"id": session_id, "workspace_dir": "/workspace/a", "created_at": start}],
+        )
+        conn.execute(
+            insert(Event),
+            [
+                {
+                    "id": str(uuid.uuid4()),
+                    "session_id": session_id,
+                    # Pairs of events share a timestamp to exercise the id tiebreak
+                    "timestamp": start + timedelta(seconds=i // 2),
+                    "event_type": "user_message" if i % 5 == 0 else "tool_result",
+                    "event_payload": {"i": i},
+                }
+                for i in range(n_events)
+            ],
+        )
+    return session_id
+
+
+def test_unpaginated_returns_all_events(engine, client):
+    session_id = seed(engine, 12)
+
+    response = client.get(f"/api/sessions/{session_id}/events")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["events"]) == 12
+    assert body["next_cursor"] is None
+    assert all(e["workspace_dir"] == "/workspace/a" for e in body["events"])
+
+
+def test_cursor_pagination_covers_all_events_in_order(engine, client):
+    session_id = seed(engine, 23)
+    expected = [
+        e["id"] for e in client.get(f"/api/sessions/{session_id}/events").json()["events"]
+    ]
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 5}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get(f"/api/sessions/{session_id}/events", params=params).json()
+        seen.extend(e["id"] for e in body["events"])
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == expected
+    assert pages == 5
+
+
+def test_event_type_filter(engine, client):
+    session_id = seed(engine, 20)
+
+    body = client.get(
+        f"/api/sessions/{session_id}/events", params={"event_type": "user_message"}
+    ).json()
+
+    assert [e["event_payload"]["i"] for e in body["events"]] == [0, 5, 10, 15]
+
+
+def test_invalid_cursor_is_rejected(engine, client):
+    session_id = seed(engine, 3)
+
+    response = client.get(
+        f"/api/sessions/{session_id}/events", params={"limit": 2, "cursor": "nope"}
+    )
+
+    assert response.status_code == 400
+
+
+def test_ndjson_stream(engine, client, monkeypatch):
+    session_id = seed(engine, 30)
+    original = db_manager.Events.iter_session_events
+    monkeypatch.setattr(
+        db_manager.Events,
+        "iter_session_events",
+        lambda *args, **kwargs: original(*args, **{**kwargs, "batch_size": 7}),
+    )
+
+    expected = client.get(f"/api/sessions/{session_id}/events").json()["events"]
+
+    response = client.get(f"/api/sessions/{session_id}/events/stream")
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines == expected
+
+
+def test_events_loaded_with_single_query(engine, client):
+    session_id = seed(engine, 50)
+    statements = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+
+    client.get(f"/api/sessions/{session_id}/events")
+
+    selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+    assert len(selects) == 1
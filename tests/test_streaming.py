@@ -0,0 +1,278 @@
+import asyncio
+import json
+import logging
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import httpx
+import openai
+import pytest
+
+from ii_agent.agents.function_call import FunctionCallAgent
+from ii_agent.core.event import EventType
+from ii_agent.llm.anthropic import AnthropicDirectClient
+from ii_agent.llm.base import (
+    LLMClient,
+    StreamDelta,
+    TextPrompt,
+    TextResult,
+    ToolCall,
+    ToolParam,
+)
+from ii_agent.llm.message_history import MessageHistory
+from ii_agent.llm.openai import OpenAIDirectClient
+from ii_agent.utils.workspace_manager import WorkspaceManager
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def sse_body(chunks):
+    lines = [f"data: {json.dumps(chunk)}\n\n" for chunk in chunks]
+    lines.append("data: [DONE]\n\n")
+    return "".join(lines).encode()
+
+
+def make_chunk(delta, finish_reason=None, usage=None):
+    return {
+        "id": "chatcmpl-1",
+        "object": "chat.completion.chunk",
+        "created": 1,
+        "model": "test-model",
+        "choices": [] if delta is None else [
+            {"index": 0, "delta": delta, "finish_reason": finish_reason}
+        ],
+        "usage": usage,
+    }
+
+
+def make_sse_client(chunks, requests):
+    """An OpenAI client whose transport replays `chunks` as server-sent events."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/event-stream"},
+            content=sse_body(chunks),
+        )
+
+    client = OpenAIDirectClient(model_name="test-model", cot_model=False)
+    client.async_client = MagicMock()
+    client.async_client.get.return_value = openai.AsyncOpenAI(
+        api_key="test",
+        base_url="http://sse.test/v1",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    return client
+
+
+@pytest.mark.asyncio
+async def test_openai_stream_text_deltas():
+    requests = []
+    client = make_sse_client(
+        [
+            make_chunk({"role": "assistant", "content": "Hel"}),
+            make_chunk({"content": "lo"}),
+            make_chunk({}, finish_reason="stop"),
+            make_chunk(None, usage={"prompt_tokens": 7, "completion_tokens": 2, "total_tokens": 9}),
+        ],
+        requests,
+    )
+    deltas = []
+
+    blocks, metadata = await client.agenerate_stream(
+        messages=[[TextPrompt(text="hi")]],
+        max_tokens=16,
+        on_delta=deltas.append,
+    )
+
+    assert requests[0]["stream"] is True
+    assert [d.delta for d in deltas] == ["Hel", "lo"]
+    assert all(d.type == "text" for d in deltas)
+    assert blocks == [TextResult(text="Hello")]
+    assert metadata["input_tokens"] == 7
+    assert metadata["output_tokens"] == 2
+
+
+@pytest.mark.asyncio
+async def test_openai_stream_tool_call_arguments():
+    tool = ToolParam(
+        name="web_search",
+        description="search",
+        input_schema={"type": "object", "properties": {"query": {"type": "string"}}},
+    )
+    client = make_sse_client(
+        [
+            make_chunk(
+                {
+                    "role": "assistant",
+                    "tool_calls": [
+                        {
+                            "index": 0,
+                            "id": "call_1",
+                            "type": "function",
+                            "function": {"name": "web_search", "arguments": '{"que'},
+                        }
+                    ],
+                }
+            ),
+            make_chunk({"tool_calls": [{"index": 0, "function": {"arguments": 'ry": "x"}'}}]}),
+            make_chunk({}, finish_reason="tool_calls"),
+        ],
+        [],
+    )
+    deltas = []
+
+    blocks, _ = await client.agenerate_stream(
+        messages=[[TextPrompt(text="hi")]],
+        max_tokens=16,
+        on_delta=deltas.append,
+        tools=[tool],
+    )
+
+    assert [d.type for d in deltas] == ["tool_input", "tool_input"]
+    assert "".join(d.delta for d in deltas) == '{"query": "x"}'
+    assert deltas[-1].tool_call_id == "call_1"
+    assert deltas[-1].tool_name == "web_search"
+    assert blocks == [
+        ToolCall(tool_call_id="call_1", tool_name="web_search", tool_input={"query": "x"})
+    ]
+
+
+def test_anthropic_stream_events_to_deltas():
+    tool_uses = {}
+    events = [
+        SimpleNamespace(type="message_start"),
+        SimpleNamespace(
+            type="content_block_delta",
+            index=0,
+            delta=SimpleNamespace(type="thinking_delta", thinking="hmm"),
+        ),
+        SimpleNamespace(
+            type="content_block_delta",
+            index=1,
+            delta=SimpleNamespace(type="text_delta", text="Hi"),
+        ),
+        SimpleNamespace(
+            type="content_block_start",
+            index=2,
+            content_block=SimpleNamespace(type="tool_use", id="toolu_1", name="bash"),
+        ),
+        SimpleNamespace(
+            type="content_block_delta",
+            index=2,
+            delta=SimpleNamespace(type="input_json_delta", partial_json='{"cmd'),
+        ),
+        SimpleNamespace(
+            type="content_block_delta",
+            index=0,
+            delta=SimpleNamespace(type="signature_delta", signature="sig"),
+        ),
+    ]
+
+    deltas = [
+        delta
+        for delta in (
+            AnthropicDirectClient._to_stream_delta(event, tool_uses) for event in events
+        )
+        if delta is not None
+    ]
+
+    assert deltas == [
+        StreamDelta(type="thinking", delta="hmm", index=0),
+        StreamDelta(type="text", delta="Hi", index=1),
+        StreamDelta(
+            type="tool_input",
+            delta='{"cmd',
+            index=2,
+            tool_call_id="toolu_1",
+            tool_name="bash",
+        ),
+    ]
+
+
+class DummyContextManager:
+    def apply_truncation_if_needed(self, messages, token_count=None):
+        return messages
+
+    async def aapply_truncation_if_needed(
+        self, messages, token_count=None, owner=None
+    ):
+        return messages
+
+    def count_tokens(self, messages):
+        return 0
+
+    def count_turn_tokens(self, message_list):
+        return 0, 0
+
+
+class StreamingLLM(LLMClient):
+    def __init__(self):
+        self.model_name = "dummy"
+
+    def generate(self, *args, **kwargs):
+        raise AssertionError("streaming agent must not call generate")
+
+    async def agenerate_stream(self, messages, max_tokens, on_delta, **kwargs):
+        for piece in ["All ", "done"]:
+            on_delta(StreamDelta(type="text", delta=piece))
+        on_delta(StreamDelta(type="thinking", delta="hidden"))
+        return [TextResult(text="All done")], {}
+
+
+class NonStreamingLLM(LLMClient):
+    def __init__(self):
+        self.model_name = "dummy"
+
+    def generate(self, *args, **kwargs):
+        return [TextResult(text="All done")], {}
+
+
+def make_agent(client, queue, tmp_dir):
+    return FunctionCallAgent(
+        system_prompt="",
+        client=client,
+        tools=[],
+        init_history=MessageHistory(context_manager=DummyContextManager()),
+        workspace_manager=WorkspaceManager(Path(tmp_dir)),
+        message_queue=queue,
+        logger_for_agent_logs=logging.getLogger("test"),
+        max_turns=1,
+        stream_responses=True,
+    )
+
+
+def drain_deltas(queue):
+    events = []
+    while not queue.empty():
+        event = queue.get_nowait()
+        if event.type == EventType.AGENT_RESPONSE_DELTA:
+            events.append(event)
+    return events
+
+
+@pytest.mark.asyncio
+async def test_agent_forwards_text_deltas():
+    queue = asyncio.Queue()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        agent = make_agent(StreamingLLM(), queue, tmp_dir)
+        await agent.run_agent_async("do it")
+
+    deltas = drain_deltas(queue)
+    assert [e.content["text"] for e in deltas] == ["All ", "done"]
+    assert len({e.content["message_id"] for e in deltas}) == 1
+    assert agent.history.get_last_assistant_text_response() == "All done"
+
+
+@pytest.mark.asyncio
+async def test_agent_streaming_falls_back_for_non_streaming_clients():
+    queue = asyncio.Queue()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        agent = make_agent(NonStreamingLLM(), queue, tmp_dir)
+        await agent.run_agent_async("do it")
+
+    deltas = drain_deltas(queue)
+    assert [e.content["text"] for e in deltas] == ["All done"]
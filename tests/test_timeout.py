@@ -14,12 +14,20 @@ from ii_agent.utils.workspace_manager import WorkspaceManager
 
 
 class DummyContextManager:
-    def apply_truncation_if_needed(self, messages):
+    def apply_truncation_if_needed(self, messages, token_count=None):
+        return messages
+
+    async def aapply_truncation_if_needed(
+        self, messages, token_count=None, owner=None
+    ):
         return messages
 
     def count_tokens(self, messages):
         return 0
 
+    def count_turn_tokens(self, message_list):
+        return 0, 0
+
 
 class SlowTool(LLMTool):
     name = "slow_tool"
@@ -0,0 +1,143 @@
+import asyncio
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+import pytest
+
+from ii_agent.agents.function_call import FunctionCallAgent
+from ii_agent.core.event import EventType, RealtimeEvent
+from ii_agent.core.tracing import (
+    add_span_event,
+    configure_tracing,
+    current_trace_id,
+    shutdown_tracing,
+    trace_span,
+)
+from ii_agent.llm.base import LLMClient, TextResult
+from ii_agent.llm.message_history import MessageHistory
+from ii_agent.utils.workspace_manager import WorkspaceManager
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+class DummyContextManager:
+    async def aapply_truncation_if_needed(
+        self, messages, token_count=None, owner=None
+    ):
+        return messages
+
+    def count_tokens(self, messages):
+        return 0
+
+    def count_turn_tokens(self, message_list):
+        return 0, 0
+
+
+class RetryingLLM(LLMClient):
+    def __init__(self):
+        self.model_name = "dummy"
+
+    def generate(self, *args, **kwargs):
+        # As the clients do before sleeping and retrying a failed request
+        add_span_event("llm.retry", attempt=1, error="overloaded")
+        return [TextResult(text="done")], {"input_tokens": 7, "output_tokens": 3}
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    path = tmp_path / "traces" / "spans.jsonl"
+    configure_tracing(trace_file=str(path))
+    yield path
+    shutdown_tracing()
+
+
+def read_spans(path):
+    shutdown_tracing()
+    return {
+        span["name"]: span
+        for span in map(json.loads, path.read_text().splitlines())
+    }
+
+
+def test_trace_span_is_a_shared_noop_while_tracing_is_off():
+    assert trace_span("a", x=1) is trace_span("b")
+    with trace_span("a") as span:
+        span.set_attribute("x", 1)
+        add_span_event("retry")
+        assert current_trace_id() is None
+    assert RealtimeEvent(type=EventType.PROCESSING, content={}).trace_id is None
+
+
+@pytest.mark.asyncio
+async def test_agent_run_is_traced_as_a_span_tree(trace_file, tmp_path):
+    agent = FunctionCallAgent(
+        system_prompt="",
+        client=RetryingLLM(),
+        tools=[],
+        init_history=MessageHistory(context_manager=DummyContextManager()),
+        workspace_manager=WorkspaceManager(Path(tmp_path)),
+        message_queue=asyncio.Queue(),
+        logger_for_agent_logs=logging.getLogger("test"),
+        max_turns=1,
+    )
+
+    await agent.run_agent_async("do it")
+    spans = read_spans(trace_file)
+
+    run, turn, llm = spans["agent.run"], spans["agent.turn"], spans["llm.generate"]
+    assert run["parent_id"] is None
+    assert turn["parent_id"] == run["span_id"]
+    assert llm["parent_id"] == turn["span_id"]
+    assert {span["trace_id"] for span in spans.values()} == {run["trace_id"]}
+    assert llm["attributes"]["purpose"] == "main"
+    assert llm["attributes"]["input_tokens"] == 7
+    assert [event["name"] for event in llm["events"]] == ["llm.retry"]
+    assert run["duration_ms"] >= llm["duration_ms"]
+
+
+def test_events_and_errors_carry_the_current_span(trace_file):
+    with pytest.raises(ValueError):
+        with trace_span("tool.run", tool="bash") as span:
+            event = RealtimeEvent(type=EventType.TOOL_RESULT, content={})
+            raise ValueError("boom")
+
+    assert (event.trace_id, event.span_id) == (span.trace_id, span.span_id)
+    assert read_spans(trace_file)["tool.run"]["error"] == "ValueError: boom"
+
+
+def test_spans_are_sent_to_an_otlp_collector():
+    received = []
+
+    class Collector(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            received.append((self.path, json.loads(body)))
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Collector)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        configure_tracing(otlp_endpoint=f"http://127.0.0.1:{server.server_port}")
+        with trace_span("db.flush", events=3):
+            pass
+    finally:
+        shutdown_tracing()
+        server.shutdown()
+
+    path, payload = received[0]
+    resource_spans = payload["resourceSpans"][0]
+    span = resource_spans["scopeSpans"][0]["spans"][0]
+    assert path == "/v1/traces"
+    assert resource_spans["resource"]["attributes"][0]["value"] == {
+        "stringValue": "ii-agent"
+    }
+    assert span["name"] == "db.flush"
+    assert span["attributes"] == [{"key": "events", "value": {"intValue": "3"}}]
+    assert "parentSpanId" not in span
@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import uuid
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+import ii_agent.db.manager as db_manager
+from ii_agent.agents.function_call import FunctionCallAgent
+from ii_agent.db.models import Base, Session
+from ii_agent.llm.base import LLMClient, StreamDelta, TextResult
+from ii_agent.llm.concurrency import agenerate_auxiliary
+from ii_agent.llm.message_history import MessageHistory
+from ii_agent.llm.usage import (
+    LLMCallPurpose,
+    LLMCallTimer,
+    UsageLedger,
+    summarize_usage,
+    use_usage_ledger,
+)
+from ii_agent.server.api import usage_router
+from ii_agent.utils.workspace_manager import WorkspaceManager
+
+pytest_plugins = ("pytest_asyncio",)
+
+METADATA = {
+    "input_tokens": 100,
+    "output_tokens": 20,
+    "cache_read_input_tokens": 900,
+    "cache_creation_input_tokens": -1,
+}
+
+
+class DummyContextManager:
+    async def aapply_truncation_if_needed(
+        self, messages, token_count=None, owner=None
+    ):
+        return messages
+
+    def count_tokens(self, messages):
+        return 0
+
+    def count_turn_tokens(self, message_list):
+        return 0, 0
+
+
+class UsageLLM(LLMClient):
+    def __init__(self):
+        self.model_name = "dummy"
+
+    def generate(self, *args, **kwargs):
+        return [TextResult(text="done")], dict(METADATA)
+
+    async def agenerate_stream(self, messages, max_tokens, on_delta, **kwargs):
+        await asyncio.sleep(0.01)
+        on_delta(StreamDelta(type="text", delta="done"))
+        await asyncio.sleep(0.01)
+        return [TextResult(text="done")], dict(METADATA)
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'events.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(
+        db_manager,
+        "SessionLocal",
+        sessionmaker(
+            autocommit=False, autoflush=False, bind=engine, expire_on_commit=False
+        ),
+    )
+    yield engine
+    engine.dispose()
+
+
+def create_session(engine):
+    session_id = uuid.uuid4()
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Session),
+            [{"id": str(session_id), "workspace_dir": f"/workspace/{session_id}"}],
+        )
+    return session_id
+
+
+def test_timer_measures_first_byte_and_clamps_missing_tokens():
+    timer = LLMCallTimer("dummy", "main")
+    deltas = []
+    callback = timer.stream_callback(deltas.append)
+
+    callback(StreamDelta(type="text", delta="a"))
+    usage = timer.usage(METADATA)
+
+    assert deltas == [StreamDelta(type="text", delta="a")]
+    assert 0 <= usage.ttfb_ms <= usage.latency_ms
+    assert usage.cache_creation_input_tokens == 0
+    assert LLMCallTimer("dummy", "main").usage(None).ttfb_ms is None
+
+
+@pytest.mark.asyncio
+async def test_agent_and_auxiliary_calls_are_recorded_in_the_session_ledger(
+    engine, tmp_path
+):
+    session_id = create_session(engine)
+    client = UsageLLM()
+    ledger = UsageLedger(session_id, run_id="run-1")
+    with use_usage_ledger(ledger):
+        agent = FunctionCallAgent(
+            system_prompt="",
+            client=client,
+            tools=[],
+            init_history=MessageHistory(context_manager=DummyContextManager()),
+            workspace_manager=WorkspaceManager(Path(tmp_path)),
+            message_queue=asyncio.Queue(),
+            logger_for_agent_logs=logging.getLogger("test"),
+            max_turns=1,
+            session_id=session_id,
+            stream_responses=True,
+        )
+        await agenerate_auxiliary(
+            client, purpose=LLMCallPurpose.ENHANCEMENT, messages=[], max_tokens=5
+        )
+    await agent.run_agent_async("do it")
+
+    assert agent.usage_ledger is ledger
+    main_call = ledger.calls[1]
+    assert [call.purpose for call in ledger.calls] == ["enhancement", "main"]
+    assert main_call.ttfb_ms >= 10 and main_call.latency_ms >= 20
+    rows = db_manager.LLMUsageEntries.get_usage(session_id=str(session_id))
+    assert [(row["purpose"], row["run_id"], row["input_tokens"]) for row in rows] == [
+        ("enhancement", "run-1", 100),
+        ("main", "run-1", 100),
+    ]
+
+
+def test_usage_endpoints_aggregate_per_session_and_run(engine):
+    first, second = create_session(engine), create_session(engine)
+    for session_id, purposes in ((first, ["main", "summary"]), (second, ["main"])):
+        ledger = UsageLedger(session_id, run_id="gaia")
+        for purpose in purposes:
+            ledger.record(LLMCallTimer("dummy", purpose).usage(METADATA))
+    app = FastAPI()
+    app.include_router(usage_router)
+    client = TestClient(app)
+
+    session_usage = client.get(f"/api/sessions/{first}/usage").json()
+    run_usage = client.get("/api/runs/gaia/usage").json()
+
+    assert len(session_usage["calls"]) == 2
+    assert session_usage["summary"]["calls"] == 2
+    assert session_usage["summary"]["by_purpose"]["summary"]["input_tokens"] == 100
+    assert run_usage["summary"]["cache_read_input_tokens"] == 2700
+    assert run_usage["summary"]["by_model"]["dummy"]["calls"] == 3
+    assert run_usage["sessions"][str(second)]["calls"] == 1
+    assert client.get("/api/runs/other/usage").json()["summary"]["calls"] == 0
+
+
+def test_summary_of_no_calls():
+    assert summarize_usage([]) == {
+        "calls": 0,
+        "total_latency_ms": 0,
+        "mean_latency_ms": 0.0,
+        "mean_ttfb_ms": None,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "cache_read_input_tokens": 0,
+        "cache_creation_input_tokens": 0,
+        "by_purpose": {},
+        "by_model": {},
+    }
+
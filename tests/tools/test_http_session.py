@@ -0,0 +1,46 @@
+import pytest
+from aiohttp import web
+
+from ii_agent.tools.http_session import aclose_aiohttp_session, get_aiohttp_session
+from ii_agent.tools.visit_webpage_client import MarkdownifyVisitClient
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+@pytest.mark.asyncio
+async def test_session_shared_within_loop():
+    first = get_aiohttp_session()
+    assert get_aiohttp_session() is first
+
+    await aclose_aiohttp_session()
+    assert first.closed
+    assert get_aiohttp_session() is not first
+    await aclose_aiohttp_session()
+
+
+@pytest.mark.asyncio
+async def test_visits_reuse_connections():
+    client_ports = []
+
+    async def page(request):
+        client_ports.append(request.transport.get_extra_info("peername")[1])
+        return web.Response(text="<h1>Hello</h1>", content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/", page)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    try:
+        client = MarkdownifyVisitClient()
+        for _ in range(3):
+            assert "Hello" in await client.forward_async(f"http://127.0.0.1:{port}/")
+    finally:
+        await aclose_aiohttp_session()
+        await runner.cleanup()
+
+    assert len(client_ports) == 3
+    assert len(set(client_ports)) == 1
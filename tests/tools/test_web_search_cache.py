@@ -0,0 +1,136 @@
+import pytest
+
+from ii_agent.tools.web_search_client import (
+    BaseSearchClient,
+    CachedSearchClient,
+    SQLiteSearchResultCache,
+)
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+class FakeSearchClient(BaseSearchClient):
+    name = "Fake"
+
+    def __init__(self, max_results=5, fail=False):
+        self.max_results = max_results
+        self.fail = fail
+        self.queries = []
+
+    async def forward_async(self, query):
+        self.queries.append(query)
+        if self.fail:
+            return f"Error searching with {self.name}: boom"
+        return f"results for {query}"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = SQLiteSearchResultCache(
+        str(tmp_path / "search.db"), ttl=60, max_entries=3, clock=clock
+    )
+    yield cache
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_repeated_query_is_served_from_cache(cache):
+    engine = FakeSearchClient()
+    client = CachedSearchClient(engine, cache)
+
+    first = await client.forward_async("Python  asyncio")
+    second = await client.forward_async("python asyncio ")
+
+    assert first == second == "results for Python  asyncio"
+    assert engine.queries == ["Python  asyncio"]
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 1,
+        "expired": 0,
+        "evictions": 0,
+        "entries": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_key_includes_engine_and_max_results(cache):
+    engine = FakeSearchClient(max_results=5)
+    await CachedSearchClient(engine, cache).forward_async("q")
+    await CachedSearchClient(engine, cache).forward_async("q")
+
+    other_size = FakeSearchClient(max_results=10)
+    await CachedSearchClient(other_size, cache).forward_async("q")
+    other_engine = FakeSearchClient()
+    other_engine.name = "Other"
+    await CachedSearchClient(other_engine, cache).forward_async("q")
+
+    assert engine.queries == ["q"]
+    assert other_size.queries == ["q"]
+    assert other_engine.queries == ["q"]
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_ttl(cache, clock):
+    engine = FakeSearchClient()
+    client = CachedSearchClient(engine, cache)
+
+    await client.forward_async("q")
+    clock.now += 59
+    await client.forward_async("q")
+    clock.now += 1
+    await client.forward_async("q")
+
+    assert len(engine.queries) == 2
+    assert cache.stats()["expired"] == 1
+
+
+def test_least_recently_used_entries_are_evicted(cache, clock):
+    for query in ["a", "b", "c"]:
+        cache.put("Fake", query, 5, query)
+        clock.now += 1
+    assert cache.get("Fake", "a", 5) == "a"
+    clock.now += 1
+
+    cache.put("Fake", "d", 5, "d")
+
+    assert cache.get("Fake", "b", 5) is None
+    assert [cache.get("Fake", q, 5) for q in ["a", "c", "d"]] == ["a", "c", "d"]
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["entries"] == 3
+
+
+def test_cache_survives_reopening(tmp_path):
+    path = str(tmp_path / "search.db")
+    cache = SQLiteSearchResultCache(path)
+    cache.put("Fake", "q", 5, "r")
+    cache.close()
+
+    reopened = SQLiteSearchResultCache(path)
+
+    assert reopened.get("Fake", "Q", 5) == "r"
+    reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_errors_are_not_cached(cache):
+    engine = FakeSearchClient(fail=True)
+    client = CachedSearchClient(engine, cache)
+
+    await client.forward_async("q")
+    await client.forward_async("q")
+
+    assert len(engine.queries) == 2
+    assert cache.stats()["entries"] == 0
@@ -1,4 +1,5 @@
 from argparse import ArgumentParser
+import os
 import uuid
 from pathlib import Path
 from ii_agent.utils import WorkspaceManager
@@ -99,12 +100,31 @@ def parse_common_args(parser: ArgumentParser):
         default=True,
         help="Disable chain-of-thought model (enabled by default)",
     )
+    parser.add_argument(
+        "--no-prompt-caching",
+        action="store_false",
+        dest="prompt_caching",
+        default=True,
+        help="Disable Anthropic prompt caching (enabled by default)",
+    )
     parser.add_argument(
         "--prompt",
         type=str,
         default=None,
         help="Prompt to use for the LLM",
     )
+    parser.add_argument(
+        "--trace-file",
+        type=str,
+        default=os.getenv("II_AGENT_TRACE_FILE"),
+        help="(Optional) JSONL file to write spans of agent runs, LLM calls and tools to",
+    )
+    parser.add_argument(
+        "--otlp-endpoint",
+        type=str,
+        default=os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"),
+        help="(Optional) OTLP/HTTP collector to send spans to, e.g. http://localhost:4318",
+    )
     return parser
 
 
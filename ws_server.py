@@ -38,7 +38,7 @@ def main():
         "model_name": args.model_name,
     }
     if args.llm_client == "anthropic-direct":
-        client_kwargs["use_caching"] = False
+        client_kwargs["use_caching"] = args.prompt_caching
         client_kwargs["project_id"] = args.project_id
         client_kwargs["region"] = args.region
     elif args.llm_client == "openai-direct":